@@ -10,11 +10,9 @@ def PST_RegisterExtensibleCallback(name, fn):
 
 def V_calculate_standard_deviation(V_nums, V_length, V_mean):
   V_total_dev = 0.0
-  V_i = 0
-  while V_i < V_length:
+  for V_i in range(V_length):
     V_diff = V_nums[V_i] - V_mean
     V_total_dev += V_diff ** 2
-    V_i += 1
   return (V_total_dev / V_length) ** 0.5
 
 def V_NumAnalysis_getCount(V_na):
@@ -46,15 +44,13 @@ def V_perform_analysis(V_nums, V_length):
     V_output[1] = V_nums[0]
     V_output[2] = V_nums[0]
     V_output[3] = 0
-    V_i = 0
-    while V_i < V_length:
+    for V_i in range(V_length):
       V_value = V_nums[V_i]
       V_output[3] += V_value
       if V_value < V_output[1]:
         V_output[1] = V_value
       if V_value > V_output[2]:
         V_output[2] = V_value
-      V_i += 1
     V_output[4] = 1.0 * V_output[3] / V_length
     V_output[6] = V_calculate_standard_deviation(V_nums, V_length, V_output[4])
     V_nums_copy = PST_sortedCopyOfList(V_nums)
@@ -0,0 +1,92 @@
+﻿using System.Collections.Generic;
+using System.Linq;
+
+namespace Pastel
+{
+    // Skips a build when nothing it depends on has changed since the last build of the same target.
+    //
+    // After each successful build, a manifest is saved in the cache directory with hashes of...
+    // - the Pastel binary, the build file, and the target ID
+    // - every source file that was read, including all files that were @import'ed
+    // - every file that was generated
+    // A later build of the same target is skipped entirely if all of these still match. Files that are
+    // @import'ed are recorded as they're loaded, so changing any file in the import graph (or a flag
+    // that changes which files are imported) invalidates the build, while unrelated files do not.
+    //
+    // This only works on whole targets. Nothing is cached per file or per function: inlining, constant
+    // folding, and tree shaking make the output of a function depend on other functions, so any change
+    // rebuilds the whole target.
+    internal class BuildCache
+    {
+        private string manifestPath;
+        private string header;
+        private Dictionary<string, string> inputHashes = new Dictionary<string, string>();
+
+        public BuildCache(ProjectConfig config, string? targetId)
+        {
+            string targetName = targetId ?? "default";
+            this.manifestPath = System.IO.Path.Combine(
+                config.BuildCacheDirectory!,
+                string.Join("", targetName.Select(c => char.IsLetterOrDigit(c) || c == '-' ? c : '_')) + ".manifest");
+            this.header = string.Join("\n", [
+                "compiler " + typeof(BuildCache).Assembly.ManifestModule.ModuleVersionId,
+                "config " + GetHash(System.IO.File.ReadAllText(config.Path)),
+                "target " + targetName,
+            ]);
+        }
+
+        private static string GetHash(string content)
+        {
+            byte[] bytes = System.Text.Encoding.UTF8.GetBytes(content);
+            return System.Convert.ToHexString(System.Security.Cryptography.SHA256.HashData(bytes));
+        }
+
+        private static string? GetFileHash(string path)
+        {
+            string? content = DiskUtil.TryReadTextFile(path);
+            return content == null ? null : GetHash(content);
+        }
+
+        public void RecordInput(string path, string content)
+        {
+            this.inputHashes[path] = GetHash(content);
+        }
+
+        public bool IsUpToDate()
+        {
+            string? manifest = DiskUtil.TryReadTextFile(this.manifestPath);
+            if (manifest == null || !manifest.StartsWith(this.header + "\n")) return false;
+
+            foreach (string line in manifest.Substring(this.header.Length + 1).Split('\n'))
+            {
+                if (line.Length == 0) continue;
+
+                // <input|output> <hash> <path>
+                string[] parts = line.Split(' ', 3);
+                if (parts.Length != 3 || GetFileHash(parts[2]) != parts[1]) return false;
+            }
+            return true;
+        }
+
+        public void Save(IList<string> outputPaths)
+        {
+            List<string> lines = [this.header];
+            foreach (string path in this.inputHashes.Keys.OrderBy(p => p))
+            {
+                lines.Add("input " + this.inputHashes[path] + " " + path);
+            }
+            foreach (string path in outputPaths.Distinct().OrderBy(p => p))
+            {
+                lines.Add("output " + GetFileHash(path) + " " + path);
+            }
+            lines.Add("");
+
+            string? dir = System.IO.Path.GetDirectoryName(this.manifestPath);
+            if (dir == null || !DiskUtil.EnsureDirectoryExists(dir))
+            {
+                throw new UserErrorException("Cannot create build cache directory: " + dir);
+            }
+            DiskUtil.WriteTextFileIfChanged(this.manifestPath, string.Join("\n", lines));
+        }
+    }
+}
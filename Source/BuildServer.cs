@@ -0,0 +1,332 @@
+﻿using Pastel.Parser;
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Text.Json;
+using System.Threading;
+
+namespace Pastel
+{
+    // Runs the compiler as a long-running process so that a series of builds only pays for .NET startup and
+    // JIT compilation once. Requests are read as one JSON object per line and one JSON object is written back
+    // per request:
+    //
+    //   {"id": 1, "command": "build", "project": "path/to/build.json", "targets": ["python"]}
+    //   {"id": 1, "success": true, "errors": [], "targets": [{"name": "python", "status": "built", ...}]}
+    //
+    // Parsed build files and tokenized source files are kept between builds. In watch mode, every project that
+    // has been built is rebuilt when a .pst or .json file in its directories changes, and the result is written
+    // as a message with "event": "rebuild" instead of an id.
+    internal class BuildServer
+    {
+        private class CachedConfig
+        {
+            public string Content { get; private set; }
+            public ProjectConfig Config { get; private set; }
+
+            public CachedConfig(string content, ProjectConfig config)
+            {
+                this.Content = content;
+                this.Config = config;
+            }
+        }
+
+        private class WatchedProject
+        {
+            public string ProjectPath { get; set; } = "";
+            public string?[] TargetIds { get; set; } = new string?[0];
+            public HashSet<string> OutputFiles { get; } = new HashSet<string>();
+            public Dictionary<string, FileSystemWatcher> WatchersByDirectory { get; } = new Dictionary<string, FileSystemWatcher>();
+            public Timer? RebuildTimer { get; set; }
+        }
+
+        private const int REBUILD_DELAY_MILLIS = 200;
+
+        private static readonly JsonSerializerOptions JSON_OPTIONS = new JsonSerializerOptions()
+        {
+            Encoder = System.Text.Encodings.Web.JavaScriptEncoder.UnsafeRelaxedJsonEscaping,
+        };
+
+        private bool watch;
+        private TextWriter output = TextWriter.Null;
+        private object buildLock = new object();
+        private object outputLock = new object();
+        private TokenCache tokenCache = new TokenCache();
+        private Dictionary<string, CachedConfig> configs = new Dictionary<string, CachedConfig>();
+        private Dictionary<string, WatchedProject> watchedProjects = new Dictionary<string, WatchedProject>();
+
+        public BuildServer(bool watch)
+        {
+            this.watch = watch;
+        }
+
+        // Handles requests until the input is closed or a shutdown request is received.
+        public void Run(TextReader input, TextWriter output)
+        {
+            this.output = output;
+            bool shutdown = false;
+            string? line;
+            while (!shutdown && (line = input.ReadLine()) != null)
+            {
+                if (line.Trim().Length == 0) continue;
+
+                Dictionary<string, object?> response = new Dictionary<string, object?>() { { "id", null } };
+                try
+                {
+                    using JsonDocument doc = JsonDocument.Parse(line);
+                    JsonElement request = doc.RootElement;
+                    if (request.ValueKind != JsonValueKind.Object) throw new UserErrorException("Request must be a JSON object.");
+                    if (request.TryGetProperty("id", out JsonElement id)) response["id"] = id.Clone();
+
+                    string command = GetString(request, "command") ?? "build";
+                    switch (command)
+                    {
+                        case "build":
+                            AddAll(response, this.HandleBuild(request));
+                            break;
+
+                        case "shutdown":
+                            response["success"] = true;
+                            shutdown = true;
+                            break;
+
+                        default:
+                            throw new UserErrorException("Unknown command: '" + command + "'");
+                    }
+                }
+                catch (JsonException je)
+                {
+                    AddAll(response, CreateErrorResponse("Invalid JSON request: " + je.Message));
+                }
+                catch (Exception e)
+                {
+                    AddAll(response, CreateErrorResponse(GetErrorMessage(e)));
+                }
+                this.WriteMessage(response);
+            }
+
+            lock (this.watchedProjects)
+            {
+                foreach (WatchedProject project in this.watchedProjects.Values)
+                {
+                    project.RebuildTimer?.Dispose();
+                    foreach (FileSystemWatcher watcher in project.WatchersByDirectory.Values)
+                    {
+                        watcher.Dispose();
+                    }
+                }
+                this.watchedProjects.Clear();
+            }
+        }
+
+        private Dictionary<string, object?> HandleBuild(JsonElement request)
+        {
+            string projectPath = GetString(request, "project") ?? throw new UserErrorException("Build request is missing a 'project' path.");
+            if (!File.Exists(projectPath)) throw new UserErrorException("Project file does not exist: '" + projectPath + "'");
+            projectPath = Path.GetFullPath(projectPath);
+
+            // Without a list of targets, the default target is built, the same as when no target is given on the command line.
+            string?[] targetIds = new string?[] { null };
+            if (request.TryGetProperty("targets", out JsonElement targets))
+            {
+                if (targets.ValueKind != JsonValueKind.Array || targets.EnumerateArray().Any(t => t.ValueKind != JsonValueKind.String))
+                {
+                    throw new UserErrorException("Build request 'targets' must be a list of target names.");
+                }
+                targetIds = targets.EnumerateArray().Select(t => t.GetString()).Distinct().ToArray();
+                if (targetIds.Length == 0) throw new UserErrorException("Build request 'targets' is empty.");
+            }
+
+            TargetBuildResult[] results = this.Build(projectPath, targetIds);
+            if (this.watch)
+            {
+                this.WatchProject(projectPath, targetIds, results);
+            }
+            return CreateBuildResponse(results);
+        }
+
+        // Builds are run one at a time. Each build already runs its targets in parallel.
+        private TargetBuildResult[] Build(string projectPath, string?[] targetIds)
+        {
+            lock (this.buildLock)
+            {
+                ProjectConfig[] configs = targetIds.Select(targetId => this.GetConfig(projectPath, targetId)).ToArray();
+                TargetBuildResult[] results = Program.BuildConfigs(configs, targetIds, this.tokenCache);
+                this.tokenCache.RemoveUnusedEntries();
+                return results;
+            }
+        }
+
+        private ProjectConfig GetConfig(string projectPath, string? targetId)
+        {
+            string content = File.ReadAllText(projectPath);
+            string key = projectPath + "\n" + targetId;
+            if (this.configs.TryGetValue(key, out CachedConfig? cached) && cached.Content == content)
+            {
+                return cached.Config;
+            }
+
+            ProjectConfig config = Program.ParseConfig(projectPath, targetId);
+            this.configs[key] = new CachedConfig(content, config);
+            return config;
+        }
+
+        private void WatchProject(string projectPath, string?[] targetIds, TargetBuildResult[] results)
+        {
+            List<string> directories = new List<string>() { Path.GetDirectoryName(projectPath)! };
+            lock (this.buildLock)
+            {
+                foreach (string? targetId in targetIds)
+                {
+                    directories.Add(Path.GetDirectoryName(this.GetConfig(projectPath, targetId).Source)!);
+                }
+            }
+
+            lock (this.watchedProjects)
+            {
+                if (!this.watchedProjects.TryGetValue(projectPath, out WatchedProject? project))
+                {
+                    project = new WatchedProject() { ProjectPath = projectPath };
+                    this.watchedProjects[projectPath] = project;
+                }
+
+                lock (project)
+                {
+                    project.TargetIds = project.TargetIds.Union(targetIds).ToArray();
+                    project.OutputFiles.UnionWith(results.SelectMany(result => result.OutputFiles).Select(Path.GetFullPath));
+                    foreach (string directory in directories.Distinct())
+                    {
+                        if (project.WatchersByDirectory.ContainsKey(directory) || !Directory.Exists(directory)) continue;
+
+                        FileSystemWatcher watcher = new FileSystemWatcher(directory)
+                        {
+                            IncludeSubdirectories = true,
+                            NotifyFilter = NotifyFilters.FileName | NotifyFilters.LastWrite,
+                        };
+                        watcher.Changed += (sender, e) => this.OnFileChanged(project, e.FullPath);
+                        watcher.Created += (sender, e) => this.OnFileChanged(project, e.FullPath);
+                        watcher.Deleted += (sender, e) => this.OnFileChanged(project, e.FullPath);
+                        watcher.Renamed += (sender, e) => this.OnFileChanged(project, e.FullPath);
+                        watcher.EnableRaisingEvents = true;
+                        project.WatchersByDirectory[directory] = watcher;
+                    }
+                }
+            }
+        }
+
+        // Editors tend to write a file several times when it is saved, so the rebuild is delayed until the
+        // changes have stopped for a moment.
+        private void OnFileChanged(WatchedProject project, string path)
+        {
+            string extension = Path.GetExtension(path).ToLowerInvariant();
+            if (extension != ".pst" && extension != ".json") return;
+
+            lock (project)
+            {
+                if (project.OutputFiles.Contains(Path.GetFullPath(path))) return;
+                project.RebuildTimer?.Dispose();
+                project.RebuildTimer = new Timer(_ => this.Rebuild(project), null, REBUILD_DELAY_MILLIS, Timeout.Infinite);
+            }
+        }
+
+        private void Rebuild(WatchedProject project)
+        {
+            string?[] targetIds;
+            lock (project)
+            {
+                targetIds = project.TargetIds;
+            }
+
+            Dictionary<string, object?> message = new Dictionary<string, object?>()
+            {
+                { "event", "rebuild" },
+                { "project", project.ProjectPath },
+            };
+            try
+            {
+                TargetBuildResult[] results = this.Build(project.ProjectPath, targetIds);
+                lock (project)
+                {
+                    project.OutputFiles.UnionWith(results.SelectMany(result => result.OutputFiles).Select(Path.GetFullPath));
+                }
+                AddAll(message, CreateBuildResponse(results));
+            }
+            catch (Exception e)
+            {
+                AddAll(message, CreateErrorResponse(GetErrorMessage(e)));
+            }
+            this.WriteMessage(message);
+        }
+
+        // Errors are listed the same way the command line reports them: on their own for a single target and
+        // prefixed with the target name when several targets are built at once.
+        private static Dictionary<string, object?> CreateBuildResponse(TargetBuildResult[] results)
+        {
+            return new Dictionary<string, object?>()
+            {
+                { "success", results.All(result => result.Error == null) },
+                {
+                    "errors",
+                    results
+                        .Where(result => result.Error != null)
+                        .Select(result => results.Length == 1 ? result.Error : "[" + result.TargetId + "] " + result.Error)
+                        .ToArray()
+                },
+                {
+                    "targets",
+                    results.Select(result => new Dictionary<string, object?>()
+                    {
+                        { "name", result.TargetId },
+                        { "status", result.Error != null ? "failed" : result.Built ? "built" : "up-to-date" },
+                        { "milliseconds", result.Milliseconds },
+                        { "files", result.OutputFiles },
+                        { "error", result.Error },
+                    }).ToArray()
+                },
+            };
+        }
+
+        private static Dictionary<string, object?> CreateErrorResponse(string error)
+        {
+            return new Dictionary<string, object?>()
+            {
+                { "success", false },
+                { "errors", new string[] { error } },
+            };
+        }
+
+        // User errors are reported by their message. Anything else is a compiler bug, so the full exception is
+        // reported instead of taking the server down.
+        private static string GetErrorMessage(Exception e)
+        {
+            if (e is AggregateException ae) e = ae.Flatten().InnerExceptions[0];
+            return e is UserErrorException ? e.Message : e.ToString();
+        }
+
+        private void WriteMessage(Dictionary<string, object?> message)
+        {
+            string json = JsonSerializer.Serialize(message, JSON_OPTIONS);
+            lock (this.outputLock)
+            {
+                this.output.WriteLine(json);
+                this.output.Flush();
+            }
+        }
+
+        private static string? GetString(JsonElement obj, string key)
+        {
+            if (!obj.TryGetProperty(key, out JsonElement value)) return null;
+            if (value.ValueKind != JsonValueKind.String) throw new UserErrorException("Request field '" + key + "' must be a string.");
+            return value.GetString();
+        }
+
+        private static void AddAll(Dictionary<string, object?> target, Dictionary<string, object?> values)
+        {
+            foreach (string key in values.Keys)
+            {
+                target[key] = values[key];
+            }
+        }
+    }
+}
@@ -62,7 +62,21 @@ namespace Pastel
             return CoreFunctionUtil.argTypesRepeated[functionId];
         }
 
+        private static readonly object initLock = new object();
+
+        // Multiple targets can be compiled on different threads.
         private static void Init()
+        {
+            lock (initLock)
+            {
+                if (CoreFunctionUtil.returnTypes == null)
+                {
+                    InitImpl();
+                }
+            }
+        }
+
+        private static void InitImpl()
         {
             Dictionary<string, CoreFunction> lookup = new Dictionary<string, CoreFunction>();
             foreach (CoreFunction func in typeof(CoreFunction).GetEnumValues().Cast<CoreFunction>())
@@ -70,7 +84,7 @@ namespace Pastel
                 lookup[func.ToString()] = func;
             }
 
-            CoreFunctionUtil.returnTypes = new Dictionary<CoreFunction, PType>();
+            Dictionary<CoreFunction, PType> returnTypes = new Dictionary<CoreFunction, PType>();
             CoreFunctionUtil.argTypes = new Dictionary<CoreFunction, PType[]>();
             CoreFunctionUtil.argTypesRepeated = new Dictionary<CoreFunction, bool[]>();
 
@@ -108,11 +122,14 @@ namespace Pastel
                     }
 
                     CoreFunction func = lookup[name];
-                    CoreFunctionUtil.returnTypes[func] = returnType;
+                    returnTypes[func] = returnType;
                     CoreFunctionUtil.argTypes[func] = argList.ToArray();
                     CoreFunctionUtil.argTypesRepeated[func] = argRepeated.ToArray();
                 }
             }
+
+            // This is checked by callers to see if initialization is done, so it is set last.
+            CoreFunctionUtil.returnTypes = returnTypes;
         }
 
         private static string GetCoreFunctionSignatureManifest()
@@ -12,25 +12,6 @@ namespace Pastel
     // about the codebase.
     internal static class CrayonHacks
     {
-        // TODO(pastel-split): This is just a quick and dirty short-circuit logic for && and ||
-        // Do full logic later. Currently this is causing problems in specific snippets in Crayon libraries.
-        internal static Expression BoolLogicResolver(Expression binaryOp, string opValue, InlineConstant? left)
-        {
-            if (left != null)
-            {
-                if (opValue == "&&" && left.Value is bool)
-                {
-                    return (bool)left.Value ? binaryOp : left;
-                }
-                if (opValue == "||" && left.Value is bool)
-                {
-                    return (bool)left.Value ? left : binaryOp;
-                }
-            }
-
-            return binaryOp;
-        }
-
         // TODO: This is a Crayon-ism that needs to be removed
         // TODO: also this is dangerously likely to affect other projects. At least add a
         // hacky `if (structDef.NameToken.FileName == blah)` that'll be at least somewhat more
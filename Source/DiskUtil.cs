@@ -15,6 +15,18 @@
             return null;
         }
 
+        // Files whose content hasn't changed are not written so that their timestamps are left alone for
+        // anything downstream that watches them.
+        public static void WriteTextFileIfChanged(string path, string content)
+        {
+            byte[] bytes = new System.Text.UTF8Encoding(false).GetBytes(content);
+            if (System.IO.File.Exists(path) && System.Linq.Enumerable.SequenceEqual(System.IO.File.ReadAllBytes(path), bytes))
+            {
+                return;
+            }
+            System.IO.File.WriteAllBytes(path, bytes);
+        }
+
         public static bool EnsureDirectoryExists(string path)
         {
             string fullPath = System.IO.Path.GetFullPath(path);
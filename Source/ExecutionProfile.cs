@@ -0,0 +1,61 @@
+﻿using Pastel.Parser.ParseNodes;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text.Json;
+
+namespace Pastel
+{
+    // The number of times each function was called and each switch chunk was hit in a run of an instrumented build,
+    // as written by PST_dumpProfile. This is a JSON object of counts keyed by the names that the Instrumenter gives
+    // them. Anything that isn't in the profile is treated as never having run.
+    internal class ExecutionProfile
+    {
+        private Dictionary<string, long> counts;
+
+        private ExecutionProfile(Dictionary<string, long> counts)
+        {
+            this.counts = counts;
+        }
+
+        public static ExecutionProfile Parse(string path, string json)
+        {
+            Dictionary<string, long> counts = new Dictionary<string, long>();
+            try
+            {
+                using JsonDocument doc = JsonDocument.Parse(json);
+                if (doc.RootElement.ValueKind != JsonValueKind.Object) throw new JsonException();
+                foreach (JsonProperty kvp in doc.RootElement.EnumerateObject())
+                {
+                    counts[kvp.Name] = kvp.Value.GetInt64();
+                }
+            }
+            catch (System.Exception e) when (e is JsonException || e is System.FormatException || e is System.InvalidOperationException)
+            {
+                throw new UserErrorException("Invalid profile: " + path + ". Expected a JSON object of counts as written by PST_dumpProfile.");
+            }
+            return new ExecutionProfile(counts);
+        }
+
+        public static string GetChunkKey(string switchKey, int chunkIndex)
+        {
+            return switchKey + "/chunk" + chunkIndex;
+        }
+
+        public long GetCount(string key)
+        {
+            return this.counts.TryGetValue(key, out long count) ? count : 0;
+        }
+
+        // The indices of the chunks of the switch statement from the most to the least frequently hit, or null if
+        // none of them were. Chunks with the same count stay in their original order.
+        public int[]? GetChunkOrder(SwitchStatement switchStatement)
+        {
+            if (switchStatement.ProfileKey == null) return null;
+            long[] chunkCounts = Enumerable.Range(0, switchStatement.Chunks.Length)
+                .Select(i => this.GetCount(GetChunkKey(switchStatement.ProfileKey, i)))
+                .ToArray();
+            if (chunkCounts.All(count => count == 0)) return null;
+            return Enumerable.Range(0, chunkCounts.Length).OrderByDescending(i => chunkCounts[i]).ToArray();
+        }
+    }
+}
@@ -0,0 +1,556 @@
+﻿using Pastel.Parser.ParseNodes;
+using System;
+using System.Collections.Generic;
+using System.Linq;
+
+namespace Pastel.Parser
+{
+    // Evaluates operations on constants at compile time and removes code that can never run.
+    //
+    // Individual expressions are folded by Fold as they are resolved with type context. Run then goes over all
+    // the code again, both before functions are inlined (so that pruned code doesn't count towards the inlining
+    // budget) and after (since inlining can substitute constants into places where there weren't any before).
+    // It folds whatever is left and prunes:
+    // - if statements whose condition is constant, and if statements with nothing in them
+    // - while loops whose condition is false
+    // - switch statements whose condition is constant
+    // - statements that follow a return or break
+    //
+    // Operations whose results differ between platforms (division by zero, division and modulo of negative
+    // numbers, integer overflow, numeric casts that some platforms ignore) are left for the platform to evaluate.
+    internal class ConstantFolder
+    {
+        public int FoldedExpressions { get; private set; }
+        public int RemovedStatements { get; private set; }
+
+        // The number of blocks of code that were removed, by the kind of statement they were removed from.
+        public Dictionary<string, int> PrunedBlocks { get; private set; }
+
+        public ConstantFolder()
+        {
+            this.PrunedBlocks = new Dictionary<string, int>();
+        }
+
+        public void Run(Dictionary<string, FunctionDefinition> functionDefinitions)
+        {
+            foreach (string functionName in functionDefinitions.Keys.OrderBy(s => s))
+            {
+                FunctionDefinition fd = functionDefinitions[functionName];
+                fd.Code = this.FoldBlock(fd.Code);
+            }
+        }
+
+        public void RecordPrunedCode(string kind, IList<Statement> code)
+        {
+            this.PrunedBlocks[kind] = this.PrunedBlocks.GetValueOrDefault(kind) + 1;
+            this.RemovedStatements += CountStatements(code);
+        }
+
+        private static int CountStatements(IList<Statement> code)
+        {
+            int count = 0;
+            ParseTreeWalker.WalkStatements(code, stmnt =>
+            {
+                if (stmnt is CountedForLoop countedLoop)
+                {
+                    // Don't count the canonical form as well.
+                    count += 1 + CountStatements(countedLoop.Code);
+                    return false;
+                }
+                if (!(stmnt is StatementBatch)) count++;
+                return true;
+            }, null);
+            return count;
+        }
+
+        // Folds a single expression whose children have already been folded.
+        // Returns the original expression if it can't be simplified.
+        public Expression Fold(Expression expr)
+        {
+            Expression output;
+            switch (expr.Type)
+            {
+                case ExpressionType.CAST: output = FoldCast((CastExpression)expr); break;
+                case ExpressionType.CORE_FUNCTION_INVOCATION: output = ((CoreFunctionInvocation)expr).TryCompileTimeResolve() ?? expr; break;
+                case ExpressionType.OP_PAIR: output = FoldOpPair((OpPair)expr); break;
+                case ExpressionType.STRING_CONCATENATION: output = FoldStringConcatenation((StringConcatenation)expr); break;
+                case ExpressionType.UNARY_OP: output = FoldUnaryOp((UnaryOp)expr); break;
+                default: return expr;
+            }
+
+            if (output != expr) this.FoldedExpressions++;
+            return output;
+        }
+
+        // Short-circuits && and || with constant operands. Unlike Fold, this only looks at the values of
+        // the constants and so it can be used before types are resolved.
+        public Expression FoldBooleanLogic(OpPair opPair)
+        {
+            Expression? output = TryFoldBooleanLogic(opPair);
+            if (output == null) return opPair;
+            this.FoldedExpressions++;
+            return output;
+        }
+
+        private static Expression? TryFoldBooleanLogic(OpPair opPair)
+        {
+            bool isAnd = opPair.Op == "&&";
+            if (!isAnd && opPair.Op != "||") return null;
+
+            if (opPair.Left is InlineConstant left && left.Value is bool leftValue)
+            {
+                // true && x -> x, false && x -> false, true || x -> true, false || x -> x
+                return leftValue == isAnd ? opPair.Right : left;
+            }
+
+            if (opPair.Right is InlineConstant right && right.Value is bool rightValue && rightValue == isAnd)
+            {
+                // x && true -> x, x || false -> x
+                return opPair.Left;
+            }
+
+            return null;
+        }
+
+        private static Expression FoldOpPair(OpPair opPair)
+        {
+            Expression? booleanLogic = TryFoldBooleanLogic(opPair);
+            if (booleanLogic != null) return booleanLogic;
+
+            if (opPair.Left is InlineConstant left && opPair.Right is InlineConstant right)
+            {
+                object? value = EvaluateOpPair(left, opPair.Op, right);
+                if (value != null) return InlineConstant.Of(value, opPair.FirstToken, opPair.Owner);
+            }
+
+            return opPair;
+        }
+
+        // Returns null if the operation can't be done at compile time.
+        private static object? EvaluateOpPair(InlineConstant left, string op, InlineConstant right)
+        {
+            object a = left.Value;
+            object b = right.Value;
+            switch (left.ResolvedType.RootValue + op + right.ResolvedType.RootValue)
+            {
+                case "int+int": return ToIntIfInRange((long)(int)a + (int)b);
+                case "int-int": return ToIntIfInRange((long)(int)a - (int)b);
+                case "int*int": return ToIntIfInRange((long)(int)a * (int)b);
+                case "int/int": return (int)a >= 0 && (int)b > 0 ? (int)a / (int)b : null;
+                case "int%int": return (int)a >= 0 && (int)b > 0 ? (int)a % (int)b : null;
+                case "int&int": return (int)a & (int)b;
+                case "int|int": return (int)a | (int)b;
+                case "int^int": return (int)a ^ (int)b;
+                case "int<<int": return (int)b >= 0 && (int)b < 32 ? ToIntIfInRange((long)(int)a << (int)b) : null;
+                case "int>>int": return (int)b >= 0 && (int)b < 32 ? (int)a >> (int)b : null;
+
+                case "int+double":
+                case "double+int":
+                case "double+double":
+                    return Convert.ToDouble(a) + Convert.ToDouble(b);
+                case "int-double":
+                case "double-int":
+                case "double-double":
+                    return Convert.ToDouble(a) - Convert.ToDouble(b);
+                case "int*double":
+                case "double*int":
+                case "double*double":
+                    return Convert.ToDouble(a) * Convert.ToDouble(b);
+                case "int/double":
+                case "double/int":
+                case "double/double":
+                    return Convert.ToDouble(b) != 0 ? Convert.ToDouble(a) / Convert.ToDouble(b) : null;
+                case "int%double":
+                case "double%int":
+                case "double%double":
+                    return Convert.ToDouble(a) >= 0 && Convert.ToDouble(b) > 0 ? Convert.ToDouble(a) % Convert.ToDouble(b) : null;
+
+                case "int==int":
+                case "int==double":
+                case "double==int":
+                case "double==double":
+                    return Convert.ToDouble(a) == Convert.ToDouble(b);
+                case "int!=int":
+                case "int!=double":
+                case "double!=int":
+                case "double!=double":
+                    return Convert.ToDouble(a) != Convert.ToDouble(b);
+                case "int<int":
+                case "int<double":
+                case "double<int":
+                case "double<double":
+                    return Convert.ToDouble(a) < Convert.ToDouble(b);
+                case "int<=int":
+                case "int<=double":
+                case "double<=int":
+                case "double<=double":
+                    return Convert.ToDouble(a) <= Convert.ToDouble(b);
+                case "int>int":
+                case "int>double":
+                case "double>int":
+                case "double>double":
+                    return Convert.ToDouble(a) > Convert.ToDouble(b);
+                case "int>=int":
+                case "int>=double":
+                case "double>=int":
+                case "double>=double":
+                    return Convert.ToDouble(a) >= Convert.ToDouble(b);
+
+                case "char==char": return (char)a == (char)b;
+                case "char!=char": return (char)a != (char)b;
+                case "char<char": return (char)a < (char)b;
+                case "char<=char": return (char)a <= (char)b;
+                case "char>char": return (char)a > (char)b;
+                case "char>=char": return (char)a >= (char)b;
+
+                case "bool==bool": return (bool)a == (bool)b;
+                case "bool!=bool": return (bool)a != (bool)b;
+
+                case "string+string": return (string)a + (string)b;
+                case "string+char": return (string)a + (char)b;
+                case "char+string": return (char)a + (string)b;
+
+                default:
+                    // Notably, string equality is left alone since not all platforms compare strings by value.
+                    return null;
+            }
+        }
+
+        private static object? ToIntIfInRange(long value)
+        {
+            return value >= int.MinValue && value <= int.MaxValue ? (int)value : null;
+        }
+
+        private static Expression FoldUnaryOp(UnaryOp unaryOp)
+        {
+            bool isNot = unaryOp.OpToken.Value == "!";
+            if (unaryOp.Expression is InlineConstant ic)
+            {
+                if (isNot && ic.Value is bool boolValue)
+                {
+                    return InlineConstant.OfBoolean(!boolValue, unaryOp.FirstToken, unaryOp.Owner);
+                }
+                if (!isNot && ic.Value is int intValue && intValue != int.MinValue)
+                {
+                    return InlineConstant.OfInteger(-intValue, unaryOp.FirstToken, unaryOp.Owner);
+                }
+                if (!isNot && ic.Value is double floatValue)
+                {
+                    return InlineConstant.OfFloat(-floatValue, unaryOp.FirstToken, unaryOp.Owner);
+                }
+            }
+
+            if (unaryOp.Expression is UnaryOp inner && inner.OpToken.Value == unaryOp.OpToken.Value)
+            {
+                // !!x -> x, - -x -> x
+                return inner.Expression;
+            }
+
+            return unaryOp;
+        }
+
+        private static Expression FoldCast(CastExpression cast)
+        {
+            if (cast.Expression is InlineConstant ic)
+            {
+                string from = ic.ResolvedType.RootValue;
+                string to = cast.Type.RootValue;
+                if (from == to && cast.Type.Generics.Length == 0) return ic;
+
+                // Widening is exact everywhere. Narrowing (double to int) is not folded since some platforms
+                // don't do anything for a cast.
+                if (from == "int" && to == "double")
+                {
+                    return InlineConstant.OfFloat((int)ic.Value, cast.FirstToken, cast.Owner);
+                }
+            }
+            return cast;
+        }
+
+        private static Expression FoldStringConcatenation(StringConcatenation strConcat)
+        {
+            // Everything in a string concatenation has already been converted to a string.
+            List<Expression> output = [];
+            foreach (Expression expr in strConcat.Expressions)
+            {
+                if (expr is InlineConstant ic && ic.Value is string value)
+                {
+                    if (value.Length == 0) continue;
+                    if (output.Count > 0 && output[output.Count - 1] is InlineConstant prev && prev.Value is string prevValue)
+                    {
+                        output[output.Count - 1] = InlineConstant.OfString(prevValue + value, prev.FirstToken, prev.Owner);
+                        continue;
+                    }
+                }
+                output.Add(expr);
+            }
+
+            if (output.Count == strConcat.Expressions.Count) return strConcat;
+            if (output.Count == 0) return InlineConstant.OfString("", strConcat.FirstToken, strConcat.Owner);
+            if (output.Count == 1) return output[0];
+
+            StringConcatenation newConcat = new StringConcatenation(output[0], output[1]);
+            newConcat.Expressions.AddRange(output.Skip(2));
+            return newConcat;
+        }
+
+        private Expression FoldExpression(Expression expr)
+        {
+            return this.Fold(this.FoldChildren(expr));
+        }
+
+        private void FoldExpressions(Expression[] expressions)
+        {
+            for (int i = 0; i < expressions.Length; ++i)
+            {
+                expressions[i] = this.FoldExpression(expressions[i]);
+            }
+        }
+
+        private Expression FoldChildren(Expression expr)
+        {
+            switch (expr.Type)
+            {
+                case ExpressionType.CAST:
+                    CastExpression cast = (CastExpression)expr;
+                    cast.Expression = this.FoldExpression(cast.Expression);
+                    break;
+
+                case ExpressionType.CONSTRUCTOR_INVOCATION:
+                    this.FoldExpressions(((ConstructorInvocation)expr).Args);
+                    break;
+
+                case ExpressionType.CORE_FUNCTION_INVOCATION:
+                    this.FoldExpressions(((CoreFunctionInvocation)expr).Args);
+                    break;
+
+                case ExpressionType.DOT_FIELD:
+                    DotField dotField = (DotField)expr;
+                    dotField.Root = this.FoldExpression(dotField.Root);
+                    break;
+
+                case ExpressionType.EXTENSIBLE_FUNCTION_INVOCATION:
+                    this.FoldExpressions(((ExtensibleFunctionInvocation)expr).Args);
+                    break;
+
+                case ExpressionType.FUNCTION_INVOCATION:
+                    this.FoldExpressions(((FunctionInvocation)expr).Args);
+                    break;
+
+                case ExpressionType.FUNCTION_POINTER_INVOCATION:
+                    FunctionPointerInvocation fpInvocation = (FunctionPointerInvocation)expr;
+                    fpInvocation.Root = this.FoldExpression(fpInvocation.Root);
+                    this.FoldExpressions(fpInvocation.Args);
+                    break;
+
+                case ExpressionType.OP_PAIR:
+                    OpPair opPair = (OpPair)expr;
+                    opPair.Left = this.FoldExpression(opPair.Left);
+                    opPair.Right = this.FoldExpression(opPair.Right);
+                    break;
+
+                case ExpressionType.STRING_CONCATENATION:
+                    List<Expression> strExprs = ((StringConcatenation)expr).Expressions;
+                    for (int i = 0; i < strExprs.Count; ++i)
+                    {
+                        strExprs[i] = this.FoldExpression(strExprs[i]);
+                    }
+                    break;
+
+                case ExpressionType.UNARY_OP:
+                    UnaryOp unaryOp = (UnaryOp)expr;
+                    unaryOp.Expression = this.FoldExpression(unaryOp.Expression);
+                    break;
+            }
+            return expr;
+        }
+
+        private Statement[] FoldBlock(Statement[] code)
+        {
+            List<Statement> output = [];
+            for (int i = 0; i < code.Length; ++i)
+            {
+                Statement[]? replacement = this.FoldStatement(code[i]);
+                if (replacement == null)
+                {
+                    output.Add(code[i]);
+                }
+                else
+                {
+                    output.AddRange(replacement);
+                }
+
+                if (i + 1 < code.Length && output.Count > 0 &&
+                    (output[output.Count - 1] is ReturnStatement || output[output.Count - 1] is BreakStatement))
+                {
+                    this.RecordPrunedCode("unreachable", code.Skip(i + 1).ToArray());
+                    break;
+                }
+            }
+            return output.ToArray();
+        }
+
+        // Returns null if the statement was left in place (although its expressions may have changed).
+        // Otherwise returns the statements that replace it.
+        private Statement[]? FoldStatement(Statement stmnt)
+        {
+            switch (stmnt)
+            {
+                case Assignment asgn:
+                    asgn.Target = this.FoldChildren(asgn.Target);
+                    asgn.Value = this.FoldExpression(asgn.Value);
+                    return null;
+
+                case ExpressionAsStatement exprAsStmnt:
+                    // Only the children are folded so that whatever is left is still valid as a statement.
+                    exprAsStmnt.Expression = this.FoldChildren(exprAsStmnt.Expression);
+                    return null;
+
+                case ReturnStatement returnStatement:
+                    if (returnStatement.Expression != null)
+                    {
+                        returnStatement.Expression = this.FoldExpression(returnStatement.Expression);
+                    }
+                    return null;
+
+                case VariableDeclaration varDecl:
+                    if (varDecl.Value != null)
+                    {
+                        varDecl.Value = this.FoldExpression(varDecl.Value);
+                    }
+                    return null;
+
+                case IfStatement ifStatement:
+                    return this.FoldIfStatement(ifStatement);
+
+                case WhileLoop whileLoop:
+                    whileLoop.Condition = this.FoldExpression(whileLoop.Condition);
+                    if (whileLoop.Condition is InlineConstant ic && ic.Value is bool isRunning && !isRunning)
+                    {
+                        this.RecordPrunedCode("while", [whileLoop]);
+                        return [];
+                    }
+                    whileLoop.Code = this.FoldBlock(whileLoop.Code);
+                    return null;
+
+                case SwitchStatement switchStatement:
+                    return this.FoldSwitchStatement(switchStatement);
+
+                case CountedForLoop countedLoop:
+                    countedLoop.SetCode(this.FoldBlock(countedLoop.Code));
+                    return null;
+
+                case StatementBatch batch:
+                    // Flattened so that a return or break inside of it ends the enclosing block.
+                    return this.FoldBlock(batch.Statements);
+
+                default:
+                    return null;
+            }
+        }
+
+        private Statement[]? FoldIfStatement(IfStatement ifStatement)
+        {
+            ifStatement.Condition = this.FoldExpression(ifStatement.Condition);
+            if (ifStatement.Condition is InlineConstant ic && ic.Value is bool condition)
+            {
+                this.RecordPrunedCode("if", condition ? ifStatement.ElseCode : ifStatement.IfCode);
+                return this.FoldBlock(condition ? ifStatement.IfCode : ifStatement.ElseCode);
+            }
+
+            ifStatement.IfCode = this.FoldBlock(ifStatement.IfCode);
+            ifStatement.ElseCode = this.FoldBlock(ifStatement.ElseCode);
+
+            if (ifStatement.IfCode.Length == 0)
+            {
+                if (ifStatement.ElseCode.Length == 0)
+                {
+                    // The condition still has to run if it does anything.
+                    if (!Inliner.IsPure(ifStatement.Condition)) return null;
+                    this.RecordPrunedCode("if", [ifStatement]);
+                    return [];
+                }
+
+                ifStatement.Condition = Negate(ifStatement.Condition);
+                ifStatement.IfCode = ifStatement.ElseCode;
+                ifStatement.ElseCode = [];
+            }
+
+            return null;
+        }
+
+        private static Expression Negate(Expression condition)
+        {
+            if (condition is UnaryOp unaryOp && unaryOp.OpToken.Value == "!")
+            {
+                return unaryOp.Expression;
+            }
+
+            if (condition is OpPair opPair && (opPair.Op == "==" || opPair.Op == "!="))
+            {
+                Token opToken = new Token(
+                    opPair.Op == "==" ? "!=" : "==",
+                    opPair.OpToken.FileName,
+                    opPair.OpToken.Line,
+                    opPair.OpToken.Col,
+                    opPair.OpToken.Type);
+                return new OpPair(opPair.Left, opToken, opPair.Right) { ResolvedType = opPair.ResolvedType };
+            }
+
+            return new UnaryOp(Token.CreateDummyToken("!"), condition) { ResolvedType = PType.BOOL };
+        }
+
+        private Statement[]? FoldSwitchStatement(SwitchStatement switchStatement)
+        {
+            switchStatement.Condition = this.FoldExpression(switchStatement.Condition);
+
+            if (switchStatement.Condition is InlineConstant ic)
+            {
+                int value = ic.Value is char c ? c : (int)ic.Value;
+                SwitchStatement.SwitchChunk? selected =
+                    switchStatement.Chunks.FirstOrDefault(chunk => chunk.Cases.Any(caseExpr => caseExpr != null && GetCaseValue(caseExpr) == value)) ??
+                    switchStatement.Chunks.FirstOrDefault(chunk => chunk.HasDefault);
+
+                Statement[]? code = selected == null ? [] : RemoveSwitchBreak(selected.Code);
+                if (code != null)
+                {
+                    foreach (SwitchStatement.SwitchChunk chunk in switchStatement.Chunks)
+                    {
+                        if (chunk != selected) this.RecordPrunedCode("switch", chunk.Code);
+                    }
+                    return this.FoldBlock(code);
+                }
+            }
+
+            foreach (SwitchStatement.SwitchChunk chunk in switchStatement.Chunks)
+            {
+                chunk.Code = this.FoldBlock(chunk.Code);
+            }
+            return null;
+        }
+
+        private static int GetCaseValue(Expression caseExpr)
+        {
+            object value = ((InlineConstant)caseExpr).Value;
+            return value is char c ? c : (int)value;
+        }
+
+        // Returns the code of a switch case without the break at the end of it, or null if there are any other
+        // breaks that would have exited the switch statement.
+        private static Statement[]? RemoveSwitchBreak(Statement[] code)
+        {
+            Statement[] output = code.Length > 0 && code[code.Length - 1] is BreakStatement
+                ? code.Take(code.Length - 1).ToArray()
+                : code;
+
+            bool hasBreak = false;
+            ParseTreeWalker.WalkStatements(output, stmnt =>
+            {
+                if (stmnt is BreakStatement) hasBreak = true;
+                // Breaks in these belong to them.
+                return !hasBreak && !(stmnt is WhileLoop || stmnt is CountedForLoop || stmnt is SwitchStatement);
+            }, null);
+            return hasBreak ? null : output;
+        }
+    }
+}
@@ -0,0 +1,241 @@
+﻿using Pastel.Parser.ParseNodes;
+using System.Collections.Generic;
+using System.Linq;
+
+namespace Pastel.Parser
+{
+    // Finds the core functions that copy a collection (dictionary keys and values, list to array, sorted copies)
+    // whose copy can't be observed, and marks them with MayShareArgument so that the translators can skip it.
+    // This runs on fully resolved code, after functions have been inlined. A copy can be skipped when:
+    // - The result is read once, immediately, by something that doesn't hold on to it (the length of the array,
+    //   or joining it with a separator that has no side effects).
+    // - The result is sorted. The sorted copy can then sort the fresh collection in place.
+    // - The input is a local variable that owns its collection and is never used again. The variable must be
+    //   initialized with a new collection in the same block, must not be reassigned, and must not escape before
+    //   this point, i.e. it can only be used as the collection of a core function that doesn't keep a reference to
+    //   it, or be indexed. The input is then handed over to the result instead of copied.
+    // Anything else, including code that mutates the result while the input is still in use, keeps its copy.
+    internal class CopyElider
+    {
+        public void Run(Dictionary<string, FunctionDefinition> functionDefinitions)
+        {
+            foreach (string functionName in functionDefinitions.Keys.OrderBy(s => s))
+            {
+                FunctionDefinition fd = functionDefinitions[functionName];
+                foreach (Statement[] block in GetBlocks(fd.Code))
+                {
+                    for (int i = 0; i < block.Length; ++i)
+                    {
+                        this.ElideOwnedInputs(block, i);
+                    }
+                }
+
+                ParseTreeWalker.WalkStatements(fd.Code, null, expr =>
+                {
+                    if (expr is CoreFunctionInvocation cfi) this.ElideImmediateUse(cfi);
+                    return true;
+                });
+            }
+        }
+
+        private static List<Statement[]> GetBlocks(Statement[] code)
+        {
+            List<Statement[]> blocks = [code];
+            ParseTreeWalker.WalkStatements(code, stmnt =>
+            {
+                switch (stmnt)
+                {
+                    case IfStatement ifStatement:
+                        blocks.Add(ifStatement.IfCode);
+                        blocks.Add(ifStatement.ElseCode);
+                        break;
+                    case WhileLoop whileLoop:
+                        blocks.Add(whileLoop.Code);
+                        break;
+                    case ForLoop forLoop:
+                        blocks.Add(forLoop.Code);
+                        break;
+                    case SwitchStatement switchStatement:
+                        blocks.AddRange(switchStatement.Chunks.Select(chunk => chunk.Code));
+                        break;
+                    case StatementBatch batch:
+                        blocks.Add(batch.Statements);
+                        break;
+                }
+                return true;
+            }, null);
+            return blocks;
+        }
+
+        private static bool IsCopyProducer(Expression expr)
+        {
+            if (!(expr is CoreFunctionInvocation cfi)) return false;
+            switch (cfi.Function)
+            {
+                case CoreFunction.DICTIONARY_KEYS:
+                case CoreFunction.DICTIONARY_VALUES:
+                case CoreFunction.LIST_TO_ARRAY:
+                case CoreFunction.SORTED_COPY_OF_INT_ARRAY:
+                case CoreFunction.SORTED_COPY_OF_STRING_ARRAY:
+                    return true;
+                default:
+                    return false;
+            }
+        }
+
+        private static bool IsSortedCopy(CoreFunction function)
+        {
+            return function == CoreFunction.SORTED_COPY_OF_INT_ARRAY || function == CoreFunction.SORTED_COPY_OF_STRING_ARRAY;
+        }
+
+        // Core functions that use their first argument as a collection without keeping a reference to it.
+        private static bool IsNonCapturingCollectionFunction(CoreFunction function)
+        {
+            switch (function)
+            {
+                case CoreFunction.ARRAY_GET:
+                case CoreFunction.ARRAY_JOIN:
+                case CoreFunction.ARRAY_LENGTH:
+                case CoreFunction.ARRAY_SET:
+                case CoreFunction.LIST_ADD:
+                case CoreFunction.LIST_CLEAR:
+                case CoreFunction.LIST_GET:
+                case CoreFunction.LIST_INSERT:
+                case CoreFunction.LIST_JOIN_CHARS:
+                case CoreFunction.LIST_JOIN_STRINGS:
+                case CoreFunction.LIST_POP:
+                case CoreFunction.LIST_REMOVE_AT:
+                case CoreFunction.LIST_REVERSE:
+                case CoreFunction.LIST_SET:
+                case CoreFunction.LIST_SHUFFLE:
+                case CoreFunction.LIST_SIZE:
+                    return true;
+                default:
+                    return false;
+            }
+        }
+
+        private void ElideImmediateUse(CoreFunctionInvocation cfi)
+        {
+            if (cfi.Args.Length == 0 || !IsCopyProducer(cfi.Args[0])) return;
+            CoreFunctionInvocation producer = (CoreFunctionInvocation)cfi.Args[0];
+
+            switch (cfi.Function)
+            {
+                case CoreFunction.ARRAY_LENGTH:
+                    if (!IsSortedCopy(producer.Function)) this.MarkShared(producer);
+                    break;
+
+                case CoreFunction.ARRAY_JOIN:
+                    // The separator is evaluated after the array on some platforms and must not be able to
+                    // change the collection before it is read.
+                    Expression sep = cfi.Args[1];
+                    if (!IsSortedCopy(producer.Function) && (sep is InlineConstant || sep is Variable)) this.MarkShared(producer);
+                    break;
+
+                case CoreFunction.SORTED_COPY_OF_INT_ARRAY:
+                case CoreFunction.SORTED_COPY_OF_STRING_ARRAY:
+                    // Dictionary keys and values are only shared when they are read immediately, so the input is
+                    // either a new collection or one that was handed over from a local variable that is done with it.
+                    this.MarkShared(cfi);
+                    break;
+            }
+        }
+
+        // Hands the collection of a local variable over to a list-to-array conversion or a sorted copy in
+        // block[index] if the variable owns it and is never used again.
+        private void ElideOwnedInputs(Statement[] block, int index)
+        {
+            Statement stmnt = block[index];
+            if (!(stmnt is Assignment || stmnt is ExpressionAsStatement || stmnt is ReturnStatement || stmnt is VariableDeclaration))
+            {
+                // Anything that contains other statements can run the same expression more than once.
+                return;
+            }
+
+            List<CoreFunctionInvocation> candidates = new List<CoreFunctionInvocation>();
+            ParseTreeWalker.WalkStatement(stmnt, null, expr =>
+            {
+                if (expr is CoreFunctionInvocation cfi &&
+                    (cfi.Function == CoreFunction.LIST_TO_ARRAY || IsSortedCopy(cfi.Function)) &&
+                    cfi.Args[0] is Variable)
+                {
+                    candidates.Add(cfi);
+                }
+                return true;
+            });
+
+            foreach (CoreFunctionInvocation cfi in candidates)
+            {
+                Variable variable = (Variable)cfi.Args[0];
+                if (IsOwnedAndDead(block, index, variable)) this.MarkShared(cfi);
+            }
+        }
+
+        private static bool IsOwnedAndDead(Statement[] block, int index, Variable variable)
+        {
+            string name = variable.Name;
+            int declarationIndex = -1;
+            for (int i = 0; i < index; ++i)
+            {
+                if (block[i] is VariableDeclaration varDecl && varDecl.VariableNameToken.Value == name)
+                {
+                    declarationIndex = i;
+                    break;
+                }
+            }
+            if (declarationIndex == -1) return false;
+
+            Expression initialValue = ((VariableDeclaration)block[declarationIndex]).Value;
+            bool isNewCollection = initialValue is ConstructorInvocation ctor && ctor.StructDefinition == null;
+            if (!isNewCollection && !IsCopyProducer(initialValue)) return false;
+
+            for (int i = declarationIndex + 1; i < block.Length; ++i)
+            {
+                CountUses(block[i], name, out int uses, out int nonEscapingUses);
+                if (i < index)
+                {
+                    if (uses != nonEscapingUses) return false;
+                }
+                else if (i == index)
+                {
+                    if (uses != 1) return false;
+                }
+                else if (uses != 0)
+                {
+                    return false;
+                }
+            }
+            return true;
+        }
+
+        private static void CountUses(Statement stmnt, string name, out int uses, out int nonEscapingUses)
+        {
+            HashSet<Expression> nonEscaping = new HashSet<Expression>();
+            int total = 0;
+            ParseTreeWalker.WalkStatement(stmnt, null, expr =>
+            {
+                switch (expr)
+                {
+                    case Variable v:
+                        if (v.Name == name) total++;
+                        break;
+                    case BracketIndex bracketIndex:
+                        nonEscaping.Add(bracketIndex.Root);
+                        break;
+                    case CoreFunctionInvocation cfi:
+                        if (IsNonCapturingCollectionFunction(cfi.Function)) nonEscaping.Add(cfi.Args[0]);
+                        break;
+                }
+                return true;
+            });
+            uses = total;
+            nonEscapingUses = nonEscaping.Count(expr => expr is Variable v && v.Name == name);
+        }
+
+        private void MarkShared(CoreFunctionInvocation cfi)
+        {
+            cfi.MayShareArgument = true;
+        }
+    }
+}
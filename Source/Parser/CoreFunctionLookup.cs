@@ -15,10 +15,24 @@ namespace Pastel.Parser
         private static readonly Dictionary<string, Dictionary<string, CoreFunction>> coreLookup = [];
         private static readonly Dictionary<string, Dictionary<string, CoreFunction>> methodLookup = [];
 
+        private static bool isInitialized = false;
+
+        // Multiple targets can be compiled on different threads.
         private static void EnsureInitialized()
         {
-            if (coreLookup.Count > 0) return;
+            if (isInitialized) return;
+            lock (coreLookup)
+            {
+                if (!isInitialized)
+                {
+                    Initialize();
+                    isInitialized = true;
+                }
+            }
+        }
 
+        private static void Initialize()
+        {
             Dictionary<string, CoreFunction> _Base64 = [];
             Dictionary<string, CoreFunction> _Collections = [];
             Dictionary<string, CoreFunction> _Convert = [];
@@ -167,6 +181,7 @@ namespace Pastel.Parser
 
         internal static CoreFunction DetermineCoreFunctionId(PType rootType, string field)
         {
+            CoreFunctionLookup.EnsureInitialized();
             string typeName = rootType.RootValue;
             if (methodLookup.ContainsKey(typeName) && methodLookup[typeName].ContainsKey(field))
             {
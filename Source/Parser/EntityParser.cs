@@ -16,7 +16,11 @@ namespace Pastel.Parser
 
         public ICompilationEntity[] ParseText(string filename, string text)
         {
-            TokenStream tokens = new TokenStream(Tokenizer.Tokenize(filename, text));
+            return this.ParseTokens(new TokenStream(this.parser.Context.Tokenize(filename, text)));
+        }
+
+        private ICompilationEntity[] ParseTokens(TokenStream tokens)
+        {
             List<ICompilationEntity> output = new List<ICompilationEntity>();
             while (tokens.HasMore)
             {
@@ -36,6 +40,11 @@ namespace Pastel.Parser
 
                     case "@":
                         Token atToken = tokens.Pop();
+                        if (tokens.PeekValue() == "memoize")
+                        {
+                            output.Add(this.ParseMemoizedFunctionDefinition(atToken, tokens));
+                            break;
+                        }
                         ICompilationEntity[] inlinedEntities = this.ParseTopLevelInlineImport(atToken, tokens);
                         output.AddRange(inlinedEntities);
                         break;
@@ -146,6 +155,29 @@ namespace Pastel.Parser
             return funcDef;
         }
 
+        // @memoize(maxEntries) followed by a function definition. The function is checked by the Resolver.
+        private FunctionDefinition ParseMemoizedFunctionDefinition(Token atToken, TokenStream tokens)
+        {
+            Token memoizeToken = tokens.PopExpected("memoize");
+            Token maxEntriesToken = memoizeToken;
+            if (tokens.PopIfPresent("("))
+            {
+                maxEntriesToken = tokens.Pop();
+                tokens.PopExpected(")");
+            }
+            if (!int.TryParse(maxEntriesToken.Value, out int maxEntries) || maxEntries <= 0)
+            {
+                throw new TestedParserException(
+                    maxEntriesToken,
+                    "@memoize requires the maximum number of entries to cache as a positive integer, e.g. @memoize(1000).");
+            }
+
+            FunctionDefinition funcDef = this.ParseFunctionDefinition(tokens);
+            funcDef.MemoizeMaxEntries = maxEntries;
+            funcDef.MemoizeToken = atToken;
+            return funcDef;
+        }
+
         private ICompilationEntity[] ParseTopLevelInlineImport(Token atToken, TokenStream tokens)
         {
             string sourceFile = null;
@@ -193,8 +225,7 @@ namespace Pastel.Parser
 
             if (sourceFile != null)
             {
-                string code = this.parser.LoadCode(atToken, sourceFile);
-                return ParseText(sourceFile, code);
+                return this.ParseTokens(new TokenStream(this.parser.LoadImportedTokens(atToken, sourceFile)));
             }
 
             return [];
@@ -0,0 +1,813 @@
+﻿using Pastel.Parser.ParseNodes;
+using System.Collections.Generic;
+using System.Linq;
+
+namespace Pastel.Parser
+{
+    // Replaces invocations of small non-recursive functions with the body of the function.
+    // This runs after the ResolveWithTypeContext phase and so only deals with fully resolved code.
+    //
+    // Functions whose body is a single return statement are inlined as an expression wherever they are
+    // invoked, provided the arguments can be substituted into the body without changing the order in which
+    // anything is evaluated.
+    //
+    // Otherwise, if the invocation is the root of a statement (a standalone invocation, a variable declaration,
+    // an assignment, or a return), the body of the function is spliced in before that statement. The arguments
+    // are assigned to temporary variables in their original order and the function's locals are renamed so that
+    // they cannot collide with the caller's variables. This requires the function to run straight through to a
+    // single final return statement.
+    //
+    // The size of a function is the number of statements and expressions in it. Functions larger than the
+    // budget are never inlined, and a budget of 0 disables inlining entirely.
+    internal class Inliner
+    {
+        public const int DEFAULT_BUDGET = 12;
+
+        private Resolver resolver;
+        private Dictionary<string, FunctionDefinition> functionDefinitions;
+        private int budget;
+        private HashSet<FunctionDefinition> candidates = new HashSet<FunctionDefinition>();
+
+        // State for the function that is currently being modified.
+        private FunctionDefinition? currentFunction = null;
+        private HashSet<string> currentVariableNames = new HashSet<string>();
+        private int inlineCounter = 0;
+
+        // Number of call sites each function was inlined at.
+        public Dictionary<string, int> InlinedFunctions { get; private set; }
+
+        public Inliner(Resolver resolver, Dictionary<string, FunctionDefinition> functionDefinitions, int budget)
+        {
+            this.resolver = resolver;
+            this.functionDefinitions = functionDefinitions;
+            this.budget = budget;
+            this.InlinedFunctions = new Dictionary<string, int>();
+        }
+
+        public void Run()
+        {
+            if (this.budget <= 0) return;
+
+            string[] functionNames = this.functionDefinitions.Keys.OrderBy(s => s).ToArray();
+            Dictionary<FunctionDefinition, FunctionDefinition[]> callGraph = [];
+            foreach (string functionName in functionNames)
+            {
+                FunctionDefinition fd = this.functionDefinitions[functionName];
+                callGraph[fd] = GetInvokedFunctions(fd.Code);
+            }
+
+            foreach (string functionName in functionNames)
+            {
+                FunctionDefinition fd = this.functionDefinitions[functionName];
+                // Inlining a memoized function would skip its cache.
+                if (fd.MemoizeMaxEntries == 0 &&
+                    GetSize(fd.Code) <= this.budget &&
+                    ParseTreeCloner.CanClone(fd.Code) &&
+                    !IsRecursive(fd, callGraph))
+                {
+                    this.candidates.Add(fd);
+                }
+            }
+
+            // Candidates are processed before anything that invokes them so that the code that gets copied
+            // into the caller has already had its own invocations inlined. Candidates are never recursive,
+            // so this order always exists.
+            List<FunctionDefinition> order = [];
+            HashSet<FunctionDefinition> visited = [];
+            foreach (string functionName in functionNames)
+            {
+                AddCalleesFirst(this.functionDefinitions[functionName], callGraph, visited, order);
+            }
+
+            foreach (FunctionDefinition fd in order)
+            {
+                this.InlineFunctionsInto(fd);
+            }
+        }
+
+        private void AddCalleesFirst(
+            FunctionDefinition fd,
+            Dictionary<FunctionDefinition, FunctionDefinition[]> callGraph,
+            HashSet<FunctionDefinition> visited,
+            List<FunctionDefinition> order)
+        {
+            if (visited.Contains(fd)) return;
+            visited.Add(fd);
+            foreach (FunctionDefinition callee in callGraph[fd])
+            {
+                if (this.candidates.Contains(callee))
+                {
+                    AddCalleesFirst(callee, callGraph, visited, order);
+                }
+            }
+            order.Add(fd);
+        }
+
+        private static FunctionDefinition[] GetInvokedFunctions(Statement[] code)
+        {
+            HashSet<FunctionDefinition> output = [];
+            ParseTreeWalker.WalkStatements(code, null, expr =>
+            {
+                if (expr is FunctionInvocation funcInvocation && funcInvocation.Root is FunctionReference funcRef)
+                {
+                    output.Add(funcRef.Function);
+                }
+                return true;
+            });
+            return output.OrderBy(fd => fd.Name).ToArray();
+        }
+
+        private static bool IsRecursive(FunctionDefinition fd, Dictionary<FunctionDefinition, FunctionDefinition[]> callGraph)
+        {
+            HashSet<FunctionDefinition> visited = [];
+            Stack<FunctionDefinition> queue = new Stack<FunctionDefinition>(callGraph[fd]);
+            while (queue.Count > 0)
+            {
+                FunctionDefinition current = queue.Pop();
+                if (current == fd) return true;
+                if (visited.Add(current) && callGraph.ContainsKey(current))
+                {
+                    foreach (FunctionDefinition callee in callGraph[current])
+                    {
+                        queue.Push(callee);
+                    }
+                }
+            }
+            return false;
+        }
+
+        private static int GetSize(Statement[] code)
+        {
+            int size = 0;
+            ParseTreeWalker.WalkStatements(code, _ => { size++; return true; }, _ => { size++; return true; });
+            return size;
+        }
+
+        private void InlineFunctionsInto(FunctionDefinition fd)
+        {
+            this.currentFunction = fd;
+            this.currentVariableNames = new HashSet<string>(fd.ArgNames.Select(t => t.Value));
+            ParseTreeWalker.WalkStatements(
+                fd.Code,
+                stmnt =>
+                {
+                    if (stmnt is VariableDeclaration varDecl) this.currentVariableNames.Add(varDecl.VariableNameToken.Value);
+                    return true;
+                },
+                expr =>
+                {
+                    if (expr is Variable v) this.currentVariableNames.Add(v.Name);
+                    return true;
+                });
+            this.inlineCounter = 0;
+
+            fd.Code = this.InlineBlock(fd.Code);
+        }
+
+        private FunctionDefinition? GetCandidate(FunctionInvocation funcInvocation)
+        {
+            if (funcInvocation.Root is FunctionReference funcRef &&
+                funcRef.Function != this.currentFunction &&
+                this.candidates.Contains(funcRef.Function))
+            {
+                return funcRef.Function;
+            }
+            return null;
+        }
+
+        private void RecordInlining(FunctionDefinition fd)
+        {
+            this.InlinedFunctions[fd.Name] = this.InlinedFunctions.GetValueOrDefault(fd.Name) + 1;
+        }
+
+        private Statement[] InlineBlock(Statement[] code)
+        {
+            List<Statement> output = [];
+            foreach (Statement stmnt in code)
+            {
+                Statement[]? replacement = this.InlineStatement(stmnt, true);
+                if (replacement == null)
+                {
+                    output.Add(stmnt);
+                }
+                else
+                {
+                    output.AddRange(replacement);
+                }
+            }
+            return output.ToArray();
+        }
+
+        // Returns null if the statement was left in place (although its expressions may have changed).
+        // Otherwise returns the statements that replace it.
+        private Statement[]? InlineStatement(Statement stmnt, bool allowSplicing)
+        {
+            FunctionInvocation? rootInvocation = null;
+            switch (stmnt)
+            {
+                case Assignment asgn:
+                    asgn.Target = this.InlineExpression(asgn.Target);
+                    asgn.Value = this.InlineExpression(asgn.Value);
+                    rootInvocation = asgn.Value as FunctionInvocation;
+                    break;
+
+                case ExpressionAsStatement exprAsStmnt:
+                    if (exprAsStmnt.Expression is FunctionInvocation standaloneInvocation)
+                    {
+                        // Inlining this as an expression could leave something that is not valid as a standalone statement.
+                        this.InlineExpressions(standaloneInvocation.Args);
+                        rootInvocation = standaloneInvocation;
+                    }
+                    else
+                    {
+                        exprAsStmnt.Expression = this.InlineExpression(exprAsStmnt.Expression);
+                    }
+                    break;
+
+                case ReturnStatement returnStatement:
+                    if (returnStatement.Expression != null)
+                    {
+                        returnStatement.Expression = this.InlineExpression(returnStatement.Expression);
+                        rootInvocation = returnStatement.Expression as FunctionInvocation;
+                    }
+                    break;
+
+                case VariableDeclaration varDecl:
+                    if (varDecl.Value != null)
+                    {
+                        varDecl.Value = this.InlineExpression(varDecl.Value);
+                        rootInvocation = varDecl.Value as FunctionInvocation;
+                    }
+                    break;
+
+                case IfStatement ifStatement:
+                    ifStatement.Condition = this.InlineExpression(ifStatement.Condition);
+                    ifStatement.IfCode = this.InlineBlock(ifStatement.IfCode);
+                    ifStatement.ElseCode = this.InlineBlock(ifStatement.ElseCode);
+                    break;
+
+                case WhileLoop whileLoop:
+                    // The condition is re-evaluated on each iteration so nothing can be spliced in for it.
+                    whileLoop.Condition = this.InlineExpression(whileLoop.Condition);
+                    whileLoop.Code = this.InlineBlock(whileLoop.Code);
+                    break;
+
+                case SwitchStatement switchStatement:
+                    switchStatement.Condition = this.InlineExpression(switchStatement.Condition);
+                    foreach (SwitchStatement.SwitchChunk chunk in switchStatement.Chunks)
+                    {
+                        chunk.Code = this.InlineBlock(chunk.Code);
+                    }
+                    break;
+
+                case CountedForLoop countedLoop:
+                    // The start and end values are shared with the canonical form of the loop, so they are left alone.
+                    countedLoop.SetCode(this.InlineBlock(countedLoop.Code));
+                    break;
+
+                case StatementBatch batch:
+                    batch.Statements = this.InlineBlock(batch.Statements);
+                    break;
+
+                case BreakStatement:
+                    break;
+            }
+
+            if (rootInvocation == null || !allowSplicing) return null;
+            return this.TrySpliceFunctionBody(stmnt, rootInvocation);
+        }
+
+        private void InlineExpressions(Expression[] expressions)
+        {
+            for (int i = 0; i < expressions.Length; ++i)
+            {
+                expressions[i] = this.InlineExpression(expressions[i]);
+            }
+        }
+
+        private Expression InlineExpression(Expression expr)
+        {
+            switch (expr.Type)
+            {
+                case ExpressionType.CAST:
+                    CastExpression cast = (CastExpression)expr;
+                    cast.Expression = this.InlineExpression(cast.Expression);
+                    break;
+
+                case ExpressionType.CONSTRUCTOR_INVOCATION:
+                    this.InlineExpressions(((ConstructorInvocation)expr).Args);
+                    break;
+
+                case ExpressionType.CORE_FUNCTION_INVOCATION:
+                    CoreFunctionInvocation cfi = (CoreFunctionInvocation)expr;
+                    this.InlineExpressions(cfi.Args);
+                    // An inlined function may have been a constant.
+                    return cfi.TryCompileTimeResolve() ?? (Expression)cfi;
+
+                case ExpressionType.DOT_FIELD:
+                    DotField dotField = (DotField)expr;
+                    dotField.Root = this.InlineExpression(dotField.Root);
+                    break;
+
+                case ExpressionType.EXTENSIBLE_FUNCTION_INVOCATION:
+                    this.InlineExpressions(((ExtensibleFunctionInvocation)expr).Args);
+                    break;
+
+                case ExpressionType.FUNCTION_INVOCATION:
+                    FunctionInvocation funcInvocation = (FunctionInvocation)expr;
+                    this.InlineExpressions(funcInvocation.Args);
+                    return this.TryInlineExpression(funcInvocation) ?? funcInvocation;
+
+                case ExpressionType.FUNCTION_POINTER_INVOCATION:
+                    FunctionPointerInvocation fpInvocation = (FunctionPointerInvocation)expr;
+                    fpInvocation.Root = this.InlineExpression(fpInvocation.Root);
+                    this.InlineExpressions(fpInvocation.Args);
+                    break;
+
+                case ExpressionType.OP_PAIR:
+                    OpPair opPair = (OpPair)expr;
+                    opPair.Left = this.InlineExpression(opPair.Left);
+                    opPair.Right = this.InlineExpression(opPair.Right);
+                    break;
+
+                case ExpressionType.STRING_CONCATENATION:
+                    List<Expression> strExprs = ((StringConcatenation)expr).Expressions;
+                    for (int i = 0; i < strExprs.Count; ++i)
+                    {
+                        strExprs[i] = this.InlineExpression(strExprs[i]);
+                    }
+                    break;
+
+                case ExpressionType.UNARY_OP:
+                    UnaryOp unaryOp = (UnaryOp)expr;
+                    unaryOp.Expression = this.InlineExpression(unaryOp.Expression);
+                    break;
+            }
+            return expr;
+        }
+
+        private bool HasIdenticalArgTypes(FunctionInvocation funcInvocation, FunctionDefinition fd)
+        {
+            for (int i = 0; i < fd.ArgTypes.Length; ++i)
+            {
+                if (!funcInvocation.Args[i].ResolvedType.IsIdentical(this.resolver, fd.ArgTypes[i])) return false;
+            }
+            return true;
+        }
+
+        // Returns null if the function cannot be inlined here as an expression.
+        private Expression? TryInlineExpression(FunctionInvocation funcInvocation)
+        {
+            FunctionDefinition? fd = this.GetCandidate(funcInvocation);
+            if (fd == null ||
+                fd.Code.Length != 1 ||
+                !(fd.Code[0] is ReturnStatement returnStatement) ||
+                returnStatement.Expression == null)
+            {
+                return null;
+            }
+
+            Expression body = returnStatement.Expression;
+
+            // Implicit conversions of arguments and return values must be preserved.
+            if (!body.ResolvedType.IsIdentical(this.resolver, fd.ReturnType) ||
+                !this.HasIdenticalArgTypes(funcInvocation, fd))
+            {
+                return null;
+            }
+
+            if (HasWrites(body)) return null;
+
+            Dictionary<string, int> usages = CountVariableUsages([returnStatement]);
+            HashSet<string> conditionallyEvaluated = FindConditionallyEvaluatedVariables(body);
+            bool isBodyPure = IsPure(body);
+            List<string> nonTrivialArgs = [];
+            bool isOrderSensitive = false;
+            for (int i = 0; i < funcInvocation.Args.Length; ++i)
+            {
+                Expression arg = funcInvocation.Args[i];
+                string argName = fd.ArgNames[i].Value;
+                if (HasWrites(arg)) return null;
+                if (IsTrivial(arg)) continue;
+
+                // Non-trivial arguments must be evaluated exactly once, just like they would be before the invocation.
+                if (usages.GetValueOrDefault(argName) != 1 || conditionallyEvaluated.Contains(argName)) return null;
+
+                nonTrivialArgs.Add(argName);
+                if (!isBodyPure || !IsPure(arg)) isOrderSensitive = true;
+            }
+
+            // If side effects are involved, the argument must be the first thing that the body evaluates. Anything else
+            // would either run after the argument in the body when it should've been before or vice versa.
+            if (isOrderSensitive && (nonTrivialArgs.Count != 1 || IsEvaluatedFirst(body, nonTrivialArgs[0]) != true))
+            {
+                return null;
+            }
+
+            ParseTreeCloner cloner = new ParseTreeCloner(this.resolver, this.currentFunction!);
+            for (int i = 0; i < funcInvocation.Args.Length; ++i)
+            {
+                cloner.SubstitutedVariables[fd.ArgNames[i].Value] = funcInvocation.Args[i];
+            }
+
+            this.RecordInlining(fd);
+            return cloner.CloneExpression(body);
+        }
+
+        // Returns null if the function body cannot be spliced in before this statement.
+        private Statement[]? TrySpliceFunctionBody(Statement stmnt, FunctionInvocation funcInvocation)
+        {
+            FunctionDefinition? fd = this.GetCandidate(funcInvocation);
+            if (fd == null) return null;
+
+            Statement[] body = fd.Code;
+            Expression? returnValue = null;
+            if (body.Length > 0 && body[body.Length - 1] is ReturnStatement finalReturn)
+            {
+                returnValue = finalReturn.Expression;
+                body = body.Take(body.Length - 1).ToArray();
+            }
+
+            bool isVoid = fd.ReturnType.RootValue == "void";
+            if (!isVoid && returnValue == null) return null;
+            if (!IsStraightLineCode(body, false)) return null;
+            if (returnValue != null && !returnValue.ResolvedType.IsIdentical(this.resolver, fd.ReturnType)) return null;
+            if (!this.HasIdenticalArgTypes(funcInvocation, fd)) return null;
+
+            bool argsHaveWrites = funcInvocation.Args.Any(HasWrites);
+            switch (stmnt)
+            {
+                case Assignment asgn:
+                    if (asgn.Target is Variable)
+                    {
+                        // The body cannot modify the target variable, so reading it before or after the body
+                        // is the same unless one of the args increments it.
+                        if (asgn.OpToken.Value != "=" && argsHaveWrites) return null;
+                    }
+                    else if (!(asgn.Target is DotField df && df.Root is Variable && asgn.OpToken.Value == "="))
+                    {
+                        // The body may modify the target's root.
+                        return null;
+                    }
+                    break;
+
+                case ExpressionAsStatement:
+                    // A discarded return value must still be evaluated if it does anything, but only invocations can be
+                    // standalone statements.
+                    if (returnValue != null && !IsPure(returnValue) && !IsInvocation(returnValue)) return null;
+                    break;
+            }
+
+            HashSet<string> writtenVariables = FindWrittenVariables(body);
+            Dictionary<string, int> usages = CountVariableUsages(fd.Code);
+
+            // Determine what happens to each argument before committing to anything.
+            List<string> renamedVariables = [];
+            bool[] isDropped = new bool[fd.ArgNames.Length];
+            bool[] isSubstituted = new bool[fd.ArgNames.Length];
+            for (int i = 0; i < fd.ArgNames.Length; ++i)
+            {
+                string argName = fd.ArgNames[i].Value;
+                Expression arg = funcInvocation.Args[i];
+                if (usages.GetValueOrDefault(argName) == 0)
+                {
+                    if (!IsTrivial(arg) && !IsInvocation(arg)) return null;
+                    isDropped[i] = IsTrivial(arg);
+                }
+                else if (IsTrivial(arg) && !writtenVariables.Contains(argName) && !argsHaveWrites)
+                {
+                    isSubstituted[i] = true;
+                }
+                else
+                {
+                    renamedVariables.Add(argName);
+                }
+            }
+            ParseTreeWalker.WalkStatements(body, s =>
+            {
+                if (s is VariableDeclaration varDecl) renamedVariables.Add(varDecl.VariableNameToken.Value);
+                return true;
+            }, null);
+
+            ParseTreeCloner cloner = new ParseTreeCloner(this.resolver, this.currentFunction!);
+            if (renamedVariables.Count > 0)
+            {
+                int inlineId = this.ReserveInlineId(renamedVariables);
+                foreach (string name in renamedVariables)
+                {
+                    cloner.RenamedVariables[name] = GetRenamedVariable(inlineId, name);
+                }
+            }
+
+            List<Statement> output = [];
+            for (int i = 0; i < fd.ArgNames.Length; ++i)
+            {
+                Token argName = fd.ArgNames[i];
+                Expression arg = funcInvocation.Args[i];
+                if (isDropped[i]) continue;
+
+                if (isSubstituted[i])
+                {
+                    cloner.SubstitutedVariables[argName.Value] = arg;
+                }
+                else if (!cloner.RenamedVariables.ContainsKey(argName.Value))
+                {
+                    // Unused, but it must still be invoked.
+                    this.AddWithSplicing(output, new ExpressionAsStatement(arg));
+                }
+                else
+                {
+                    string tempName = cloner.RenamedVariables[argName.Value];
+                    this.AddWithSplicing(output, new VariableDeclaration(
+                        fd.ArgTypes[i],
+                        new Token(tempName, argName.FileName, argName.Line, argName.Col, argName.Type),
+                        Token.CreateDummyToken("="),
+                        arg,
+                        this.resolver.CompilerContext.Context));
+                }
+            }
+
+            output.AddRange(cloner.CloneStatements(body));
+            Expression? newReturnValue = returnValue == null ? null : cloner.CloneExpression(returnValue);
+
+            switch (stmnt)
+            {
+                case Assignment asgn:
+                    asgn.Value = newReturnValue!;
+                    output.Add(asgn);
+                    break;
+
+                case ExpressionAsStatement:
+                    if (newReturnValue != null && !IsPure(newReturnValue))
+                    {
+                        output.Add(new ExpressionAsStatement(newReturnValue));
+                    }
+                    break;
+
+                case ReturnStatement returnStatement:
+                    returnStatement.Expression = newReturnValue!;
+                    output.Add(returnStatement);
+                    break;
+
+                case VariableDeclaration varDecl:
+                    varDecl.Value = newReturnValue!;
+                    output.Add(varDecl);
+                    break;
+            }
+
+            this.RecordInlining(fd);
+            return output.ToArray();
+        }
+
+        // The arguments have already been inlined as expressions, but now that an argument is the root of its own
+        // statement, it may be possible to splice in the body of its function as well.
+        private void AddWithSplicing(List<Statement> output, Statement stmnt)
+        {
+            Expression root = stmnt is VariableDeclaration varDecl ? varDecl.Value : ((ExpressionAsStatement)stmnt).Expression;
+            Statement[]? spliced = root is FunctionInvocation funcInvocation
+                ? this.TrySpliceFunctionBody(stmnt, funcInvocation)
+                : null;
+            if (spliced == null)
+            {
+                output.Add(stmnt);
+            }
+            else
+            {
+                output.AddRange(spliced);
+            }
+        }
+
+        private static string GetRenamedVariable(int inlineId, string name)
+        {
+            return "inl" + inlineId + "_" + name;
+        }
+
+        // Picks an id that gives all the renamed variables names that aren't used anywhere in the current function.
+        private int ReserveInlineId(List<string> names)
+        {
+            while (true)
+            {
+                int inlineId = ++this.inlineCounter;
+                if (names.All(name => !this.currentVariableNames.Contains(GetRenamedVariable(inlineId, name))))
+                {
+                    foreach (string name in names)
+                    {
+                        this.currentVariableNames.Add(GetRenamedVariable(inlineId, name));
+                    }
+                    return inlineId;
+                }
+            }
+        }
+
+        // Code that contains no return statements (other than the final one which has been removed already)
+        // and no breaks that would apply to a loop in the caller.
+        private static bool IsStraightLineCode(Statement[] code, bool isInLoop)
+        {
+            foreach (Statement stmnt in code)
+            {
+                switch (stmnt)
+                {
+                    case Assignment:
+                    case ExpressionAsStatement:
+                    case ProfileCounter:
+                    case VariableDeclaration:
+                        break;
+
+                    case BreakStatement:
+                        if (!isInLoop) return false;
+                        break;
+
+                    case IfStatement ifStatement:
+                        if (!IsStraightLineCode(ifStatement.IfCode, isInLoop) ||
+                            !IsStraightLineCode(ifStatement.ElseCode, isInLoop))
+                        {
+                            return false;
+                        }
+                        break;
+
+                    case WhileLoop whileLoop:
+                        if (!IsStraightLineCode(whileLoop.Code, true)) return false;
+                        break;
+
+                    case StatementBatch batch:
+                        if (!IsStraightLineCode(batch.Statements, isInLoop)) return false;
+                        break;
+
+                    default:
+                        return false;
+                }
+            }
+            return true;
+        }
+
+        private static bool IsTrivial(Expression expr)
+        {
+            return expr is Variable || expr is InlineConstant;
+        }
+
+        private static bool IsInvocation(Expression expr)
+        {
+            return expr is FunctionInvocation || expr is FunctionPointerInvocation || expr is ExtensibleFunctionInvocation;
+        }
+
+        private static bool HasWrites(Expression expr)
+        {
+            bool output = false;
+            ParseTreeWalker.WalkExpression(expr, null, e =>
+            {
+                if (e is InlineIncrement) output = true;
+                return !output;
+            });
+            return output;
+        }
+
+        // Core functions that only read values and cannot modify anything.
+        private static readonly HashSet<CoreFunction> PURE_CORE_FUNCTIONS = [
+            CoreFunction.ARRAY_GET,
+            CoreFunction.ARRAY_LENGTH,
+            CoreFunction.BOOL_TO_STRING,
+            CoreFunction.CHAR_TO_STRING,
+            CoreFunction.DICTIONARY_CONTAINS_KEY,
+            CoreFunction.DICTIONARY_GET,
+            CoreFunction.DICTIONARY_SIZE,
+            CoreFunction.FLOAT_TO_STRING,
+            CoreFunction.INT_TO_STRING,
+            CoreFunction.LIST_GET,
+            CoreFunction.LIST_SIZE,
+            CoreFunction.MATH_ABS,
+            CoreFunction.ORD,
+            CoreFunction.STRING_CHAR_AT,
+            CoreFunction.STRING_CHAR_CODE_AT,
+            CoreFunction.STRING_EQUALS,
+            CoreFunction.STRING_LENGTH,
+        ];
+
+        // An expression that has no side effects and can therefore be moved around other side effect free expressions.
+        internal static bool IsPure(Expression expr)
+        {
+            bool output = true;
+            ParseTreeWalker.WalkExpression(expr, null, e =>
+            {
+                switch (e.Type)
+                {
+                    case ExpressionType.CAST:
+                    case ExpressionType.DOT_FIELD:
+                    case ExpressionType.FUNCTION_REFERENCE:
+                    case ExpressionType.INLINE_CONSTANT:
+                    case ExpressionType.STRING_CONCATENATION:
+                    case ExpressionType.UNARY_OP:
+                    case ExpressionType.VARIABLE:
+                        break;
+
+                    case ExpressionType.OP_PAIR:
+                        // Division can throw.
+                        string op = ((OpPair)e).Op;
+                        if (op == "/" || op == "%") output = false;
+                        break;
+
+                    case ExpressionType.CORE_FUNCTION_INVOCATION:
+                        if (!PURE_CORE_FUNCTIONS.Contains(((CoreFunctionInvocation)e).Function)) output = false;
+                        break;
+
+                    default:
+                        output = false;
+                        break;
+                }
+                return output;
+            });
+            return output;
+        }
+
+        private static Dictionary<string, int> CountVariableUsages(Statement[] code)
+        {
+            Dictionary<string, int> output = [];
+            ParseTreeWalker.WalkStatements(code, null, e =>
+            {
+                if (e is Variable v) output[v.Name] = output.GetValueOrDefault(v.Name) + 1;
+                return true;
+            });
+            return output;
+        }
+
+        private static HashSet<string> FindWrittenVariables(Statement[] code)
+        {
+            HashSet<string> output = [];
+            ParseTreeWalker.WalkStatements(
+                code,
+                s =>
+                {
+                    if (s is Assignment asgn && asgn.Target is Variable v) output.Add(v.Name);
+                    return true;
+                },
+                e =>
+                {
+                    if (e is InlineIncrement inc && inc.Expression is Variable v) output.Add(v.Name);
+                    return true;
+                });
+            return output;
+        }
+
+        // Variables on the right side of a short-circuiting boolean op may not be evaluated at all.
+        private static HashSet<string> FindConditionallyEvaluatedVariables(Expression expr)
+        {
+            HashSet<string> output = [];
+            ParseTreeWalker.WalkExpression(expr, null, e =>
+            {
+                if (e is OpPair opPair && (opPair.Op == "&&" || opPair.Op == "||"))
+                {
+                    ParseTreeWalker.WalkExpression(opPair.Right, null, rightExpr =>
+                    {
+                        if (rightExpr is Variable v) output.Add(v.Name);
+                        return true;
+                    });
+                }
+                return true;
+            });
+            return output;
+        }
+
+        // Returns true if the variable is read before any other sub-expression of the given expression
+        // does any work (reading a plain variable or constant doesn't count), false if something else
+        // happens first, or null if the variable does not appear at all.
+        private static bool? IsEvaluatedFirst(Expression expr, string variableName)
+        {
+            switch (expr)
+            {
+                case Variable v:
+                    return v.Name == variableName ? true : null;
+
+                case InlineConstant:
+                case FunctionReference:
+                    return null;
+            }
+
+            foreach (Expression child in GetChildrenInEvaluationOrder(expr))
+            {
+                bool? result = IsEvaluatedFirst(child, variableName);
+                if (result != null) return result;
+            }
+
+            // All the children were evaluated and then this expression did something.
+            return false;
+        }
+
+        private static Expression[] GetChildrenInEvaluationOrder(Expression expr)
+        {
+            switch (expr.Type)
+            {
+                case ExpressionType.CAST: return [((CastExpression)expr).Expression];
+                case ExpressionType.CONSTRUCTOR_INVOCATION: return ((ConstructorInvocation)expr).Args;
+                case ExpressionType.CORE_FUNCTION_INVOCATION: return ((CoreFunctionInvocation)expr).Args;
+                case ExpressionType.DOT_FIELD: return [((DotField)expr).Root];
+                case ExpressionType.EXTENSIBLE_FUNCTION_INVOCATION: return ((ExtensibleFunctionInvocation)expr).Args;
+                case ExpressionType.FUNCTION_INVOCATION: return [((FunctionInvocation)expr).Root, .. ((FunctionInvocation)expr).Args];
+                case ExpressionType.FUNCTION_POINTER_INVOCATION: return [((FunctionPointerInvocation)expr).Root, .. ((FunctionPointerInvocation)expr).Args];
+                case ExpressionType.INLINE_INCREMENT: return [((InlineIncrement)expr).Expression];
+                case ExpressionType.OP_PAIR: return [((OpPair)expr).Left, ((OpPair)expr).Right];
+                case ExpressionType.STRING_CONCATENATION: return [.. ((StringConcatenation)expr).Expressions];
+                case ExpressionType.UNARY_OP: return [((UnaryOp)expr).Expression];
+                default: return [];
+            }
+        }
+    }
+}
@@ -0,0 +1,54 @@
+﻿using Pastel.Parser.ParseNodes;
+using System.Collections.Generic;
+using System.Linq;
+
+namespace Pastel.Parser
+{
+    // Gives each function and switch statement the name that identifies it in an execution profile. Functions are
+    // named after themselves and switch statements after the function they're in and their position in it, e.g.
+    // "parseValue/switch0", so the same profile applies to any target built from the same code.
+    // For an instrumented build, this also adds a counter to the start of each function and each switch chunk. The
+    // translators emit these as increments of a slot in one array, and the names of the slots are listed in
+    // SlotNames for the PST_dumpProfile helper.
+    internal class Instrumenter
+    {
+        public List<string> SlotNames { get; } = [];
+
+        public void Run(Dictionary<string, FunctionDefinition> functionDefinitions, bool addCounters)
+        {
+            foreach (string functionName in functionDefinitions.Keys.OrderBy(s => s))
+            {
+                FunctionDefinition fd = functionDefinitions[functionName];
+                if (addCounters)
+                {
+                    fd.Code = [this.CreateCounter(fd.FirstToken, functionName), .. fd.Code];
+                }
+
+                int switchCount = 0;
+                ParseTreeWalker.WalkStatements(fd.Code, stmnt =>
+                {
+                    if (stmnt is SwitchStatement switchStatement)
+                    {
+                        switchStatement.ProfileKey = functionName + "/switch" + switchCount++;
+                        if (addCounters)
+                        {
+                            for (int i = 0; i < switchStatement.Chunks.Length; ++i)
+                            {
+                                SwitchStatement.SwitchChunk chunk = switchStatement.Chunks[i];
+                                string slotName = ExecutionProfile.GetChunkKey(switchStatement.ProfileKey, i);
+                                chunk.Code = [this.CreateCounter(chunk.CaseAndDefaultTokens[0], slotName), .. chunk.Code];
+                            }
+                        }
+                    }
+                    return true;
+                }, null);
+            }
+        }
+
+        private ProfileCounter CreateCounter(Token token, string slotName)
+        {
+            this.SlotNames.Add(slotName);
+            return new ProfileCounter(token, this.SlotNames.Count - 1);
+        }
+    }
+}
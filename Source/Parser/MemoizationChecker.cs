@@ -0,0 +1,117 @@
+﻿using Pastel.Parser.ParseNodes;
+using System.Collections.Generic;
+using System.Linq;
+
+namespace Pastel.Parser
+{
+    // Makes sure that a function marked with @memoize gives the same result whenever it's called with the same
+    // arguments, so that the translators can cache its results. Its arguments and return value must be primitives
+    // or strings, which can't be modified by anything else. Since there are no globals, that leaves the core
+    // functions and extensible functions that interact with the outside world as the only way for it to do
+    // anything but compute its result, and it can't use those, directly or through any function it refers to.
+    internal class MemoizationChecker
+    {
+        private static readonly HashSet<Language> SUPPORTED_LANGUAGES = [
+            Language.CSHARP,
+            Language.GO,
+            Language.JAVA,
+            Language.JAVASCRIPT,
+            Language.PYTHON,
+        ];
+
+        private static readonly HashSet<CoreFunction> IMPURE_CORE_FUNCTIONS = [
+            CoreFunction.CURRENT_TIME_SECONDS,
+            CoreFunction.EXTENSIBLE_CALLBACK_INVOKE,
+            CoreFunction.LIST_SHUFFLE,
+            CoreFunction.PRINT_STDERR,
+            CoreFunction.PRINT_STDOUT,
+            CoreFunction.RANDOM_FLOAT,
+        ];
+
+        private Language language;
+
+        public MemoizationChecker(Language language)
+        {
+            this.language = language;
+        }
+
+        public void Run(Dictionary<string, FunctionDefinition> functionDefinitions)
+        {
+            foreach (string functionName in functionDefinitions.Keys.OrderBy(s => s))
+            {
+                FunctionDefinition fd = functionDefinitions[functionName];
+                if (fd.MemoizeMaxEntries > 0)
+                {
+                    this.CheckFunction(fd);
+                }
+            }
+        }
+
+        private void CheckFunction(FunctionDefinition fd)
+        {
+            if (!SUPPORTED_LANGUAGES.Contains(this.language))
+            {
+                throw new UNTESTED_ParserException(fd.MemoizeToken ?? fd.FirstToken, "@memoize is not supported for " + this.language + ".");
+            }
+
+            if (!IsCacheableType(fd.ReturnType))
+            {
+                throw new TestedParserException(
+                    fd.ReturnType.FirstToken,
+                    "A memoized function must return a bool, char, double, int, or string.");
+            }
+
+            PType? argType = fd.ArgTypes.FirstOrDefault(t => !IsCacheableType(t));
+            if (argType != null)
+            {
+                throw new TestedParserException(
+                    argType.FirstToken,
+                    "The arguments of a memoized function must be bools, chars, doubles, ints, or strings.");
+            }
+
+            Expression? sideEffect = FindSideEffect(fd, []);
+            if (sideEffect != null)
+            {
+                throw new TestedParserException(
+                    sideEffect.FirstToken,
+                    "The memoized function '" + fd.Name + "' can't use this, directly or through the functions it calls, since it does more than compute a value from its arguments.");
+            }
+        }
+
+        private static bool IsCacheableType(PType type)
+        {
+            return type.IsBoolean || type.IsChar || type.IsFloat || type.IsInteger || type.IsString;
+        }
+
+        private static Expression? FindSideEffect(FunctionDefinition fd, HashSet<FunctionDefinition> visited)
+        {
+            if (!visited.Add(fd)) return null;
+
+            Expression? sideEffect = null;
+            List<FunctionDefinition> referencedFunctions = [];
+            ParseTreeWalker.WalkStatements(fd.Code, null, expr =>
+            {
+                if (sideEffect != null) return false;
+                switch (expr)
+                {
+                    case CoreFunctionInvocation cfi when IMPURE_CORE_FUNCTIONS.Contains(cfi.Function):
+                    case ExtensibleFunctionInvocation:
+                        sideEffect = expr;
+                        return false;
+
+                    // This covers function pointers as well as invocations.
+                    case FunctionReference funcRef:
+                        referencedFunctions.Add(funcRef.Function);
+                        break;
+                }
+                return true;
+            });
+
+            foreach (FunctionDefinition referencedFunction in referencedFunctions)
+            {
+                sideEffect ??= FindSideEffect(referencedFunction, visited);
+            }
+            return sideEffect;
+        }
+    }
+}
@@ -29,7 +29,7 @@
         internal override Expression ResolveWithTypeContext(Resolver resolver)
         {
             this.Expression = this.Expression.ResolveWithTypeContext(resolver);
-            return this;
+            return resolver.ConstantFolder.Fold(this);
         }
     }
 }
@@ -9,6 +9,10 @@ namespace Pastel.Parser.ParseNodes
         public CoreFunction Function { get; set; }
         public Expression[] Args { get; set; }
 
+        // Set by the CopyElider when the result doesn't need its own storage and may reuse that of Args[0], e.g. a
+        // dictionary view instead of a list of keys, or a sort that happens in place on an array nobody else sees.
+        public bool MayShareArgument { get; set; }
+
         public CoreFunctionInvocation(Token firstToken, CoreFunction function, IList<Expression> args, ICompilationEntity owner) 
             : base(ExpressionType.CORE_FUNCTION_INVOCATION, firstToken, owner)
         {
@@ -106,7 +110,7 @@ namespace Pastel.Parser.ParseNodes
                 ?? base.DoConstantResolution(cycleDetection, resolver);
         }
 
-        private InlineConstant TryCompileTimeResolve()
+        internal InlineConstant TryCompileTimeResolve()
         {
             if (this.Function == CoreFunction.ORD &&
                 this.Args[0] is InlineConstant ic &&
@@ -118,6 +122,22 @@ namespace Pastel.Parser.ParseNodes
                 return output;
             }
 
+            // Translators assume string conversions of constants never make it to them.
+            if (this.Args.Length == 1 && this.Args[0] is InlineConstant value)
+            {
+                switch (this.Function)
+                {
+                    case CoreFunction.BOOL_TO_STRING:
+                        return InlineConstant.OfString((bool)value.Value ? "true" : "false", this.FirstToken, this.Owner);
+                    case CoreFunction.CHAR_TO_STRING:
+                        return InlineConstant.OfString(value.Value + "", this.FirstToken, this.Owner);
+                    case CoreFunction.FLOAT_TO_STRING:
+                        return InlineConstant.OfString(CodeUtil.FloatToString((double)value.Value), this.FirstToken, this.Owner);
+                    case CoreFunction.INT_TO_STRING:
+                        return InlineConstant.OfString((int)value.Value + "", this.FirstToken, this.Owner);
+                }
+            }
+
             return null;
         }
 
@@ -128,7 +148,7 @@ namespace Pastel.Parser.ParseNodes
                 this.Args[i] = this.Args[i].ResolveWithTypeContext(resolver);
             }
 
-            return this.TryCompileTimeResolve() ?? (Expression)this;
+            return resolver.ConstantFolder.Fold(this);
         }
     }
 }
@@ -0,0 +1,300 @@
+﻿using System;
+using System.Collections.Generic;
+using System.Linq;
+
+namespace Pastel.Parser.ParseNodes
+{
+    // A for loop that has the shape of a simple counter, e.g. for (int i = a; i < b; i += k).
+    // - The induction variable is an int that is not written to in the loop body.
+    // - The step is a non-zero constant that moves the variable towards the bound.
+    // - The bound is made of constants and variables that are not written to in the loop body.
+    // This is created in the ResolveWithTypeContext phase in place of the canonical while loop so that
+    // platforms with a native counted loop (e.g. Python's range) can use it. Platforms that don't care
+    // can simply translate the CanonicalForm, which is exactly what a regular ForLoop would have produced.
+    internal class CountedForLoop : Statement
+    {
+        public Token InductionVariable { get; private set; }
+        public Expression Start { get; private set; }
+        public Expression ExclusiveEnd { get; private set; }
+        public int Step { get; private set; }
+        public Statement[] Code { get; private set; }
+
+        // The equivalent init + while loop, which is used by platforms that don't have a counted loop.
+        public StatementBatch CanonicalForm { get; private set; }
+
+        // If the induction variable is read somewhere outside of the loop, its final value
+        // (which differs between a while loop and a native counted loop) is observable.
+        public bool IsFinalValueObserved { get; set; }
+
+        private CountedForLoop(
+            Token forToken,
+            Token inductionVariable,
+            Expression start,
+            Expression exclusiveEnd,
+            int step,
+            Statement[] code,
+            StatementBatch canonicalForm)
+            : base(forToken)
+        {
+            this.InductionVariable = inductionVariable;
+            this.Start = start;
+            this.ExclusiveEnd = exclusiveEnd;
+            this.Step = step;
+            this.Code = code;
+            this.CanonicalForm = canonicalForm;
+        }
+
+        public override Statement ResolveNamesAndCullUnusedCode(Resolver resolver)
+        {
+            // This is only created in the ResolveWithTypeContext phase.
+            throw new InvalidOperationException();
+        }
+
+        internal override void ResolveTypes(VariableScope varScope, Resolver resolver)
+        {
+            throw new InvalidOperationException();
+        }
+
+        internal override Statement ResolveWithTypeContext(Resolver resolver)
+        {
+            return this;
+        }
+
+        // Replaces the loop body in both this and the canonical form.
+        public void SetCode(Statement[] code)
+        {
+            WhileLoop whileLoop = (WhileLoop)this.CanonicalForm.Statements[this.CanonicalForm.Statements.Length - 1];
+            Statement[] stepCode = whileLoop.Code.Skip(this.Code.Length).ToArray();
+            this.Code = code;
+            whileLoop.Code = [.. code, .. stepCode];
+        }
+
+        // Returns null if the loop does not have the shape of a counted loop.
+        // All the inputs must already be resolved with type context. The whileLoop is the canonical loop without
+        // the init. Only the last init statement is part of the counted loop and the caller must run the others first.
+        public static CountedForLoop? TryCreate(
+            Token forToken,
+            Statement[] initCode,
+            Expression condition,
+            Statement[] stepCode,
+            Statement[] code,
+            WhileLoop whileLoop)
+        {
+            if (initCode.Length == 0 || stepCode.Length != 1) return null;
+
+            // The induction variable's initialization must be the last thing in the init, otherwise
+            // subsequent init statements may depend on it before the loop starts.
+            Token? inductionVariable;
+            Expression? start;
+            Statement lastInit = initCode[initCode.Length - 1];
+            if (lastInit is VariableDeclaration varDecl && varDecl.Value != null && varDecl.Type.RootValue == "int")
+            {
+                inductionVariable = varDecl.VariableNameToken;
+                start = varDecl.Value;
+            }
+            else if (lastInit is Assignment asgn && asgn.OpToken.Value == "=" && asgn.Target is Variable initTarget && IsInt(initTarget))
+            {
+                inductionVariable = initTarget.FirstToken;
+                start = asgn.Value;
+            }
+            else
+            {
+                return null;
+            }
+            string name = inductionVariable.Value;
+
+            int? step = GetStep(stepCode[0], name);
+            if (step == null || step == 0) return null;
+
+            if (!(condition is OpPair cond) || !(cond.Left is Variable condVar) || condVar.Name != name) return null;
+            bool isAscending;
+            bool isInclusive;
+            switch (cond.Op)
+            {
+                case "<": isAscending = true; isInclusive = false; break;
+                case "<=": isAscending = true; isInclusive = true; break;
+                case ">": isAscending = false; isInclusive = false; break;
+                case ">=": isAscending = false; isInclusive = true; break;
+                default: return null;
+            }
+            if (isAscending != step > 0) return null;
+
+            HashSet<string> writtenVariables = FindWrittenVariables(code);
+            if (writtenVariables.Contains(name)) return null;
+            if (!IsLoopInvariantBound(cond.Right, name, writtenVariables)) return null;
+
+            Expression exclusiveEnd = cond.Right;
+            if (isInclusive)
+            {
+                int offset = isAscending ? 1 : -1;
+                if (cond.Right is InlineConstant boundConst)
+                {
+                    exclusiveEnd = InlineConstant.OfInteger((int)boundConst.Value + offset, boundConst.FirstToken, boundConst.Owner);
+                }
+                else
+                {
+                    exclusiveEnd = new OpPair(
+                        cond.Right,
+                        Token.CreateDummyToken(isAscending ? "+" : "-"),
+                        InlineConstant.OfInteger(1, cond.OpToken, cond.Owner))
+                    {
+                        ResolvedType = PType.INT,
+                    };
+                }
+            }
+
+            return new CountedForLoop(
+                forToken,
+                inductionVariable,
+                start,
+                exclusiveEnd,
+                step.Value,
+                code,
+                new StatementBatch(forToken, [lastInit, whileLoop]));
+        }
+
+        private static bool IsInt(Expression expr)
+        {
+            return expr.ResolvedType != null && expr.ResolvedType.RootValue == "int";
+        }
+
+        private static int? GetStep(Statement stepStatement, string name)
+        {
+            if (stepStatement is Assignment asgn)
+            {
+                if (asgn.Target is Variable v && v.Name == name &&
+                    asgn.Value is InlineConstant ic && ic.Value is int amount)
+                {
+                    switch (asgn.OpToken.Value)
+                    {
+                        case "+=": return amount;
+                        case "-=": return -amount;
+                    }
+                }
+                return null;
+            }
+
+            if (stepStatement is ExpressionAsStatement exprAsStmnt &&
+                exprAsStmnt.Expression is InlineIncrement inc &&
+                inc.Expression is Variable incVar &&
+                incVar.Name == name)
+            {
+                return inc.IncrementToken.Value == "++" ? 1 : -1;
+            }
+
+            return null;
+        }
+
+        private static HashSet<string> FindWrittenVariables(Statement[] code)
+        {
+            HashSet<string> output = new HashSet<string>();
+            ParseTreeWalker.WalkStatements(
+                code,
+                stmnt =>
+                {
+                    if (stmnt is Assignment asgn && asgn.Target is Variable v) output.Add(v.Name);
+                    else if (stmnt is VariableDeclaration varDecl) output.Add(varDecl.VariableNameToken.Value);
+                    return true;
+                },
+                expr =>
+                {
+                    if (expr is InlineIncrement inc && inc.Expression is Variable v) output.Add(v.Name);
+                    return true;
+                });
+            return output;
+        }
+
+        // Only side-effect free expressions whose value cannot change while the loop is running are allowed.
+        private static bool IsLoopInvariantBound(Expression bound, string inductionVariable, HashSet<string> writtenVariables)
+        {
+            switch (bound)
+            {
+                case InlineConstant ic:
+                    return ic.Value is int;
+
+                case Variable v:
+                    return v.Name != inductionVariable && !writtenVariables.Contains(v.Name) && IsInt(v);
+
+                case OpPair op:
+                    switch (op.Op)
+                    {
+                        case "+":
+                        case "-":
+                        case "*":
+                            return IsInt(op) &&
+                                IsLoopInvariantBound(op.Left, inductionVariable, writtenVariables) &&
+                                IsLoopInvariantBound(op.Right, inductionVariable, writtenVariables);
+                    }
+                    return false;
+
+                case CoreFunctionInvocation cfi:
+                    // Arrays have a fixed length and strings are immutable.
+                    if (cfi.Function == CoreFunction.ARRAY_LENGTH || cfi.Function == CoreFunction.STRING_LENGTH)
+                    {
+                        return cfi.Args[0] is Variable root &&
+                            root.Name != inductionVariable &&
+                            !writtenVariables.Contains(root.Name);
+                    }
+                    return false;
+
+                default:
+                    return false;
+            }
+        }
+
+        // Marks the counted loops in a function whose induction variable may be read outside of the loop.
+        // Reads inside another counted loop of the same variable are not counted since that loop always
+        // re-initializes the variable before its body runs.
+        public static void MarkObservedInductionVariables(Statement[] functionCode)
+        {
+            List<CountedForLoop> loops = new List<CountedForLoop>();
+            HashSet<string> observedVariables = new HashSet<string>();
+            FindObservedVariables(functionCode, new HashSet<string>(), loops, observedVariables);
+            foreach (CountedForLoop loop in loops)
+            {
+                loop.IsFinalValueObserved = observedVariables.Contains(loop.InductionVariable.Value);
+            }
+        }
+
+        private static void FindObservedVariables(
+            Statement[] code,
+            HashSet<string> shieldedVariables,
+            List<CountedForLoop> loopsOut,
+            HashSet<string> observedVariablesOut)
+        {
+            Func<Expression, bool> onExpression = expr =>
+            {
+                if (expr is Variable v && !shieldedVariables.Contains(v.Name))
+                {
+                    observedVariablesOut.Add(v.Name);
+                }
+                return true;
+            };
+
+            Func<Statement, bool>? onStatement = null;
+            onStatement = stmnt =>
+            {
+                if (stmnt is CountedForLoop loop)
+                {
+                    loopsOut.Add(loop);
+                    ParseTreeWalker.WalkExpression(loop.Start, onStatement, onExpression);
+                    ParseTreeWalker.WalkExpression(loop.ExclusiveEnd, onStatement, onExpression);
+                    HashSet<string> innerShield = new HashSet<string>(shieldedVariables) { loop.InductionVariable.Value };
+                    FindObservedVariables(loop.Code, innerShield, loopsOut, observedVariablesOut);
+                    return false;
+                }
+
+                if (stmnt is Assignment asgn && asgn.OpToken.Value == "=" && asgn.Target is Variable)
+                {
+                    // A plain assignment writes to the variable without reading it.
+                    ParseTreeWalker.WalkExpression(asgn.Value, onStatement, onExpression);
+                    return false;
+                }
+
+                return true;
+            };
+
+            ParseTreeWalker.WalkStatements(code, onStatement, onExpression);
+        }
+    }
+}
@@ -55,15 +55,23 @@ namespace Pastel.Parser.ParseNodes
             Statement.ResolveWithTypeContext(resolver, this.Code);
             
             // Canonicalize the for loop into a while loop.
-            return new StatementBatch(this.FirstToken, [
-                ..this.InitCode, 
-                new WhileLoop(
-                    this.FirstToken, 
-                    this.Condition, [
-                        ..this.Code, 
-                        ..this.StepCode
-                    ])
-            ]);
+            WhileLoop whileLoop = new WhileLoop(
+                this.FirstToken,
+                this.Condition, [
+                    ..this.Code,
+                    ..this.StepCode
+                ]);
+
+            // Simple counter loops are preserved so that platforms with a native equivalent can use it.
+            // The counted loop includes the induction variable's init, so the rest of the init goes before it.
+            CountedForLoop? countedLoop = CountedForLoop.TryCreate(
+                this.FirstToken, this.InitCode, this.Condition, this.StepCode, this.Code, whileLoop);
+            if (countedLoop != null)
+            {
+                return new StatementBatch(this.FirstToken, [..this.InitCode.Take(this.InitCode.Length - 1), countedLoop]);
+            }
+
+            return new StatementBatch(this.FirstToken, [..this.InitCode, whileLoop]);
         }
     }
 }
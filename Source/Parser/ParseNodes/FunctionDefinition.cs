@@ -15,6 +15,10 @@ namespace Pastel.Parser.ParseNodes
         public Token[] ArgNames { get; set; }
         public Statement[] Code { get; set; }
 
+        // Set by @memoize(maxEntries), along with the token of the annotation. 0 if the function isn't memoized.
+        public int MemoizeMaxEntries { get; set; } = 0;
+        public Token? MemoizeToken { get; set; } = null;
+
         public FunctionDefinition(
             Token nameToken,
             PType returnType,
@@ -59,6 +63,7 @@ namespace Pastel.Parser.ParseNodes
         public void ResolveWithTypeContext(Resolver resolver)
         {
             Statement.ResolveWithTypeContext(resolver, this.Code);
+            CountedForLoop.MarkObservedInductionVariables(this.Code);
         }
     }
 }
@@ -6,7 +6,7 @@ namespace Pastel.Parser.ParseNodes
 {
     internal class FunctionPointerInvocation : Expression
     {
-        public Expression Root { get; private set; }
+        public Expression Root { get; set; }
         public Expression[] Args { get; private set; }
 
         // Note that this class is instantiated in the ResolveType phase.
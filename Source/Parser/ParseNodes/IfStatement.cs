@@ -31,6 +31,7 @@ namespace Pastel.Parser.ParseNodes
             {
                 if (ic.Value is bool boolCondVal)
                 {
+                    resolver.ConstantFolder.RecordPrunedCode("if", boolCondVal ? this.ElseCode : this.IfCode);
                     return new StatementBatch(
                         this.FirstToken, 
                         Statement.ResolveNamesAndCullUnusedCodeForBlock(
@@ -67,6 +68,7 @@ namespace Pastel.Parser.ParseNodes
             if (this.Condition is InlineConstant condIc)
             {
                 bool condition = (bool)condIc.Value;
+                resolver.ConstantFolder.RecordPrunedCode("if", condition ? this.ElseCode : this.IfCode);
                 return new StatementBatch(this.FirstToken, condition ? this.IfCode : this.ElseCode);
             }
 
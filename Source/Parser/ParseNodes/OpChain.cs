@@ -20,21 +20,29 @@ namespace Pastel.Parser.ParseNodes
 
         public override Expression ResolveNamesAndCullUnusedCode(Resolver resolver)
         {
-            Expression.ResolveNamesAndCullUnusedCodeInPlace(this.Expressions, resolver);
             string op = this.Ops[0].Value;
             Expression acc;
 
-            // Don't do short-circuiting yet for && and ||
             if (op == "&&" || op == "||")
             {
+                // Operands after a constant that decides the result are never evaluated. They are folded away
+                // without resolving their names, so they can refer to things that only exist on other platforms.
+                bool isDecided = false;
+                for (int i = 0; i < this.Expressions.Length && !isDecided; i++)
+                {
+                    this.Expressions[i] = this.Expressions[i].ResolveNamesAndCullUnusedCode(resolver);
+                    isDecided = this.Expressions[i] is InlineConstant ic && ic.Value is bool value && value == (op == "||");
+                }
+
                 acc = this.Expressions[this.Expressions.Length - 1];
                 for (int i = this.Expressions.Length - 2; i >= 0; i--)
                 {
-                    acc = new OpPair(this.Expressions[i], this.Ops[i], acc);
+                    acc = resolver.ConstantFolder.FoldBooleanLogic(new OpPair(this.Expressions[i], this.Ops[i], acc));
                 }
             }
             else
             {
+                Expression.ResolveNamesAndCullUnusedCodeInPlace(this.Expressions, resolver);
                 acc = this.Expressions[0];
                 for (int i = 1; i < this.Expressions.Length; i++)
                 {
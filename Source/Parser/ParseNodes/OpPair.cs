@@ -4,8 +4,8 @@ namespace Pastel.Parser.ParseNodes
 {
     internal class OpPair : Expression
     {
-        public Expression Left { get; private set; }
-        public Expression Right { get; private set; }
+        public Expression Left { get; set; }
+        public Expression Right { get; set; }
         public Token OpToken { get; private set; }
         public string Op { get; private set; }
         
@@ -164,75 +164,7 @@ namespace Pastel.Parser.ParseNodes
         {
             this.Left = this.Left.ResolveWithTypeContext(resolver);
             this.Right = this.Right.ResolveWithTypeContext(resolver);
-            InlineConstant? left = this.Left as InlineConstant;
-            InlineConstant? right = this.Right as InlineConstant;
-            if (left == null || right == null)
-            {
-                return this;
-            }
-
-            object leftValue = left.Value;
-            object rightValue = right.Value;
-            string lookup = left.ResolvedType.RootValue + this.Op + right.ResolvedType.RootValue;
-            
-            switch (lookup)
-            {
-                case "int+int": return this.CreateInteger((int)leftValue + (int)rightValue);
-                case "int-int": return this.CreateInteger((int)leftValue - (int)rightValue);
-                case "int*int": return this.CreateInteger((int)leftValue * (int)rightValue);
-                case "int/int": return this.CreateInteger((int)leftValue / (int)rightValue); 
-                case "int&int": return this.CreateInteger((int)leftValue & (int)rightValue);
-                case "int|int": return this.CreateInteger((int)leftValue | (int)rightValue); 
-                case "int^int": return this.CreateInteger((int)leftValue ^ (int)rightValue);
-                case "int<<int": return this.CreateInteger((int)leftValue << (int)rightValue);
-                case "int>>int": return this.CreateInteger((int)leftValue >> (int)rightValue);
-                case "int+double": return this.CreateFloat((int)leftValue + (double)rightValue);
-                case "int-double": return this.CreateFloat((int)leftValue - (double)rightValue);
-                case "int*double": return this.CreateFloat((int)leftValue * (double)rightValue);
-                case "int/double": return this.CreateFloat((int)leftValue / (double)rightValue);
-                case "double+int": return this.CreateFloat((double)leftValue + (int)rightValue);
-                case "double-int": return this.CreateFloat((double)leftValue - (int)rightValue);
-                case "double*int": return this.CreateFloat((double)leftValue * (int)rightValue);
-                case "double/int": return this.CreateFloat((double)leftValue / (int)rightValue);
-                case "double+double": return this.CreateFloat((double)leftValue + (double)rightValue);
-                case "double-double": return this.CreateFloat((double)leftValue - (double)rightValue);
-                case "double*double": return this.CreateFloat((double)leftValue * (double)rightValue);
-                case "double/double": return this.CreateFloat((double)leftValue / (double)rightValue);
-                case "bool&&bool": return this.CreateBoolean((bool)leftValue && (bool)rightValue);
-                case "bool||bool": return this.CreateBoolean((bool)leftValue || (bool)rightValue);
-                case "string+string": return this.CreateString((string)leftValue + (string)rightValue);
-                case "string+char": return this.CreateString((string)leftValue + (char)rightValue);
-                case "char+string": return this.CreateString((char)leftValue + (string)rightValue);
-                default:
-                    if (this.Op == "%")
-                    {
-                        // TODO: modulo operator is not defined for compile-time resolution.
-                        throw new System.NotImplementedException("Remember when you implement this to prevent negatives.");
-                    }
-                    throw new UNTESTED_ParserException(
-                        this.OpToken,
-                        "The operator is not defined for these two constants.");
-            }
-        }
-        
-        private InlineConstant CreateBoolean(bool value)
-        {
-            return InlineConstant.OfBoolean(value, this.FirstToken, this.Owner);
-        }
-
-        private InlineConstant CreateInteger(int value)
-        {
-            return InlineConstant.OfInteger(value, this.FirstToken, this.Owner);
-        }
-
-        private InlineConstant CreateFloat(double value)
-        {
-            return InlineConstant.OfFloat(value, this.FirstToken, this.Owner);
-        }
-
-        private InlineConstant CreateString(string value)
-        {
-            return InlineConstant.OfString(value, this.FirstToken, this.Owner);
+            return resolver.ConstantFolder.Fold(this);
         }
     }
 }
@@ -457,7 +457,13 @@ namespace Pastel.Parser.ParseNodes
             return type;
         }
 
-        private static Token[] reusableRootNameParserOut = new Token[2];
+        // Per thread since multiple targets can be compiled on different threads.
+        [System.ThreadStatic]
+        private static Token[]? reusableRootNameParserOutPerThread;
+        private static Token[] reusableRootNameParserOut
+        {
+            get { return reusableRootNameParserOutPerThread ??= new Token[2]; }
+        }
 
         // Attempts to pop a Namespaced.TypeName or a TypeName from the token stream.
         // The values are applied to reusableRootNameParserOut and the number of values
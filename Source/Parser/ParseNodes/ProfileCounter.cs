@@ -0,0 +1,29 @@
+﻿namespace Pastel.Parser.ParseNodes
+{
+    // Increments one of the counters of an instrumented build. These are added by the Instrumenter after types have
+    // been resolved and before functions are inlined.
+    internal class ProfileCounter : Statement
+    {
+        public int Slot { get; private set; }
+
+        public ProfileCounter(Token firstToken, int slot) : base(firstToken)
+        {
+            this.Slot = slot;
+        }
+
+        public override Statement ResolveNamesAndCullUnusedCode(Resolver resolver)
+        {
+            return this;
+        }
+
+        internal override void ResolveTypes(VariableScope varScope, Resolver resolver)
+        {
+            // nothing to do
+        }
+
+        internal override Statement ResolveWithTypeContext(Resolver resolver)
+        {
+            return this;
+        }
+    }
+}
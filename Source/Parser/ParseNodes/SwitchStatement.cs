@@ -8,6 +8,9 @@ namespace Pastel.Parser.ParseNodes
         public Expression Condition { get; set; }
         public SwitchChunk[] Chunks { get; set; }
 
+        // How this is identified in an execution profile. Set by the Instrumenter.
+        public string? ProfileKey { get; set; }
+
         public SwitchStatement(Token switchToken, Expression condition, IList<SwitchChunk> chunks) : base(switchToken)
         {
             this.Condition = condition;
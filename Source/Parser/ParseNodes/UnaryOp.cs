@@ -69,7 +69,7 @@
         internal override Expression ResolveWithTypeContext(Resolver resolver)
         {
             this.Expression = this.Expression.ResolveWithTypeContext(resolver);
-            return this;
+            return resolver.ConstantFolder.Fold(this);
         }
     }
 }
@@ -40,6 +40,7 @@ namespace Pastel.Parser.ParseNodes
             FunctionDefinition functionDefinition = resolver.GetFunctionDefinition(name);
             if (functionDefinition != null)
             {
+                resolver.ResolutionQueue.Enqueue(name);
                 return new FunctionReference(this.FirstToken, functionDefinition, this.Owner);
             }
 
@@ -0,0 +1,257 @@
+﻿using Pastel.Parser.ParseNodes;
+using System;
+using System.Collections.Generic;
+using System.Linq;
+
+namespace Pastel.Parser
+{
+    // Creates deep copies of fully resolved code so that it can be transplanted into another function.
+    // - Variables in RenamedVariables are given their new name, including declarations and assignment targets.
+    // - Variables in SubstitutedVariables are replaced with a fresh copy of the given expression at each usage.
+    // - All new expressions are owned by the given owner.
+    // Only the node types that can exist after the ResolveWithTypeContext phase are supported.
+    internal class ParseTreeCloner
+    {
+        private Resolver resolver;
+        private ICompilationEntity owner;
+
+        public Dictionary<string, string> RenamedVariables { get; private set; }
+        public Dictionary<string, Expression> SubstitutedVariables { get; private set; }
+
+        public ParseTreeCloner(Resolver resolver, ICompilationEntity owner)
+        {
+            this.resolver = resolver;
+            this.owner = owner;
+            this.RenamedVariables = new Dictionary<string, string>();
+            this.SubstitutedVariables = new Dictionary<string, Expression>();
+        }
+
+        private static readonly HashSet<ExpressionType> SUPPORTED_EXPRESSION_TYPES = [
+            ExpressionType.CAST,
+            ExpressionType.CONSTRUCTOR_INVOCATION,
+            ExpressionType.CORE_FUNCTION_INVOCATION,
+            ExpressionType.DOT_FIELD,
+            ExpressionType.EXTENSIBLE_FUNCTION_INVOCATION,
+            ExpressionType.FUNCTION_INVOCATION,
+            ExpressionType.FUNCTION_POINTER_INVOCATION,
+            ExpressionType.FUNCTION_REFERENCE,
+            ExpressionType.INLINE_CONSTANT,
+            ExpressionType.INLINE_INCREMENT,
+            ExpressionType.OP_PAIR,
+            ExpressionType.STRING_CONCATENATION,
+            ExpressionType.UNARY_OP,
+            ExpressionType.VARIABLE,
+        ];
+
+        public static bool CanClone(Statement[] code)
+        {
+            bool output = true;
+            ParseTreeWalker.WalkStatements(
+                code,
+                stmnt =>
+                {
+                    // Counted loops and switch statements have per-platform metadata that cannot be trivially copied.
+                    if (stmnt is CountedForLoop || stmnt is SwitchStatement) output = false;
+                    return output;
+                },
+                expr =>
+                {
+                    if (!SUPPORTED_EXPRESSION_TYPES.Contains(expr.Type)) output = false;
+                    return output;
+                });
+            return output;
+        }
+
+        public Statement[] CloneStatements(IList<Statement> code)
+        {
+            return code.Select(stmnt => this.CloneStatement(stmnt)).ToArray();
+        }
+
+        public Statement CloneStatement(Statement stmnt)
+        {
+            switch (stmnt)
+            {
+                case Assignment asgn:
+                    return new Assignment(
+                        this.CloneExpression(asgn.Target),
+                        asgn.OpToken,
+                        this.CloneExpression(asgn.Value));
+
+                case BreakStatement:
+                    return new BreakStatement(stmnt.FirstToken);
+
+                case ProfileCounter counter:
+                    return new ProfileCounter(counter.FirstToken, counter.Slot);
+
+                case ExpressionAsStatement exprAsStmnt:
+                    return new ExpressionAsStatement(this.CloneExpression(exprAsStmnt.Expression));
+
+                case IfStatement ifStatement:
+                    return new IfStatement(
+                        ifStatement.FirstToken,
+                        this.CloneExpression(ifStatement.Condition),
+                        this.CloneStatements(ifStatement.IfCode),
+                        ifStatement.ElseToken,
+                        this.CloneStatements(ifStatement.ElseCode));
+
+                case ReturnStatement returnStatement:
+                    return new ReturnStatement(
+                        returnStatement.FirstToken,
+                        returnStatement.Expression == null ? null! : this.CloneExpression(returnStatement.Expression));
+
+                case VariableDeclaration varDecl:
+                    return new VariableDeclaration(
+                        varDecl.Type,
+                        this.RenameToken(varDecl.VariableNameToken),
+                        varDecl.EqualsToken,
+                        varDecl.Value == null ? null! : this.CloneExpression(varDecl.Value),
+                        varDecl.Context);
+
+                case WhileLoop whileLoop:
+                    return new WhileLoop(
+                        whileLoop.FirstToken,
+                        this.CloneExpression(whileLoop.Condition),
+                        this.CloneStatements(whileLoop.Code));
+
+                case StatementBatch batch:
+                    return new StatementBatch(batch.FirstToken, this.CloneStatements(batch.Statements));
+
+                default:
+                    throw new NotImplementedException(stmnt.GetType().Name);
+            }
+        }
+
+        private Token RenameToken(Token token)
+        {
+            if (this.RenamedVariables.TryGetValue(token.Value, out string? newName))
+            {
+                return new Token(newName, token.FileName, token.Line, token.Col, token.Type);
+            }
+            return token;
+        }
+
+        private Expression[] CloneExpressions(IList<Expression> expressions)
+        {
+            return expressions.Select(expr => this.CloneExpression(expr)).ToArray();
+        }
+
+        public Expression CloneExpression(Expression expr)
+        {
+            switch (expr.Type)
+            {
+                case ExpressionType.CAST:
+                    CastExpression cast = (CastExpression)expr;
+                    return new CastExpression(cast.FirstToken, cast.Type, this.CloneExpression(cast.Expression))
+                    {
+                        ResolvedType = cast.ResolvedType,
+                    };
+
+                case ExpressionType.CONSTRUCTOR_INVOCATION:
+                    ConstructorInvocation ctorInvocation = (ConstructorInvocation)expr;
+                    return new ConstructorInvocation(ctorInvocation.FirstToken, ctorInvocation.Type, this.CloneExpressions(ctorInvocation.Args), this.owner)
+                    {
+                        StructDefinition = ctorInvocation.StructDefinition,
+                        ResolvedType = ctorInvocation.ResolvedType,
+                    };
+
+                case ExpressionType.CORE_FUNCTION_INVOCATION:
+                    CoreFunctionInvocation cfi = (CoreFunctionInvocation)expr;
+                    CoreFunctionInvocation cfiClone = new CoreFunctionInvocation(cfi.FirstToken, cfi.Function, this.CloneExpressions(cfi.Args), this.owner)
+                    {
+                        ResolvedType = cfi.ResolvedType,
+                    };
+                    // Substituted constants may need to be resolved at compile time again.
+                    return cfiClone.TryCompileTimeResolve() ?? (Expression)cfiClone;
+
+                case ExpressionType.DOT_FIELD:
+                    DotField dotField = (DotField)expr;
+                    return new DotField(this.CloneExpression(dotField.Root), dotField.DotToken, dotField.FieldName)
+                    {
+                        CoreFunctionId = dotField.CoreFunctionId,
+                        StructType = dotField.StructType,
+                        ResolvedType = dotField.ResolvedType,
+                    };
+
+                case ExpressionType.EXTENSIBLE_FUNCTION_INVOCATION:
+                    ExtensibleFunctionInvocation exInvocation = (ExtensibleFunctionInvocation)expr;
+                    return new ExtensibleFunctionInvocation(exInvocation.FirstToken, exInvocation.FunctionRef, this.CloneExpressions(exInvocation.Args))
+                    {
+                        ResolvedType = exInvocation.ResolvedType,
+                    };
+
+                case ExpressionType.FUNCTION_INVOCATION:
+                    FunctionInvocation funcInvocation = (FunctionInvocation)expr;
+                    return new FunctionInvocation(this.CloneExpression(funcInvocation.Root), funcInvocation.OpenParenToken, this.CloneExpressions(funcInvocation.Args))
+                    {
+                        ResolvedType = funcInvocation.ResolvedType,
+                    };
+
+                case ExpressionType.FUNCTION_POINTER_INVOCATION:
+                    FunctionPointerInvocation fpInvocation = (FunctionPointerInvocation)expr;
+                    return new FunctionPointerInvocation(
+                        this.resolver,
+                        fpInvocation.FirstToken,
+                        this.CloneExpression(fpInvocation.Root),
+                        this.CloneExpressions(fpInvocation.Args));
+
+                case ExpressionType.FUNCTION_REFERENCE:
+                    FunctionReference funcRef = (FunctionReference)expr;
+                    return new FunctionReference(funcRef.FirstToken, funcRef.Function, this.owner)
+                    {
+                        IsLibraryScopedFunction = funcRef.IsLibraryScopedFunction,
+                        ResolvedType = funcRef.ResolvedType,
+                    };
+
+                case ExpressionType.INLINE_CONSTANT:
+                    InlineConstant inlineConst = (InlineConstant)expr;
+                    InlineConstant constClone = inlineConst.CloneWithNewTokenAndOwner(inlineConst.FirstToken, this.owner);
+                    constClone.ResolvedType = inlineConst.ResolvedType;
+                    return constClone;
+
+                case ExpressionType.INLINE_INCREMENT:
+                    InlineIncrement inc = (InlineIncrement)expr;
+                    return new InlineIncrement(inc.FirstToken, inc.IncrementToken, this.CloneExpression(inc.Expression), inc.IsPrefix)
+                    {
+                        ResolvedType = inc.ResolvedType,
+                    };
+
+                case ExpressionType.OP_PAIR:
+                    OpPair opPair = (OpPair)expr;
+                    return new OpPair(this.CloneExpression(opPair.Left), opPair.OpToken, this.CloneExpression(opPair.Right))
+                    {
+                        ResolvedType = opPair.ResolvedType,
+                    };
+
+                case ExpressionType.STRING_CONCATENATION:
+                    List<Expression> strExprs = ((StringConcatenation)expr).Expressions;
+                    StringConcatenation strConcat = new StringConcatenation(this.CloneExpression(strExprs[0]), this.CloneExpression(strExprs[1]));
+                    strConcat.Expressions.AddRange(this.CloneExpressions(strExprs.Skip(2).ToArray()));
+                    return strConcat;
+
+                case ExpressionType.UNARY_OP:
+                    UnaryOp unaryOp = (UnaryOp)expr;
+                    return new UnaryOp(unaryOp.OpToken, this.CloneExpression(unaryOp.Expression))
+                    {
+                        ResolvedType = unaryOp.ResolvedType,
+                    };
+
+                case ExpressionType.VARIABLE:
+                    Variable variable = (Variable)expr;
+                    if (this.SubstitutedVariables.TryGetValue(variable.Name, out Expression? substitution))
+                    {
+                        // The substitution itself is not subject to renames and substitutions.
+                        return new ParseTreeCloner(this.resolver, this.owner).CloneExpression(substitution);
+                    }
+                    return new Variable(this.RenameToken(variable.FirstToken), this.owner)
+                    {
+                        ApplyPrefix = variable.ApplyPrefix,
+                        IsFunctionInvocation = variable.IsFunctionInvocation,
+                        ResolvedType = variable.ResolvedType,
+                    };
+
+                default:
+                    throw new NotImplementedException(expr.Type.ToString());
+            }
+        }
+    }
+}
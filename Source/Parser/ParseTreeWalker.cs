@@ -0,0 +1,192 @@
+﻿using Pastel.Parser.ParseNodes;
+using System;
+using System.Collections.Generic;
+
+namespace Pastel.Parser
+{
+    // Visits every statement and expression in a block of code in pre-order.
+    // If a callback returns false, the children of that node are skipped.
+    internal static class ParseTreeWalker
+    {
+        public static void WalkStatements(
+            IList<Statement> statements,
+            Func<Statement, bool>? onStatement,
+            Func<Expression, bool>? onExpression)
+        {
+            for (int i = 0; i < statements.Count; ++i)
+            {
+                WalkStatement(statements[i], onStatement, onExpression);
+            }
+        }
+
+        public static void WalkStatement(
+            Statement stmnt,
+            Func<Statement, bool>? onStatement,
+            Func<Expression, bool>? onExpression)
+        {
+            if (onStatement != null && !onStatement(stmnt)) return;
+
+            switch (stmnt)
+            {
+                case Assignment asgn:
+                    WalkExpression(asgn.Target, onStatement, onExpression);
+                    WalkExpression(asgn.Value, onStatement, onExpression);
+                    break;
+
+                case BreakStatement:
+                case ProfileCounter:
+                    break;
+
+                case ExpressionAsStatement exprAsStmnt:
+                    WalkExpression(exprAsStmnt.Expression, onStatement, onExpression);
+                    break;
+
+                case IfStatement ifStatement:
+                    WalkExpression(ifStatement.Condition, onStatement, onExpression);
+                    WalkStatements(ifStatement.IfCode, onStatement, onExpression);
+                    WalkStatements(ifStatement.ElseCode, onStatement, onExpression);
+                    break;
+
+                case ReturnStatement returnStatement:
+                    WalkExpression(returnStatement.Expression, onStatement, onExpression);
+                    break;
+
+                case SwitchStatement switchStatement:
+                    WalkExpression(switchStatement.Condition, onStatement, onExpression);
+                    foreach (SwitchStatement.SwitchChunk chunk in switchStatement.Chunks)
+                    {
+                        WalkExpressions(chunk.Cases, onStatement, onExpression);
+                        WalkStatements(chunk.Code, onStatement, onExpression);
+                    }
+                    break;
+
+                case VariableDeclaration varDecl:
+                    WalkExpression(varDecl.Value, onStatement, onExpression);
+                    break;
+
+                case WhileLoop whileLoop:
+                    WalkExpression(whileLoop.Condition, onStatement, onExpression);
+                    WalkStatements(whileLoop.Code, onStatement, onExpression);
+                    break;
+
+                case ForLoop forLoop:
+                    WalkStatements(forLoop.InitCode, onStatement, onExpression);
+                    WalkExpression(forLoop.Condition, onStatement, onExpression);
+                    WalkStatements(forLoop.Code, onStatement, onExpression);
+                    WalkStatements(forLoop.StepCode, onStatement, onExpression);
+                    break;
+
+                case CountedForLoop countedLoop:
+                    WalkStatement(countedLoop.CanonicalForm, onStatement, onExpression);
+                    break;
+
+                case StatementBatch batch:
+                    WalkStatements(batch.Statements, onStatement, onExpression);
+                    break;
+
+                default:
+                    throw new NotImplementedException(stmnt.GetType().Name);
+            }
+        }
+
+        public static void WalkExpressions(
+            IList<Expression> expressions,
+            Func<Statement, bool>? onStatement,
+            Func<Expression, bool>? onExpression)
+        {
+            for (int i = 0; i < expressions.Count; ++i)
+            {
+                WalkExpression(expressions[i], onStatement, onExpression);
+            }
+        }
+
+        // null expressions (e.g. a return with no value or a default case) are silently ignored.
+        public static void WalkExpression(
+            Expression? expr,
+            Func<Statement, bool>? onStatement,
+            Func<Expression, bool>? onExpression)
+        {
+            if (expr == null) return;
+            if (onExpression != null && !onExpression(expr)) return;
+
+            switch (expr.Type)
+            {
+                case ExpressionType.BRACKET_INDEX:
+                    BracketIndex bracketIndex = (BracketIndex)expr;
+                    WalkExpression(bracketIndex.Root, onStatement, onExpression);
+                    WalkExpression(bracketIndex.Index, onStatement, onExpression);
+                    break;
+
+                case ExpressionType.CAST:
+                    WalkExpression(((CastExpression)expr).Expression, onStatement, onExpression);
+                    break;
+
+                case ExpressionType.CONSTRUCTOR_INVOCATION:
+                    WalkExpressions(((ConstructorInvocation)expr).Args, onStatement, onExpression);
+                    break;
+
+                case ExpressionType.CORE_FUNCTION_INVOCATION:
+                    WalkExpressions(((CoreFunctionInvocation)expr).Args, onStatement, onExpression);
+                    break;
+
+                case ExpressionType.CORE_FUNCTION_REFERENCE:
+                    WalkExpression(((CoreFunctionReference)expr).Context, onStatement, onExpression);
+                    break;
+
+                case ExpressionType.DOT_FIELD:
+                    WalkExpression(((DotField)expr).Root, onStatement, onExpression);
+                    break;
+
+                case ExpressionType.EXTENSIBLE_FUNCTION_INVOCATION:
+                    WalkExpressions(((ExtensibleFunctionInvocation)expr).Args, onStatement, onExpression);
+                    break;
+
+                case ExpressionType.FUNCTION_INVOCATION:
+                    FunctionInvocation funcInvocation = (FunctionInvocation)expr;
+                    WalkExpression(funcInvocation.Root, onStatement, onExpression);
+                    WalkExpressions(funcInvocation.Args, onStatement, onExpression);
+                    break;
+
+                case ExpressionType.FUNCTION_POINTER_INVOCATION:
+                    FunctionPointerInvocation fpInvocation = (FunctionPointerInvocation)expr;
+                    WalkExpression(fpInvocation.Root, onStatement, onExpression);
+                    WalkExpressions(fpInvocation.Args, onStatement, onExpression);
+                    break;
+
+                case ExpressionType.INLINE_INCREMENT:
+                    WalkExpression(((InlineIncrement)expr).Expression, onStatement, onExpression);
+                    break;
+
+                case ExpressionType.OP_CHAIN:
+                    WalkExpressions(((OpChain)expr).Expressions, onStatement, onExpression);
+                    break;
+
+                case ExpressionType.OP_PAIR:
+                    OpPair opPair = (OpPair)expr;
+                    WalkExpression(opPair.Left, onStatement, onExpression);
+                    WalkExpression(opPair.Right, onStatement, onExpression);
+                    break;
+
+                case ExpressionType.STRING_CONCATENATION:
+                    WalkExpressions(((StringConcatenation)expr).Expressions, onStatement, onExpression);
+                    break;
+
+                case ExpressionType.UNARY_OP:
+                    WalkExpression(((UnaryOp)expr).Expression, onStatement, onExpression);
+                    break;
+
+                case ExpressionType.COMPILE_TIME_FUNCTION_REFERENCE:
+                case ExpressionType.CONSTRUCTOR_REFERENCE:
+                case ExpressionType.ENUM_REFERENCE:
+                case ExpressionType.EXTENSIBLE_FUNCTION_REFERENCE:
+                case ExpressionType.FUNCTION_REFERENCE:
+                case ExpressionType.INLINE_CONSTANT:
+                case ExpressionType.VARIABLE:
+                    break;
+
+                default:
+                    throw new NotImplementedException(expr.Type.ToString());
+            }
+        }
+    }
+}
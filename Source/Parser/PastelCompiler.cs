@@ -2,6 +2,8 @@
 using System;
 using System.Collections.Generic;
 using System.Linq;
+using System.Runtime.ExceptionServices;
+using System.Threading.Tasks;
 
 namespace Pastel.Parser
 {
@@ -44,6 +46,15 @@ namespace Pastel.Parser
         internal Dictionary<string, VariableDeclaration> ConstantDefinitions { get; set; }
         public Dictionary<string, FunctionDefinition> FunctionDefinitions { get; set; }
 
+        // Function name to the number of call sites it was inlined at.
+        public Dictionary<string, int> InlinedFunctions { get; set; } = [];
+
+        // Statistics about constants that were folded and code that was pruned as a result.
+        public ConstantFolder ConstantFolder { get; private set; } = new ConstantFolder();
+
+        // Names of the profile counters of an instrumented build, by slot. null if the build isn't instrumented.
+        public string[]? ProfileSlotNames { get; set; } = null;
+
         public StructDefinition[] GetStructDefinitions()
         {
             return this.StructDefinitions.Keys
@@ -179,13 +190,61 @@ namespace Pastel.Parser
 
         internal Dictionary<string, string> GetFunctionCodeAsLookupTEMP(Transpilers.TranspilerContext ctx, string indent)
         {
-            Dictionary<string, string> output = new Dictionary<string, string>();
-            foreach (FunctionDefinition fd in GetFunctionDefinitions())
+            // Functions are generated in parallel, each worker with its own context. Nothing a function emits depends
+            // on the functions generated before it (counters are reset per function) so the output is the same as
+            // generating them one at a time.
+            FunctionDefinition[] functions = GetFunctionDefinitions();
+            Profiler? profiler = this.Context.Profiler;
+            string[] code = new string[functions.Length];
+            Exception?[] errors = new Exception?[functions.Length];
+            object featureLock = new object();
+            Parallel.For(
+                0,
+                functions.Length,
+                () => ctx.CreateFunctionContext(),
+                (i, _, fnCtx) =>
+                {
+                    try
+                    {
+                        using Profiler.Scope? scope = profiler?.Measure(functions[i].NameToken.Value, "generate-functions");
+                        fnCtx.SwitchCounter = 0;
+                        if (functions[i].MemoizeMaxEntries > 0)
+                        {
+                            fnCtx.Transpiler.GenerateCodeForMemoizedFunction(fnCtx, functions[i], true);
+                        }
+                        else
+                        {
+                            fnCtx.Transpiler.GenerateCodeForFunction(fnCtx, functions[i], true);
+                        }
+                        code[i] = Indent(fnCtx.FlushAndClearBuffer().Trim(), indent);
+                    }
+                    catch (Exception e)
+                    {
+                        errors[i] = e;
+                        fnCtx.FlushAndClearBuffer();
+                    }
+                    return fnCtx;
+                },
+                fnCtx =>
+                {
+                    lock (featureLock)
+                    {
+                        ctx.MergeFeatureUsage(fnCtx);
+                    }
+                });
+
+            // Report the same error a serial build would have, i.e. the one from the first function.
+            Exception? firstError = errors.FirstOrDefault(e => e != null);
+            if (firstError != null)
             {
-                ctx.Transpiler.GenerateCodeForFunction(ctx, fd, true);
-                output[fd.NameToken.Value] = Indent(ctx.FlushAndClearBuffer().Trim(), indent);
+                ExceptionDispatchInfo.Capture(firstError).Throw();
             }
 
+            Dictionary<string, string> output = new Dictionary<string, string>();
+            for (int i = 0; i < functions.Length; ++i)
+            {
+                output[functions[i].NameToken.Value] = code[i];
+            }
             return output;
         }
 
@@ -16,6 +16,8 @@ namespace Pastel.Parser
 
         internal PastelContext Context { get; private set; }
 
+        private Dictionary<string, Token[]> importedFileTokens = new Dictionary<string, Token[]>();
+
         public PastelParser(
             PastelContext context,
             IDictionary<string, object> constants,
@@ -33,6 +35,18 @@ namespace Pastel.Parser
             return this.Context.CodeLoader.LoadCode(throwToken, path);
         }
 
+        // The same file is often @import'ed into many functions, so each file is only loaded and tokenized once.
+        // Tokens are not modified by the parser so the same tokens can be shared by each import.
+        public Token[] LoadImportedTokens(Token throwToken, string path)
+        {
+            if (!this.importedFileTokens.TryGetValue(path, out Token[]? tokens))
+            {
+                tokens = this.Context.Tokenize(path, this.LoadCode(throwToken, path));
+                this.importedFileTokens[path] = tokens;
+            }
+            return tokens;
+        }
+
         public ExpressionParser ExpressionParser { get; private set; }
         public StatementParser StatementParser { get; private set; }
         public EntityParser EntityParser { get; private set; }
@@ -7,6 +7,7 @@ namespace Pastel.Parser
     internal class Resolver
     {
         public PastelCompiler CompilerContext { get; private set; }
+        public ConstantFolder ConstantFolder { get; private set; }
 
         private Dictionary<string, EnumDefinition> enumDefinitions;
         private Dictionary<string, VariableDeclaration> constantDefinitions;
@@ -24,6 +25,7 @@ namespace Pastel.Parser
             Dictionary<string, StructDefinition> structDefinitions)
         {
             this.CompilerContext = compilerContext;
+            this.ConstantFolder = compilerContext.ConstantFolder;
             this.enumDefinitions = enumDefinitions;
             this.constantDefinitions = constantDefinitions;
             this.functionDefinitions = functionDefinitions;
@@ -42,12 +44,29 @@ namespace Pastel.Parser
 
         public void Resolve()
         {
-            this.ResolveConstants();
-            this.ResolveStructTypes();
-            this.ResolveNamesAndCullUnusedCode();
-            this.ResolveSignatureTypes();
-            this.ResolveTypes();
-            this.ResolveWithTypeContext();
+            this.RunPhase("resolve-constants", this.ResolveConstants);
+            this.RunPhase("resolve-struct-types", this.ResolveStructTypes);
+            this.RunPhase("resolve-names", this.ResolveNamesAndCullUnusedCode);
+            this.RunPhase("resolve-signature-types", this.ResolveSignatureTypes);
+            this.RunPhase("resolve-types", this.ResolveTypes);
+            this.RunPhase("resolve-with-type-context", this.ResolveWithTypeContext);
+            this.RunPhase("check-memoized-functions", this.CheckMemoizedFunctions);
+            this.RunPhase("fold-constants", this.FoldConstants);
+            this.RunPhase("instrument", this.Instrument);
+            this.RunPhase("inline-functions", this.InlineFunctions);
+            this.RunPhase("fold-constants", this.FoldConstants);
+            this.RunPhase("cull-unreachable-code", this.CullUnreachableCode);
+            this.RunPhase("elide-copies", this.ElideCopies);
+        }
+
+        // Each step is recorded as its own phase when the build is profiled, along with how many functions are left.
+        private void RunPhase(string name, System.Action step)
+        {
+            using (Profiler.Scope? scope = this.CompilerContext.Context.Profiler?.Measure(name))
+            {
+                step();
+                scope?.Count("functions", this.functionDefinitions.Count);
+            }
         }
 
         private void ResolveStructTypes()
@@ -98,9 +117,28 @@ namespace Pastel.Parser
             this.ResolvedFunctions = new HashSet<string>();
             this.ResolutionQueue = new Queue<string>();
 
-            foreach (string functionName in this.functionDefinitions.Keys)
+            string[]? entryPoints = this.CompilerContext.Context.EntryPoints;
+            if (entryPoints == null)
+            {
+                foreach (string functionName in this.functionDefinitions.Keys)
+                {
+                    this.ResolutionQueue.Enqueue(functionName);
+                }
+            }
+            else
             {
-                this.ResolutionQueue.Enqueue(functionName);
+                // Only the functions that can be reached from the entry points are resolved.
+                foreach (string name in entryPoints)
+                {
+                    if (this.functionDefinitions.ContainsKey(name))
+                    {
+                        this.ResolutionQueue.Enqueue(name);
+                    }
+                    else if (!this.structDefinitions.ContainsKey(name))
+                    {
+                        throw new UserErrorException("Entry point '" + name + "' is not a function or struct.");
+                    }
+                }
             }
 
             while (this.ResolutionQueue.Count > 0)
@@ -136,7 +174,10 @@ namespace Pastel.Parser
             foreach (string functionName in functionNames)
             {
                 FunctionDefinition functionDefinition = this.functionDefinitions[functionName];
-                functionDefinition.ResolveTypes(this);
+                using (this.CompilerContext.Context.Profiler?.Measure(functionName, "resolve-types"))
+                {
+                    functionDefinition.ResolveTypes(this);
+                }
             }
         }
 
@@ -146,8 +187,65 @@ namespace Pastel.Parser
             foreach (string functionName in functionNames)
             {
                 FunctionDefinition functionDefinition = this.functionDefinitions[functionName];
-                functionDefinition.ResolveWithTypeContext(this);
+                using (this.CompilerContext.Context.Profiler?.Measure(functionName, "resolve-with-type-context"))
+                {
+                    functionDefinition.ResolveWithTypeContext(this);
+                }
             }
         }
+
+        private void CheckMemoizedFunctions()
+        {
+            new MemoizationChecker(this.CompilerContext.Context.Language).Run(this.functionDefinitions);
+        }
+
+        private void InlineFunctions()
+        {
+            Inliner inliner = new Inliner(this, this.functionDefinitions, this.CompilerContext.Context.InlineBudget);
+            inliner.Run();
+            this.CompilerContext.InlinedFunctions = inliner.InlinedFunctions;
+        }
+
+        private void FoldConstants()
+        {
+            this.ConstantFolder.Run(this.functionDefinitions);
+        }
+
+        // Functions that were only reachable through invocations that have since been inlined are removed here,
+        // along with structs that aren't used by anything that is left.
+        private void CullUnreachableCode()
+        {
+            string[]? entryPoints = this.CompilerContext.Context.EntryPoints;
+            if (entryPoints == null) return;
+
+            TreeShaker treeShaker = new TreeShaker(this.functionDefinitions, this.structDefinitions);
+            treeShaker.Run(entryPoints);
+
+            this.functionDefinitions = this.functionDefinitions
+                .Where(kvp => treeShaker.ReachableFunctions.Contains(kvp.Value))
+                .ToDictionary(kvp => kvp.Key, kvp => kvp.Value);
+            this.structDefinitions = this.structDefinitions
+                .Where(kvp => treeShaker.ReachableStructs.Contains(kvp.Value))
+                .ToDictionary(kvp => kvp.Key, kvp => kvp.Value);
+            this.CompilerContext.FunctionDefinitions = this.functionDefinitions;
+            this.CompilerContext.StructDefinitions = this.structDefinitions;
+        }
+
+        private void ElideCopies()
+        {
+            new CopyElider().Run(this.functionDefinitions);
+        }
+
+        // This goes before inlining so that the counter of a function is copied along with its body wherever it's
+        // inlined, and switch statements are named after the function they're written in.
+        private void Instrument()
+        {
+            PastelContext context = this.CompilerContext.Context;
+            if (!context.Instrument && context.ExecutionProfile == null) return;
+
+            Instrumenter instrumenter = new Instrumenter();
+            instrumenter.Run(this.functionDefinitions, context.Instrument);
+            this.CompilerContext.ProfileSlotNames = context.Instrument ? [.. instrumenter.SlotNames] : null;
+        }
     }
 }
@@ -129,8 +129,7 @@ namespace Pastel.Parser
 
         public Statement[] ParseImportedCode(Token importToken, string path)
         {
-            string code = this.parser.LoadCode(importToken, path);
-            TokenStream tokens = new TokenStream(Tokenizer.Tokenize(path, code));
+            TokenStream tokens = new TokenStream(this.parser.LoadImportedTokens(importToken, path));
             List<Statement> output = new List<Statement>();
             while (tokens.HasMore)
             {
@@ -0,0 +1,58 @@
+﻿using System;
+
+namespace Pastel.Parser
+{
+    // Returns the same string instance for every occurrence of the same substring, so that the tokenizer only
+    // allocates one string per distinct identifier rather than one per occurrence. Substrings are looked up
+    // without being copied first. Not thread-safe.
+    internal class StringInternPool
+    {
+        private string?[] slots = new string?[256];
+        private int count = 0;
+
+        public string Intern(string source, int start, int length)
+        {
+            ReadOnlySpan<char> value = source.AsSpan(start, length);
+            int mask = this.slots.Length - 1;
+            int index = string.GetHashCode(value) & mask;
+            while (true)
+            {
+                string? existing = this.slots[index];
+                if (existing == null)
+                {
+                    string newValue = source.Substring(start, length);
+                    this.slots[index] = newValue;
+                    if (++this.count * 2 > this.slots.Length)
+                    {
+                        this.Grow();
+                    }
+                    return newValue;
+                }
+
+                if (value.SequenceEqual(existing))
+                {
+                    return existing;
+                }
+
+                index = (index + 1) & mask;
+            }
+        }
+
+        private void Grow()
+        {
+            string?[] oldSlots = this.slots;
+            this.slots = new string?[oldSlots.Length * 2];
+            int mask = this.slots.Length - 1;
+            foreach (string? value in oldSlots)
+            {
+                if (value == null) continue;
+                int index = string.GetHashCode(value.AsSpan()) & mask;
+                while (this.slots[index] != null)
+                {
+                    index = (index + 1) & mask;
+                }
+                this.slots[index] = value;
+            }
+        }
+    }
+}
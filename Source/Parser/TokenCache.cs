@@ -0,0 +1,34 @@
+﻿using System.Collections.Concurrent;
+
+namespace Pastel.Parser
+{
+    // Tokenizes code, reusing the tokens of any file that was already tokenized with the same content.
+    // Tokens are not modified by the parser, so the same tokens can be shared by parsers on different
+    // threads when multiple targets are built at once.
+    internal class TokenCache
+    {
+        private ConcurrentDictionary<string, Token[]> tokensByFileAndCode = new ConcurrentDictionary<string, Token[]>();
+        private ConcurrentDictionary<string, bool> usedKeys = new ConcurrentDictionary<string, bool>();
+
+        public Token[] Tokenize(string filename, string code)
+        {
+            string key = filename + "\n" + code;
+            this.usedKeys[key] = true;
+            return this.tokensByFileAndCode.GetOrAdd(key, _ => Tokenizer.Tokenize(filename, code));
+        }
+
+        // Forgets the tokens of files that have not been tokenized since the previous call. The build server uses
+        // this so that it does not hold on to every version of every file that it has seen.
+        public void RemoveUnusedEntries()
+        {
+            foreach (string key in this.tokensByFileAndCode.Keys)
+            {
+                if (!this.usedKeys.ContainsKey(key))
+                {
+                    this.tokensByFileAndCode.TryRemove(key, out _);
+                }
+            }
+            this.usedKeys.Clear();
+        }
+    }
+}
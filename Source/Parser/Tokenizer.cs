@@ -1,65 +1,79 @@
-﻿using System.Collections.Generic;
+﻿using System;
+using System.Collections.Generic;
 using System.Linq;
 
 namespace Pastel.Parser
 {
     internal static class Tokenizer
     {
-        private static readonly HashSet<string> TWO_CHAR_TOKENS = new HashSet<string>([
-            "++", "--",
-            "==", "!=",
-            "<=", ">=",
-            "&&", "||",
-            "+=", "-=", "*=", "/=", "%=", "&=", "|=", "^=",
+        private const byte CHAR_OTHER = 0;
+        private const byte CHAR_IDENTIFIER = 1;
+        private const byte CHAR_WHITESPACE = 2;
 
-            // NOTE: >> is popped differently because it can conflict with type
-            // generics, e.g. the last 2 characters of 'List<List<Foo>>'. However
-            // << has no such conflict.
-            // >>> is not in Pastel as it has too much language-specific nuance.
-            "<<",
-        ]);
+        // Character class of each ASCII character. Everything outside of ASCII is CHAR_OTHER.
+        private static readonly byte[] CHAR_CLASSES = new byte[128];
 
-        private static readonly HashSet<char> WHITESPACE = new HashSet<char>([
-            ' ', '\n', '\r', '\t',
-        ]);
-
-        private static readonly HashSet<char> IDENTIFIER_CHARS = new HashSet<char>(['_']);
+        // Punctuation tokens are the same few strings over and over, so they are only created once.
+        private static readonly string[] SINGLE_CHAR_TOKENS = new string[128];
 
         static Tokenizer()
         {
+            for (int i = 0; i < 128; i++)
+            {
+                SINGLE_CHAR_TOKENS[i] = "" + (char)i;
+            }
             for (int i = 0; i < 26; i++)
             {
-                IDENTIFIER_CHARS.Add((char)('a' + i));
-                IDENTIFIER_CHARS.Add((char)('A' + i));
+                CHAR_CLASSES['a' + i] = CHAR_IDENTIFIER;
+                CHAR_CLASSES['A' + i] = CHAR_IDENTIFIER;
             }
             for (int i = 0; i < 10; i++)
             {
-                IDENTIFIER_CHARS.Add((char)('0' + i));
+                CHAR_CLASSES['0' + i] = CHAR_IDENTIFIER;
+            }
+            CHAR_CLASSES['_'] = CHAR_IDENTIFIER;
+            foreach (char c in new char[] { ' ', '\n', '\r', '\t' })
+            {
+                CHAR_CLASSES[c] = CHAR_WHITESPACE;
             }
         }
 
-        private enum TokenMode
+        private static byte GetCharClass(char c)
         {
-            NORMAL,
-            STRING,
-            COMMENT,
-            WORD,
+            return c < 128 ? CHAR_CLASSES[c] : CHAR_OTHER;
         }
 
-        private enum CommentType
+        // Characters past the end of the file are treated as newlines so that no lookahead needs a bounds check.
+        private static char PeekChar(string code, int index)
         {
-            SINGLE_LINE,
-            MULTI_LINE,
-
-            UNSET,
+            return index < code.Length ? code[index] : '\n';
         }
 
-        private enum StringType
+        // Returns the two-character punctuation token that starts with these characters, or null if there isn't one.
+        private static string? GetTwoCharToken(char c, char next)
         {
-            SINGLE_QUOTE,
-            DOUBLE_QUOTE,
+            switch (c)
+            {
+                case '+': return next == '+' ? "++" : next == '=' ? "+=" : null;
+                case '-': return next == '-' ? "--" : next == '=' ? "-=" : null;
+                case '&': return next == '&' ? "&&" : next == '=' ? "&=" : null;
+                case '|': return next == '|' ? "||" : next == '=' ? "|=" : null;
+                case '=': return next == '=' ? "==" : null;
+                case '!': return next == '=' ? "!=" : null;
+                case '>': return next == '=' ? ">=" : null;
+                case '*': return next == '=' ? "*=" : null;
+                case '/': return next == '=' ? "/=" : null;
+                case '%': return next == '=' ? "%=" : null;
+                case '^': return next == '=' ? "^=" : null;
 
-            UNSET,
+                // NOTE: >> is popped differently because it can conflict with type
+                // generics, e.g. the last 2 characters of 'List<List<Foo>>'. However
+                // << has no such conflict.
+                // >>> is not in Pastel as it has too much language-specific nuance.
+                case '<': return next == '=' ? "<=" : next == '<' ? "<<" : null;
+
+                default: return null;
+            }
         }
 
         private static int FindSuspciousUnclosedStringLine(List<Token> tokensSoFar)
@@ -80,192 +94,154 @@ namespace Pastel.Parser
 
         public static Token[] Tokenize(string filename, string code)
         {
-            code = code.Replace("\r\n", "\n") + "\n\n";
+            List<Token> tokens = ScanTokens(filename, code.Replace("\r\n", "\n"));
 
-            int[] lineByIndex = new int[code.Length];
-            int[] colByIndex = new int[code.Length];
-            char c;
-            int line = 1;
-            int col = 1;
-            for (int i = 0; i < code.Length; i++)
-            {
-                c = code[i];
-                lineByIndex[i] = line;
-                colByIndex[i] = col;
-                if (c == '\n')
-                {
-                    line++;
-                    col = 1;
-                }
-                else
-                {
-                    col++;
-                }
-            }
-
-            List<Token> tokens = [];
-            int tokenStart = -1;
-            CommentType commentType = CommentType.UNSET;
-            StringType stringType = StringType.UNSET;
-            string c2;
-            int length = code.Length;
-
-            TokenMode mode = TokenMode.NORMAL;
-
-            for (int i = 0; i < length; ++i)
+            // Consolidate decimals into single tokens.
+            for (int i = 0; i < tokens.Count; i++)
             {
-                c = code[i];
-
-                switch (mode)
+                Token? current = tokens[i];
+                if (current != null && current.Value == ".")
                 {
-                    case TokenMode.NORMAL:
-                        if (IDENTIFIER_CHARS.Contains(c))
-                        {
-                            mode = TokenMode.WORD;
-                            tokenStart = i;
-                            i--;
-                        }
-                        else if (WHITESPACE.Contains(c))
-                        {
-                            // do nothing
-                        }
-                        else if (c == '/' && code[i + 1] == '/')
-                        {
-                            mode = TokenMode.COMMENT;
-                            commentType = CommentType.SINGLE_LINE;
-                        }
-                        else if (c == '/' && code[i + 1] == '*')
-                        {
-                            mode = TokenMode.COMMENT;
-                            commentType = CommentType.MULTI_LINE;
-                            i++;
-                        }
-                        else if (c == '"')
-                        {
-                            mode = TokenMode.STRING;
-                            stringType = StringType.DOUBLE_QUOTE;
-                            tokenStart = i;
-                        }
-                        else if (c == '\'')
-                        {
-                            mode = TokenMode.STRING;
-                            stringType = StringType.SINGLE_QUOTE;
-                            tokenStart = i;
-                        }
-                        else
-                        {
-                            c2 = code.Substring(i, 2);
-                            if (TWO_CHAR_TOKENS.Contains(c2))
-                            {
-                                tokens.Add(new Token(c2, filename, lineByIndex[i], colByIndex[i], TokenType.PUNCTUATION));
-                                i++;
-                            }
-                            else
-                            {
-                                tokens.Add(new Token("" + c, filename, lineByIndex[i], colByIndex[i], TokenType.PUNCTUATION));
-                            }
-                        }
-                        break;
-
-                    case TokenMode.COMMENT:
-                        if (commentType == CommentType.SINGLE_LINE)
-                        {
-                            if (c == '\n')
-                            {
-                                mode = TokenMode.NORMAL;
-                            }
-                        }
-                        else
-                        {
-                            if (c == '*' && code[i + 1] == '/')
-                            {
-                                mode = TokenMode.NORMAL;
-                                ++i;
-                            }
-                        }
-                        break;
-
-                    case TokenMode.STRING:
-                        if (c == '\\')
-                        {
-                            ++i;
-                        }
-                        else if ((c == '"' && stringType == StringType.DOUBLE_QUOTE) ||
-                            (c == '\'' && stringType == StringType.SINGLE_QUOTE))
+                    Token? left = i > 0 ? tokens[i - 1] : null;
+                    Token? right = i + 1 < tokens.Count ? tokens[i + 1] : null;
+                    if (left != null && left.Line == current.Line && left.Col + left.Value.Length == current.Col)
+                    {
+                        if (IsInteger(left.Value))
                         {
-                            string stringValue = code.Substring(tokenStart, i - tokenStart + 1);
-                            tokens.Add(new Token(stringValue, filename, lineByIndex[tokenStart], colByIndex[tokenStart], TokenType.STRING));
-                            mode = TokenMode.NORMAL;
+                            left.Value += ".";
+                            tokens[i - 1] = null!;
+                            tokens[i] = left;
+                            current = left;
+                            current.Type = TokenType.FLOAT;
                         }
-                        break;
+                    }
 
-                    case TokenMode.WORD:
-                        if (!IDENTIFIER_CHARS.Contains(c))
+                    if (right != null && right.Line == current.Line && current.Col + current.Value.Length == right.Col)
+                    {
+                        if (IsInteger(right.Value))
                         {
-                            string wordValue = code.Substring(tokenStart, i - tokenStart);
-                            bool isInteger = wordValue[0] >= '0' && wordValue[0] <= '9';
-                            tokens.Add(new Token(wordValue, filename, lineByIndex[tokenStart], colByIndex[tokenStart], isInteger ? TokenType.INTEGER : TokenType.WORD));
-                            i--;
-                            mode = TokenMode.NORMAL;
+                            current.Value += right.Value;
+                            current.Type = TokenType.FLOAT;
+                            tokens[i + 1] = null!;
                         }
-                        break;
+                    }
                 }
             }
 
-            if (mode != TokenMode.NORMAL)
+            tokens.RemoveAll(t => t == null);
+            return tokens.ToArray();
+        }
+
+        // Scans the code once, tracking the line and column as it goes. Each token is scanned in its entirety
+        // before moving on to the next one. Words are interned, so each distinct word in a file is only
+        // allocated once, and punctuation uses shared strings.
+        private static List<Token> ScanTokens(string filename, string code)
+        {
+            List<Token> tokens = new List<Token>(code.Length / 4);
+            StringInternPool words = new StringInternPool();
+            int length = code.Length;
+            int line = 1;
+            int lineStart = 0;
+            int i = 0;
+            while (i < length)
             {
-                if (mode == TokenMode.COMMENT)
+                char c = code[i];
+                byte charClass = GetCharClass(c);
+                if (charClass == CHAR_WHITESPACE)
                 {
-                    throw new EofException(filename, "This file seems to contain an unclosed comment.");
+                    if (c == '\n')
+                    {
+                        line++;
+                        lineStart = i + 1;
+                    }
+                    i++;
                 }
-
-                if (mode == TokenMode.STRING)
+                else if (charClass == CHAR_IDENTIFIER)
                 {
-                    string msg = "This file contains an unclosed string.";
-                    int susStringLine = FindSuspciousUnclosedStringLine(tokens);
-                    if (susStringLine != -1)
+                    int start = i;
+                    while (i < length && GetCharClass(code[i]) == CHAR_IDENTIFIER)
                     {
-                        msg += " The string on line " + susStringLine + " is suspicious.";
+                        i++;
                     }
-                    throw new EofException(filename, msg);
+                    bool isInteger = c >= '0' && c <= '9';
+                    string wordValue = words.Intern(code, start, i - start);
+                    tokens.Add(new Token(wordValue, filename, line, start - lineStart + 1, isInteger ? TokenType.INTEGER : TokenType.WORD));
                 }
-
-                throw new EofException(filename);
-            }
-
-            // Consolidate decimals into single tokens.
-            for (int i = 0; i < tokens.Count; i++)
-            {
-                Token current = tokens[i];
-                if (current != null && current.Value == ".")
+                else if (c == '/' && PeekChar(code, i + 1) == '/')
                 {
-                    Token left = i > 0 ? tokens[i - 1] : null;
-                    Token right = i + 1 < tokens.Count ? tokens[i + 1] : null;
-                    if (left != null && left.Line == current.Line && left.Col + left.Value.Length == current.Col)
+                    // The newline that ends the comment is left to be counted as whitespace.
+                    i = code.IndexOf('\n', i);
+                    if (i == -1) i = length;
+                }
+                else if (c == '/' && PeekChar(code, i + 1) == '*')
+                {
+                    int end = code.IndexOf("*/", i + 2, StringComparison.Ordinal);
+                    if (end == -1)
                     {
-                        if (IsInteger(left.Value))
+                        throw new EofException(filename, "This file seems to contain an unclosed comment.");
+                    }
+                    for (i += 2; i < end; i++)
+                    {
+                        if (code[i] == '\n')
                         {
-                            left.Value += ".";
-                            tokens[i - 1] = null;
-                            tokens[i] = left;
-                            current = left;
-                            current.Type = TokenType.FLOAT;
+                            line++;
+                            lineStart = i + 1;
                         }
                     }
+                    i = end + 2;
+                }
+                else if (c == '"' || c == '\'')
+                {
+                    int start = i;
+                    int startLine = line;
+                    int startCol = i - lineStart + 1;
+                    i++;
+                    while (i < length && code[i] != c)
+                    {
+                        // Skip over the escaped character, which may be the closing quote.
+                        if (code[i] == '\\') i++;
 
-                    if (right != null && right.Line == current.Line && current.Col + current.Value.Length == right.Col)
+                        if (i < length && code[i] == '\n')
+                        {
+                            line++;
+                            lineStart = i + 1;
+                        }
+                        i++;
+                    }
+
+                    if (i >= length)
                     {
-                        if (IsInteger(right.Value))
+                        string msg = "This file contains an unclosed string.";
+                        int susStringLine = FindSuspciousUnclosedStringLine(tokens);
+                        if (susStringLine != -1)
                         {
-                            current.Value += right.Value;
-                            current.Type = TokenType.FLOAT;
-                            tokens[i + 1] = null;
+                            msg += " The string on line " + susStringLine + " is suspicious.";
                         }
+                        throw new EofException(filename, msg);
+                    }
+
+                    i++;
+                    tokens.Add(new Token(code.Substring(start, i - start), filename, startLine, startCol, TokenType.STRING));
+                }
+                else
+                {
+                    int col = i - lineStart + 1;
+                    string? twoCharToken = GetTwoCharToken(c, PeekChar(code, i + 1));
+                    if (twoCharToken != null)
+                    {
+                        tokens.Add(new Token(twoCharToken, filename, line, col, TokenType.PUNCTUATION));
+                        i += 2;
+                    }
+                    else
+                    {
+                        string value = c < 128 ? SINGLE_CHAR_TOKENS[c] : ("" + c);
+                        tokens.Add(new Token(value, filename, line, col, TokenType.PUNCTUATION));
+                        i++;
                     }
                 }
             }
 
-            return tokens.Where(t => t != null).ToArray();
+            return tokens;
         }
 
         private static bool IsInteger(string val)
@@ -0,0 +1,113 @@
+﻿using Pastel.Parser.ParseNodes;
+using System.Collections.Generic;
+
+namespace Pastel.Parser
+{
+    // Finds the functions and structs that can be reached from a set of entry points.
+    // This runs on fully resolved code, after functions have been inlined, so that a function whose invocations
+    // were all inlined is no longer considered reachable.
+    // - Functions are reachable through function references, which covers both invocations and function pointers.
+    // - Structs are reachable through constructors and through any type that is used by reachable code, including
+    //   the field types of other reachable structs.
+    // - Enums are not considered since their values are inlined as constants and they have no generated code.
+    internal class TreeShaker
+    {
+        private Dictionary<string, FunctionDefinition> functionDefinitions;
+        private Dictionary<string, StructDefinition> structDefinitions;
+        private Queue<FunctionDefinition> queue = new Queue<FunctionDefinition>();
+
+        public HashSet<FunctionDefinition> ReachableFunctions { get; private set; }
+        public HashSet<StructDefinition> ReachableStructs { get; private set; }
+
+        public TreeShaker(Dictionary<string, FunctionDefinition> functionDefinitions, Dictionary<string, StructDefinition> structDefinitions)
+        {
+            this.functionDefinitions = functionDefinitions;
+            this.structDefinitions = structDefinitions;
+            this.ReachableFunctions = new HashSet<FunctionDefinition>();
+            this.ReachableStructs = new HashSet<StructDefinition>();
+        }
+
+        // Entry points can be functions or structs (e.g. a struct that is only created by the host application).
+        public void Run(IList<string> entryPoints)
+        {
+            foreach (string name in entryPoints)
+            {
+                if (this.functionDefinitions.TryGetValue(name, out FunctionDefinition? fd))
+                {
+                    this.AddFunction(fd);
+                }
+                else if (this.structDefinitions.TryGetValue(name, out StructDefinition? sd))
+                {
+                    this.AddStruct(sd);
+                }
+            }
+
+            while (this.queue.Count > 0)
+            {
+                FunctionDefinition fd = this.queue.Dequeue();
+                this.AddType(fd.ReturnType);
+                foreach (PType argType in fd.ArgTypes)
+                {
+                    this.AddType(argType);
+                }
+
+                ParseTreeWalker.WalkStatements(
+                    fd.Code,
+                    stmnt =>
+                    {
+                        if (stmnt is VariableDeclaration varDecl) this.AddType(varDecl.Type);
+                        return true;
+                    },
+                    expr =>
+                    {
+                        switch (expr)
+                        {
+                            case FunctionReference funcRef:
+                                this.AddFunction(funcRef.Function);
+                                break;
+                            case ConstructorInvocation ctorInvocation:
+                                if (ctorInvocation.StructDefinition != null) this.AddStruct(ctorInvocation.StructDefinition);
+                                this.AddType(ctorInvocation.Type);
+                                break;
+                            case CastExpression cast:
+                                this.AddType(cast.Type);
+                                break;
+                        }
+                        this.AddType(expr.ResolvedType);
+                        return true;
+                    });
+            }
+        }
+
+        private void AddFunction(FunctionDefinition fd)
+        {
+            if (this.ReachableFunctions.Add(fd))
+            {
+                this.queue.Enqueue(fd);
+            }
+        }
+
+        private void AddStruct(StructDefinition sd)
+        {
+            if (this.ReachableStructs.Add(sd))
+            {
+                foreach (PType fieldType in sd.FieldTypes)
+                {
+                    this.AddType(fieldType);
+                }
+            }
+        }
+
+        private void AddType(PType? type)
+        {
+            if (type == null) return;
+            StructDefinition? sd = type.StructDef;
+            if (sd == null && type.IsStruct) this.structDefinitions.TryGetValue(type.TypeName, out sd);
+            if (sd != null) this.AddStruct(sd);
+            foreach (PType generic in type.Generics)
+            {
+                this.AddType(generic);
+            }
+        }
+    }
+}
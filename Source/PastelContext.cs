@@ -16,6 +16,25 @@ namespace Pastel
         public TranspilerContext TranspilerContext { get; private set; }
         public IInlineImportCodeLoader CodeLoader { get; private set; }
 
+        // Maximum size of a function that can be inlined at its call sites. 0 disables inlining.
+        public int InlineBudget { get; set; } = Inliner.DEFAULT_BUDGET;
+
+        // Names of the functions and structs that are used by the host application. Anything that can't be reached
+        // from these is left out of the generated code. null means everything is an entry point.
+        public string[]? EntryPoints { get; set; } = null;
+
+        // Whether the generated code counts function calls and switch chunk hits for PST_dumpProfile.
+        public bool Instrument { get; set; } = false;
+
+        // Counts from a run of an instrumented build, which switch statements are ordered by. null if there are none.
+        internal ExecutionProfile? ExecutionProfile { get; set; } = null;
+
+        // Shared by all the targets being built by the same invocation.
+        internal TokenCache TokenCache { get; set; } = new TokenCache();
+
+        // Set when the build is being profiled with --profile.
+        internal Profiler? Profiler { get; set; } = null;
+
         private string dir;
 
         public PastelContext(string dir, Language language, IInlineImportCodeLoader codeLoader)
@@ -62,10 +81,29 @@ namespace Pastel
 
         public PastelContext CompileCode(string filename, string code)
         {
-            this.GetCompiler().CompileBlobOfCode(filename, code);
+            PastelCompiler compiler = this.GetCompiler();
+            using (Profiler.Scope? scope = this.Profiler?.Measure("parse"))
+            {
+                compiler.CompileBlobOfCode(filename, code);
+                scope?
+                    .Count("functions", compiler.FunctionDefinitions.Count)
+                    .Count("structs", compiler.StructDefinitions.Count)
+                    .Count("enums", compiler.EnumDefinitions.Count)
+                    .Count("constants", compiler.ConstantDefinitions.Count);
+            }
             return this;
         }
 
+        internal Token[] Tokenize(string filename, string code)
+        {
+            using (Profiler.Scope? scope = this.Profiler?.Measure("tokenize"))
+            {
+                Token[] tokens = this.TokenCache.Tokenize(filename, code);
+                scope?.Count("tokens", tokens.Length);
+                return tokens;
+            }
+        }
+
         public PastelContext CompileFile(Token throwLocation, string filename)
         {
             return this.CompileCode(filename, this.CodeLoader.LoadCode(throwLocation, filename));
@@ -74,13 +112,16 @@ namespace Pastel
         public PastelContext FinalizeCompilation()
         {
             PastelCompiler compiler = this.GetCompiler();
-            new Resolver(
-                compiler,
-                compiler.EnumDefinitions,
-                compiler.ConstantDefinitions,
-                compiler.FunctionDefinitions,
-                compiler.StructDefinitions
-            ).Resolve();
+            using (this.Profiler?.Measure("resolve"))
+            {
+                new Resolver(
+                    compiler,
+                    compiler.EnumDefinitions,
+                    compiler.ConstantDefinitions,
+                    compiler.FunctionDefinitions,
+                    compiler.StructDefinitions
+                ).Resolve();
+            }
             return this;
         }
 
@@ -88,10 +129,13 @@ namespace Pastel
         {
             TranspilerContext ctx = this.TranspilerContext;
             Dictionary<string, string> output = [];
-            foreach (StructDefinition sd in this.GetCompiler().GetStructDefinitions())
+            using (this.Profiler?.Measure("generate-structs"))
             {
-                this.Transpiler.GenerateCodeForStruct(ctx, sd);
-                output[sd.NameToken.Value] = ctx.FlushAndClearBuffer();
+                foreach (StructDefinition sd in this.GetCompiler().GetStructDefinitions())
+                {
+                    this.Transpiler.GenerateCodeForStruct(ctx, sd);
+                    output[sd.NameToken.Value] = ctx.FlushAndClearBuffer();
+                }
             }
             return output;
         }
@@ -106,7 +150,12 @@ namespace Pastel
         public Dictionary<string, string> GetCodeForFunctionsLookup()
         {
             TranspilerContext ctx = this.TranspilerContext;
-            return this.GetCompiler().GetFunctionCodeAsLookupTEMP(ctx, "");
+            using (Profiler.Scope? scope = this.Profiler?.Measure("generate-functions"))
+            {
+                Dictionary<string, string> output = this.GetCompiler().GetFunctionCodeAsLookupTEMP(ctx, "");
+                scope?.Count("functions", output.Count);
+                return output;
+            }
         }
 
         public string GetCodeForFunctionDeclarations()
@@ -120,10 +169,108 @@ namespace Pastel
             Dictionary<string, string> output = this.GetCodeForFunctionsLookup();
 
             string userCode = string.Join("\n\n", output.Keys.OrderBy(name => name).Select(name => output[name]));
-            string userCodeWithPastelHelpers = TranspilationHelperCodeUtil.InjectTranspilationHelpers(
-                this.TranspilerContext.Transpiler, userCode);
+            using (Profiler.Scope? scope = this.Profiler?.Measure("inject-helpers"))
+            {
+                string userCodeWithPastelHelpers = TranspilationHelperCodeUtil.InjectTranspilationHelpers(
+                    this.TranspilerContext, userCode);
+                scope?.Count("helperBytes", userCodeWithPastelHelpers.Length - userCode.Length);
+                return userCodeWithPastelHelpers;
+            }
+        }
 
-            return userCodeWithPastelHelpers;
+        // The helpers used by the functions, without the functions. Call this after generating them.
+        public string GetCodeForHelpers()
+        {
+            using (Profiler.Scope? scope = this.Profiler?.Measure("inject-helpers"))
+            {
+                string helperCode = TranspilationHelperCodeUtil.InjectTranspilationHelpers(this.TranspilerContext, "").Trim();
+                scope?.Count("helperBytes", helperCode.Length);
+                return helperCode;
+            }
+        }
+
+        public string GetInliningReport()
+        {
+            Dictionary<string, int> inlinedFunctions = this.GetCompiler().InlinedFunctions;
+            List<string> lines = [
+                "Inlined " + inlinedFunctions.Count + " function(s) at " + inlinedFunctions.Values.Sum() + " call site(s).",
+            ];
+            foreach (string name in inlinedFunctions.Keys.OrderBy(k => k))
+            {
+                lines.Add(name + ": " + inlinedFunctions[name]);
+            }
+            return string.Join("\n", lines) + "\n";
+        }
+
+        public string GetConstantFoldingReport()
+        {
+            ConstantFolder folder = this.GetCompiler().ConstantFolder;
+            List<string> lines = [
+                "Folded " + folder.FoldedExpressions + " constant expression(s).",
+                "Removed " + folder.RemovedStatements + " statement(s) from " + folder.PrunedBlocks.Values.Sum() + " pruned block(s).",
+            ];
+            foreach (string kind in folder.PrunedBlocks.Keys.OrderBy(k => k))
+            {
+                lines.Add(kind + ": " + folder.PrunedBlocks[kind]);
+            }
+            return string.Join("\n", lines) + "\n";
+        }
+
+        private const int PROFILE_REPORT_MAX_ROWS = 20;
+
+        // The functions and switch chunks of the generated code that the execution profile says are hit the most.
+        public string GetProfileReport()
+        {
+            ExecutionProfile profile = this.ExecutionProfile!;
+            List<(string Name, long Count)> functions = [];
+            List<(string Name, long Count)> chunks = [];
+            int reorderedSwitches = 0;
+            foreach (FunctionDefinition fd in this.GetCompiler().GetFunctionDefinitions())
+            {
+                functions.Add((fd.Name, profile.GetCount(fd.Name)));
+                ParseTreeWalker.WalkStatements(fd.Code, stmnt =>
+                {
+                    if (stmnt is SwitchStatement switchStatement && switchStatement.ProfileKey != null)
+                    {
+                        int[]? order = profile.GetChunkOrder(switchStatement);
+                        if (order != null && order.Where((chunkIndex, i) => chunkIndex != i).Any()) reorderedSwitches++;
+                        for (int i = 0; i < switchStatement.Chunks.Length; ++i)
+                        {
+                            string cases = string.Join(", ", switchStatement.Chunks[i].Cases.Select(GetCaseLabel));
+                            chunks.Add((
+                                switchStatement.ProfileKey + " (" + cases + ")",
+                                profile.GetCount(ExecutionProfile.GetChunkKey(switchStatement.ProfileKey, i))));
+                        }
+                    }
+                    return true;
+                }, null);
+            }
+
+            List<string> lines = [
+                "Profile has " + functions.Sum(f => f.Count) + " function call(s) and " + chunks.Sum(c => c.Count) + " switch case hit(s).",
+                "Reordered " + reorderedSwitches + " switch statement(s) by frequency.",
+            ];
+            AddProfileReportSection(lines, "Hottest functions:", functions);
+            AddProfileReportSection(lines, "Hottest switch cases:", chunks);
+            return string.Join("\n", lines) + "\n";
+        }
+
+        private static string GetCaseLabel(Expression? caseExpression)
+        {
+            if (caseExpression == null) return "default";
+            InlineConstant ic = (InlineConstant)caseExpression;
+            return "case " + (ic.ResolvedType.IsChar ? CodeUtil.ConvertCharToCharConstantCode((char)ic.Value) : ic.Value.ToString());
+        }
+
+        private static void AddProfileReportSection(List<string> lines, string title, List<(string Name, long Count)> rows)
+        {
+            long total = rows.Sum(row => row.Count);
+            lines.Add("");
+            lines.Add(title);
+            foreach ((string name, long count) in rows.Where(row => row.Count > 0).OrderByDescending(row => row.Count).ThenBy(row => row.Name).Take(PROFILE_REPORT_MAX_ROWS))
+            {
+                lines.Add(count + " (" + (100.0 * count / total).ToString("0.0", System.Globalization.CultureInfo.InvariantCulture) + "%) " + name);
+            }
         }
     }
 }
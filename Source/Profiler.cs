@@ -0,0 +1,200 @@
+﻿using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Linq;
+using System.Text.Json;
+using System.Threading;
+
+namespace Pastel
+{
+    // Records the wall time, allocations, and entity counts of each phase of a build for --profile. Phases can be
+    // nested and can run on multiple threads. The report is a Chrome trace event file, which chrome://tracing,
+    // Perfetto, and speedscope show as a flame graph, with an extra "summary" field that has the totals for each
+    // phase and the functions that took the longest to resolve and generate.
+    //
+    // Allocations are measured per thread, so a phase only counts the allocations of work done on another thread if
+    // that work is measured as a nested phase.
+    internal class Profiler
+    {
+        internal class Scope : IDisposable
+        {
+            private Profiler profiler;
+            private Scope? parent;
+            private string name;
+            private string category;
+            private int threadId;
+            private double startMicros;
+            private long startAllocatedBytes;
+            private long otherThreadAllocatedBytes = 0;
+            private Dictionary<string, long> counts = new Dictionary<string, long>();
+
+            public Scope(Profiler profiler, string name, string category)
+            {
+                this.profiler = profiler;
+                this.parent = CURRENT_SCOPE.Value;
+                this.name = name;
+                this.category = category;
+                this.threadId = Environment.CurrentManagedThreadId;
+                this.startMicros = CLOCK.Elapsed.TotalMicroseconds;
+                this.startAllocatedBytes = GC.GetAllocatedBytesForCurrentThread();
+                CURRENT_SCOPE.Value = this;
+            }
+
+            public Scope Count(string name, long value)
+            {
+                this.counts[name] = value;
+                return this;
+            }
+
+            public void Dispose()
+            {
+                long allocatedBytes = GC.GetAllocatedBytesForCurrentThread() - this.startAllocatedBytes
+                    + Interlocked.Read(ref this.otherThreadAllocatedBytes);
+                double endMicros = CLOCK.Elapsed.TotalMicroseconds;
+                CURRENT_SCOPE.Value = this.parent;
+
+                if (this.parent != null && this.parent.threadId != this.threadId)
+                {
+                    Interlocked.Add(ref this.parent.otherThreadAllocatedBytes, allocatedBytes);
+                }
+
+                this.profiler.AddEvent(new Event()
+                {
+                    Name = this.name,
+                    Category = this.category,
+                    ThreadId = this.threadId,
+                    StartMicros = this.startMicros,
+                    DurationMicros = endMicros - this.startMicros,
+                    AllocatedBytes = allocatedBytes,
+                    Counts = this.counts,
+                });
+            }
+        }
+
+        private class Event
+        {
+            public string Name { get; set; } = "";
+            public string Category { get; set; } = "";
+            public int ThreadId { get; set; }
+            public double StartMicros { get; set; }
+            public double DurationMicros { get; set; }
+            public long AllocatedBytes { get; set; }
+            public Dictionary<string, long> Counts { get; set; } = new Dictionary<string, long>();
+        }
+
+        public const string PHASE = "phase";
+        private const int HOT_FUNCTION_COUNT = 25;
+
+        // Shared by all profilers so that targets built at the same time line up in the report.
+        private static readonly Stopwatch CLOCK = Stopwatch.StartNew();
+
+        // The innermost scope of the current thread, which flows into tasks started by it.
+        private static readonly AsyncLocal<Scope?> CURRENT_SCOPE = new AsyncLocal<Scope?>();
+
+        public string Name { get; private set; }
+        private List<Event> events = new List<Event>();
+
+        public Profiler(string name)
+        {
+            this.Name = name;
+        }
+
+        // Per-function measurements use the name of the phase as their category.
+        public Scope Measure(string name, string category = PHASE)
+        {
+            return new Scope(this, name, category);
+        }
+
+        private void AddEvent(Event e)
+        {
+            lock (this.events)
+            {
+                this.events.Add(e);
+            }
+        }
+
+        public static void WriteReport(string path, IList<Profiler> profilers)
+        {
+            List<object> traceEvents = [];
+            List<object> summary = [];
+            for (int i = 0; i < profilers.Count; i++)
+            {
+                Profiler profiler = profilers[i];
+                int pid = i + 1;
+                traceEvents.Add(new Dictionary<string, object>()
+                {
+                    { "name", "process_name" },
+                    { "ph", "M" },
+                    { "pid", pid },
+                    { "args", new Dictionary<string, object>() { { "name", profiler.Name } } },
+                });
+                foreach (Event e in profiler.events.OrderBy(e => e.StartMicros))
+                {
+                    Dictionary<string, object> args = new Dictionary<string, object>() { { "allocatedBytes", e.AllocatedBytes } };
+                    foreach (string key in e.Counts.Keys) args[key] = e.Counts[key];
+                    traceEvents.Add(new Dictionary<string, object>()
+                    {
+                        { "name", e.Name },
+                        { "cat", e.Category },
+                        { "ph", "X" },
+                        { "ts", Math.Round(e.StartMicros, 1) },
+                        { "dur", Math.Round(e.DurationMicros, 1) },
+                        { "pid", pid },
+                        { "tid", e.ThreadId },
+                        { "args", args },
+                    });
+                }
+                summary.Add(profiler.GetSummary());
+            }
+
+            Dictionary<string, object> report = new Dictionary<string, object>()
+            {
+                { "traceEvents", traceEvents },
+                { "displayTimeUnit", "ms" },
+                { "summary", summary },
+            };
+            DiskUtil.WriteTextFileIfChanged(path, JsonSerializer.Serialize(report, new JsonSerializerOptions() { WriteIndented = true }) + "\n");
+        }
+
+        // Phases with the same name (e.g. the tokenizing of each imported file) are combined. Counts are summed.
+        private Dictionary<string, object> GetSummary()
+        {
+            List<object> phases = [];
+            foreach (IGrouping<string, Event> group in this.events.Where(e => e.Category == PHASE).GroupBy(e => e.Name))
+            {
+                Dictionary<string, object> phase = new Dictionary<string, object>()
+                {
+                    { "name", group.Key },
+                    { "calls", group.Count() },
+                    { "ms", Math.Round(group.Sum(e => e.DurationMicros) / 1000, 3) },
+                    { "allocatedBytes", group.Sum(e => e.AllocatedBytes) },
+                };
+                foreach (string key in group.SelectMany(e => e.Counts.Keys).Distinct())
+                {
+                    phase[key] = group.Sum(e => e.Counts.TryGetValue(key, out long value) ? value : 0);
+                }
+                phases.Add(phase);
+            }
+
+            Dictionary<string, object>[] hotFunctions = this.events
+                .Where(e => e.Category != PHASE)
+                .OrderByDescending(e => e.DurationMicros)
+                .Take(HOT_FUNCTION_COUNT)
+                .Select(e => new Dictionary<string, object>()
+                {
+                    { "name", e.Name },
+                    { "phase", e.Category },
+                    { "ms", Math.Round(e.DurationMicros / 1000, 3) },
+                    { "allocatedBytes", e.AllocatedBytes },
+                })
+                .ToArray();
+
+            return new Dictionary<string, object>()
+            {
+                { "target", this.Name },
+                { "phases", phases },
+                { "hotFunctions", hotFunctions },
+            };
+        }
+    }
+}
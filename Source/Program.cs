@@ -1,4 +1,5 @@
 ﻿using System.Collections.Generic;
+using System.Linq;
 using Pastel.Parser;
 
 namespace Pastel
@@ -23,9 +24,27 @@ namespace Pastel
 
         public static void MainWrapped(string[] args)
         {
-            if (args.Length == 0 || args.Length > 2)
+            if (args.Length > 0 && args[0] == "--serve")
             {
-                throw new UserErrorException("Incorrect usage. Please provide a path to a Pastel project config file (required) and a build target (optional).");
+                bool watch = args.Skip(1).Contains("--watch");
+                string? unknownArg = args.Skip(1).FirstOrDefault(arg => arg != "--watch");
+                if (unknownArg != null) throw new UserErrorException("Unrecognized argument for --serve: " + unknownArg);
+                new BuildServer(watch).Run(System.Console.In, System.Console.Out);
+                return;
+            }
+
+            string? profilePath = null;
+            int profileIndex = System.Array.IndexOf(args, "--profile");
+            if (profileIndex != -1)
+            {
+                if (profileIndex + 1 >= args.Length) throw new UserErrorException("--profile requires a path to write the report to.");
+                profilePath = System.IO.Path.GetFullPath(args[profileIndex + 1]);
+                args = args.Take(profileIndex).Concat(args.Skip(profileIndex + 2)).ToArray();
+            }
+
+            if (args.Length == 0)
+            {
+                throw new UserErrorException("Incorrect usage. Please provide a path to a Pastel project config file (required) and a build target (optional). Use --all or a list of targets to build multiple targets at once. Use --profile followed by a path to write a report of where the build time went.");
             }
 
             string projectPath = args[0];
@@ -36,18 +55,153 @@ namespace Pastel
 
             projectPath = System.IO.Path.GetFullPath(projectPath);
 
-            BuildProject(projectPath, args.Length == 2 ? args[1] : null);
+            if (args.Length == 2 && args[1] == "--all")
+            {
+                BuildTargets(projectPath, ProjectConfig.GetTargetNames(projectPath), profilePath);
+            }
+            else if (args.Length > 2)
+            {
+                BuildTargets(projectPath, args.Skip(1).ToArray(), profilePath);
+            }
+            else
+            {
+                string? targetId = args.Length == 2 ? args[1] : null;
+                Profiler? profiler = profilePath == null ? null : new Profiler(targetId ?? "default");
+                ProjectConfig config;
+                using (profiler?.Measure("parse-config"))
+                {
+                    config = ParseConfig(projectPath, targetId);
+                }
+                BuildProject(config, targetId, new TokenCache(), profiler);
+                if (profiler != null) Profiler.WriteReport(profilePath!, [profiler]);
+            }
         }
 
-        private static void BuildProject(string projectPath, string targetId)
+        internal static ProjectConfig ParseConfig(string projectPath, string? targetId)
         {
             ProjectConfig config = ProjectConfig.Parse(projectPath, targetId);
             if (config.Language == Language.NONE) throw new UserErrorException("Language not defined in " + projectPath);
-            PastelContext context = CompilePastelContexts(config);
-            context.Transpiler.Exporter.DoExport(config, context);
+            return config;
+        }
+
+        // Each target is compiled and exported on its own thread. Parsing and resolution depend on the target's
+        // language and flags and modify the parse tree, so each target has its own parse tree, but each source
+        // file is only tokenized once. A summary of the time spent on each target is printed at the end.
+        private static void BuildTargets(string projectPath, string[] targetIds, string? profilePath)
+        {
+            targetIds = targetIds.Distinct().ToArray();
+            if (targetIds.Length == 0) throw new UserErrorException("No targets are defined in " + projectPath);
+
+            Profiler[]? profilers = profilePath == null ? null : targetIds.Select(targetId => new Profiler(targetId)).ToArray();
+            ProjectConfig[] configs = new ProjectConfig[targetIds.Length];
+            for (int i = 0; i < targetIds.Length; i++)
+            {
+                using (profilers?[i].Measure("parse-config"))
+                {
+                    configs[i] = ParseConfig(projectPath, targetIds[i]);
+                }
+            }
+            System.Diagnostics.Stopwatch totalTimer = System.Diagnostics.Stopwatch.StartNew();
+            TargetBuildResult[] results = BuildConfigs(configs, targetIds, new TokenCache(), profilers);
+            if (profilers != null) Profiler.WriteReport(profilePath!, profilers);
+
+            int nameWidth = targetIds.Max(t => t.Length);
+            System.Console.WriteLine("Built " + targetIds.Length + " targets in " + totalTimer.ElapsedMilliseconds + " ms");
+            foreach (TargetBuildResult result in results)
+            {
+                string status = result.Error != null ? "FAILED" : result.Built ? result.Milliseconds + " ms" : "up to date";
+                System.Console.WriteLine("  " + (result.TargetId ?? "").PadRight(nameWidth) + "  " + status);
+            }
+
+            string[] errorMessages = results
+                .Where(result => result.Error != null)
+                .Select(result => "[" + result.TargetId + "] " + result.Error)
+                .ToArray();
+            if (errorMessages.Length > 0)
+            {
+                throw new UserErrorException(string.Join("\n", errorMessages));
+            }
+        }
+
+        // Builds the given targets in parallel. User errors are reported in the results rather than thrown.
+        internal static TargetBuildResult[] BuildConfigs(ProjectConfig[] configs, string?[] targetIds, TokenCache tokenCache, Profiler[]? profilers = null)
+        {
+            Dictionary<string, string?> targetByOutputPath = new Dictionary<string, string?>();
+            for (int i = 0; i < configs.Length; i++)
+            {
+                string outputPath = configs[i].OutputFileFunctions ?? "";
+                if (targetByOutputPath.ContainsKey(outputPath))
+                {
+                    throw new UserErrorException("Targets '" + targetByOutputPath[outputPath] + "' and '" + targetIds[i] + "' cannot be built at the same time since they have the same output path.");
+                }
+                targetByOutputPath[outputPath] = targetIds[i];
+            }
+
+            TargetBuildResult[] results = new TargetBuildResult[targetIds.Length];
+            System.Threading.Tasks.Parallel.For(0, targetIds.Length, i =>
+            {
+                System.Diagnostics.Stopwatch timer = System.Diagnostics.Stopwatch.StartNew();
+                TargetBuildResult result = new TargetBuildResult() { TargetId = targetIds[i] };
+                try
+                {
+                    string[]? outputFiles = BuildProject(configs[i], targetIds[i], tokenCache, profilers?[i]);
+                    result.Built = outputFiles != null;
+                    result.OutputFiles = outputFiles ?? new string[0];
+                }
+                catch (UserErrorException uee)
+                {
+                    result.Error = uee.Message;
+                }
+                result.Milliseconds = timer.ElapsedMilliseconds;
+                results[i] = result;
+            });
+            return results;
+        }
+
+        // Returns the paths of the files that were exported, or null if the build was skipped because the build
+        // cache was up to date.
+        private static string[]? BuildProject(ProjectConfig config, string? targetId, TokenCache tokenCache, Profiler? profiler)
+        {
+            BuildCache? cache = config.BuildCacheDirectory == null ? null : new BuildCache(config, targetId);
+            using (Profiler.Scope? scope = profiler?.Measure("check-build-cache"))
+            {
+                if (cache != null && cache.IsUpToDate())
+                {
+                    scope?.Count("upToDate", 1);
+                    return null;
+                }
+            }
+
+            PastelContext context = CompilePastelContexts(config, cache, tokenCache, profiler);
+            List<string> outputPaths = [];
+            using (profiler?.Measure("export"))
+            {
+                outputPaths.AddRange(context.Transpiler.Exporter.DoExport(config, context));
+            }
+
+            if (config.InlineReportPath != null)
+            {
+                DiskUtil.WriteTextFileIfChanged(config.InlineReportPath, context.GetInliningReport());
+                outputPaths.Add(config.InlineReportPath);
+            }
+
+            if (config.FoldReportPath != null)
+            {
+                DiskUtil.WriteTextFileIfChanged(config.FoldReportPath, context.GetConstantFoldingReport());
+                outputPaths.Add(config.FoldReportPath);
+            }
+
+            if (config.ProfileReportPath != null)
+            {
+                DiskUtil.WriteTextFileIfChanged(config.ProfileReportPath, context.GetProfileReport());
+                outputPaths.Add(config.ProfileReportPath);
+            }
+
+            cache?.Save(outputPaths);
+            return outputPaths.ToArray();
         }
 
-        private static PastelContext CompilePastelContexts(ProjectConfig rootConfig)
+        private static PastelContext CompilePastelContexts(ProjectConfig rootConfig, BuildCache? cache, TokenCache tokenCache, Profiler? profiler)
         {
             Dictionary<string, ProjectConfig> configsLookup = new Dictionary<string, ProjectConfig>();
             string[] contextPaths = GetContextsInDependencyOrder(rootConfig, configsLookup);
@@ -55,9 +209,12 @@ namespace Pastel
             foreach (string contextPath in contextPaths)
             {
                 ProjectConfig config = configsLookup[contextPath];
-                PastelContext context = GetContextForConfigImpl(config, contexts, new HashSet<string>());
+                PastelContext context = GetContextForConfigImpl(config, contexts, new HashSet<string>(), cache);
+                context.TokenCache = tokenCache;
+                context.Profiler = profiler;
                 string source = DiskUtil.TryReadTextFile(config.Source);
                 if (source == null) throw new UserErrorException("Source file not found: " + config.Source);
+                cache?.RecordInput(config.Source, source);
                 context.CompileCode(config.Source, source);
                 context.FinalizeCompilation();
             }
@@ -84,7 +241,8 @@ namespace Pastel
         private static PastelContext GetContextForConfigImpl(
             ProjectConfig config,
             Dictionary<string, PastelContext> contexts,
-            HashSet<string> recursionCheck)
+            HashSet<string> recursionCheck,
+            BuildCache? cache)
         {
             if (contexts.ContainsKey(config.Path)) return contexts[config.Path];
             if (recursionCheck.Contains(config.Path))
@@ -95,7 +253,22 @@ namespace Pastel
             recursionCheck.Add(config.Path);
 
             string sourceRootDir = System.IO.Path.GetDirectoryName(config.Source);
-            PastelContext context = new PastelContext(sourceRootDir, config.Language, new CodeLoader(sourceRootDir));
+            PastelContext context = new PastelContext(sourceRootDir, config.Language, new CodeLoader(sourceRootDir, cache));
+            context.TranspilerContext.PythonSwitchLowering = config.PythonSwitchLowering;
+            context.TranspilerContext.PythonTypedArrays = config.PythonTypedArrays;
+            context.TranspilerContext.PythonTypeHints = config.PythonTypeHints;
+            context.TranspilerContext.PythonHoistGlobals = config.PythonHoistGlobals;
+            context.InlineBudget = config.InlineBudget;
+            context.EntryPoints = config.EntryPoints;
+            context.Instrument = config.Instrument;
+
+            if (config.ProfilePath != null)
+            {
+                string profile = DiskUtil.TryReadTextFile(config.ProfilePath);
+                if (profile == null) throw new UserErrorException("Profile not found: " + config.ProfilePath);
+                cache?.RecordInput(config.ProfilePath, profile);
+                context.ExecutionProfile = ExecutionProfile.Parse(config.ProfilePath, profile);
+            }
 
             foreach (string constantName in config.Flags.Keys)
             {
@@ -118,9 +291,11 @@ namespace Pastel
         private class CodeLoader : IInlineImportCodeLoader
         {
             private string root;
-            public CodeLoader(string root)
+            private BuildCache? cache;
+            public CodeLoader(string root, BuildCache? cache)
             {
                 this.root = root;
+                this.cache = cache;
             }
 
             public string LoadCode(Token throwLocation, string path)
@@ -134,6 +309,7 @@ namespace Pastel
                         throwLocation,
                         "File does not exist: " + path);
                 }
+                this.cache?.RecordInput(path, code);
                 return code;
             }
         }
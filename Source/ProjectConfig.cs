@@ -3,6 +3,7 @@ using System.Collections.Generic;
 using System.Linq;
 using System.Text.Json;
 using Pastel.Parser;
+using Pastel.Transpilers.Python;
 
 namespace Pastel
 {
@@ -43,6 +44,20 @@ namespace Pastel
         public string? NamespaceForStructs { get; set; }
         public string? NamespaceForFunctions { get; set; }
         public HashSet<string> Imports { get; set; }
+        public PythonSwitchLowering PythonSwitchLowering { get; set; }
+        public bool PythonTypedArrays { get; set; }
+        public bool PythonTypeHints { get; set; }
+        public bool PythonHoistGlobals { get; set; }
+        public PythonModuleLayout PythonModuleLayout { get; set; }
+        public string? PythonPrecompileInterpreter { get; set; }
+        public int InlineBudget { get; set; }
+        public string? InlineReportPath { get; set; }
+        public string? FoldReportPath { get; set; }
+        public string[]? EntryPoints { get; set; }
+        public string? BuildCacheDirectory { get; set; }
+        public bool Instrument { get; set; }
+        public string? ProfilePath { get; set; }
+        public string? ProfileReportPath { get; set; }
 
         public static ProjectConfig Parse(string path, string targetId)
         {
@@ -52,6 +67,17 @@ namespace Pastel
             return config;
         }
 
+        public static string[] GetTargetNames(string path)
+        {
+            Dictionary<string, object> data = ParseConfigFile(null, System.IO.File.ReadAllText(path));
+            if (data == null) throw new UserErrorException("Invalid JSON document: " + path);
+            return ((data.ContainsKey("targets") ? data["targets"] : null) as object[] ?? new object[0])
+                .OfType<Dictionary<string, object>>()
+                .Select(target => target.ContainsKey("name") ? target["name"] as string : null)
+                .OfType<string>()
+                .ToArray();
+        }
+
         // multiple colons are valid, but no colon is not.
         // if the value contains a colon, then only split on the first one.
         // results should be trimmed.
@@ -96,7 +122,7 @@ namespace Pastel
             }
         }
 
-        private static Dictionary<string, object> ParseConfigFile(string targetId, string content)
+        private static Dictionary<string, object> ParseConfigFile(string? targetId, string content)
         {
             Dictionary<string, object> root;
             try
@@ -232,6 +258,146 @@ namespace Pastel
                 config.NamespaceForStructs = ns;
             }
 
+            switch (((data.ContainsKey("python-switch") ? data["python-switch"] : null) as string ?? "auto").ToLower())
+            {
+                case "auto":
+                    config.PythonSwitchLowering = PythonSwitchLowering.AUTO;
+                    break;
+                case "binary-search":
+                    config.PythonSwitchLowering = PythonSwitchLowering.BINARY_SEARCH;
+                    break;
+                case "if-chain":
+                    config.PythonSwitchLowering = PythonSwitchLowering.IF_CHAIN;
+                    break;
+                case "table":
+                    config.PythonSwitchLowering = PythonSwitchLowering.TABLE;
+                    break;
+                default:
+                    throw new UserErrorException("Invalid value for 'python-switch' in the build file. Choices: auto binary-search if-chain table");
+            }
+
+            object pythonTypedArrays = data.ContainsKey("python-typed-arrays") ? data["python-typed-arrays"] : false;
+            if (!(pythonTypedArrays is bool))
+            {
+                throw new UserErrorException("Invalid value for 'python-typed-arrays' in the build file. Expected true or false.");
+            }
+            config.PythonTypedArrays = (bool)pythonTypedArrays;
+
+            object pythonTypeHints = data.ContainsKey("python-type-hints") ? data["python-type-hints"] : false;
+            if (!(pythonTypeHints is bool))
+            {
+                throw new UserErrorException("Invalid value for 'python-type-hints' in the build file. Expected true or false.");
+            }
+            config.PythonTypeHints = (bool)pythonTypeHints;
+
+            object pythonHoistGlobals = data.ContainsKey("python-hoist-globals") ? data["python-hoist-globals"] : false;
+            if (!(pythonHoistGlobals is bool))
+            {
+                throw new UserErrorException("Invalid value for 'python-hoist-globals' in the build file. Expected true or false.");
+            }
+            config.PythonHoistGlobals = (bool)pythonHoistGlobals;
+
+            switch (((data.ContainsKey("python-modules") ? data["python-modules"] : null) as string ?? "single").ToLower())
+            {
+                case "single":
+                    config.PythonModuleLayout = PythonModuleLayout.SINGLE;
+                    break;
+                case "file":
+                    config.PythonModuleLayout = PythonModuleLayout.FILE;
+                    break;
+                case "call-graph":
+                    config.PythonModuleLayout = PythonModuleLayout.CALL_GRAPH;
+                    break;
+                default:
+                    throw new UserErrorException("Invalid value for 'python-modules' in the build file. Choices: single file call-graph");
+            }
+
+            // true uses the default interpreter, or it can be the interpreter to use, since .pyc files are specific to
+            // the Python version that wrote them.
+            object pythonPrecompile = data.ContainsKey("python-precompile") ? data["python-precompile"] : false;
+            if (pythonPrecompile is string interpreter && interpreter.Length > 0)
+            {
+                config.PythonPrecompileInterpreter = interpreter;
+            }
+            else if (pythonPrecompile is bool)
+            {
+                config.PythonPrecompileInterpreter = (bool)pythonPrecompile ? (OperatingSystem.IsWindows() ? "python" : "python3") : null;
+            }
+            else
+            {
+                throw new UserErrorException("Invalid value for 'python-precompile' in the build file. Expected true, false, or the Python interpreter to use.");
+            }
+
+            object inlineBudget = data.ContainsKey("inline-budget") ? data["inline-budget"] : Inliner.DEFAULT_BUDGET;
+            if (!(inlineBudget is int) || (int)inlineBudget < 0)
+            {
+                throw new UserErrorException("Invalid value for 'inline-budget' in the build file. Expected a non-negative integer.");
+            }
+            config.InlineBudget = (int)inlineBudget;
+
+            if (data.ContainsKey("inline-report") && data["inline-report"] is string)
+            {
+                config.InlineReportPath = CanonicalizeDirectory(directory, (string)data["inline-report"]);
+            }
+
+            if (data.ContainsKey("fold-report") && data["fold-report"] is string)
+            {
+                config.FoldReportPath = CanonicalizeDirectory(directory, (string)data["fold-report"]);
+            }
+
+            string entryPointsKey = data.ContainsKey("entry-points") ? "entry-points" : "exports";
+            if (data.ContainsKey(entryPointsKey))
+            {
+                object[]? entryPoints = data[entryPointsKey] as object[];
+                if (entryPoints == null || entryPoints.Length == 0 || !entryPoints.All(e => e is string))
+                {
+                    throw new UserErrorException("Invalid value for '" + entryPointsKey + "' in the build file. Expected a non-empty list of function names.");
+                }
+                config.EntryPoints = entryPoints.Cast<string>().ToArray();
+            }
+
+            if (data.ContainsKey("build-cache"))
+            {
+                object buildCache = data["build-cache"];
+                if (buildCache is string)
+                {
+                    config.BuildCacheDirectory = CanonicalizeDirectory(directory, (string)buildCache);
+                }
+                else if (buildCache is bool)
+                {
+                    config.BuildCacheDirectory = (bool)buildCache ? CanonicalizeDirectory(directory, ".pastel-cache") : null;
+                }
+                else
+                {
+                    throw new UserErrorException("Invalid value for 'build-cache' in the build file. Expected true, false, or a directory path.");
+                }
+            }
+
+            object instrument = data.ContainsKey("instrument") ? data["instrument"] : false;
+            if (!(instrument is bool))
+            {
+                throw new UserErrorException("Invalid value for 'instrument' in the build file. Expected true or false.");
+            }
+            config.Instrument = (bool)instrument;
+            if (config.Instrument && !new[] { Language.CSHARP, Language.GO, Language.JAVA, Language.JAVASCRIPT, Language.PYTHON }.Contains(config.Language))
+            {
+                throw new UserErrorException("The 'instrument' option is only supported for csharp, go, java, javascript, and python.");
+            }
+
+            if (data.ContainsKey("profile") && data["profile"] is string)
+            {
+                config.ProfilePath = CanonicalizeDirectory(directory, (string)data["profile"]);
+            }
+
+            if (data.ContainsKey("profile-report") && data["profile-report"] is string)
+            {
+                if (config.ProfilePath == null)
+                {
+                    throw new UserErrorException("The build file has a 'profile-report' but no 'profile' to report on.");
+                }
+                config.ProfileReportPath = CanonicalizeDirectory(directory, (string)data["profile-report"]);
+            }
+
             Dictionary<string, object>[] flagList =
                 ((data.ContainsKey("flags")
                     ? data["flags"]
@@ -30,7 +30,16 @@ namespace Pastel
 
         private static readonly byte[] BUFFER = new byte[1000];
 
+        // Multiple targets can be compiled on different threads, and the lookup and buffer are shared.
         public static byte[] ReadBinaryFile(System.Reflection.Assembly assembly, string path, bool failSilently)
+        {
+            lock (BUFFER)
+            {
+                return ReadBinaryFileImpl(assembly, path, failSilently);
+            }
+        }
+
+        private static byte[] ReadBinaryFileImpl(System.Reflection.Assembly assembly, string path, bool failSilently)
         {
             string canonicalizedPath = path.Replace('/', '.');
 #if WINDOWS
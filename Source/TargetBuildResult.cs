@@ -0,0 +1,13 @@
+﻿namespace Pastel
+{
+    internal class TargetBuildResult
+    {
+        public string? TargetId { get; set; }
+
+        // False if the build was skipped because the build cache was up to date.
+        public bool Built { get; set; }
+        public long Milliseconds { get; set; }
+        public string[] OutputFiles { get; set; } = new string[0];
+        public string? Error { get; set; }
+    }
+}
@@ -6,25 +6,90 @@ namespace Pastel
 {
     internal static class TranspilationHelperCodeUtil
     {
-        public static string InjectTranspilationHelpers(AbstractTranspiler transpiler, string userCode)
+        // The helpers and the dependencies between them only depend on the resource, so each resource is only
+        // parsed once.
+        private class HelperCode
         {
-            Dictionary<string, string> codeChunks = GetCodeChunks(transpiler, userCode);
-            string[] chunkOrder = GetChunkOrder(codeChunks, userCode);
+            // In the order they appear in the resource.
+            public List<string> Ids { get; } = [];
+            public Dictionary<string, string> CodeById { get; } = [];
+            public Dictionary<string, string[]> DependenciesById { get; } = [];
+        }
+
+        private static readonly Dictionary<string, HelperCode> helperCodeByResourcePath = [];
+
+        // Adds the helpers that the translators marked as used, and the helpers they depend on, before the user
+        // code. Dependencies come before the helpers that use them, and otherwise helpers appear in the same
+        // order as in the resource.
+        public static string InjectTranspilationHelpers(TranspilerContext ctx, string userCode)
+        {
+            HelperCode helperCode = GetHelperCode(ctx.Transpiler.HelperCodeResourcePath);
 
-            List<string> finalCodeBuilder = [];
-            foreach (string chunkId in chunkOrder)
+            // The counters of an instrumented build go before everything else.
+            List<string> chunks = [];
+            string[]? profileSlotNames = ctx.PastelContext.GetCompiler().ProfileSlotNames;
+            if (profileSlotNames != null)
             {
-                finalCodeBuilder.Add(codeChunks[chunkId]);
+                ctx.Transpiler.GenerateCodeForProfileCounters(ctx, profileSlotNames);
+                chunks.Add(ctx.FlushAndClearBuffer().Trim());
             }
 
-            string finalCode = string.Join("\n\n", finalCodeBuilder);
-            return finalCode;
+            string[] features = ctx.GetFeatures();
+
+            HashSet<string> usedHelpers = [.. features
+                .Where(f => f.StartsWith("HELPER:"))
+                .Select(f => f["HELPER:".Length..])];
+
+            // Extensible function translations come from the build file rather than a translator, so they are
+            // the only code that is searched for helper names.
+            Dictionary<string, string> extensionTranslations = ctx.PastelContext.ExtensionSet.ExtensibleFunctionTranslations;
+            foreach (string feature in features.Where(f => f.StartsWith("EXTENSION:")))
+            {
+                string translation = extensionTranslations[feature["EXTENSION:".Length..]];
+                usedHelpers.UnionWith(FindUsedMarkers(translation, helperCode, ""));
+            }
+
+            // The host can register extensible callbacks whether or not the code invokes any.
+            if (helperCode.CodeById.ContainsKey("PST_RegisterExtensibleCallback"))
+            {
+                usedHelpers.Add("PST_RegisterExtensibleCallback");
+            }
+
+            string? unknownHelper = usedHelpers.FirstOrDefault(id => !helperCode.CodeById.ContainsKey(id));
+            if (unknownHelper != null)
+            {
+                throw new System.InvalidOperationException("Helper '" + unknownHelper + "' is not defined in " + ctx.Transpiler.HelperCodeResourcePath);
+            }
+
+            List<string> orderedKeys = [];
+            Dictionary<string, int> traversalState = [];
+            foreach (string id in helperCode.Ids.Where(usedHelpers.Contains))
+            {
+                PopulateOrderedChunkKeys(id, orderedKeys, helperCode.DependenciesById, traversalState);
+            }
+
+            chunks.AddRange(orderedKeys.Select(id => helperCode.CodeById[id]));
+            chunks.Add(userCode);
+            return string.Join("\n\n", chunks);
+        }
+
+        private static HelperCode GetHelperCode(string? resourcePath)
+        {
+            lock (helperCodeByResourcePath)
+            {
+                string key = resourcePath ?? "";
+                if (!helperCodeByResourcePath.TryGetValue(key, out HelperCode? helperCode))
+                {
+                    helperCode = ParseHelperCode(resourcePath);
+                    helperCodeByResourcePath[key] = helperCode;
+                }
+                return helperCode;
+            }
         }
 
-        private static Dictionary<string, string> GetCodeChunks(AbstractTranspiler transpiler, string userCode)
+        private static HelperCode ParseHelperCode(string? resourcePath)
         {
-            string resourcePath = transpiler.HelperCodeResourcePath;
-            Dictionary<string, string> output = [];
+            HelperCode output = new HelperCode();
             if (resourcePath == null) return output;
 
             string helperCode = ResourceReader.ReadTextFile(resourcePath);
@@ -38,9 +103,10 @@ namespace Pastel
                 {
                     if (currentId != null)
                     {
-                        output[currentId] = string.Join("\n", currentChunk).Trim();
+                        output.CodeById[currentId] = string.Join("\n", currentChunk).Trim();
                     }
                     currentId = line.Split(':')[1].Trim();
+                    output.Ids.Add(currentId);
                     currentChunk.Clear();
                 }
                 else
@@ -51,45 +117,21 @@ namespace Pastel
 
             if (currentId != null)
             {
-                output[currentId] = string.Join("\n", currentChunk).Trim();
+                output.CodeById[currentId] = string.Join("\n", currentChunk).Trim();
             }
 
-            output[""] = userCode;
-
-            return output;
-        }
-
-        private static string[] GetChunkOrder(Dictionary<string, string> chunksByMarker, string userCode)
-        {
-            HashSet<string> allMarkers = [.. chunksByMarker.Keys];
-            List<string> nonPstPrefixThings = [];
-            List<string> pstPrefixedThings = [];
-            foreach (string marker in chunksByMarker.Keys.Where(m => m.Length > 0).OrderBy(m => m))
+            foreach (string id in output.Ids)
             {
-                if (marker.StartsWith("PST"))
-                {
-                    pstPrefixedThings.Add(marker);
-                }
-                else
-                {
-                    nonPstPrefixThings.Add(marker);
-                }
+                output.DependenciesById[id] = FindUsedMarkers(output.CodeById[id], output, id);
             }
-            Dictionary<string, string[]> dependencies = [];
-            foreach (string marker in chunksByMarker.Keys.OrderBy(m => m))
+
+            // The entity ID doesn't match the name used in the code in all languages (e.g. PST$extCallbacks in JavaScript).
+            if (output.CodeById.ContainsKey("PST_RegisterExtensibleCallback") && output.CodeById.ContainsKey("PST_ExtCallbacks"))
             {
-                string code = chunksByMarker[marker];
-                dependencies[marker] = FindUsedMarkers(code, nonPstPrefixThings, pstPrefixedThings, allMarkers, marker);
+                output.DependenciesById["PST_RegisterExtensibleCallback"] = [.. output.DependenciesById["PST_RegisterExtensibleCallback"].Union(["PST_ExtCallbacks"])];
             }
 
-            dependencies["PST_RegisterExtensibleCallback"] = ["PST_ExtCallbacks"];
-            dependencies[""] = [.. dependencies[""], "PST_RegisterExtensibleCallback"];
-
-            List<string> orderedKeys = [];
-
-            PopulateOrderedChunkKeys("", orderedKeys, dependencies, new Dictionary<string, int>());
-
-            return [.. orderedKeys];
+            return output;
         }
 
         private static void PopulateOrderedChunkKeys(
@@ -120,15 +162,10 @@ namespace Pastel
             orderedKeys.Add(currentItem);
         }
 
-        private static string[] FindUsedMarkers(
-            string code,
-            IList<string> nonPstMarkers,
-            IList<string> pstMarkers,
-            HashSet<string> allMarkers,
-            string exclusion)
+        private static string[] FindUsedMarkers(string code, HelperCode helperCode, string exclusion)
         {
             List<string> usedMarkers = [];
-            foreach (string nonPstMarker in nonPstMarkers)
+            foreach (string nonPstMarker in helperCode.Ids.Where(id => !id.StartsWith("PST")).OrderBy(id => id))
             {
                 if (exclusion != nonPstMarker && code.Contains(nonPstMarker))
                 {
@@ -140,7 +177,7 @@ namespace Pastel
             for (int i = 1; i < pstParts.Length; ++i)
             {
                 string markerName = GetMarkerNameHacky(pstParts[i]);
-                if (allMarkers.Contains(markerName) && exclusion != markerName)
+                if (helperCode.CodeById.ContainsKey(markerName) && exclusion != markerName)
                 {
                     usedMarkers.Add(markerName);
                 }
@@ -10,9 +10,14 @@ namespace Pastel.Transpilers
 
         protected abstract Dictionary<string, string> GenerateFiles(ProjectConfig config, PastelContext context);
 
-        public void DoExport(ProjectConfig config, PastelContext context)
+        // Returns the paths of the exported files.
+        public string[] DoExport(ProjectConfig config, PastelContext context)
         {
-            Dictionary<string, string> files = this.GenerateFiles(config, context);
+            Dictionary<string, string> files;
+            using (context.Profiler?.Measure("generate"))
+            {
+                files = this.GenerateFiles(config, context);
+            }
 
             if (config.OutputFileFunctions == null)
             {
@@ -20,6 +25,9 @@ namespace Pastel.Transpilers
                     "The project config does not define an output file for functions. An output.functions-path field is necessary.");
             }
 
+            List<string> exportedPaths = [];
+            long exportedBytes = 0;
+            using Profiler.Scope? scope = context.Profiler?.Measure("write");
             foreach (string path in files.Keys)
             {
                 string actualPath = path
@@ -35,10 +43,18 @@ namespace Pastel.Transpilers
                     throw new UserErrorException("Cannot export file: " + actualPath);
                 }
 
-                System.IO.File.WriteAllText(actualPath, code);
+                DiskUtil.WriteTextFileIfChanged(actualPath, code);
+                exportedPaths.Add(actualPath);
+                exportedBytes += code.Length;
             }
+            scope?.Count("files", exportedPaths.Count).Count("bytes", exportedBytes);
+            this.OnFilesExported(config, [.. exportedPaths]);
+            return [.. exportedPaths];
         }
 
+        // Called with the paths of all the exported files once they've been written.
+        protected virtual void OnFilesExported(ProjectConfig config, string[] paths) { }
+
         protected string[] SplitAndIndent(string code, string indentStr)
         {
             string[] lines = code.TrimEnd().Split('\n');
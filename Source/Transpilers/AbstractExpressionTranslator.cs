@@ -15,6 +15,13 @@ namespace Pastel.Transpilers
             this.transpilerCtx.MarkFeatureAsBeingUsed(feature);
         }
 
+        // Helpers are the entities in the language's PastelHelper resource. Only the helpers that are marked as
+        // used, along with the helpers they depend on, are included in the output.
+        protected void MarkHelperAsUsed(string helperName)
+        {
+            this.transpilerCtx.MarkFeatureAsBeingUsed("HELPER:" + helperName);
+        }
+
         protected AbstractTypeTranspiler TypeTranspiler
         {
             get { return this.transpilerCtx.Transpiler.TypeTranspiler; }
@@ -164,6 +171,35 @@ namespace Pastel.Transpilers
             return this.TranslateStringConcatAll(expressions);
         }
 
+        // These are used instead of the copying version of the same core function when the CopyElider has found
+        // that the copy can't be observed. Platforms that can't share the storage (e.g. a C# list can't be used
+        // as an array) simply keep the copy.
+        public virtual StringBuffer TranslateDictionaryKeysWithoutCopy(Expression dictionary)
+        {
+            return this.TranslateDictionaryKeys(dictionary);
+        }
+
+        public virtual StringBuffer TranslateDictionaryValuesWithoutCopy(Expression dictionary)
+        {
+            return this.TranslateDictionaryValues(dictionary);
+        }
+
+        public virtual StringBuffer TranslateListToArrayWithoutCopy(Expression list)
+        {
+            return this.TranslateListToArray(list);
+        }
+
+        // The array is not used by anything else and can be sorted in place and returned.
+        public virtual StringBuffer TranslateSortIntArrayInPlace(Expression intArray)
+        {
+            return this.TranslateSortedCopyOfIntArray(intArray);
+        }
+
+        public virtual StringBuffer TranslateSortStringArrayInPlace(Expression stringArray)
+        {
+            return this.TranslateSortedCopyOfStringArray(stringArray);
+        }
+
         public virtual StringBuffer TranslateFunctionPointerInvocation(FunctionPointerInvocation fpi)
         {
             StringBuffer sb = this.TranslateExpression(fpi.Root);
@@ -195,12 +231,18 @@ namespace Pastel.Transpilers
                 case CoreFunction.CURRENT_TIME_SECONDS: return this.TranslateCurrentTimeSeconds();
                 case CoreFunction.DICTIONARY_CONTAINS_KEY: return this.TranslateDictionaryContainsKey(args[0], args[1]);
                 case CoreFunction.DICTIONARY_GET: return this.TranslateDictionaryGet(args[0], args[1]);
-                case CoreFunction.DICTIONARY_KEYS: return this.TranslateDictionaryKeys(args[0]);
+                case CoreFunction.DICTIONARY_KEYS:
+                    return coreFuncInvocation.MayShareArgument
+                        ? this.TranslateDictionaryKeysWithoutCopy(args[0])
+                        : this.TranslateDictionaryKeys(args[0]);
                 case CoreFunction.DICTIONARY_NEW: return this.TranslateDictionaryNew(coreFuncInvocation.ResolvedType.Generics[0], coreFuncInvocation.ResolvedType.Generics[1]);
                 case CoreFunction.DICTIONARY_REMOVE: return this.TranslateDictionaryRemove(args[0], args[1]);
                 case CoreFunction.DICTIONARY_SET: return this.TranslateDictionarySet(args[0], args[1], args[2]);
                 case CoreFunction.DICTIONARY_SIZE: return this.TranslateDictionarySize(args[0]);
-                case CoreFunction.DICTIONARY_VALUES: return this.TranslateDictionaryValues(args[0]);
+                case CoreFunction.DICTIONARY_VALUES:
+                    return coreFuncInvocation.MayShareArgument
+                        ? this.TranslateDictionaryValuesWithoutCopy(args[0])
+                        : this.TranslateDictionaryValues(args[0]);
                 case CoreFunction.EMIT_COMMENT: return this.TranslateEmitComment(((InlineConstant)args[0]).Value.ToString());
                 case CoreFunction.EXTENSIBLE_CALLBACK_INVOKE: return this.TranslateExtensibleCallbackInvoke(args[0], args[1]);
                 case CoreFunction.FLOAT_TO_STRING: return this.TranslateFloatToString(args[0]);
@@ -220,7 +262,10 @@ namespace Pastel.Transpilers
                 case CoreFunction.LIST_SET: return this.TranslateListSet(args[0], args[1], args[2]);
                 case CoreFunction.LIST_SHUFFLE: return this.TranslateListShuffle(args[0]);
                 case CoreFunction.LIST_SIZE: return this.TranslateListSize(args[0]);
-                case CoreFunction.LIST_TO_ARRAY: return this.TranslateListToArray(args[0]);
+                case CoreFunction.LIST_TO_ARRAY:
+                    return coreFuncInvocation.MayShareArgument
+                        ? this.TranslateListToArrayWithoutCopy(args[0])
+                        : this.TranslateListToArray(args[0]);
                 case CoreFunction.MATH_ABS: return this.TranslateMathAbs(args[0]);
                 case CoreFunction.MATH_ARCCOS: return this.TranslateMathArcCos(args[0]);
                 case CoreFunction.MATH_ARCSIN: return this.TranslateMathArcSin(args[0]);
@@ -239,8 +284,14 @@ namespace Pastel.Transpilers
                 case CoreFunction.PRINT_STDERR: return this.TranslatePrintStdErr(args[0]);
                 case CoreFunction.PRINT_STDOUT: return this.TranslatePrintStdOut(args[0]);
                 case CoreFunction.RANDOM_FLOAT: return this.TranslateRandomFloat();
-                case CoreFunction.SORTED_COPY_OF_INT_ARRAY: return this.TranslateSortedCopyOfIntArray(args[0]);
-                case CoreFunction.SORTED_COPY_OF_STRING_ARRAY: return this.TranslateSortedCopyOfStringArray(args[0]);
+                case CoreFunction.SORTED_COPY_OF_INT_ARRAY:
+                    return coreFuncInvocation.MayShareArgument
+                        ? this.TranslateSortIntArrayInPlace(args[0])
+                        : this.TranslateSortedCopyOfIntArray(args[0]);
+                case CoreFunction.SORTED_COPY_OF_STRING_ARRAY:
+                    return coreFuncInvocation.MayShareArgument
+                        ? this.TranslateSortStringArrayInPlace(args[0])
+                        : this.TranslateSortedCopyOfStringArray(args[0]);
                 case CoreFunction.STRING_APPEND: return this.TranslateStringAppend(args[0], args[1]);
                 case CoreFunction.STRING_CHAR_AT: return this.TranslateStringCharAt(args[0], args[1]);
                 case CoreFunction.STRING_CHAR_CODE_AT: return this.TranslateStringCharCodeAt(args[0], args[1]);
@@ -298,6 +349,7 @@ namespace Pastel.Transpilers
             }
 
             string codeSnippet = extLookup[functionName];
+            this.MarkFeatureAsUsed("EXTENSION:" + functionName);
 
             // Filter down to just the arguments that are used.
             // Put their location and length in this locations lookup. The key
@@ -1,5 +1,6 @@
 ﻿using Pastel.Parser.ParseNodes;
 using System;
+using System.Linq;
 
 namespace Pastel.Transpilers
 {
@@ -61,6 +62,8 @@ namespace Pastel.Transpilers
                 case "SwitchStatement": this.TranslateSwitchStatement(sb, (SwitchStatement)stmnt); break;
                 case "VariableDeclaration": this.TranslateVariableDeclaration(sb, (VariableDeclaration)stmnt); break;
                 case "WhileLoop": this.TranslateWhileLoop(sb, (WhileLoop)stmnt); break;
+                case "CountedForLoop": this.TranslateCountedForLoop(sb, (CountedForLoop)stmnt); break;
+                case "ProfileCounter": this.TranslateProfileCounter(sb, (ProfileCounter)stmnt); break;
                 case "StatementBatch":
                     Statement[] stmnts = ((StatementBatch)stmnt).Statements;
                     for (int i = 0; i < stmnts.Length; ++i)
@@ -83,5 +86,33 @@ namespace Pastel.Transpilers
         public abstract void TranslateSwitchStatement(TranspilerContext sb, SwitchStatement switchStatement);
         public abstract void TranslateVariableDeclaration(TranspilerContext sb, VariableDeclaration varDecl);
         public abstract void TranslateWhileLoop(TranspilerContext sb, WhileLoop whileLoop);
+
+        // Platforms that have a native counted loop can override this. Otherwise it is the same init + while loop
+        // that any other for loop produces.
+        public virtual void TranslateCountedForLoop(TranspilerContext sb, CountedForLoop countedLoop)
+        {
+            this.TranslateStatement(sb, countedLoop.CanonicalForm);
+        }
+
+        // Only languages that support the "instrument" build option have counters to increment.
+        public virtual void TranslateProfileCounter(TranspilerContext sb, ProfileCounter counter)
+        {
+            throw new NotSupportedException();
+        }
+
+        // The chunks of the switch statement from the most to the least frequently hit according to the execution
+        // profile, if there is one. They can only be moved around if none of them fall through to the next one.
+        protected SwitchStatement.SwitchChunk[] GetChunksInProfileOrder(SwitchStatement switchStatement)
+        {
+            int[]? order = this.transpilerCtx.PastelContext.ExecutionProfile?.GetChunkOrder(switchStatement);
+            if (order == null) return switchStatement.Chunks;
+
+            bool canReorder = switchStatement.Chunks.All(chunk =>
+                chunk.Code.Length > 0 &&
+                (chunk.Code[chunk.Code.Length - 1] is BreakStatement || chunk.Code[chunk.Code.Length - 1] is ReturnStatement));
+            if (!canReorder) return switchStatement.Chunks;
+
+            return order.Select(i => switchStatement.Chunks[i]).ToArray();
+        }
     }
 }
@@ -1,4 +1,5 @@
-﻿using Pastel.Parser.ParseNodes;
+﻿using Pastel.Parser;
+using Pastel.Parser.ParseNodes;
 using System;
 
 namespace Pastel.Transpilers
@@ -35,6 +36,32 @@ namespace Pastel.Transpilers
             throw new NotSupportedException();
         }
 
+        // Declares the counters of an instrumented build and marks the PST_dumpProfile helper as used. This is only
+        // overridden in the languages that support the "instrument" build option.
+        public virtual void GenerateCodeForProfileCounters(TranspilerContext sb, string[] slotNames)
+        {
+            throw new NotSupportedException();
+        }
+
+        // Generates a function marked with @memoize as a cache of its results, a function with its name that looks
+        // the arguments up in the cache, and the original function renamed by GetUncachedCopy, which is called on a
+        // miss. Also marks the PST_getMemoStats helper as used. This is only overridden in the languages that
+        // MemoizationChecker allows @memoize in.
+        public virtual void GenerateCodeForMemoizedFunction(TranspilerContext sb, FunctionDefinition funcDef, bool isStatic)
+        {
+            throw new NotSupportedException();
+        }
+
+        protected static FunctionDefinition GetUncachedCopy(FunctionDefinition funcDef)
+        {
+            Token nameToken = funcDef.NameToken;
+            Token uncachedNameToken = new Token(nameToken.Value + "__uncached", nameToken.FileName, nameToken.Line, nameToken.Col, nameToken.Type);
+            return new FunctionDefinition(uncachedNameToken, funcDef.ReturnType, funcDef.ArgTypes, funcDef.ArgNames)
+            {
+                Code = funcDef.Code,
+            };
+        }
+
         // Overridden in languages that require a function to be declared separately in order for declaration order to not matter, such as C.
         public virtual void GenerateCodeForFunctionDeclaration(TranspilerContext sb, FunctionDefinition funcDef, bool isStatic)
         {
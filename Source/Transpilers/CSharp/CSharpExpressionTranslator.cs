@@ -100,6 +100,8 @@ namespace Pastel.Transpilers.CSharp
 
         public override StringBuffer TranslateBase64ToString(Expression base64String)
         {
+            this.MarkHelperAsUsed("PST_Base64ToString");
+
             return StringBuffer
                 .Of("PST_Base64ToString(")
                 .Push(this.TranslateExpression(base64String))
@@ -109,6 +111,8 @@ namespace Pastel.Transpilers.CSharp
 
         public override StringBuffer TranslateBytesToBase64(Expression byteArr)
         {
+            this.MarkHelperAsUsed("PST_BytesToBase64");
+
             return StringBuffer
                 .Of("PST_BytesToBase64(")
                 .Push(this.TranslateExpression(byteArr))
@@ -151,6 +155,8 @@ namespace Pastel.Transpilers.CSharp
 
         public override StringBuffer TranslateCurrentTimeSeconds()
         {
+            this.MarkHelperAsUsed("PST_CurrentTime");
+
             return StringBuffer
                 .Of("PST_CurrentTime")
                 .WithTightness(ExpressionTightness.ATOMIC);
@@ -263,6 +269,8 @@ namespace Pastel.Transpilers.CSharp
 
         public override StringBuffer TranslateExtensibleCallbackInvoke(Expression name, Expression argsArray)
         {
+            this.MarkHelperAsUsed("PST_ExtCallbacks");
+
             return StringBuffer
                 .Of("PST_ExtCallbacks[")
                 .Push(this.TranslateExpression(name))
@@ -274,6 +282,8 @@ namespace Pastel.Transpilers.CSharp
 
         public override StringBuffer TranslateFloatToString(Expression floatExpr)
         {
+            this.MarkHelperAsUsed("PST_FloatToString");
+
             return StringBuffer.Of("PST_FloatToString(")
                 .Push(this.TranslateExpression(floatExpr))
                 .Push(")")
@@ -294,6 +304,8 @@ namespace Pastel.Transpilers.CSharp
 
         public override StringBuffer TranslateIsValidInteger(Expression stringValue)
         {
+            this.MarkHelperAsUsed("PST_IsValidInteger");
+
             return StringBuffer
                 .Of("PST_IsValidInteger(")
                 .Push(this.TranslateExpression(stringValue))
@@ -313,6 +325,8 @@ namespace Pastel.Transpilers.CSharp
 
         public override StringBuffer TranslateListConcat(Expression list, Expression items)
         {
+            this.MarkHelperAsUsed("PST_ListConcat");
+
             return StringBuffer
                 .Of("PST_ListConcat(")
                 .Push(this.TranslateExpression(list))
@@ -383,6 +397,8 @@ namespace Pastel.Transpilers.CSharp
 
         public override StringBuffer TranslateListPop(Expression list)
         {
+            this.MarkHelperAsUsed("PST_ListPop");
+
             return StringBuffer
                 .Of("PST_ListPop(")
                 .Push(this.TranslateExpression(list))
@@ -418,6 +434,8 @@ namespace Pastel.Transpilers.CSharp
 
         public override StringBuffer TranslateListShuffle(Expression list)
         {
+            this.MarkHelperAsUsed("PST_ShuffleInPlace");
+
             return StringBuffer
                 .Of("PST_ShuffleInPlace(")
                 .Push(TranslateExpression(list))
@@ -545,6 +563,8 @@ namespace Pastel.Transpilers.CSharp
 
         public override StringBuffer TranslateMultiplyList(Expression list, Expression n)
         {
+            this.MarkHelperAsUsed("PST_MultiplyList");
+
             return StringBuffer
                 .Of("PST_MultiplyList(")
                 .Push(this.TranslateExpression(list))
@@ -595,6 +615,8 @@ namespace Pastel.Transpilers.CSharp
 
         public override StringBuffer TranslateRandomFloat()
         {
+            this.MarkHelperAsUsed("PST_Random");
+
             return StringBuffer
                 .Of("PST_Random.NextDouble()")
                 .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
@@ -616,6 +638,47 @@ namespace Pastel.Transpilers.CSharp
                 .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
         }
 
+        // OrderBy makes its own array, so rather than sorting in place (Array.Sort isn't stable, which matters for
+        // strings that are equal under the culture's comparison), the ToArray() that created the input is skipped.
+        public override StringBuffer TranslateSortIntArrayInPlace(Expression intArray)
+        {
+            return this.TranslateSortInput(intArray)
+                .EnsureTightness(ExpressionTightness.SUFFIX_SEQUENCE)
+                .Push(".OrderBy<int, int>(_PST_GEN_arg => _PST_GEN_arg).ToArray()")
+                .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
+        }
+
+        public override StringBuffer TranslateSortStringArrayInPlace(Expression stringArray)
+        {
+            return this.TranslateSortInput(stringArray)
+                .EnsureTightness(ExpressionTightness.SUFFIX_SEQUENCE)
+                .Push(".OrderBy<string, string>(_PST_GEN_arg => _PST_GEN_arg).ToArray()")
+                .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
+        }
+
+        private StringBuffer TranslateSortInput(Expression array)
+        {
+            if (array is CoreFunctionInvocation cfi)
+            {
+                switch (cfi.Function)
+                {
+                    case CoreFunction.DICTIONARY_KEYS:
+                        return this.TranslateExpression(cfi.Args[0])
+                            .EnsureTightness(ExpressionTightness.SUFFIX_SEQUENCE)
+                            .Push(".Keys")
+                            .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
+                    case CoreFunction.DICTIONARY_VALUES:
+                        return this.TranslateExpression(cfi.Args[0])
+                            .EnsureTightness(ExpressionTightness.SUFFIX_SEQUENCE)
+                            .Push(".Values")
+                            .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
+                    case CoreFunction.LIST_TO_ARRAY:
+                        return this.TranslateExpression(cfi.Args[0]);
+                }
+            }
+            return this.TranslateExpression(array);
+        }
+
         public override StringBuffer TranslateStringAppend(Expression str1, Expression str2)
         {
             return this.TranslateExpression(str1)
@@ -766,6 +829,8 @@ namespace Pastel.Transpilers.CSharp
 
         public override StringBuffer TranslateStringReverse(Expression str)
         {
+            this.MarkHelperAsUsed("PST_StringReverse");
+
             return StringBuffer.Of("PST_StringReverse(")
                 .Push(this.TranslateExpression(str))
                 .Push(")")
@@ -774,6 +839,8 @@ namespace Pastel.Transpilers.CSharp
 
         public override StringBuffer TranslateStringSplit(Expression haystack, Expression needle)
         {
+            this.MarkHelperAsUsed("PST_StringSplit");
+
             return StringBuffer.Of("PST_StringSplit(")
                 .Push(this.TranslateExpression(haystack))
                 .Push(", ")
@@ -805,6 +872,8 @@ namespace Pastel.Transpilers.CSharp
 
         public override StringBuffer TranslateStringSubstringIsEqualTo(Expression haystack, Expression startIndex, Expression needle)
         {
+            this.MarkHelperAsUsed("PST_SubstringIsEqualTo");
+
             return StringBuffer.Of("PST_SubstringIsEqualTo(")
                 .Push(this.TranslateExpression(haystack))
                 .Push(", ")
@@ -833,6 +902,8 @@ namespace Pastel.Transpilers.CSharp
 
         public override StringBuffer TranslateStringToUnicodeChars(Expression str)
         {
+            this.MarkHelperAsUsed("PST_stringToUnicodeChars");
+
             return StringBuffer
                 .Of("PST_stringToUnicodeChars(")
                 .Push(this.TranslateExpression(str))
@@ -842,6 +913,8 @@ namespace Pastel.Transpilers.CSharp
 
         public override StringBuffer TranslateStringToUtf8Bytes(Expression str)
         {
+            this.MarkHelperAsUsed("PST_stringToUtf8Bytes");
+
             return StringBuffer
                 .Of("PST_stringToUtf8Bytes(")
                 .Push(this.TranslateExpression(str))
@@ -926,6 +999,8 @@ namespace Pastel.Transpilers.CSharp
 
         public override StringBuffer TranslateToCodeString(Expression str)
         {
+            this.MarkHelperAsUsed("PST_ToCodeString");
+
             return StringBuffer
                 .Of("PST_ToCodeString(")
                 .Push(this.TranslateExpression(str))
@@ -935,6 +1010,8 @@ namespace Pastel.Transpilers.CSharp
 
         public override StringBuffer TranslateTryParseFloat(Expression stringValue, Expression floatOutList)
         {
+            this.MarkHelperAsUsed("PST_ParseFloat");
+
             return StringBuffer.Of("PST_ParseFloat(")
                 .Push(this.TranslateExpression(stringValue))
                 .Push(", ")
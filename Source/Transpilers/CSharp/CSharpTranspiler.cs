@@ -1,6 +1,7 @@
 ﻿using Pastel.Parser;
 using Pastel.Parser.ParseNodes;
 using System.Collections.Generic;
+using System.Linq;
 
 namespace Pastel.Transpilers.CSharp
 {
@@ -18,6 +19,17 @@ namespace Pastel.Transpilers.CSharp
 
         public override string HelperCodeResourcePath { get { return "Transpilers/CSharp/PastelHelper.cs"; } }
 
+        public override void GenerateCodeForProfileCounters(TranspilerContext sb, string[] slotNames)
+        {
+            sb.Append("private static readonly string[] PST_profileNames = new string[] { ");
+            sb.Append(string.Join(", ", slotNames.Select(name => CodeUtil.ConvertStringValueToCode(name))));
+            sb.Append(" };\n");
+            sb.Append("private static readonly long[] PST_profileCounters = new long[");
+            sb.Append(slotNames.Length);
+            sb.Append("];\n");
+            sb.MarkFeatureAsBeingUsed("HELPER:PST_dumpProfile");
+        }
+
         public override void GenerateCodeForStruct(TranspilerContext sb, StructDefinition structDef)
         {
             PType[] types = structDef.FieldTypes;
@@ -65,6 +77,59 @@ namespace Pastel.Transpilers.CSharp
             sb.Append(string.Join("\n", lines));
         }
 
+        public override void GenerateCodeForMemoizedFunction(TranspilerContext output, FunctionDefinition funcDef, bool isStatic)
+        {
+            string cacheName = "PST_memo_" + funcDef.Name;
+            string[] args = [.. funcDef.ArgNames.Select(arg => arg.Value)];
+            string[] argTypes = [.. funcDef.ArgTypes.Select(type => this.TypeTranspiler.TranslateType(type))];
+            string returnType = this.TypeTranspiler.TranslateType(funcDef.ReturnType);
+
+            // Dictionary keys can't be null, but a value tuple containing a null string can be.
+            string keyType;
+            string key;
+            if (args.Length == 0)
+            {
+                keyType = "bool";
+                key = "true";
+            }
+            else if (args.Length == 1 && !funcDef.ArgTypes[0].IsString)
+            {
+                keyType = argTypes[0];
+                key = args[0];
+            }
+            else
+            {
+                keyType = args.Length == 1 ? "System.ValueTuple<string>" : "(" + string.Join(", ", argTypes) + ")";
+                key = args.Length == 1 ? "System.ValueTuple.Create(" + args[0] + ")" : "(" + string.Join(", ", args) + ")";
+            }
+            string cacheType = "PST_MemoCache<" + keyType + ", " + returnType + ">";
+
+            output.Append(output.CurrentTab).Append("private static readonly ").Append(cacheType).Append(' ').Append(cacheName)
+                .Append(" = new ").Append(cacheType).Append('(').Append(CodeUtil.ConvertStringValueToCode(funcDef.Name)).Append(", ").Append(funcDef.MemoizeMaxEntries).Append(");\n\n");
+            output.Append(output.CurrentTab).Append("public ");
+            if (isStatic) output.Append("static ");
+            output.Append(returnType).Append(' ').Append(funcDef.Name).Append('(');
+            for (int i = 0; i < args.Length; ++i)
+            {
+                if (i > 0) output.Append(", ");
+                output.Append(argTypes[i]).Append(' ').Append(args[i]);
+            }
+            output.Append(")\n");
+            output.Append(output.CurrentTab).Append("{\n");
+            output.Append(output.CurrentTab).Append('\t').Append(returnType).Append(" PST_value;\n");
+            output.Append(output.CurrentTab).Append("\tif (!").Append(cacheName).Append(".TryGet(").Append(key).Append(", out PST_value))\n");
+            output.Append(output.CurrentTab).Append("\t{\n");
+            output.Append(output.CurrentTab).Append("\t\tPST_value = ").Append(funcDef.Name).Append("__uncached(").Append(string.Join(", ", args)).Append(");\n");
+            output.Append(output.CurrentTab).Append("\t\t").Append(cacheName).Append(".Add(").Append(key).Append(", PST_value);\n");
+            output.Append(output.CurrentTab).Append("\t}\n");
+            output.Append(output.CurrentTab).Append("\treturn PST_value;\n");
+            output.Append(output.CurrentTab).Append("}\n\n");
+            this.GenerateCodeForFunction(output, GetUncachedCopy(funcDef), isStatic);
+
+            output.MarkFeatureAsBeingUsed("HELPER:PST_MemoCache");
+            output.MarkFeatureAsBeingUsed("HELPER:PST_getMemoStats");
+        }
+
         public override void GenerateCodeForFunction(TranspilerContext output, FunctionDefinition funcDef, bool isStatic)
         {
             PType returnType = funcDef.ReturnType;
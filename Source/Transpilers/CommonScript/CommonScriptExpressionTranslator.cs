@@ -195,6 +195,8 @@ namespace Pastel.Transpilers.CommonScript
 
         public override StringBuffer TranslateExtensibleCallbackInvoke(Expression name, Expression argsArray)
         {
+            this.MarkHelperAsUsed("PST_ExtCallbacks");
+
             return StringBuffer
                 .Of("PST_ExtCallbacks.ext[")
                 .Push(this.TranslateExpression(name))
@@ -145,7 +145,7 @@ namespace Pastel.Transpilers
 
             sb.TabDepth++;
 
-            foreach (SwitchStatement.SwitchChunk chunk in switchStatement.Chunks)
+            foreach (SwitchStatement.SwitchChunk chunk in this.GetChunksInProfileOrder(switchStatement))
             {
                 for (int i = 0; i < chunk.Cases.Length; ++i)
                 {
@@ -173,6 +173,14 @@ namespace Pastel.Transpilers
             sb.Append("}\n");
         }
 
+        public override void TranslateProfileCounter(TranspilerContext sb, ProfileCounter counter)
+        {
+            sb.Append(sb.CurrentTab);
+            sb.Append("PST_profileCounters[");
+            sb.Append(counter.Slot);
+            sb.Append("]++;\n");
+        }
+
         public override void TranslateWhileLoop(TranspilerContext sb, WhileLoop whileLoop)
         {
             sb.Append(sb.CurrentTab);
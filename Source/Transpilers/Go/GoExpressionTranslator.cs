@@ -86,6 +86,7 @@ namespace Pastel.Transpilers.Go
                 case "double": defaultVal = "0.0"; break;
                 default: defaultVal = "nil"; break;
             }
+            this.MarkHelperAsUsed("PST_newList");
             return StringBuffer
                 .Of("PST_newList(")
                 .Push(this.TranslateExpression(lengthExpression))
@@ -107,6 +108,7 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateBase64ToBytes(Expression base64String)
         {
+            this.MarkHelperAsUsed("PST_base64ToBytes");
             this.MarkFeatureAsUsed("IMPORT:encoding/base64");
             return StringBuffer
                 .Of("PST_base64ToBytes(")
@@ -135,6 +137,8 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateBoolToString(Expression value)
         {
+            this.MarkHelperAsUsed("PST_boolToStr");
+
             return StringBuffer
                 .Of("PST_boolToStr(")
                 .Push(this.TranslateExpression(value))
@@ -144,6 +148,7 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateBytesToBase64(Expression byteArr)
         {
+            this.MarkHelperAsUsed("PST_bytesToBase64");
             this.MarkFeatureAsUsed("IMPORT:encoding/base64");
             return StringBuffer
                 .Of("PST_bytesToBase64(")
@@ -172,6 +177,8 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateCharToString(Expression charValue)
         {
+            this.MarkHelperAsUsed("PST_charToStr");
+
             return StringBuffer
                 .Of("PST_charToStr(")
                 .Push(this.TranslateExpression(charValue))
@@ -221,6 +228,7 @@ namespace Pastel.Transpilers.Go
         public override StringBuffer TranslateDictionaryContainsKey(Expression dictionary, Expression key)
         {
             bool isString = this.IsStringDict(dictionary);
+            this.MarkHelperAsUsed(isString ? "PST_dictContainsStr" : "PST_dictContainsInt");
             return StringBuffer
                 .Of(isString ? "PST_dictContainsStr(" : "PST_dictContainsInt(")
                 .Push(this.TranslateExpression(dictionary))
@@ -234,6 +242,7 @@ namespace Pastel.Transpilers.Go
         {
             bool isString = this.IsStringDict(dictionary);
             PType valueType = dictionary.ResolvedType.Generics[1];
+            this.MarkHelperAsUsed(isString ? "PST_dictGetStr" : "PST_dictGetInt");
             StringBuffer sb = StringBuffer
                 .Of(isString ? "PST_dictGetStr(" : "PST_dictGetInt(")
                 .Push(this.TranslateExpression(dictionary))
@@ -253,6 +262,7 @@ namespace Pastel.Transpilers.Go
         public override StringBuffer TranslateDictionaryKeys(Expression dictionary)
         {
             bool isString = this.IsStringDict(dictionary);
+            this.MarkHelperAsUsed(isString ? "PST_dictKeysStr" : "PST_dictKeysInt");
             return StringBuffer
                 .Of(isString ? "PST_dictKeysStr(" : "PST_dictKeysInt(")
                 .Push(this.TranslateExpression(dictionary))
@@ -262,6 +272,7 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateDictionaryNew(PType keyType, PType valueType)
         {
+            this.MarkHelperAsUsed(keyType.IsString ? "PST_newDictStr" : "PST_newDictInt");
             return StringBuffer
                 .Of(keyType.IsString ? "PST_newDictStr()" : "PST_newDictInt()")
                 .WithTightness(ExpressionTightness.ATOMIC);
@@ -270,6 +281,7 @@ namespace Pastel.Transpilers.Go
         public override StringBuffer TranslateDictionaryRemove(Expression dictionary, Expression key)
         {
             bool isString = this.IsStringDict(dictionary);
+            this.MarkHelperAsUsed(isString ? "PST_dictRemoveStr" : "PST_dictRemoveInt");
             return StringBuffer
                 .Of(isString ? "PST_dictRemoveStr(" : "PST_dictRemoveInt(")
                 .Push(this.TranslateExpression(dictionary))
@@ -284,6 +296,7 @@ namespace Pastel.Transpilers.Go
         public override StringBuffer TranslateDictionarySet(Expression dictionary, Expression key, Expression value)
         {
             bool isString = this.IsStringDict(dictionary);
+            this.MarkHelperAsUsed(isString ? "PST_dictSetStr" : "PST_dictSetInt");
             return StringBuffer
                 .Of(isString ? "PST_dictSetStr(" : "PST_dictSetInt")
                 .Push(this.TranslateExpression(dictionary))
@@ -307,11 +320,22 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateDictionaryValues(Expression dictionary)
         {
-            bool isString = this.IsStringDict(dictionary);
+            return this.TranslateDictionaryValuesImpl(dictionary, true);
+        }
+
+        public override StringBuffer TranslateDictionaryValuesWithoutCopy(Expression dictionary)
+        {
+            return this.TranslateDictionaryValuesImpl(dictionary, false);
+        }
+
+        private StringBuffer TranslateDictionaryValuesImpl(Expression dictionary, bool copy)
+        {
+            this.MarkHelperAsUsed("PST_wrapArray");
+
             return StringBuffer
                 .Of("PST_wrapArray(")
                 .Push(this.TranslateExpression(dictionary).EnsureTightness(ExpressionTightness.SUFFIX_SEQUENCE))
-                .Push(".v, true)")
+                .Push(copy ? ".v, true)" : ".v, false)")
                 .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
         }
 
@@ -348,6 +372,8 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateExtensibleCallbackInvoke(Expression name, Expression argsArray)
         {
+            this.MarkHelperAsUsed("PST_ExtCallbacks");
+
             return StringBuffer.Of("PST_ExtCallbacks[")
                 .Push(this.TranslateExpressionStringUnwrap(name, false))
                 .Push("](")
@@ -365,6 +391,7 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateFloatToString(Expression floatExpr)
         {
+            this.MarkHelperAsUsed("PST_floatToStr");
             this.MarkFeatureAsUsed("IMPORT:strconv");
             this.MarkFeatureAsUsed("IMPORT:strings");
             return StringBuffer.Of("PST_floatToStr(")
@@ -402,6 +429,7 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateIntToString(Expression integer)
         {
+            this.MarkHelperAsUsed("PST_intToStr");
             this.MarkFeatureAsUsed("IMPORT:strconv");
 
             return StringBuffer.Of("PST_intToStr(")
@@ -427,6 +455,8 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateListClear(Expression list)
         {
+            this.MarkHelperAsUsed("PST_listClear");
+
             return StringBuffer.Of("PST_listClear(")
                 .Push(this.TranslateExpression(list))
                 .Push(")")
@@ -435,6 +465,8 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateListConcat(Expression list, Expression items)
         {
+            this.MarkHelperAsUsed("PST_listConcat");
+
             return StringBuffer.Of("PST_listConcat(")
                 .Push(this.TranslateExpression(list))
                 .Push(", ")
@@ -460,6 +492,7 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateListJoinStrings(Expression list, Expression sep)
         {
+            this.MarkHelperAsUsed("PST_listJoin");
             this.MarkFeatureAsUsed("IMPORT:strings");
             return StringBuffer.Of("PST_listJoin(")
                 .Push(this.TranslateExpression(list))
@@ -471,6 +504,8 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateListNew(PType type)
         {
+            this.MarkHelperAsUsed("PST_newList");
+
             return StringBuffer
                 .Of("PST_newList(0, nil)")
                 .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
@@ -524,6 +559,7 @@ namespace Pastel.Transpilers.Go
             }
             else
             {
+                this.MarkHelperAsUsed("PST_mathAbsInt");
                 funcName = "PST_mathAbsInt";
             }
 
@@ -733,6 +769,7 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateSortedCopyOfIntArray(Expression intArray)
         {
+            this.MarkHelperAsUsed("PST_SortedIntArrayCopy");
             this.MarkFeatureAsUsed("IMPORT:sort");
             return StringBuffer
                 .Of("PST_SortedIntArrayCopy(")
@@ -740,6 +777,16 @@ namespace Pastel.Transpilers.Go
                 .Push(")");
         }
 
+        public override StringBuffer TranslateSortIntArrayInPlace(Expression intArray)
+        {
+            this.MarkHelperAsUsed("PST_SortIntArrayInPlace");
+            this.MarkFeatureAsUsed("IMPORT:sort");
+            return StringBuffer
+                .Of("PST_SortIntArrayInPlace(")
+                .Push(this.TranslateExpression(intArray))
+                .Push(")");
+        }
+
         public override StringBuffer TranslateSortedCopyOfStringArray(Expression stringArray)
         {
             throw new NotImplementedException();
@@ -752,6 +799,8 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateStringCharAt(Expression str, Expression index)
         {
+            this.MarkHelperAsUsed("PST_strGetUChars");
+
             return StringBuffer.Of("PST_strGetUChars(")
                 .Push(this.TranslateExpression(str))
                 .Push(")[")
@@ -762,6 +811,8 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateStringCharCodeAt(Expression str, Expression index)
         {
+            this.MarkHelperAsUsed("PST_strGetUChars");
+
             return StringBuffer.Of("PST_strGetUChars(")
                 .Push(this.TranslateExpression(str))
                 .Push(")[")
@@ -785,6 +836,7 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateStringConcatAll(Expression[] strings)
         {
+            this.MarkHelperAsUsed("PST_strJoin");
             this.MarkFeatureAsUsed("IMPORT:strings");
 
             StringBuffer sb = StringBuffer.Of("PST_strJoin([]*pstring{");
@@ -800,6 +852,8 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateStringConcatPair(Expression strLeft, Expression strRight)
         {
+            this.MarkHelperAsUsed("PST_str");
+
             return StringBuffer
                 .Of("PST_str(")
                 .Push(this.TranslateExpressionStringUnwrap(strLeft, false).EnsureTightness(ExpressionTightness.ADDITION))
@@ -811,6 +865,8 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateStringConstant(string value)
         {
+            this.MarkHelperAsUsed("PST_str");
+
             return StringBuffer
                 .Of("PST_str(")
                 .Push(CodeUtil.ConvertStringValueToCode(value))
@@ -844,6 +900,8 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateStringEquals(Expression left, Expression right)
         {
+            this.MarkHelperAsUsed("PST_strEq");
+
             StringBuffer leftBuf = this.TranslateExpression(left)
                 .EnsureTightness(ExpressionTightness.EQUALITY);
             StringBuffer rightBuf = this.TranslateExpression(right)
@@ -859,6 +917,8 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateStringFromCharCode(Expression charCode)
         {
+            this.MarkHelperAsUsed("PST_strFromCharCode");
+
             return StringBuffer.Of("PST_strFromCharCode(")
                 .Push(this.TranslateExpression(charCode))
                 .Push(")")
@@ -867,6 +927,8 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateStringIndexOf(Expression haystack, Expression needle)
         {
+            this.MarkHelperAsUsed("PST_strFind");
+
             return StringBuffer
                 .Of("PST_strFind(")
                 .Push(this.TranslateExpression(haystack))
@@ -878,6 +940,8 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateStringIndexOfWithStart(Expression haystack, Expression needle, Expression startIndex)
         {
+            this.MarkHelperAsUsed("PST_strFind");
+
             return StringBuffer
                 .Of("PST_strFind(")
                 .Push(this.TranslateExpression(haystack))
@@ -891,6 +955,8 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateStringLastIndexOf(Expression haystack, Expression needle)
         {
+            this.MarkHelperAsUsed("PST_strFind");
+
             return StringBuffer
                 .Of("PST_strFind(")
                 .Push(this.TranslateExpression(haystack))
@@ -902,6 +968,8 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateStringLength(Expression str)
         {
+            this.MarkHelperAsUsed("PST_strLen");
+
             return StringBuffer
                 .Of("PST_strLen(")
                 .Push(this.TranslateExpression(str))
@@ -911,6 +979,7 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateStringReplace(Expression haystack, Expression needle, Expression newNeedle)
         {
+            this.MarkHelperAsUsed("PST_strReplace");
             this.MarkFeatureAsUsed("IMPORT:strings");
             return StringBuffer
                 .Of("PST_strReplace(")
@@ -924,6 +993,8 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateStringReverse(Expression str)
         {
+            this.MarkHelperAsUsed("PST_strReverse");
+
             return StringBuffer
                 .Of("PST_strReverse(")
                 .Push(this.TranslateExpressionStringUnwrap(str, false))
@@ -933,6 +1004,7 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateStringSplit(Expression haystack, Expression needle)
         {
+            this.MarkHelperAsUsed("PST_strSplit");
             this.MarkFeatureAsUsed("IMPORT:strings");
             return StringBuffer
                 .Of("PST_strSplit(")
@@ -956,6 +1028,8 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateStringSubstring(Expression str, Expression start, Expression length)
         {
+            this.MarkHelperAsUsed("PST_substr");
+
             return StringBuffer.Of("PST_substr(")
                 .Push(this.TranslateExpression(str))
                 .Push(", ")
@@ -968,6 +1042,8 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateStringSubstringIsEqualTo(Expression haystack, Expression startIndex, Expression needle)
         {
+            this.MarkHelperAsUsed("PST_strSubstringEquals");
+
             return StringBuffer
                 .Of("PST_strSubstringEquals(")
                 .Push(this.TranslateExpression(haystack))
@@ -981,6 +1057,7 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateStringToLower(Expression str)
         {
+            this.MarkHelperAsUsed("PST_strLower");
             this.MarkFeatureAsUsed("IMPORT:strings");
             return StringBuffer.Of("PST_strLower(")
                 .Push(this.TranslateExpression(str))
@@ -990,6 +1067,7 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateStringToUpper(Expression str)
         {
+            this.MarkHelperAsUsed("PST_strUpper");
             this.MarkFeatureAsUsed("IMPORT:strings");
             return StringBuffer.Of("PST_strUpper(")
                 .Push(this.TranslateExpression(str))
@@ -1004,6 +1082,8 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateStringToUtf8Bytes(Expression str)
         {
+            this.MarkHelperAsUsed("PST_strToUtf8Bytes");
+
             return StringBuffer
                 .Of("PST_strToUtf8Bytes(")
                 .Push(this.TranslateExpressionStringUnwrap(str, false))
@@ -1013,6 +1093,7 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateStringTrim(Expression str)
         {
+            this.MarkHelperAsUsed("PST_strTrim");
             this.MarkFeatureAsUsed("IMPORT:strings");
             return StringBuffer
                 .Of("PST_strTrim(")
@@ -1023,6 +1104,7 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateStringTrimEnd(Expression str)
         {
+            this.MarkHelperAsUsed("PST_strTrim");
             this.MarkFeatureAsUsed("IMPORT:strings");
             return StringBuffer
                 .Of("PST_strTrim(")
@@ -1033,6 +1115,7 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateStringTrimStart(Expression str)
         {
+            this.MarkHelperAsUsed("PST_strTrim");
             this.MarkFeatureAsUsed("IMPORT:strings");
             return StringBuffer
                 .Of("PST_strTrim(")
@@ -1041,24 +1124,78 @@ namespace Pastel.Transpilers.Go
                 .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
         }
 
+        // A StringBuilder is a *strings.Builder. Values are written to it as Go strings so that no *pstring is
+        // allocated until the builder is converted.
         public override StringBuffer TranslateStringBuilderAdd(Expression sbInst, Expression obj)
         {
+            StringBuffer sb = this.TranslateExpression(sbInst).EnsureTightness(ExpressionTightness.SUFFIX_SEQUENCE);
+            switch (obj.ResolvedType.RootValue)
+            {
+                case "string":
+                    return sb
+                        .Push(".WriteString(")
+                        .Push(this.TranslateExpressionStringUnwrap(obj, false))
+                        .Push(")")
+                        .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
+
+                case "char":
+                    return sb
+                        .Push(".WriteRune(rune(")
+                        .Push(this.TranslateExpression(obj))
+                        .Push("))")
+                        .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
+
+                case "int":
+                    this.MarkFeatureAsUsed("IMPORT:strconv");
+                    return sb
+                        .Push(".WriteString(strconv.Itoa(")
+                        .Push(this.TranslateExpression(obj))
+                        .Push("))")
+                        .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
+
+                case "double":
+                    return sb
+                        .Push(".WriteString(*")
+                        .Push(this.TranslateFloatToString(obj))
+                        .Push(".str)")
+                        .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
+
+                case "bool":
+                    this.MarkFeatureAsUsed("IMPORT:strconv");
+                    return sb
+                        .Push(".WriteString(strconv.FormatBool(")
+                        .Push(this.TranslateExpression(obj))
+                        .Push("))")
+                        .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
+            }
             throw new NotImplementedException();
         }
 
         public override StringBuffer TranslateStringBuilderClear(Expression sbInst)
         {
-            throw new NotImplementedException();
+            return this.TranslateExpression(sbInst)
+                .EnsureTightness(ExpressionTightness.SUFFIX_SEQUENCE)
+                .Push(".Reset()")
+                .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
         }
 
         public override StringBuffer TranslateStringBuilderNew()
         {
-            throw new NotImplementedException();
+            this.MarkFeatureAsUsed("IMPORT:strings");
+            return StringBuffer
+                .Of("new(strings.Builder)")
+                .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
         }
 
         public override StringBuffer TranslateStringBuilderToString(Expression sbInst)
         {
-            throw new NotImplementedException();
+            this.MarkHelperAsUsed("PST_strBuilderToStr");
+            this.MarkFeatureAsUsed("IMPORT:strings");
+            return StringBuffer
+                .Of("PST_strBuilderToStr(")
+                .Push(this.TranslateExpression(sbInst))
+                .Push(")")
+                .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
         }
 
         public override StringBuffer TranslateStrongReferenceEquality(Expression left, Expression right)
@@ -1075,6 +1212,7 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateToCodeString(Expression str)
         {
+            this.MarkHelperAsUsed("PST_stringToCode");
             this.MarkFeatureAsUsed("IMPORT:encoding/json");
             return StringBuffer.Of("PST_stringToCode(")
                 .Push(this.TranslateExpressionStringUnwrap(str, false))
@@ -1089,6 +1227,8 @@ namespace Pastel.Transpilers.Go
 
         public override StringBuffer TranslateUtf8BytesToString(Expression bytes)
         {
+            this.MarkHelperAsUsed("PST_utf8BytesToStr");
+
             return StringBuffer
                 .Of("PST_utf8BytesToStr(")
                 .Push(this.TranslateExpression(bytes).EnsureTightness(ExpressionTightness.SUFFIX_SEQUENCE))
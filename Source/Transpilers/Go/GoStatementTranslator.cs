@@ -80,6 +80,14 @@ namespace Pastel.Transpilers.Go
         }
 
 
+        public override void TranslateProfileCounter(TranspilerContext sb, ProfileCounter counter)
+        {
+            sb.Append(sb.CurrentTab);
+            sb.Append("PST_profileCounters[");
+            sb.Append(counter.Slot);
+            sb.Append("]++\n");
+        }
+
         public override void TranslateVariableDeclaration(TranspilerContext sb, VariableDeclaration varDecl)
         {
             sb
@@ -17,6 +17,20 @@ namespace Pastel.Transpilers.Go
 
         public override string HelperCodeResourcePath { get { return "Transpilers/Go/PastelHelper.go"; } }
 
+        public override void GenerateCodeForProfileCounters(TranspilerContext sb, string[] slotNames)
+        {
+            sb.Append("var PST_profileNames = []string{");
+            sb.Append(string.Join(", ", slotNames.Select(name => CodeUtil.ConvertStringValueToCode(name))));
+            sb.Append("}\n");
+            sb.Append("var PST_profileCounters = make([]int, ");
+            sb.Append(slotNames.Length);
+            sb.Append(")\n");
+            sb.MarkFeatureAsBeingUsed("HELPER:PST_dumpProfile");
+            sb.MarkFeatureAsBeingUsed("IMPORT:os");
+            sb.MarkFeatureAsBeingUsed("IMPORT:strconv");
+            sb.MarkFeatureAsBeingUsed("IMPORT:strings");
+        }
+
         public override void GenerateCodeForFunction(TranspilerContext sb, FunctionDefinition funcDef, bool isStatic)
         {
             sb
@@ -44,6 +58,39 @@ namespace Pastel.Transpilers.Go
             sb.Append("}\n\n");
         }
 
+        public override void GenerateCodeForMemoizedFunction(TranspilerContext sb, FunctionDefinition funcDef, bool isStatic)
+        {
+            string cacheName = "PST_memo_" + funcDef.Name;
+            string[] args = [.. funcDef.ArgNames.Select(arg => "v_" + arg.Value)];
+            string argList = string.Join(", ", args);
+            // Strings are pointers, so they're keyed by their value instead.
+            string[] keys = [.. args.Select((arg, i) => funcDef.ArgTypes[i].IsString ? "PST_memoStringKey(" + arg + ")" : arg)];
+            string key = keys.Length == 0 ? "0" : keys.Length == 1 ? keys[0] : "[" + keys.Length + "]any{" + string.Join(", ", keys) + "}";
+            string returnType = this.TypeTranspiler.TranslateType(funcDef.ReturnType);
+
+            sb.Append("var ").Append(cacheName).Append(" = PST_newMemoCache(").Append(CodeUtil.ConvertStringValueToCode(funcDef.Name)).Append(", ").Append(funcDef.MemoizeMaxEntries).Append(")\n\n");
+            sb.Append("func fn_").Append(funcDef.Name).Append('(');
+            for (int i = 0; i < args.Length; i++)
+            {
+                if (i > 0) sb.Append(", ");
+                sb.Append(args[i]).Append(' ').Append(this.TypeTranspiler.TranslateType(funcDef.ArgTypes[i]));
+            }
+            sb.Append(") ").Append(returnType).Append(" {\n");
+            sb.Append("\tkey := ").Append(key).Append('\n');
+            sb.Append("\tvalue, ok := ").Append(cacheName).Append(".get(key)\n");
+            sb.Append("\tif !ok {\n");
+            sb.Append("\t\tvalue = fn_").Append(funcDef.Name).Append("__uncached(").Append(argList).Append(")\n");
+            sb.Append("\t\t").Append(cacheName).Append(".put(key, value)\n");
+            sb.Append("\t}\n");
+            sb.Append("\treturn value.(").Append(returnType).Append(")\n");
+            sb.Append("}\n\n");
+            this.GenerateCodeForFunction(sb, GetUncachedCopy(funcDef), isStatic);
+
+            sb.MarkFeatureAsBeingUsed("HELPER:PST_MemoCache");
+            sb.MarkFeatureAsBeingUsed("HELPER:PST_getMemoStats");
+            sb.MarkFeatureAsBeingUsed("IMPORT:container/list");
+        }
+
         public override void GenerateCodeForStruct(TranspilerContext sb, StructDefinition structDef)
         {
             sb
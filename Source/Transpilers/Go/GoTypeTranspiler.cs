@@ -15,6 +15,7 @@ namespace Pastel.Transpilers.Go
                 case "char": return "int";
                 case "string": return "*pstring";
                 case "object": return "any"; 
+                case "StringBuilder": return "*strings.Builder";
 
                 case "Array":
                 case "List":
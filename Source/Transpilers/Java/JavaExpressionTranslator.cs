@@ -125,6 +125,8 @@ namespace Pastel.Transpilers.Java
 
         public override StringBuffer TranslateBase64ToBytes(Expression base64String)
         {
+            this.MarkHelperAsUsed("PST_base64ToBytes");
+
             return StringBuffer
                 .Of("PST_base64ToBytes(")
                 .Push(this.TranslateExpression(base64String))
@@ -134,6 +136,8 @@ namespace Pastel.Transpilers.Java
 
         public override StringBuffer TranslateBase64ToString(Expression base64String)
         {
+            this.MarkHelperAsUsed("PST_base64ToString");
+
             return StringBuffer.Of("PST_base64ToString(")
                 .Push(this.TranslateExpression(base64String))
                 .Push(")")
@@ -142,6 +146,8 @@ namespace Pastel.Transpilers.Java
 
         public override StringBuffer TranslateBytesToBase64(Expression byteArr)
         {
+            this.MarkHelperAsUsed("PST_bytesToBase64");
+
             return StringBuffer
                 .Of("PST_bytesToBase64(")
                 .Push(this.TranslateExpression(byteArr))
@@ -306,6 +312,7 @@ namespace Pastel.Transpilers.Java
                 case "bool":
                 case "int":
                 case "double":
+                    this.MarkHelperAsUsed("PST_toArray_" + type.RootValue);
                     sb = StringBuffer
                         .Of("PST_toArray_")
                         .Push(type.RootValue)
@@ -353,6 +360,8 @@ namespace Pastel.Transpilers.Java
 
         public override StringBuffer TranslateExtensibleCallbackInvoke(Expression name, Expression argsArray)
         {
+            this.MarkHelperAsUsed("PST_ExtCallbacks");
+
             return StringBuffer
                 .Of("PST_ExtCallbacks.get(")
                 .Push(this.TranslateExpression(name))
@@ -381,6 +390,8 @@ namespace Pastel.Transpilers.Java
 
         public override StringBuffer TranslateIsValidInteger(Expression stringValue)
         {
+            this.MarkHelperAsUsed("PST_isValidInteger");
+
             return StringBuffer
                 .Of("PST_isValidInteger(")
                 .Push(TranslateExpression(stringValue))
@@ -408,6 +419,8 @@ namespace Pastel.Transpilers.Java
 
         public override StringBuffer TranslateListConcat(Expression list, Expression items)
         {
+            this.MarkHelperAsUsed("PST_concatLists");
+
             // Fun fact: this is actually not implemented. The only place that this is used is by Value.
             return StringBuffer
                 .Of("PST_concatLists(")
@@ -440,6 +453,8 @@ namespace Pastel.Transpilers.Java
 
         public override StringBuffer TranslateListJoinChars(Expression list)
         {
+            this.MarkHelperAsUsed("PST_joinChars");
+
             return StringBuffer
                 .Of("PST_joinChars(")
                 .Push(this.TranslateExpression(list))
@@ -449,6 +464,8 @@ namespace Pastel.Transpilers.Java
 
         public override StringBuffer TranslateListJoinStrings(Expression list, Expression sep)
         {
+            this.MarkHelperAsUsed("PST_joinList");
+
             return StringBuffer
                 .Of("PST_joinList(")
                 .Push(this.TranslateExpression(sep))
@@ -483,6 +500,7 @@ namespace Pastel.Transpilers.Java
                     .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
             }
 
+            this.MarkHelperAsUsed("PST_listPop");
             return StringBuffer
                 .Of("PST_listPop(")
                 .Push(this.TranslateExpression(list))
@@ -523,6 +541,8 @@ namespace Pastel.Transpilers.Java
 
         public override StringBuffer TranslateListShuffle(Expression list)
         {
+            this.MarkHelperAsUsed("PST_listShuffle");
+
             // This is currently only used and implemented by Value lists.
             return StringBuffer
                 .Of("PST_listShuffle(")
@@ -648,6 +668,8 @@ namespace Pastel.Transpilers.Java
 
         public override StringBuffer TranslateMultiplyList(Expression list, Expression n)
         {
+            this.MarkHelperAsUsed("PST_multiplyList");
+
             // TODO: this helper function is not actually implemented yet.
             return StringBuffer
                 .Of("PST_multiplyList(")
@@ -693,6 +715,8 @@ namespace Pastel.Transpilers.Java
 
         public override StringBuffer TranslateRandomFloat()
         {
+            this.MarkHelperAsUsed("PST_random");
+
             return StringBuffer
                 .Of("PST_random.nextDouble()")
                 .WithTightness(ExpressionTightness.ATOMIC);
@@ -700,6 +724,8 @@ namespace Pastel.Transpilers.Java
 
         public override StringBuffer TranslateSortedCopyOfIntArray(Expression intArray)
         {
+            this.MarkHelperAsUsed("PST_sortedCopyOfIntArray");
+
             return StringBuffer
                 .Of("PST_sortedCopyOfIntArray(")
                 .Push(this.TranslateExpression(intArray))
@@ -709,6 +735,8 @@ namespace Pastel.Transpilers.Java
 
         public override StringBuffer TranslateSortedCopyOfStringArray(Expression stringArray)
         {
+            this.MarkHelperAsUsed("PST_sortedCopyOfStringArray");
+
             return StringBuffer
                 .Of("PST_sortedCopyOfStringArray(")
                 .Push(this.TranslateExpression(stringArray))
@@ -716,6 +744,28 @@ namespace Pastel.Transpilers.Java
                 .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
         }
 
+        public override StringBuffer TranslateSortIntArrayInPlace(Expression intArray)
+        {
+            this.MarkHelperAsUsed("PST_sortIntArrayInPlace");
+
+            return StringBuffer
+                .Of("PST_sortIntArrayInPlace(")
+                .Push(this.TranslateExpression(intArray))
+                .Push(")")
+                .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
+        }
+
+        public override StringBuffer TranslateSortStringArrayInPlace(Expression stringArray)
+        {
+            this.MarkHelperAsUsed("PST_sortStringArrayInPlace");
+
+            return StringBuffer
+                .Of("PST_sortStringArrayInPlace(")
+                .Push(this.TranslateExpression(stringArray))
+                .Push(")")
+                .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
+        }
+
         public override StringBuffer TranslateStringAppend(Expression str1, Expression str2)
         {
             return this.TranslateExpression(str1)
@@ -872,6 +922,8 @@ namespace Pastel.Transpilers.Java
 
         public override StringBuffer TranslateStringReverse(Expression str)
         {
+            this.MarkHelperAsUsed("PST_reverseString");
+
             return StringBuffer
                 .Of("PST_reverseString(")
                 .Push(this.TranslateExpression(str))
@@ -881,6 +933,8 @@ namespace Pastel.Transpilers.Java
 
         public override StringBuffer TranslateStringSplit(Expression haystack, Expression needle)
         {
+            this.MarkHelperAsUsed("PST_literalStringSplit");
+
             return StringBuffer
                 .Of("PST_literalStringSplit(")
                 .Push(this.TranslateExpression(haystack))
@@ -914,6 +968,8 @@ namespace Pastel.Transpilers.Java
 
         public override StringBuffer TranslateStringSubstringIsEqualTo(Expression haystack, Expression startIndex, Expression needle)
         {
+            this.MarkHelperAsUsed("PST_checkStringInString");
+
             return StringBuffer
                 .Of("PST_checkStringInString(")
                 .Push(this.TranslateExpression(haystack))
@@ -948,6 +1004,8 @@ namespace Pastel.Transpilers.Java
 
         public override StringBuffer TranslateStringToUtf8Bytes(Expression str)
         {
+            this.MarkHelperAsUsed("PST_stringToUtf8Bytes");
+
             return StringBuffer
                 .Of("PST_stringToUtf8Bytes(")
                 .Push(this.TranslateExpression(str))
@@ -965,6 +1023,8 @@ namespace Pastel.Transpilers.Java
 
         public override StringBuffer TranslateStringTrimEnd(Expression str)
         {
+            this.MarkHelperAsUsed("PST_trimSide");
+
             return StringBuffer
                 .Of("PST_trimSide(")
                 .Push(this.TranslateExpression(str))
@@ -974,6 +1034,8 @@ namespace Pastel.Transpilers.Java
 
         public override StringBuffer TranslateStringTrimStart(Expression str)
         {
+            this.MarkHelperAsUsed("PST_trimSide");
+
             return StringBuffer
                 .Of("PST_trimSide(")
                 .Push(this.TranslateExpression(str))
@@ -1017,6 +1079,8 @@ namespace Pastel.Transpilers.Java
 
         public override StringBuffer TranslateToCodeString(Expression str)
         {
+            this.MarkHelperAsUsed("PST_toCodeString");
+
             return StringBuffer
                 .Of("PST_toCodeString(")
                 .Push(this.TranslateExpression(str))
@@ -1026,6 +1090,8 @@ namespace Pastel.Transpilers.Java
 
         public override StringBuffer TranslateTryParseFloat(Expression stringValue, Expression floatOutList)
         {
+            this.MarkHelperAsUsed("PST_parseFloatOrReturnNull");
+
             return StringBuffer
                 .Of("PST_parseFloatOrReturnNull(")
                 .Push(this.TranslateExpression(floatOutList))
@@ -18,6 +18,17 @@ namespace Pastel.Transpilers.Java
 
         public override string HelperCodeResourcePath { get { return "Transpilers/Java/PastelHelper.java"; } }
 
+        public override void GenerateCodeForProfileCounters(TranspilerContext sb, string[] slotNames)
+        {
+            sb.Append("private static final String[] PST_profileNames = new String[] { ");
+            sb.Append(string.Join(", ", slotNames.Select(name => CodeUtil.ConvertStringValueToCode(name))));
+            sb.Append(" };\n");
+            sb.Append("private static final long[] PST_profileCounters = new long[");
+            sb.Append(slotNames.Length);
+            sb.Append("];\n");
+            sb.MarkFeatureAsBeingUsed("HELPER:PST_dumpProfile");
+        }
+
         private JavaTypeTranspiler JavaTypeTranspiler { get { return (JavaTypeTranspiler)TypeTranspiler; } }
 
         public override void GenerateCodeForFunction(TranspilerContext sb, FunctionDefinition funcDef, bool isStatic)
@@ -54,6 +65,36 @@ namespace Pastel.Transpilers.Java
             }
         }
 
+        public override void GenerateCodeForMemoizedFunction(TranspilerContext sb, FunctionDefinition funcDef, bool isStatic)
+        {
+            string cacheName = "PST_memo_" + funcDef.Name;
+            string[] args = [.. funcDef.ArgNames.Select(arg => arg.Value)];
+            string argList = string.Join(", ", args);
+            string key = args.Length == 0 ? "0" : args.Length == 1 ? args[0] : "Arrays.asList(" + argList + ")";
+
+            sb.Append(sb.CurrentTab).Append("private static final PST_MemoCache ").Append(cacheName).Append(" = new PST_MemoCache(")
+                .Append(CodeUtil.ConvertStringValueToCode(funcDef.Name)).Append(", ").Append(funcDef.MemoizeMaxEntries).Append(");\n\n");
+            sb.Append(sb.CurrentTab).Append("public static ").Append(this.TypeTranspiler.TranslateType(funcDef.ReturnType)).Append(' ').Append(funcDef.Name).Append('(');
+            for (int i = 0; i < args.Length; ++i)
+            {
+                if (i > 0) sb.Append(", ");
+                sb.Append(this.TypeTranspiler.TranslateType(funcDef.ArgTypes[i])).Append(' ').Append(args[i]);
+            }
+            sb.Append(") {\n");
+            sb.Append(sb.CurrentTab).Append("\tObject PST_key = ").Append(key).Append(";\n");
+            sb.Append(sb.CurrentTab).Append("\tObject PST_value = ").Append(cacheName).Append(".lookup(PST_key);\n");
+            sb.Append(sb.CurrentTab).Append("\tif (PST_value == PST_MemoCache.MISS) {\n");
+            sb.Append(sb.CurrentTab).Append("\t\tPST_value = ").Append(funcDef.Name).Append("__uncached(").Append(argList).Append(");\n");
+            sb.Append(sb.CurrentTab).Append("\t\t").Append(cacheName).Append(".put(PST_key, PST_value);\n");
+            sb.Append(sb.CurrentTab).Append("\t}\n");
+            sb.Append(sb.CurrentTab).Append("\treturn (").Append(this.JavaTypeTranspiler.TranslateJavaNestedType(funcDef.ReturnType)).Append(") PST_value;\n");
+            sb.Append(sb.CurrentTab).Append("}\n\n");
+            this.GenerateCodeForFunction(sb, GetUncachedCopy(funcDef), isStatic);
+
+            sb.MarkFeatureAsBeingUsed("HELPER:PST_MemoCache");
+            sb.MarkFeatureAsBeingUsed("HELPER:PST_getMemoStats");
+        }
+
         public override void GenerateCodeForStruct(TranspilerContext sb, StructDefinition structDef)
         {
             string[] names = structDef.FieldNames.Select(token => token.Value).ToArray();
@@ -19,11 +19,13 @@ namespace Pastel.Transpilers.JavaScript
 
         private void GenerateFunctionImplementation(Dictionary<string, string> filesOut, PastelContext ctx, ProjectConfig config, string funcCode)
         {
-            funcCode = this.WrapFinalExportedCode(funcCode, ctx.GetCompiler().GetFunctionDefinitions());
+            FunctionDefinition[] functions = ctx.GetCompiler().GetFunctionDefinitions();
+            bool hasMemoizedFunctions = functions.Any(fd => fd.MemoizeMaxEntries > 0);
+            funcCode = this.WrapFinalExportedCode(funcCode, functions, ctx.Instrument, hasMemoizedFunctions);
             filesOut["@FUNC_FILE"] = funcCode;
         }
 
-        private string WrapFinalExportedCode(string code, FunctionDefinition[] functions)
+        private string WrapFinalExportedCode(string code, FunctionDefinition[] functions, bool isInstrumented, bool hasMemoizedFunctions)
         {
             // TODO: public annotation to only export certain functions.
 
@@ -31,6 +33,8 @@ namespace Pastel.Transpilers.JavaScript
             // is the only important thing to assign it to the proper external alias.
             StringBuilder sb = new StringBuilder();
             sb.Append("const [PASTEL_regCallback");
+            if (isInstrumented) sb.Append(", PASTEL_dumpProfile");
+            if (hasMemoizedFunctions) sb.Append(", PASTEL_getMemoStats");
             string[] funcNames = functions
                 .Select(fd => fd.Name)
                 .OrderBy(n => n)
@@ -44,6 +48,8 @@ namespace Pastel.Transpilers.JavaScript
             sb.Append(code);
             sb.Append('\n');
             sb.Append("return [PST$registerExtensibleCallback");
+            if (isInstrumented) sb.Append(", PST$dumpProfile");
+            if (hasMemoizedFunctions) sb.Append(", PST$getMemoStats");
             for (int i = 0; i < funcNames.Length; i++)
             {
                 sb.Append(", $");
@@ -50,6 +50,7 @@ namespace Pastel.Transpilers.JavaScript
                 default: defaultVal = "null"; break;
             }
 
+            this.MarkHelperAsUsed("PST$createNewArray");
             return StringBuffer
                 .Of("PST$createNewArray(")
                 .Push(this.TranslateExpression(lengthExpression))
@@ -71,6 +72,8 @@ namespace Pastel.Transpilers.JavaScript
 
         public override StringBuffer TranslateBase64ToBytes(Expression base64String)
         {
+            this.MarkHelperAsUsed("PST$b64ToBytes");
+
             return StringBuffer.Of("PST$b64ToBytes(")
                 .Push(this.TranslateExpression(base64String))
                 .Push(")")
@@ -79,6 +82,8 @@ namespace Pastel.Transpilers.JavaScript
 
         public override StringBuffer TranslateBase64ToString(Expression base64String)
         {
+            this.MarkHelperAsUsed("PST$b64ToBytes");
+
             return StringBuffer.Of("new TextDecoder().decode(new Uint8Array(PST$b64ToBytes(")
                 .Push(this.TranslateExpression(base64String))
                 .Push(")))")
@@ -87,6 +92,8 @@ namespace Pastel.Transpilers.JavaScript
 
         public override StringBuffer TranslateBytesToBase64(Expression byteArr)
         {
+            this.MarkHelperAsUsed("PST$bytesToB64");
+
             return StringBuffer
                 .Of("PST$bytesToB64(")
                 .Push(this.TranslateExpression(byteArr))
@@ -163,6 +170,7 @@ namespace Pastel.Transpilers.JavaScript
         public override StringBuffer TranslateDictionaryKeys(Expression dictionary)
         {
             bool isIntKeys = dictionary.ResolvedType.Generics[0].IsInteger;
+            if (isIntKeys) this.MarkHelperAsUsed("PST$Object_intKeys");
             return StringBuffer
                 .Of(isIntKeys ? "PST$Object_intKeys(" : "Object.keys(")
                 .Push(this.TranslateExpression(dictionary))
@@ -234,6 +242,8 @@ namespace Pastel.Transpilers.JavaScript
 
         public override StringBuffer TranslateExtensibleCallbackInvoke(Expression name, Expression argsArray)
         {
+            this.MarkHelperAsUsed("PST_ExtCallbacks");
+
             return StringBuffer
                 .Of("PST$extCallbacks[")
                 .Push(this.TranslateExpression(name))
@@ -245,6 +255,8 @@ namespace Pastel.Transpilers.JavaScript
 
         public override StringBuffer TranslateFloatToString(Expression floatExpr)
         {
+            this.MarkHelperAsUsed("PST$floatToStr");
+
             return StringBuffer.Of("PST$floatToStr(")
                 .Push(this.TranslateExpression(floatExpr))
                 .Push(")")
@@ -280,6 +292,8 @@ namespace Pastel.Transpilers.JavaScript
 
         public override StringBuffer TranslateListClear(Expression list)
         {
+            this.MarkHelperAsUsed("PST$clearList");
+
             return StringBuffer
                 .Of("PST$clearList(")
                 .Push(this.TranslateExpression(list))
@@ -382,6 +396,8 @@ namespace Pastel.Transpilers.JavaScript
 
         public override StringBuffer TranslateListShuffle(Expression list)
         {
+            this.MarkHelperAsUsed("PST$shuffle");
+
             return StringBuffer.Of("PST$shuffle(")
                 .Push(this.TranslateExpression(list))
                 .Push(")")
@@ -398,8 +414,6 @@ namespace Pastel.Transpilers.JavaScript
 
         public override StringBuffer TranslateListToArray(Expression list)
         {
-            // TODO: go through and figure out which list to array conversions are necessary to copy and which ones are just ensuring that the type is compatible
-            // For example, JS and Python can just no-op in situations where a throwaway list builder is being made.
             return StringBuffer
                 .Of("[...(")
                 .Push(this.TranslateExpression(list))
@@ -407,6 +421,11 @@ namespace Pastel.Transpilers.JavaScript
                 .WithTightness(ExpressionTightness.ATOMIC);
         }
 
+        public override StringBuffer TranslateListToArrayWithoutCopy(Expression list)
+        {
+            return this.TranslateExpression(list);
+        }
+
         public override StringBuffer TranslateMathAbs(Expression num)
         {
             return StringBuffer
@@ -512,6 +531,8 @@ namespace Pastel.Transpilers.JavaScript
 
         public override StringBuffer TranslateMultiplyList(Expression list, Expression n)
         {
+            this.MarkHelperAsUsed("PST$multiplyList");
+
             return StringBuffer
                 .Of("PST$multiplyList(")
                 .Push(this.TranslateExpression(list))
@@ -556,6 +577,8 @@ namespace Pastel.Transpilers.JavaScript
 
         public override StringBuffer TranslatePrintStdErr(Expression value)
         {
+            this.MarkHelperAsUsed("PST$stderr");
+
             return StringBuffer
                 .Of("PST$stderr(")
                 .Push(this.TranslateExpression(value))
@@ -565,6 +588,8 @@ namespace Pastel.Transpilers.JavaScript
 
         public override StringBuffer TranslatePrintStdOut(Expression value)
         {
+            this.MarkHelperAsUsed("PST$stdout");
+
             return StringBuffer
                 .Of("PST$stdout(")
                 .Push(this.TranslateExpression(value))
@@ -581,6 +606,8 @@ namespace Pastel.Transpilers.JavaScript
 
         public override StringBuffer TranslateSortedCopyOfIntArray(Expression intArray)
         {
+            this.MarkHelperAsUsed("PST$sortedCopyOfArray");
+
             return StringBuffer
                 .Of("PST$sortedCopyOfArray(")
                 .Push(this.TranslateExpression(intArray))
@@ -590,6 +617,8 @@ namespace Pastel.Transpilers.JavaScript
 
         public override StringBuffer TranslateSortedCopyOfStringArray(Expression stringArray)
         {
+            this.MarkHelperAsUsed("PST$sortedCopyOfArray");
+
             return StringBuffer
                 .Of("PST$sortedCopyOfArray(")
                 .Push(this.TranslateExpression(stringArray))
@@ -597,6 +626,22 @@ namespace Pastel.Transpilers.JavaScript
                 .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
         }
 
+        public override StringBuffer TranslateSortIntArrayInPlace(Expression intArray)
+        {
+            return this.TranslateExpression(intArray)
+                .EnsureTightness(ExpressionTightness.SUFFIX_SEQUENCE)
+                .Push(".sort((a, b) => a - b)")
+                .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
+        }
+
+        public override StringBuffer TranslateSortStringArrayInPlace(Expression stringArray)
+        {
+            return this.TranslateExpression(stringArray)
+                .EnsureTightness(ExpressionTightness.SUFFIX_SEQUENCE)
+                .Push(".sort()")
+                .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
+        }
+
         public override StringBuffer TranslateStringAppend(Expression str1, Expression str2)
         {
             return this.TranslateExpression(str1)
@@ -791,6 +836,8 @@ namespace Pastel.Transpilers.JavaScript
 
         public override StringBuffer TranslateStringSubstringIsEqualTo(Expression haystack, Expression startIndex, Expression needle)
         {
+            this.MarkHelperAsUsed("PST$checksubstring");
+
             return StringBuffer
                 .Of("PST$checksubstring(")
                 .Push(this.TranslateExpression(haystack))
@@ -819,6 +866,8 @@ namespace Pastel.Transpilers.JavaScript
 
         public override StringBuffer TranslateStringToUnicodeChars(Expression str)
         {
+            this.MarkHelperAsUsed("PST$toUnicode");
+
             return StringBuffer
                 .Of("PST$toUnicode(")
                 .Push(this.TranslateExpression(str))
@@ -828,6 +877,8 @@ namespace Pastel.Transpilers.JavaScript
 
         public override StringBuffer TranslateStringToUtf8Bytes(Expression str)
         {
+            this.MarkHelperAsUsed("PST$stringToUtf8Bytes");
+
             return StringBuffer
                 .Of("PST$stringToUtf8Bytes(")
                 .Push(this.TranslateExpression(str))
@@ -858,24 +909,39 @@ namespace Pastel.Transpilers.JavaScript
                 .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
         }
 
+        // A StringBuilder is an array of chunks that is joined when it is converted to a string.
         public override StringBuffer TranslateStringBuilderAdd(Expression sbInst, Expression obj)
         {
-            throw new NotImplementedException();
+            // join() already converts everything else the same way string concatenation does.
+            StringBuffer value = obj.ResolvedType.IsFloat
+                ? this.TranslateFloatToString(obj)
+                : this.TranslateExpression(obj);
+            return this.TranslateExpression(sbInst)
+                .EnsureTightness(ExpressionTightness.SUFFIX_SEQUENCE)
+                .Push(".push(")
+                .Push(value)
+                .Push(")")
+                .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
         }
 
         public override StringBuffer TranslateStringBuilderClear(Expression sbInst)
         {
-            throw new NotImplementedException();
+            return this.TranslateListClear(sbInst);
         }
 
         public override StringBuffer TranslateStringBuilderNew()
         {
-            throw new NotImplementedException();
+            return StringBuffer
+                .Of("[]")
+                .WithTightness(ExpressionTightness.ATOMIC);
         }
 
         public override StringBuffer TranslateStringBuilderToString(Expression sbInst)
         {
-            throw new NotImplementedException();
+            return this.TranslateExpression(sbInst)
+                .EnsureTightness(ExpressionTightness.SUFFIX_SEQUENCE)
+                .Push(".join('')")
+                .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
         }
 
         public override StringBuffer TranslateStrongReferenceEquality(Expression left, Expression right)
@@ -902,6 +968,8 @@ namespace Pastel.Transpilers.JavaScript
 
         public override StringBuffer TranslateTryParseFloat(Expression stringValue, Expression floatOutList)
         {
+            this.MarkHelperAsUsed("PST$floatParseHelper");
+
             return StringBuffer
                 .Of("PST$floatParseHelper(")
                 .Push(this.TranslateExpression(floatOutList))
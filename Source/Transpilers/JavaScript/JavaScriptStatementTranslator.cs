@@ -25,6 +25,14 @@ namespace Pastel.Transpilers.JavaScript
             sb.Append(";\n");
         }
 
+        public override void TranslateProfileCounter(TranspilerContext sb, ProfileCounter counter)
+        {
+            sb.Append(sb.CurrentTab);
+            sb.Append("PST$profileCounters[");
+            sb.Append(counter.Slot);
+            sb.Append("]++;\n");
+        }
+
         public override void TranslateVariableDeclaration(TranspilerContext sb, VariableDeclaration varDecl)
         {
             sb.Append(sb.CurrentTab);
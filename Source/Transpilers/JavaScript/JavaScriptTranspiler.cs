@@ -1,6 +1,7 @@
 ﻿using Pastel.Parser;
 using Pastel.Parser.ParseNodes;
 using System;
+using System.Linq;
 
 namespace Pastel.Transpilers.JavaScript
 {
@@ -20,6 +21,17 @@ namespace Pastel.Transpilers.JavaScript
 
         public override string HelperCodeResourcePath { get { return "Transpilers/JavaScript/PastelHelper.js"; } }
 
+        public override void GenerateCodeForProfileCounters(TranspilerContext sb, string[] slotNames)
+        {
+            sb.Append("let PST$profileNames = [");
+            sb.Append(string.Join(", ", slotNames.Select(name => CodeUtil.ConvertStringValueToCode(name))));
+            sb.Append("];\n");
+            sb.Append("let PST$profileCounters = new Array(");
+            sb.Append(slotNames.Length);
+            sb.Append(").fill(0);\n");
+            sb.MarkFeatureAsBeingUsed("HELPER:PST$dumpProfile");
+        }
+
         public override void GenerateCodeForFunction(TranspilerContext sb, FunctionDefinition funcDef, bool isStatic)
         {
             sb.Append("let ");
@@ -40,6 +52,46 @@ namespace Pastel.Transpilers.JavaScript
             sb.Append("};\n\n");
         }
 
+        public override void GenerateCodeForMemoizedFunction(TranspilerContext sb, FunctionDefinition funcDef, bool isStatic)
+        {
+            string cacheName = "PST$memo_" + funcDef.Name;
+            string[] args = [.. funcDef.ArgNames.Select(arg => this.transpilerCtx.WrapVariableName(arg.Value))];
+            string argList = string.Join(", ", args);
+            // Map keys are compared with SameValueZero, which treats 0 and -0 as the same double. Multiple arguments
+            // are joined into one string, with each one written so that different values never give the same text.
+            string key = args.Length == 0
+                ? "0"
+                : args.Length == 1 && !funcDef.ArgTypes[0].IsFloat
+                    ? args[0]
+                    : string.Join(" + \",\" + ", args.Select((arg, i) => GetMemoKeyPart(funcDef.ArgTypes[i], arg)));
+
+            sb.Append("let ").Append(cacheName).Append(" = PST$createMemoCache(").Append(CodeUtil.ConvertStringValueToCode(funcDef.Name)).Append(", ").Append(funcDef.MemoizeMaxEntries).Append(");\n\n");
+            sb.Append("let ").AppendVariableNameSafe(funcDef.Name).Append(" = function(").Append(argList).Append(") {\n");
+            sb.Append("\tlet key = ").Append(key).Append(";\n");
+            sb.Append("\tlet value = PST$memoGet(").Append(cacheName).Append(", key);\n");
+            sb.Append("\tif (value === undefined) {\n");
+            sb.Append("\t\tvalue = ").AppendVariableNameSafe(funcDef.Name + "__uncached").Append('(').Append(argList).Append(");\n");
+            sb.Append("\t\tPST$memoPut(").Append(cacheName).Append(", key, value);\n");
+            sb.Append("\t}\n");
+            sb.Append("\treturn value;\n");
+            sb.Append("};\n\n");
+            this.GenerateCodeForFunction(sb, GetUncachedCopy(funcDef), isStatic);
+
+            sb.MarkFeatureAsBeingUsed("HELPER:PST$createMemoCache");
+            sb.MarkFeatureAsBeingUsed("HELPER:PST$memoGet");
+            sb.MarkFeatureAsBeingUsed("HELPER:PST$memoPut");
+            sb.MarkFeatureAsBeingUsed("HELPER:PST$getMemoStats");
+        }
+
+        private static string GetMemoKeyPart(PType type, string arg)
+        {
+            // Quoting keeps strings (or null) from running into the separator. Numbers are already written as
+            // NaN, Infinity and -Infinity, but -0 is written as 0.
+            if (type.IsString || type.IsChar) return "JSON.stringify(" + arg + ")";
+            if (type.IsFloat) return "(Object.is(" + arg + ", -0) ? \"-0\" : " + arg + ")";
+            return arg;
+        }
+
         public override void GenerateCodeForStruct(TranspilerContext sb, StructDefinition structDef)
         {
             throw new InvalidOperationException();
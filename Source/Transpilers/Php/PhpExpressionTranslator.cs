@@ -212,6 +212,7 @@ namespace Pastel.Transpilers.Php
 
         public override StringBuffer TranslateDictionaryKeys(Expression dictionary)
         {
+            this.MarkHelperAsUsed("PST_dictGetKeys");
             return StringBuffer.Of("self::PST_dictGetKeys(")
                 .Push(this.TranslateExpression(dictionary))
                 .Push(", ")
@@ -302,6 +303,8 @@ namespace Pastel.Transpilers.Php
 
         public override StringBuffer TranslateIsValidInteger(Expression stringValue)
         {
+            this.MarkHelperAsUsed("PST_isValidInteger");
+
             return StringBuffer
                 .Of("self::PST_isValidInteger(")
                 .Push(this.TranslateExpression(stringValue))
@@ -410,6 +413,8 @@ namespace Pastel.Transpilers.Php
 
         public override StringBuffer TranslateListReverse(Expression list)
         {
+            this.MarkHelperAsUsed("PST_reverseArray");
+
             return StringBuffer
                 .Of("self::PST_reverseArray(")
                 .Push(this.TranslateExpression(list))
@@ -429,6 +434,7 @@ namespace Pastel.Transpilers.Php
                     .Push(this.TranslateExpression(value));
             }
 
+            this.MarkHelperAsUsed("PST_assignIndexHack");
             return StringBuffer
                 .Of("self::PST_assignIndexHack(")
                 .Push(this.TranslateExpression(list))
@@ -600,6 +606,8 @@ namespace Pastel.Transpilers.Php
 
         public override StringBuffer TranslateSortedCopyOfIntArray(Expression intArray)
         {
+            this.MarkHelperAsUsed("PST_sortedCopyOfIntArray");
+
             return StringBuffer
                 .Of("self::PST_sortedCopyOfIntArray(")
                 .Push(this.TranslateExpression(intArray))
@@ -609,6 +617,8 @@ namespace Pastel.Transpilers.Php
 
         public override StringBuffer TranslateSortedCopyOfStringArray(Expression stringArray)
         {
+            this.MarkHelperAsUsed("PST_sortedCopyOfStringArray");
+
             return StringBuffer
                 .Of("self::PST_sortedCopyOfStringArray(")
                 .Push(this.TranslateExpression(stringArray))
@@ -690,6 +700,8 @@ namespace Pastel.Transpilers.Php
 
         public override StringBuffer TranslateStringEndsWith(Expression haystack, Expression needle)
         {
+            this.MarkHelperAsUsed("PST_stringEndsWith");
+
             return StringBuffer
                 .Of("self::PST_stringEndsWith(")
                 .Push(this.TranslateExpression(haystack))
@@ -715,6 +727,8 @@ namespace Pastel.Transpilers.Php
 
         public override StringBuffer TranslateStringIndexOf(Expression haystack, Expression needle)
         {
+            this.MarkHelperAsUsed("PST_stringIndexOf");
+
             return StringBuffer
                 .Of("self::PST_stringIndexOf(")
                 .Push(this.TranslateExpression(haystack))
@@ -726,6 +740,8 @@ namespace Pastel.Transpilers.Php
 
         public override StringBuffer TranslateStringIndexOfWithStart(Expression haystack, Expression needle, Expression startIndex)
         {
+            this.MarkHelperAsUsed("PST_stringIndexOf");
+
             return StringBuffer
                 .Of("self::PST_stringIndexOf(")
                 .Push(this.TranslateExpression(haystack))
@@ -739,6 +755,8 @@ namespace Pastel.Transpilers.Php
 
         public override StringBuffer TranslateStringLastIndexOf(Expression haystack, Expression needle)
         {
+            this.MarkHelperAsUsed("PST_stringLastIndexOf");
+
             return StringBuffer
                 .Of("self::PST_stringLastIndexOf(")
                 .Push(this.TranslateExpression(haystack))
@@ -792,6 +810,8 @@ namespace Pastel.Transpilers.Php
 
         public override StringBuffer TranslateStringStartsWith(Expression haystack, Expression needle)
         {
+            this.MarkHelperAsUsed("PST_stringStartsWith");
+
             return StringBuffer
                 .Of("self::PST_stringStartsWith(")
                 .Push(this.TranslateExpression(haystack))
@@ -923,6 +943,8 @@ namespace Pastel.Transpilers.Php
 
         public override StringBuffer TranslateTryParseFloat(Expression stringValue, Expression floatOutList)
         {
+            this.MarkHelperAsUsed("PST_tryParseFloat");
+
             return StringBuffer
                 .Of("self::PST_tryParseFloat(")
                 .Push(this.TranslateExpression(stringValue))
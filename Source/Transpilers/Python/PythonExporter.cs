@@ -1,4 +1,5 @@
-﻿using System.Collections.Generic;
+﻿using Pastel.Parser.ParseNodes;
+using System.Collections.Generic;
 using System.Linq;
 
 namespace Pastel.Transpilers.Python
@@ -8,25 +9,219 @@ namespace Pastel.Transpilers.Python
         protected override string PreferredTab => "  ";
         protected override string PreferredNewline => "\n";
 
+        private const string HELPER_MODULE = "_pst_helpers";
+
         protected override Dictionary<string, string> GenerateFiles(ProjectConfig config, PastelContext context)
         {
+            if (config.PythonModuleLayout != PythonModuleLayout.SINGLE)
+            {
+                return this.GeneratePackageFiles(config, context);
+            }
+
             Dictionary<string, string> files = [];
 
             string userCode = context.GetCodeForFunctions();
 
-            string[] imports = [.. context.TranspilerContext.GetFeatures()
-                .Where(f => f.StartsWith("IMPORT:"))
-                .Select(f => f["IMPORT:".Length..])
-                .OrderBy(v => v)];
-
             files["@FUNC_FILE"] = string.Join('\n', [
-                .. imports.Select(imp => "import " + imp),
+                .. GetTypeHintHeader(context),
+                .. GetImports(context).Select(imp => "import " + imp),
                 "",
+                .. GetStructAliases(context),
                 userCode.Trim(),
                 "",
+                .. GetCallbackSlotBinding(context, userCode, GetCallbackSlotNames(context)),
             ]).Trim();
 
             return files;
         }
+
+        // The functions are split into modules of a package. The package's __init__ imports a module the first time
+        // one of its names is used, and so does each module for the functions it uses from other modules. After
+        // that, calls bind directly to the function.
+        private Dictionary<string, string> GeneratePackageFiles(ProjectConfig config, PastelContext context)
+        {
+            if (config.OutputFileFunctions == null || System.IO.Path.GetFileName(config.OutputFileFunctions) != "__init__.py")
+            {
+                throw new UserErrorException(
+                    "The output.functions-path of a Python target that sets python-modules must be the __init__.py file of a package.");
+            }
+            string packageDir = System.IO.Path.GetDirectoryName(config.OutputFileFunctions) ?? ".";
+
+            Dictionary<string, string> codeByFunction = context.GetCodeForFunctionsLookup();
+            string helperCode = context.GetCodeForHelpers();
+            string[] importLines = [.. GetImports(context).Select(imp => "import " + imp)];
+            string[] slotNames = GetCallbackSlotNames(context);
+            TranspilerContext ctx = context.TranspilerContext;
+
+            PythonModuleSplitter splitter = new PythonModuleSplitter(context.GetCompiler().GetFunctionDefinitions(), context.EntryPoints)
+                .Split(config.PythonModuleLayout);
+
+            Dictionary<string, string> files = [];
+            files[packageDir + "/" + HELPER_MODULE + ".py"] = string.Join('\n', [
+                .. GetTypeHintHeader(context),
+                .. importLines,
+                "",
+                .. GetStructAliases(context),
+                helperCode,
+            ]).Trim() + "\n";
+
+            List<string> moduleByName = [];
+            foreach (string name in GetHelperNames(helperCode))
+            {
+                moduleByName.Add("\t'" + name + "': '" + HELPER_MODULE + "',");
+            }
+
+            foreach (string moduleName in splitter.ModuleNames)
+            {
+                List<string> lines = [.. GetTypeHintHeader(context), .. importLines, "from ." + HELPER_MODULE + " import *", ""];
+                foreach (FunctionDefinition fd in splitter.FunctionsByModule[moduleName])
+                {
+                    lines.Add(codeByFunction[fd.NameToken.Value].Trim());
+                    lines.Add("");
+                    moduleByName.Add("\t'" + ctx.WrapVariableName(fd.NameToken.Value) + "': '" + moduleName + "',");
+                }
+                lines.AddRange(GetCallbackSlotBinding(context, string.Join('\n', lines), slotNames));
+
+                // Each of these replaces itself with the actual function the first time it's called.
+                foreach (FunctionDefinition fd in splitter.GetExternalReferences(moduleName))
+                {
+                    string name = ctx.WrapVariableName(fd.NameToken.Value);
+                    lines.Add("def " + name + "(*args):");
+                    lines.Add("\tglobal " + name);
+                    lines.Add("\tfrom ." + splitter.ModuleByFunction[fd] + " import " + name);
+                    lines.Add("\treturn " + name + "(*args)");
+                    lines.Add("");
+                }
+
+                files[packageDir + "/" + moduleName + ".py"] = string.Join('\n', lines).Trim() + "\n";
+            }
+
+            files["@FUNC_FILE"] = string.Join('\n', [
+                "# Each module is imported the first time one of its names is used.",
+                "import importlib",
+                "",
+                "_MODULE_BY_NAME = {",
+                .. moduleByName,
+                "}",
+                "",
+                "def __getattr__(name):",
+                "\tmodule_name = _MODULE_BY_NAME.get(name)",
+                "\tif module_name == None:",
+                "\t\traise AttributeError('module ' + repr(__name__) + ' has no attribute ' + repr(name))",
+                "\tvalue = getattr(importlib.import_module('.' + module_name, __name__), name)",
+                "\tglobals()[name] = value",
+                "\treturn value",
+                "",
+                "def __dir__():",
+                "\treturn sorted(set(globals()) | set(_MODULE_BY_NAME))",
+                "",
+            ]);
+
+            return files;
+        }
+
+        protected override void OnFilesExported(ProjectConfig config, string[] paths)
+        {
+            if (config.PythonPrecompileInterpreter == null) return;
+
+            System.Diagnostics.ProcessStartInfo startInfo = new System.Diagnostics.ProcessStartInfo(config.PythonPrecompileInterpreter)
+            {
+                RedirectStandardOutput = true,
+                RedirectStandardError = true,
+            };
+            startInfo.ArgumentList.Add("-m");
+            startInfo.ArgumentList.Add("compileall");
+            startInfo.ArgumentList.Add("-q");
+            foreach (string path in paths)
+            {
+                startInfo.ArgumentList.Add(path);
+            }
+
+            string output;
+            int exitCode;
+            try
+            {
+                using System.Diagnostics.Process process = System.Diagnostics.Process.Start(startInfo)!;
+                System.Threading.Tasks.Task<string> stderr = process.StandardError.ReadToEndAsync();
+                output = process.StandardOutput.ReadToEnd() + stderr.Result;
+                process.WaitForExit();
+                exitCode = process.ExitCode;
+            }
+            catch (System.ComponentModel.Win32Exception)
+            {
+                throw new UserErrorException(
+                    "Could not run '" + config.PythonPrecompileInterpreter + "' to byte-compile the Python output. Set python-precompile to the Python interpreter to use.");
+            }
+
+            if (exitCode != 0)
+            {
+                throw new UserErrorException("Byte-compiling the Python output failed:\n" + output.Trim());
+            }
+        }
+
+        private static string[] GetImports(PastelContext context)
+        {
+            IEnumerable<string> imports = context.TranspilerContext.GetFeatures()
+                .Where(f => f.StartsWith("IMPORT:"))
+                .Select(f => f["IMPORT:".Length..]);
+            if (GetStructAliases(context).Length > 0 || (context.TranspilerContext.PythonTypeHints && GetCallbackSlotNames(context).Length > 0))
+            {
+                imports = imports.Append("typing");
+            }
+            return [.. imports.Distinct().OrderBy(v => v)];
+        }
+
+        // Annotations are left as strings so that they don't cost anything at import time and can refer to names
+        // that aren't defined yet.
+        private static string[] GetTypeHintHeader(PastelContext context)
+        {
+            return context.TranspilerContext.PythonTypeHints ? ["from __future__ import annotations", ""] : [];
+        }
+
+        // The types that struct annotations refer to.
+        private static string[] GetStructAliases(PastelContext context)
+        {
+            if (!context.TranspilerContext.PythonTypeHints) return [];
+            string[] aliases = [.. context.GetCompiler().GetStructDefinitions()
+                .Select(sd => PythonTypeTranspiler.GetStructAliasName(sd.NameToken.Value) + " = typing.List[typing.Any]")];
+            return aliases.Length == 0 ? [] : [.. aliases, ""];
+        }
+
+        private static string[] GetCallbackSlotNames(PastelContext context)
+        {
+            return [.. context.TranspilerContext.GetFeatures()
+                .Where(f => f.StartsWith("CALLBACK_SLOT:"))
+                .Select(f => f["CALLBACK_SLOT:".Length..])
+                .OrderBy(v => v, System.StringComparer.Ordinal)];
+        }
+
+        // Defines the globals of the given code's module that constant extensible callback invocations are called
+        // through. Registering a callback rebinds them. Type checkers can't see globals that are defined through
+        // globals(), so they're declared as well if the output is annotated.
+        private static string[] GetCallbackSlotBinding(PastelContext context, string code, string[] slotNames)
+        {
+            string[] usedNames = [.. slotNames.Where(name => code.Contains(PythonExpressionTranslator.EXTENSIBLE_CALLBACK_SLOT_PREFIX + name + "("))];
+            if (usedNames.Length == 0) return [];
+            string[] declarations = context.TranspilerContext.PythonTypeHints
+                ? [.. usedNames.Select(name => PythonExpressionTranslator.EXTENSIBLE_CALLBACK_SLOT_PREFIX + name + ": typing.Callable[[list[typing.Any]], typing.Any]")]
+                : [];
+            return [.. declarations, "PST_BindExtensibleCallbackSlots(globals(), [" + string.Join(", ", usedNames.Select(name => "'" + name + "'")) + "])", ""];
+        }
+
+        // The names that the helper code defines at the top level, e.g. PST_RegisterExtensibleCallback.
+        private static IEnumerable<string> GetHelperNames(string helperCode)
+        {
+            foreach (string line in helperCode.Split('\n'))
+            {
+                if (line.StartsWith("def "))
+                {
+                    yield return line["def ".Length..line.IndexOf('(')];
+                }
+                else if (line.Length > 0 && line[0] != ' ' && line[0] != '\t' && line.Contains(" = "))
+                {
+                    yield return line[..line.IndexOf(" = ")];
+                }
+            }
+        }
     }
 }
@@ -19,6 +19,20 @@ namespace Pastel.Transpilers.Python
             }
         }
 
+        // When the python-typed-arrays build option is on, arrays of ints, doubles, and bools are
+        // array.array instances instead of lists. Returns the array.array type code for the given
+        // element type or null if the array should remain a list.
+        private string? GetTypedArrayCode(PType itemType)
+        {
+            if (!this.transpilerCtx.PythonTypedArrays) return null;
+            switch (itemType.RootValue)
+            {
+                case "int": return "q";
+                case "double": return "d";
+                default: return null;
+            }
+        }
+
         private ExpressionTightness GetOpTightness(string op)
         {
             switch (op)
@@ -89,6 +103,25 @@ namespace Pastel.Transpilers.Python
                 default: defaultVal = "None"; break;
             }
 
+            if (arrayType.IsByte)
+            {
+                return StringBuffer
+                    .Of("bytearray(")
+                    .Push(this.TranslateExpression(lengthExpression))
+                    .Push(")")
+                    .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
+            }
+
+            string? typeCode = this.GetTypedArrayCode(arrayType);
+            if (typeCode != null)
+            {
+                this.MarkFeatureAsUsed("IMPORT:array");
+                return StringBuffer
+                    .Of("array.array('" + typeCode + "', [" + defaultVal + "]) * ")
+                    .Push(this.TranslateExpression(lengthExpression).EnsureGreaterTightness(ExpressionTightness.MULTIPLICATION))
+                    .WithTightness(ExpressionTightness.MULTIPLICATION);
+            }
+
             if (lengthExpression is InlineConstant ic)
             {
                 int length = (int)ic.Value;
@@ -119,9 +152,53 @@ namespace Pastel.Transpilers.Python
         public override StringBuffer TranslateBase64ToBytes(Expression base64String)
         {
             this.MarkFeatureAsUsed("IMPORT:base64");
-            return StringBuffer
-                .Of("list(base64.b64decode(")
+            return this.WrapBytesAsIntArray(StringBuffer
+                .Of("base64.b64decode(")
                 .Push(this.TranslateExpression(base64String))
+                .Push(")"));
+        }
+
+        // Copies the items of an iterable into a new Array, which is an array.array for ints and doubles under
+        // python-typed-arrays like any other Array of them.
+        private StringBuffer CopyIntoArray(PType itemType, StringBuffer items)
+        {
+            string? typeCode = this.GetTypedArrayCode(itemType);
+            if (typeCode == null)
+            {
+                return StringBuffer
+                    .Of("list(")
+                    .Push(items)
+                    .Push(")")
+                    .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
+            }
+
+            this.MarkFeatureAsUsed("IMPORT:array");
+            return StringBuffer
+                .Of("array.array('" + typeCode + "', ")
+                .Push(items)
+                .Push(")")
+                .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
+        }
+
+        // Bytes that are typed as Array<int> are copied into the list or array.array that any other Array<int> is.
+        // A bytearray can't hold values above 255. The array.array is given an iterator since it would copy the
+        // raw memory of bytes.
+        private StringBuffer WrapBytesAsIntArray(StringBuffer bytes)
+        {
+            string? typeCode = this.GetTypedArrayCode(PType.INT);
+            if (typeCode == null)
+            {
+                return StringBuffer
+                    .Of("list(")
+                    .Push(bytes)
+                    .Push(")")
+                    .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
+            }
+
+            this.MarkFeatureAsUsed("IMPORT:array");
+            return StringBuffer
+                .Of("array.array('" + typeCode + "', iter(")
+                .Push(bytes)
                 .Push("))")
                 .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
         }
@@ -168,6 +245,7 @@ namespace Pastel.Transpilers.Python
 
         public override StringBuffer TranslateBytesToBase64(Expression byteArr)
         {
+            this.MarkHelperAsUsed("PST_bytesToBase64");
             this.MarkFeatureAsUsed("IMPORT:base64");
             return StringBuffer
                 .Of("PST_bytesToBase64(")
@@ -246,10 +324,16 @@ namespace Pastel.Transpilers.Python
 
         public override StringBuffer TranslateDictionaryKeys(Expression dictionary)
         {
-            return StringBuffer
-                .Of("list(")
-                .Push(this.TranslateExpression(dictionary))
-                .Push(".keys())")
+            return this.CopyIntoArray(
+                dictionary.ResolvedType.Generics[0],
+                this.TranslateExpression(dictionary).EnsureTightness(ExpressionTightness.SUFFIX_SEQUENCE).Push(".keys()"));
+        }
+
+        public override StringBuffer TranslateDictionaryKeysWithoutCopy(Expression dictionary)
+        {
+            return this.TranslateExpression(dictionary)
+                .EnsureTightness(ExpressionTightness.SUFFIX_SEQUENCE)
+                .Push(".keys()")
                 .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
         }
 
@@ -291,10 +375,16 @@ namespace Pastel.Transpilers.Python
 
         public override StringBuffer TranslateDictionaryValues(Expression dictionary)
         {
-            return StringBuffer
-                .Of("list(")
-                .Push(this.TranslateExpression(dictionary).EnsureTightness(ExpressionTightness.SUFFIX_SEQUENCE))
-                .Push(".values())")
+            return this.CopyIntoArray(
+                dictionary.ResolvedType.Generics[1],
+                this.TranslateExpression(dictionary).EnsureTightness(ExpressionTightness.SUFFIX_SEQUENCE).Push(".values()"));
+        }
+
+        public override StringBuffer TranslateDictionaryValuesWithoutCopy(Expression dictionary)
+        {
+            return this.TranslateExpression(dictionary)
+                .EnsureTightness(ExpressionTightness.SUFFIX_SEQUENCE)
+                .Push(".values()")
                 .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
         }
 
@@ -325,6 +415,21 @@ namespace Pastel.Transpilers.Python
 
         public override StringBuffer TranslateExtensibleCallbackInvoke(Expression name, Expression argsArray)
         {
+            // A constant name is bound to a global at import time, which skips the dictionary lookup on each call.
+            // The exporter adds the PST_BindExtensibleCallbackSlots call that defines it.
+            string? slotName = GetExtensibleCallbackSlotName(name);
+            if (slotName != null)
+            {
+                this.MarkHelperAsUsed("PST_BindExtensibleCallbackSlots");
+                this.MarkFeatureAsUsed("CALLBACK_SLOT:" + slotName);
+                return StringBuffer.Of(EXTENSIBLE_CALLBACK_SLOT_PREFIX + slotName + "(")
+                    .Push(this.TranslateExpression(argsArray))
+                    .Push(")")
+                    .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
+            }
+
+            this.MarkHelperAsUsed("PST_ExtCallbacks");
+
             return StringBuffer.Of("PST_ExtCallbacks[")
                 .Push(this.TranslateExpression(name))
                 .Push("](")
@@ -333,6 +438,19 @@ namespace Pastel.Transpilers.Python
                 .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
         }
 
+        public const string EXTENSIBLE_CALLBACK_SLOT_PREFIX = "PST_ext_";
+
+        // Returns the name if it's a constant that can be part of a Python identifier, otherwise null.
+        private static string? GetExtensibleCallbackSlotName(Expression name)
+        {
+            if (!(name is InlineConstant ic) || !(ic.Value is string value) || value.Length == 0) return null;
+            foreach (char c in value)
+            {
+                if (!((c >= 'a' && c <= 'z') || (c >= 'A' && c <= 'Z') || (c >= '0' && c <= '9') || c == '_')) return null;
+            }
+            return value;
+        }
+
         public override StringBuffer TranslateFloatConstant(double value)
         {
             return StringBuffer
@@ -398,6 +516,8 @@ namespace Pastel.Transpilers.Python
 
         public override StringBuffer TranslateIsValidInteger(Expression stringValue)
         {
+            this.MarkHelperAsUsed("PST_isValidInteger");
+
             return StringBuffer
                 .Of("PST_isValidInteger(")
                 .Push(this.TranslateExpression(stringValue))
@@ -520,6 +640,7 @@ namespace Pastel.Transpilers.Python
 
         public override StringBuffer TranslateListShuffle(Expression list)
         {
+            this.MarkFeatureAsUsed("IMPORT:random");
             return StringBuffer
                 .Of("random.shuffle(")
                 .Push(this.TranslateExpression(list))
@@ -538,12 +659,43 @@ namespace Pastel.Transpilers.Python
 
         public override StringBuffer TranslateListToArray(Expression list)
         {
+            if (list.ResolvedType.Generics[0].IsByte)
+            {
+                return StringBuffer
+                    .Of("bytearray(")
+                    .Push(this.TranslateExpression(list))
+                    .Push(")")
+                    .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
+            }
+
+            string? typeCode = this.GetTypedArrayCode(list.ResolvedType.Generics[0]);
+            if (typeCode != null)
+            {
+                this.MarkFeatureAsUsed("IMPORT:array");
+                return StringBuffer
+                    .Of("array.array('" + typeCode + "', ")
+                    .Push(this.TranslateExpression(list))
+                    .Push(")")
+                    .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
+            }
+
             return this.TranslateExpression(list)
                 .EnsureTightness(ExpressionTightness.SUFFIX_SEQUENCE)
                 .Push("[:]")
                 .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
         }
 
+        public override StringBuffer TranslateListToArrayWithoutCopy(Expression list)
+        {
+            // bytearray and array.array are a different type of collection and still need to be converted.
+            PType itemType = list.ResolvedType.Generics[0];
+            if (itemType.IsByte || this.GetTypedArrayCode(itemType) != null)
+            {
+                return this.TranslateListToArray(list);
+            }
+            return this.TranslateExpression(list);
+        }
+
         public override StringBuffer TranslateMathAbs(Expression num)
         {
             return StringBuffer
@@ -794,20 +946,50 @@ namespace Pastel.Transpilers.Python
 
         public override StringBuffer TranslateSortedCopyOfIntArray(Expression intArray)
         {
-            return StringBuffer
-                .Of("PST_sortedCopyOfList(")
-                .Push(this.TranslateExpression(intArray))
-                .Push(")")
-                .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
+            return this.SortedToArray(PType.INT, this.TranslateExpression(intArray));
         }
 
         public override StringBuffer TranslateSortedCopyOfStringArray(Expression stringArray)
         {
-            return StringBuffer
-                .Of("PST_sortedCopyOfList(")
-                .Push(this.TranslateExpression(stringArray))
-                .Push(")")
-                .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
+            return this.SortedToArray(PType.STRING, this.TranslateExpression(stringArray));
+        }
+
+        // sorted() always makes its own list, so instead of sorting in place, the copy that was made to create
+        // the input is skipped and sorted() reads the keys, values or list directly.
+        public override StringBuffer TranslateSortIntArrayInPlace(Expression intArray)
+        {
+            return this.SortedToArray(PType.INT, this.TranslateSortInput(intArray));
+        }
+
+        public override StringBuffer TranslateSortStringArrayInPlace(Expression stringArray)
+        {
+            return this.SortedToArray(PType.STRING, this.TranslateSortInput(stringArray));
+        }
+
+        private StringBuffer TranslateSortInput(Expression array)
+        {
+            if (array is CoreFunctionInvocation cfi)
+            {
+                switch (cfi.Function)
+                {
+                    case CoreFunction.DICTIONARY_KEYS: return this.TranslateDictionaryKeysWithoutCopy(cfi.Args[0]);
+                    case CoreFunction.DICTIONARY_VALUES: return this.TranslateDictionaryValuesWithoutCopy(cfi.Args[0]);
+                    case CoreFunction.LIST_TO_ARRAY: return this.TranslateExpression(cfi.Args[0]);
+                }
+            }
+            return this.TranslateExpression(array);
+        }
+
+        private StringBuffer SortedToArray(PType itemType, StringBuffer items)
+        {
+            StringBuffer sb = StringBuffer.Of("sorted(").Push(items).Push(")");
+            string? typeCode = this.GetTypedArrayCode(itemType);
+            if (typeCode != null)
+            {
+                this.MarkFeatureAsUsed("IMPORT:array");
+                sb = StringBuffer.Of("array.array('" + typeCode + "', ").Push(sb).Push(")");
+            }
+            return sb.WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
         }
 
         public override StringBuffer TranslateStringAppend(Expression str1, Expression str2)
@@ -1012,6 +1194,8 @@ namespace Pastel.Transpilers.Python
 
         public override StringBuffer TranslateStringSubstringIsEqualTo(Expression haystack, Expression startIndex, Expression needle)
         {
+            this.MarkHelperAsUsed("PST_stringCheckSlice");
+
             return StringBuffer
                 .Of("PST_stringCheckSlice(")
                 .Push(this.TranslateExpression(haystack))
@@ -1041,6 +1225,8 @@ namespace Pastel.Transpilers.Python
 
         public override StringBuffer TranslateStringToUnicodeChars(Expression str)
         {
+            this.MarkHelperAsUsed("PST_stringToUnicodeChars");
+
             return StringBuffer
                 .Of("PST_stringToUnicodeChars(")
                 .Push(this.TranslateExpression(str))
@@ -1050,11 +1236,9 @@ namespace Pastel.Transpilers.Python
 
         public override StringBuffer TranslateStringToUtf8Bytes(Expression str)
         {
-            return StringBuffer
-                .Of("PST_stringToUtf8Bytes(")
-                .Push(this.TranslateExpression(str))
-                .Push(")")
-                .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
+            return this.WrapBytesAsIntArray(this.TranslateExpression(str)
+                .EnsureTightness(ExpressionTightness.SUFFIX_SEQUENCE)
+                .Push(".encode('utf-8')"));
         }
 
         public override StringBuffer TranslateStringTrim(Expression str)
@@ -1154,6 +1338,8 @@ namespace Pastel.Transpilers.Python
 
         public override StringBuffer TranslateTryParseFloat(Expression stringValue, Expression floatOutList)
         {
+            this.MarkHelperAsUsed("PST_tryParseFloat");
+
             return StringBuffer
                 .Of("PST_tryParseFloat(")
                 .Push(this.TranslateExpression(stringValue))
@@ -1165,8 +1351,10 @@ namespace Pastel.Transpilers.Python
 
         public override StringBuffer TranslateUtf8BytesToString(Expression bytes)
         {
+            this.MarkHelperAsUsed("PST_toByteBuffer");
+
             return StringBuffer
-                .Of("bytes(")
+                .Of("PST_toByteBuffer(")
                 .Push(this.TranslateExpression(bytes))
                 .Push(").decode('utf-8')")
                 .WithTightness(ExpressionTightness.SUFFIX_SEQUENCE);
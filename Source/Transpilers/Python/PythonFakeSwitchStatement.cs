@@ -1,6 +1,7 @@
 ﻿using Pastel.Parser;
 using Pastel.Parser.ParseNodes;
 using System.Collections.Generic;
+using System.Linq;
 using System.Text;
 
 // I'm so sorry.
@@ -24,6 +25,17 @@ namespace Pastel.Transpilers.Python
         This is assigned into a value called sc_{ID}
 
         The switch code itself is a binary search tree of if statements.
+
+        That is the BINARY_SEARCH lowering. There are two others (see PythonSwitchLowering):
+        - IF_CHAIN compares the condition against each case value in a flat if/elif chain and has no dictionary.
+          This beats the dictionary lookup + tree for a handful of cases.
+        - TABLE serializes each code chunk as a module-level function named "swcase__{function name}__{switch ID}__{chunk ID}"
+          which takes in all the local variables it uses as arguments. The dictionary maps the case values to these
+          functions rather than chunk ID's and the switch statement is just a lookup and an invocation, which is O(1).
+          This is only possible when every chunk ends in a return statement as the local variable changes in the
+          function cannot propagate back to the caller.
+
+        If there is an execution profile, the IF_CHAIN checks the chunks from the most to the least frequently hit.
      */
     internal class PythonFakeSwitchStatement
     {
@@ -32,10 +44,19 @@ namespace Pastel.Transpilers.Python
         private ICompilationEntity owner;
         private Dictionary<InlineConstant, int> expressionsToChunkIds;
         private Dictionary<int, Statement[]> chunkIdsToCode;
+        private int[]? chunkOrder;
 
         public int DefaultId { get; set; }
+        public PythonSwitchLowering Lowering { get; private set; }
+
+        // Sorted names of the local variables that the chunks in a TABLE lowering use but do not declare.
+        public string[] TableFunctionArgs { get; private set; } = [];
 
-        private string conditionVariableName = null;
+        // Thresholds based on benchmarks/python_switch.py, which compares these lowerings for various case counts.
+        private const int IF_CHAIN_MAX_CASES = 8;
+        private const int TABLE_MIN_CASES = 16;
+
+        private string? conditionVariableName = null;
         public string ConditionVariableName
         {
             get
@@ -48,7 +69,7 @@ namespace Pastel.Transpilers.Python
             }
         }
 
-        private string dictionaryGlobalName = null;
+        private string? dictionaryGlobalName = null;
         public string DictionaryGlobalName
         {
             get
@@ -61,13 +82,43 @@ namespace Pastel.Transpilers.Python
             }
         }
 
-        public static PythonFakeSwitchStatement Build(SwitchStatement switchStatement, int switchId, string functionName)
+        private string? tableGlobalName = null;
+        public string TableGlobalName
+        {
+            get
+            {
+                if (this.tableGlobalName == null)
+                {
+                    this.tableGlobalName = "swtable__" + this.functionName + "__" + this.switchId;
+                }
+                return this.tableGlobalName;
+            }
+        }
+
+        public string GetTableFunctionName(int chunkId)
+        {
+            return "swcase__" + this.functionName + "__" + this.switchId + "__" + chunkId;
+        }
+
+        public int ChunkCount { get { return this.chunkIdsToCode.Count; } }
+
+        public Statement[] GetChunkCode(int chunkId)
+        {
+            return this.TrimBreak(this.chunkIdsToCode[chunkId]);
+        }
+
+        public static PythonFakeSwitchStatement Build(
+            SwitchStatement switchStatement,
+            int switchId,
+            string functionName,
+            PythonSwitchLowering preferredLowering,
+            int[]? chunkOrder)
         {
             ICompilationEntity owner = switchStatement.Condition.Owner;
             Dictionary<InlineConstant, int> expressionToId = new Dictionary<InlineConstant, int>();
             Dictionary<int, Statement[]> codeById = new Dictionary<int, Statement[]>();
             int? nullableDefaultId = null;
-            Statement[] defaultCode = null;
+            Statement[] defaultCode = [];
             for (int i = 0; i < switchStatement.Chunks.Length; ++i)
             {
                 SwitchStatement.SwitchChunk chunk = switchStatement.Chunks[i];
@@ -105,7 +156,72 @@ namespace Pastel.Transpilers.Python
                 codeById[defaultId] = new Statement[0];
             }
 
-            return new PythonFakeSwitchStatement(functionName, switchId, defaultId, expressionToId, codeById, owner);
+            PythonFakeSwitchStatement output = new PythonFakeSwitchStatement(functionName, switchId, defaultId, expressionToId, codeById, owner);
+            output.chunkOrder = chunkOrder;
+            output.Lowering = output.ChooseLowering(preferredLowering, nullableDefaultId != null);
+            if (output.Lowering == PythonSwitchLowering.TABLE)
+            {
+                output.TableFunctionArgs = output.FindTableFunctionArgs();
+            }
+            return output;
+        }
+
+        private PythonSwitchLowering ChooseLowering(PythonSwitchLowering preferredLowering, bool hasDefault)
+        {
+            int caseCount = this.expressionsToChunkIds.Count;
+            bool canUseTable = hasDefault && this.chunkIdsToCode.Values.All(IsTableCompatible);
+            switch (preferredLowering)
+            {
+                case PythonSwitchLowering.AUTO:
+                    if (caseCount <= IF_CHAIN_MAX_CASES) return PythonSwitchLowering.IF_CHAIN;
+                    if (caseCount >= TABLE_MIN_CASES && canUseTable) return PythonSwitchLowering.TABLE;
+                    return PythonSwitchLowering.BINARY_SEARCH;
+
+                case PythonSwitchLowering.TABLE:
+                    return canUseTable ? PythonSwitchLowering.TABLE : PythonSwitchLowering.BINARY_SEARCH;
+
+                default:
+                    return preferredLowering;
+            }
+        }
+
+        // A chunk can be moved into its own function if it always returns and has no break that
+        // refers to the switch statement itself (which would be a syntax error outside of a loop).
+        private static bool IsTableCompatible(Statement[] code)
+        {
+            if (code.Length == 0 || !(code[code.Length - 1] is ReturnStatement)) return false;
+            bool hasSwitchBreak = false;
+            ParseTreeWalker.WalkStatements(code, stmnt =>
+            {
+                if (stmnt is BreakStatement) hasSwitchBreak = true;
+
+                // A break inside a loop or a nested switch refers to that instead.
+                return !(stmnt is WhileLoop || stmnt is CountedForLoop || stmnt is SwitchStatement);
+            }, null);
+            return !hasSwitchBreak;
+        }
+
+        private string[] FindTableFunctionArgs()
+        {
+            HashSet<string> used = new HashSet<string>();
+            HashSet<string> declared = new HashSet<string>();
+            foreach (Statement[] code in this.chunkIdsToCode.Values)
+            {
+                ParseTreeWalker.WalkStatements(
+                    code,
+                    stmnt =>
+                    {
+                        if (stmnt is VariableDeclaration varDecl) declared.Add(varDecl.VariableNameToken.Value);
+                        if (stmnt is CountedForLoop countedLoop) used.Add(countedLoop.InductionVariable.Value);
+                        return true;
+                    },
+                    expr =>
+                    {
+                        if (expr is Variable v && v.ApplyPrefix) used.Add(v.Name);
+                        return true;
+                    });
+            }
+            return used.Where(name => !declared.Contains(name)).OrderBy(name => name).ToArray();
         }
 
         private PythonFakeSwitchStatement(
@@ -126,8 +242,9 @@ namespace Pastel.Transpilers.Python
 
         public string GenerateGlobalDictionaryLookup()
         {
+            bool isTable = this.Lowering == PythonSwitchLowering.TABLE;
             StringBuilder dictionaryBuilder = new StringBuilder();
-            dictionaryBuilder.Append(DictionaryGlobalName);
+            dictionaryBuilder.Append(isTable ? this.TableGlobalName : this.DictionaryGlobalName);
             dictionaryBuilder.Append(" = { ");
 
             bool isInteger = false;
@@ -157,12 +274,64 @@ namespace Pastel.Transpilers.Python
                     dictionaryBuilder.Append(CodeUtil.ConvertStringValueToCode(strValRaw));
                 }
                 dictionaryBuilder.Append(": ");
-                dictionaryBuilder.Append(this.expressionsToChunkIds[ic]);
+                if (isTable)
+                {
+                    dictionaryBuilder.Append(this.GetTableFunctionName(id));
+                }
+                else
+                {
+                    dictionaryBuilder.Append(id);
+                }
             }
             dictionaryBuilder.Append(" }");
             return dictionaryBuilder.ToString();
         }
 
+        // The condition is compared directly against the case values, in the order the chunks appear or the order of
+        // the profile. conditionValue must be safe to evaluate multiple times.
+        public Statement[] GenerateIfChain(Expression conditionValue)
+        {
+            List<int> chunkIds = new List<int>();
+            Dictionary<int, Expression> conditionsByChunkId = new Dictionary<int, Expression>();
+            foreach (InlineConstant ic in this.expressionsToChunkIds.Keys)
+            {
+                int id = this.expressionsToChunkIds[ic];
+                if (id == this.DefaultId) continue; // no need to check for values that lead to the default anyway.
+
+                Expression check = new OpPair(conditionValue, Token.CreateDummyToken("=="), ic);
+                if (conditionsByChunkId.ContainsKey(id))
+                {
+                    check = new OpPair(conditionsByChunkId[id], Token.CreateDummyToken("||"), check);
+                }
+                else
+                {
+                    chunkIds.Add(id);
+                }
+                conditionsByChunkId[id] = check;
+            }
+
+            if (this.chunkOrder != null)
+            {
+                // Chunk ID's are the indices of the chunks in the original switch statement.
+                chunkIds = chunkIds.OrderBy(id => System.Array.IndexOf(this.chunkOrder, id)).ToList();
+            }
+
+            Statement[] output = this.TrimBreak(this.chunkIdsToCode[this.DefaultId]);
+            for (int i = chunkIds.Count - 1; i >= 0; --i)
+            {
+                int id = chunkIds[i];
+                output = [
+                    new IfStatement(
+                        Token.CreateDummyToken("if"),
+                        conditionsByChunkId[id],
+                        this.TrimBreak(this.chunkIdsToCode[id]),
+                        Token.CreateDummyToken("else"),
+                        output)
+                ];
+            }
+            return output;
+        }
+
         public IfStatement GenerateIfStatementBinarySearchTree()
         {
             return this.GenerateIfStatementBinarySearchTree(0, this.chunkIdsToCode.Count - 1, this.chunkIdsToCode);
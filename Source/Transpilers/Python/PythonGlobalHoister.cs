@@ -0,0 +1,182 @@
+﻿using System.Collections.Generic;
+using System.Linq;
+
+namespace Pastel.Transpilers.Python
+{
+    // Rewrites the body of a generated function so that the globals, builtins, and module functions it uses in a
+    // loop (or uses often) are read from locals that are bound at the top of the function, e.g. "_len = len" or
+    // "_math_floor = math.floor". Each use of a global looks it up in the module's dictionary and then the builtins,
+    // whereas a local is read directly from the frame.
+    // The aliases are bound each time the function is called, so a global that is reassigned between calls is seen
+    // by the next call. The PST_ext_ slots of extensible callbacks are the only globals that can be reassigned while
+    // a function is running (by PST_RegisterExtensibleCallback, which a callback may call), so they're never
+    // hoisted. Functions from other modules of a split package are stubs that replace themselves with the actual
+    // function when they're first called. An alias of a stub still works, it's just slower until the next call.
+    internal static class PythonGlobalHoister
+    {
+        // Globals that aren't used in a loop are only hoisted if they're used at least this many times.
+        public const int MIN_REFERENCES_OUTSIDE_LOOPS = 4;
+
+        private static readonly HashSet<string> BUILTINS = [
+            "abs", "bool", "bytearray", "chr", "dict", "float", "int", "isinstance", "iter", "len", "list", "max",
+            "min", "next", "object", "ord", "range", "round", "sorted", "str", "sum", "type",
+        ];
+
+        // The modules that the translators import. Their functions are hoisted rather than the module.
+        private static readonly HashSet<string> MODULES = ["array", "base64", "json", "math", "random", "time"];
+
+        private class Reference
+        {
+            public int Line { get; init; }
+            public int Start { get; init; }
+            public int Length { get; init; }
+            public string Name { get; init; } = "";
+            public bool InLoop { get; init; }
+        }
+
+        // moduleGlobals are the other names (besides builtins, module functions, and PST_ helpers) that refer to
+        // globals of the module, i.e. the generated functions and the lookup tables of switch statements.
+        public static string HoistGlobals(string body, string tab, IEnumerable<string> argNames, HashSet<string> moduleGlobals)
+        {
+            string[] lines = body.Split('\n');
+            List<Reference> references = [];
+            HashSet<string> locals = [.. argNames];
+
+            // The indentation of each loop that the current line is in.
+            List<int> loopDepths = [];
+            for (int lineIndex = 0; lineIndex < lines.Length; ++lineIndex)
+            {
+                string line = lines[lineIndex];
+                int depth = 0;
+                while (depth < line.Length && line[depth] == '\t') depth++;
+                if (depth == line.Length) continue;
+
+                while (loopDepths.Count > 0 && depth <= loopDepths[^1])
+                {
+                    loopDepths.RemoveAt(loopDepths.Count - 1);
+                }
+
+                string statement = line[depth..];
+                bool isWhile = statement.StartsWith("while ");
+                bool isFor = statement.StartsWith("for ");
+                // The condition of a while loop is evaluated on each iteration but the iterable of a for loop isn't.
+                FindReferences(line, lineIndex, depth, loopDepths.Count > 0 || isWhile, references, locals);
+                if (isWhile || isFor)
+                {
+                    loopDepths.Add(depth);
+                }
+            }
+
+            List<string> hoisted = [.. references
+                .GroupBy(r => r.Name)
+                .Where(g => !locals.Contains(g.Key) && IsHoistable(g.Key, moduleGlobals))
+                .Where(g => g.Any(r => r.InLoop) || g.Count() >= MIN_REFERENCES_OUTSIDE_LOOPS)
+                .Select(g => g.Key)];
+            if (hoisted.Count == 0) return body;
+
+            HashSet<string> hoistedLookup = [.. hoisted];
+            foreach (Reference reference in references.Where(r => hoistedLookup.Contains(r.Name)).Reverse())
+            {
+                string line = lines[reference.Line];
+                lines[reference.Line] = line[..reference.Start] + GetAliasName(reference.Name) + line[(reference.Start + reference.Length)..];
+            }
+
+            return string.Join("", hoisted.Select(name => tab + GetAliasName(name) + " = " + name + "\n")) + string.Join('\n', lines);
+        }
+
+        private static string GetAliasName(string name)
+        {
+            return "_" + name.Replace('.', '_');
+        }
+
+        private static bool IsHoistable(string name, HashSet<string> moduleGlobals)
+        {
+            if (name.StartsWith(PythonExpressionTranslator.EXTENSIBLE_CALLBACK_SLOT_PREFIX)) return false;
+            return name.Contains('.') || name.StartsWith("PST_") || BUILTINS.Contains(name) || moduleGlobals.Contains(name);
+        }
+
+        // Adds the names that are used in the line, with module functions as "module.function". Names that are
+        // assigned at the start of a statement or are the variable of a for loop are added to the locals instead.
+        private static void FindReferences(string line, int lineIndex, int depth, bool inLoop, List<Reference> references, HashSet<string> locals)
+        {
+            bool isLoopVariable = false;
+            int i = depth;
+            while (i < line.Length)
+            {
+                char c = line[i];
+                if (c == '#') return;
+                if (c == '\'' || c == '"')
+                {
+                    i = SkipString(line, i);
+                    continue;
+                }
+                if (!IsIdentifierChar(c))
+                {
+                    i++;
+                    continue;
+                }
+
+                int start = i;
+                while (i < line.Length && IsIdentifierChar(line[i])) i++;
+                string name = line[start..i];
+
+                // Numbers (e.g. 1e9) and attributes aren't names.
+                if (char.IsDigit(c) || (start > 0 && line[start - 1] == '.')) continue;
+
+                if (isLoopVariable)
+                {
+                    locals.Add(name);
+                    isLoopVariable = false;
+                    continue;
+                }
+                if (start == depth && name == "for")
+                {
+                    isLoopVariable = true;
+                    continue;
+                }
+
+                int next = i;
+                while (next < line.Length && line[next] == ' ') next++;
+                bool isAssignment = next < line.Length && line[next] == '=' && (next + 1 == line.Length || line[next + 1] != '=');
+                if (start == depth && !isAssignment)
+                {
+                    // Augmented assignments, e.g. +=, <<=
+                    int op = next;
+                    while (op < line.Length && "+-*/%&|^<>".Contains(line[op])) op++;
+                    isAssignment = op > next && op < line.Length && line[op] == '=';
+                }
+                if (isAssignment)
+                {
+                    // Otherwise this is the name of a keyword argument.
+                    if (start == depth) locals.Add(name);
+                    continue;
+                }
+
+                if (MODULES.Contains(name) && i + 1 < line.Length && line[i] == '.' && IsIdentifierChar(line[i + 1]))
+                {
+                    i++;
+                    while (i < line.Length && IsIdentifierChar(line[i])) i++;
+                    name = line[start..i];
+                }
+                references.Add(new Reference { Line = lineIndex, Start = start, Length = i - start, Name = name, InLoop = inLoop });
+            }
+        }
+
+        private static int SkipString(string line, int i)
+        {
+            char quote = line[i++];
+            while (i < line.Length)
+            {
+                char c = line[i++];
+                if (c == '\\') i++;
+                else if (c == quote) break;
+            }
+            return i;
+        }
+
+        private static bool IsIdentifierChar(char c)
+        {
+            return (c >= 'a' && c <= 'z') || (c >= 'A' && c <= 'Z') || (c >= '0' && c <= '9') || c == '_';
+        }
+    }
+}
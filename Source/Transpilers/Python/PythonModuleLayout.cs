@@ -0,0 +1,16 @@
+﻿namespace Pastel.Transpilers.Python
+{
+    // How the generated Python functions are split into modules.
+    // This is configured by the "python-modules" field in the build file.
+    public enum PythonModuleLayout
+    {
+        // Everything goes in the functions-path file.
+        SINGLE,
+
+        // A package with a module per Pastel source file.
+        FILE,
+
+        // A package with a module per cluster of functions that are only called from the same place.
+        CALL_GRAPH,
+    }
+}
@@ -0,0 +1,158 @@
+﻿using Pastel.Parser;
+using Pastel.Parser.ParseNodes;
+using System.Collections.Generic;
+using System.Linq;
+
+namespace Pastel.Transpilers.Python
+{
+    // Assigns each function to a module of the generated Python package, and finds which functions each module
+    // uses from other modules.
+    // - FILE puts the functions of each Pastel source file together. The module is named after the file's path.
+    // - CALL_GRAPH puts a function in the same module as its caller if it only has one, so each module is a function
+    //   that is called from several places (or none, e.g. an entry point) along with everything that only it uses.
+    //   Modules with fewer than MIN_CLUSTER_SIZE functions are merged into one shared module since importing many
+    //   tiny modules is slower than importing a few functions that aren't needed.
+    internal class PythonModuleSplitter
+    {
+        public const int MIN_CLUSTER_SIZE = 4;
+        private const string SHARED_MODULE = "mod_shared";
+
+        private FunctionDefinition[] functions;
+        private Dictionary<FunctionDefinition, HashSet<FunctionDefinition>> calleesByFunction = [];
+        private Dictionary<FunctionDefinition, HashSet<FunctionDefinition>> callersByFunction = [];
+        private HashSet<string> entryPoints;
+
+        // Module names in the order they should be generated, and the functions in each, in the order they were given.
+        public List<string> ModuleNames { get; } = [];
+        public Dictionary<string, List<FunctionDefinition>> FunctionsByModule { get; } = [];
+        public Dictionary<FunctionDefinition, string> ModuleByFunction { get; } = [];
+
+        public PythonModuleSplitter(FunctionDefinition[] functions, string[]? entryPoints)
+        {
+            this.functions = functions;
+            this.entryPoints = [.. entryPoints ?? []];
+            foreach (FunctionDefinition fd in functions)
+            {
+                this.calleesByFunction[fd] = [];
+                this.callersByFunction[fd] = [];
+            }
+
+            foreach (FunctionDefinition fd in functions)
+            {
+                ParseTreeWalker.WalkStatements(fd.Code, null, expr =>
+                {
+                    if (expr is FunctionReference funcRef && funcRef.Function != fd && this.callersByFunction.ContainsKey(funcRef.Function))
+                    {
+                        this.calleesByFunction[fd].Add(funcRef.Function);
+                        this.callersByFunction[funcRef.Function].Add(fd);
+                    }
+                    return true;
+                });
+            }
+        }
+
+        public PythonModuleSplitter Split(PythonModuleLayout layout)
+        {
+            Dictionary<FunctionDefinition, string> groups = layout == PythonModuleLayout.FILE
+                ? this.GroupByFile()
+                : this.GroupByCaller();
+
+            HashSet<string> usedNames = [];
+            Dictionary<string, string> moduleNameByGroup = [];
+            foreach (string group in groups.Values.Distinct().OrderBy(g => g == SHARED_MODULE ? "" : g, System.StringComparer.Ordinal))
+            {
+                // Lowercase since the module names are file names, which may not be case sensitive.
+                string name = group == SHARED_MODULE ? group : GetSafeModuleName(group);
+                string uniqueName = name;
+                for (int i = 2; !usedNames.Add(uniqueName); ++i)
+                {
+                    uniqueName = name + "_" + i;
+                }
+                moduleNameByGroup[group] = uniqueName;
+                this.ModuleNames.Add(uniqueName);
+                this.FunctionsByModule[uniqueName] = [];
+            }
+
+            foreach (FunctionDefinition fd in this.functions)
+            {
+                string moduleName = moduleNameByGroup[groups[fd]];
+                this.ModuleByFunction[fd] = moduleName;
+                this.FunctionsByModule[moduleName].Add(fd);
+            }
+            return this;
+        }
+
+        // Returns the functions that the given module's functions use from other modules, ordered by name.
+        public FunctionDefinition[] GetExternalReferences(string moduleName)
+        {
+            return [.. this.FunctionsByModule[moduleName]
+                .SelectMany(fd => this.calleesByFunction[fd])
+                .Where(callee => this.ModuleByFunction[callee] != moduleName)
+                .Distinct()
+                .OrderBy(callee => callee.NameToken.Value, System.StringComparer.Ordinal)];
+        }
+
+        private Dictionary<FunctionDefinition, string> GroupByFile()
+        {
+            Dictionary<FunctionDefinition, string> output = [];
+            foreach (FunctionDefinition fd in this.functions)
+            {
+                string path = fd.NameToken.FileName ?? "";
+                output[fd] = path.EndsWith(".pst") ? path[..^".pst".Length] : path;
+            }
+            return output;
+        }
+
+        private Dictionary<FunctionDefinition, string> GroupByCaller()
+        {
+            Dictionary<FunctionDefinition, FunctionDefinition> rootByFunction = [];
+            foreach (FunctionDefinition fd in this.functions)
+            {
+                this.FindRoot(fd, rootByFunction, []);
+            }
+
+            Dictionary<FunctionDefinition, int> clusterSizes = rootByFunction.Values
+                .GroupBy(root => root)
+                .ToDictionary(g => g.Key, g => g.Count());
+
+            Dictionary<FunctionDefinition, string> output = [];
+            foreach (FunctionDefinition fd in this.functions)
+            {
+                FunctionDefinition root = rootByFunction[fd];
+                output[fd] = clusterSizes[root] < MIN_CLUSTER_SIZE ? SHARED_MODULE : root.NameToken.Value;
+            }
+            return output;
+        }
+
+        // A function's root is the root of its only caller, or itself if it's an entry point or has any other
+        // number of callers. A function whose callers lead back to itself is its own root.
+        private FunctionDefinition FindRoot(
+            FunctionDefinition fd,
+            Dictionary<FunctionDefinition, FunctionDefinition> rootByFunction,
+            HashSet<FunctionDefinition> visiting)
+        {
+            if (rootByFunction.TryGetValue(fd, out FunctionDefinition? root)) return root;
+
+            HashSet<FunctionDefinition> callers = this.callersByFunction[fd];
+            if (this.entryPoints.Contains(fd.NameToken.Value) || callers.Count != 1 || !visiting.Add(fd))
+            {
+                root = fd;
+            }
+            else
+            {
+                root = this.FindRoot(callers.First(), rootByFunction, visiting);
+
+                // If the chain of callers led back around to this function, it was made the root along the way.
+                if (rootByFunction.TryGetValue(fd, out FunctionDefinition? cycleRoot)) root = cycleRoot;
+            }
+            rootByFunction[fd] = root;
+            return root;
+        }
+
+        private static string GetSafeModuleName(string name)
+        {
+            string safe = new string(name.ToLowerInvariant().Select(c => (c >= 'a' && c <= 'z') || (c >= '0' && c <= '9') ? c : '_').ToArray());
+            return "mod_" + safe;
+        }
+    }
+}
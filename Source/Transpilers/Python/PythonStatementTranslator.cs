@@ -1,4 +1,6 @@
-﻿using Pastel.Parser.ParseNodes;
+﻿using Pastel.Parser;
+using Pastel.Parser.ParseNodes;
+using System.Collections.Generic;
 
 namespace Pastel.Transpilers.Python
 {
@@ -6,6 +8,10 @@ namespace Pastel.Transpilers.Python
     {
         public PythonStatementTranslator(TranspilerContext ctx) : base(ctx) { }
 
+        // The annotations of the local variables of the function being generated, by name, if the python-type-hints
+        // build option is on. Each one is removed once it's used since a variable can only be annotated once.
+        public Dictionary<string, string?>? LocalTypeHints { get; set; }
+
         public override void TranslateAssignment(TranspilerContext sb, Assignment assignment)
         {
             sb.Append(sb.CurrentTab);
@@ -70,7 +76,8 @@ namespace Pastel.Transpilers.Python
             sb.TabDepth++;
             if (ifStatement.IfCode.Length == 0)
             {
-                // ideally this should be optimized out at compile-time. TODO: throw instead and do that
+                // The constant folder removes empty ifs or inverts them if there's an else, so this only
+                // happens when the condition has side effects.
                 sb.Append(sb.CurrentTab);
                 sb.Append("pass\n");
             }
@@ -114,9 +121,53 @@ namespace Pastel.Transpilers.Python
 
         public override void TranslateSwitchStatement(TranspilerContext sb, SwitchStatement switchStatement)
         {
-            string functionName = this.transpilerCtx.CurrentFunctionDefinition.NameToken.Value;
+            string functionName = this.transpilerCtx.CurrentFunctionDefinition!.NameToken.Value;
             int switchId = this.transpilerCtx.SwitchCounter++;
-            PythonFakeSwitchStatement fakeSwitchStatement = PythonFakeSwitchStatement.Build(switchStatement, switchId, functionName);
+            PythonFakeSwitchStatement fakeSwitchStatement = PythonFakeSwitchStatement.Build(
+                switchStatement,
+                switchId,
+                functionName,
+                sb.PythonSwitchLowering,
+                sb.PastelContext.ExecutionProfile?.GetChunkOrder(switchStatement));
+
+            if (fakeSwitchStatement.Lowering == PythonSwitchLowering.IF_CHAIN)
+            {
+                Expression conditionValue = switchStatement.Condition;
+                if (!(conditionValue is Variable))
+                {
+                    // Only evaluate the condition once.
+                    sb.Append(sb.CurrentTab);
+                    sb.Append(fakeSwitchStatement.ConditionVariableName);
+                    sb.Append(" = ");
+                    sb.Append(this.ExpressionTranslator.TranslateExpressionAsString(conditionValue));
+                    sb.Append('\n');
+                    conditionValue = new Variable(Token.CreateDummyToken(fakeSwitchStatement.ConditionVariableName), conditionValue.Owner)
+                    {
+                        ApplyPrefix = false,
+                        ResolvedType = conditionValue.ResolvedType,
+                    };
+                }
+                this.TranslateStatements(sb, fakeSwitchStatement.GenerateIfChain(conditionValue));
+                return;
+            }
+
+            if (fakeSwitchStatement.Lowering == PythonSwitchLowering.TABLE)
+            {
+                sb.Append(sb.CurrentTab);
+                sb.Append("return ");
+                sb.Append(fakeSwitchStatement.TableGlobalName);
+                sb.Append(".get(");
+                sb.Append(this.ExpressionTranslator.TranslateExpressionAsString(switchStatement.Condition));
+                sb.Append(", ");
+                sb.Append(fakeSwitchStatement.GetTableFunctionName(fakeSwitchStatement.DefaultId));
+                sb.Append(")(");
+                this.AppendTableFunctionArgs(sb, fakeSwitchStatement);
+                sb.Append(")\n");
+
+                // The case functions and table are serialized at the end of the function definition.
+                sb.SwitchStatements.Add(fakeSwitchStatement);
+                return;
+            }
 
             sb.Append(sb.CurrentTab);
             sb.Append(fakeSwitchStatement.ConditionVariableName);
@@ -133,10 +184,32 @@ namespace Pastel.Transpilers.Python
             sb.SwitchStatements.Add(fakeSwitchStatement);
         }
 
+        public override void TranslateProfileCounter(TranspilerContext sb, ProfileCounter counter)
+        {
+            sb.Append(sb.CurrentTab);
+            sb.Append("PST_profileCounters[");
+            sb.Append(counter.Slot);
+            sb.Append("] += 1\n");
+        }
+
+        public void AppendTableFunctionArgs(TranspilerContext sb, PythonFakeSwitchStatement fakeSwitchStatement)
+        {
+            string[] args = fakeSwitchStatement.TableFunctionArgs;
+            for (int i = 0; i < args.Length; ++i)
+            {
+                if (i > 0) sb.Append(", ");
+                sb.AppendVariableNameSafe(args[i]);
+            }
+        }
+
         public override void TranslateVariableDeclaration(TranspilerContext sb, VariableDeclaration varDecl)
         {
             sb.Append(sb.CurrentTab);
             sb.AppendVariableNameSafe(varDecl.VariableNameToken.Value);
+            if (this.LocalTypeHints != null && this.LocalTypeHints.Remove(varDecl.VariableNameToken.Value, out string? typeHint) && typeHint != null)
+            {
+                sb.Append(": ").Append(typeHint);
+            }
             sb.Append(" = ");
             sb.Append(this.ExpressionTranslator.TranslateExpressionAsString(varDecl.Value));
             sb.Append("\n");
@@ -152,5 +225,37 @@ namespace Pastel.Transpilers.Python
             this.TranslateStatements(sb, whileLoop.Code);
             sb.TabDepth--;
         }
+
+        public override void TranslateCountedForLoop(TranspilerContext sb, CountedForLoop countedLoop)
+        {
+            // range() leaves the variable at the last value in the range rather than the bound, so the while loop
+            // is used instead if anything reads the variable after the loop.
+            if (countedLoop.IsFinalValueObserved)
+            {
+                base.TranslateCountedForLoop(sb, countedLoop);
+                return;
+            }
+
+            sb.Append(sb.CurrentTab);
+            sb.Append("for ");
+            sb.AppendVariableNameSafe(countedLoop.InductionVariable.Value);
+            sb.Append(" in range(");
+            bool isZeroStart = countedLoop.Start is InlineConstant ic && ic.Value is int start && start == 0;
+            if (!isZeroStart || countedLoop.Step != 1)
+            {
+                sb.Append(this.ExpressionTranslator.TranslateExpressionAsString(countedLoop.Start));
+                sb.Append(", ");
+            }
+            sb.Append(this.ExpressionTranslator.TranslateExpressionAsString(countedLoop.ExclusiveEnd));
+            if (countedLoop.Step != 1)
+            {
+                sb.Append(", ");
+                sb.Append(countedLoop.Step);
+            }
+            sb.Append("):\n");
+            sb.TabDepth++;
+            this.TranslateStatements(sb, countedLoop.Code);
+            sb.TabDepth--;
+        }
     }
 }
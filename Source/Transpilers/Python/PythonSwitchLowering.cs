@@ -0,0 +1,20 @@
+﻿namespace Pastel.Transpilers.Python
+{
+    // How switch statements are emitted in Python, which has no native equivalent.
+    // This is configured by the "python-switch" field in the build file.
+    public enum PythonSwitchLowering
+    {
+        // Picks one of the others based on the number of cases and the shape of the code in them.
+        AUTO,
+
+        // A dictionary lookup of the condition to a chunk ID followed by a binary search tree of if statements on that ID.
+        BINARY_SEARCH,
+
+        // A flat if/elif chain that compares the condition to each case value directly. Fastest for small switches.
+        IF_CHAIN,
+
+        // A dictionary lookup of the condition to a module-level function per case, which is invoked immediately.
+        // This is O(1) but only possible when every case ends with a return statement.
+        TABLE,
+    }
+}
@@ -1,5 +1,8 @@
-﻿using Pastel.Parser.ParseNodes;
+﻿using Pastel.Parser;
+using Pastel.Parser.ParseNodes;
 using System;
+using System.Collections.Generic;
+using System.Linq;
 
 namespace Pastel.Transpilers.Python
 {
@@ -9,13 +12,15 @@ namespace Pastel.Transpilers.Python
             : base(
                 transpilerCtx,
                 new PythonExporter(),
-                null,
+                new PythonTypeTranspiler(transpilerCtx),
                 new PythonExpressionTranslator(transpilerCtx),
                 new PythonStatementTranslator(transpilerCtx))
         {
             transpilerCtx.VariablePrefix = "V_";
         }
 
+        private HashSet<string>? functionNames = null;
+
         public override string HelperCodeResourcePath { get { return "Transpilers/Python/PastelHelper.py"; } }
 
         public override void GenerateCodeForFunction(TranspilerContext sb, FunctionDefinition funcDef, bool isStatic)
@@ -25,21 +30,34 @@ namespace Pastel.Transpilers.Python
             sb.Append(sb.CurrentTab);
             sb.Append("def ");
             sb.AppendVariableNameSafe(funcDef.NameToken.Value);
-            sb.Append('(');
-            int argCount = funcDef.ArgNames.Length;
-            for (int i = 0; i < argCount; ++i)
+            this.AppendSignature(sb, funcDef);
+            sb.Append(":\n");
+            PythonStatementTranslator stmntTranslator = (PythonStatementTranslator)this.StatementTranslator;
+            stmntTranslator.LocalTypeHints = sb.PythonTypeHints ? this.GetLocalTypeHints(funcDef) : null;
+            sb.TabDepth++;
+            int bodyStart = sb.CurrentStringBuilderSize;
+            stmntTranslator.TranslateStatements(sb, funcDef.Code);
+            // mypyc compiles calls to the module's functions and builtins into direct calls, which it can't do
+            // through a local.
+            if (sb.PythonHoistGlobals && !sb.PythonTypeHints)
             {
-                if (i > 0) sb.Append(", ");
-                sb.AppendVariableNameSafe(funcDef.ArgNames[i].Value);
+                string body = sb.ExtractStringFromIndex(bodyStart);
+                sb.Append(PythonGlobalHoister.HoistGlobals(body, sb.CurrentTab, funcDef.ArgNames.Select(arg => sb.WrapVariableName(arg.Value)), this.GetModuleGlobals()));
             }
-            sb.Append("):\n");
-            sb.TabDepth++;
-            this.StatementTranslator.TranslateStatements(sb, funcDef.Code);
             sb.TabDepth--;
             sb.Append("\n");
 
-            foreach (PythonFakeSwitchStatement switchStatement in this.transpilerCtx.SwitchStatements)
+            // The locals of the case functions of a switch are their arguments, so they're left unannotated.
+            stmntTranslator.LocalTypeHints = null;
+
+            // Iterate by index since case functions may contain switch statements that add to this list.
+            for (int i = 0; i < this.transpilerCtx.SwitchStatements.Count; ++i)
             {
+                PythonFakeSwitchStatement switchStatement = this.transpilerCtx.SwitchStatements[i];
+                if (switchStatement.Lowering == PythonSwitchLowering.TABLE)
+                {
+                    this.GenerateCodeForSwitchTableFunctions(sb, switchStatement);
+                }
                 sb.Append(sb.CurrentTab);
                 sb.Append(switchStatement.GenerateGlobalDictionaryLookup());
                 sb.Append("\n");
@@ -48,6 +66,133 @@ namespace Pastel.Transpilers.Python
             this.transpilerCtx.CurrentFunctionDefinition = null;
         }
 
+        public override void GenerateCodeForMemoizedFunction(TranspilerContext sb, FunctionDefinition funcDef, bool isStatic)
+        {
+            string cacheName = "PST_memo_" + funcDef.Name;
+            string[] args = [.. funcDef.ArgNames.Select(arg => this.transpilerCtx.WrapVariableName(arg.Value))];
+            string argList = string.Join(", ", args);
+            string key = args.Length == 0 ? "None" : args.Length == 1 ? args[0] : "(" + argList + ")";
+
+            sb.Append(cacheName).Append(" = PST_MemoCache(").Append(CodeUtil.ConvertStringValueToCode(funcDef.Name)).Append(", ").Append(funcDef.MemoizeMaxEntries).Append(")\n\n");
+            sb.Append("def ").AppendVariableNameSafe(funcDef.Name);
+            this.AppendSignature(sb, funcDef);
+            sb.Append(":\n");
+            sb.Append("\tvalue = ").Append(cacheName).Append(".get(").Append(key).Append(")\n");
+            sb.Append("\tif value is PST_MemoMiss:\n");
+            sb.Append("\t\tvalue = ").AppendVariableNameSafe(funcDef.Name + "__uncached").Append('(').Append(argList).Append(")\n");
+            sb.Append("\t\t").Append(cacheName).Append(".put(").Append(key).Append(", value)\n");
+            sb.Append("\treturn value\n\n");
+            this.GenerateCodeForFunction(sb, GetUncachedCopy(funcDef), isStatic);
+
+            sb.MarkFeatureAsBeingUsed("HELPER:PST_MemoCache");
+            sb.MarkFeatureAsBeingUsed("HELPER:PST_getMemoStats");
+        }
+
+        // The generated functions and the lookup tables of the switch statements of the current function.
+        private HashSet<string> GetModuleGlobals()
+        {
+            if (this.functionNames == null)
+            {
+                this.functionNames = [.. this.transpilerCtx.PastelContext.GetCompiler().GetFunctionDefinitions()
+                    .Select(fd => this.transpilerCtx.WrapVariableName(fd.NameToken.Value))];
+            }
+            return [
+                .. this.functionNames,
+                .. this.transpilerCtx.SwitchStatements.SelectMany(s => new string[] { s.DictionaryGlobalName, s.TableGlobalName }),
+            ];
+        }
+
+        // The arguments, with their annotations if the python-type-hints build option is on, and the return type.
+        private void AppendSignature(TranspilerContext sb, FunctionDefinition funcDef)
+        {
+            sb.Append('(');
+            for (int i = 0; i < funcDef.ArgNames.Length; ++i)
+            {
+                if (i > 0) sb.Append(", ");
+                sb.AppendVariableNameSafe(funcDef.ArgNames[i].Value);
+                if (sb.PythonTypeHints)
+                {
+                    sb.Append(": ").Append(this.TypeTranspiler.TranslateType(funcDef.ArgTypes[i]));
+                }
+            }
+            sb.Append(')');
+            if (sb.PythonTypeHints)
+            {
+                sb.Append(" -> ").Append(this.TypeTranspiler.TranslateType(funcDef.ReturnType));
+            }
+        }
+
+        // A local variable is annotated where it's first assigned, as long as every declaration of it in the
+        // function has the same type. Pastel allows declaring the same name with different types in separate blocks
+        // but a Python variable can only have one annotation. Variables that are first assigned by a range() loop
+        // are left unannotated as well since the loop already tells type checkers that they're ints.
+        private Dictionary<string, string?> GetLocalTypeHints(FunctionDefinition funcDef)
+        {
+            Dictionary<string, string?> hints = [];
+            foreach (Token arg in funcDef.ArgNames)
+            {
+                hints[arg.Value] = null;
+            }
+
+            void AddDeclaration(string name, string? hint)
+            {
+                if (!hints.TryGetValue(name, out string? existingHint))
+                {
+                    hints[name] = hint;
+                }
+                else if (existingHint != hint)
+                {
+                    hints[name] = null;
+                }
+            }
+
+            bool OnStatement(Statement stmnt)
+            {
+                if (stmnt is CountedForLoop countedLoop && !countedLoop.IsFinalValueObserved)
+                {
+                    // This is a range() loop rather than its canonical form. See PythonStatementTranslator.
+                    AddDeclaration(countedLoop.InductionVariable.Value, null);
+                    ParseTreeWalker.WalkStatements(countedLoop.Code, OnStatement, null);
+                    return false;
+                }
+                if (stmnt is VariableDeclaration varDecl)
+                {
+                    AddDeclaration(varDecl.VariableNameToken.Value, this.TypeTranspiler.TranslateType(varDecl.Type));
+                }
+                return true;
+            }
+
+            ParseTreeWalker.WalkStatements(funcDef.Code, OnStatement, null);
+            return hints;
+        }
+
+        private void GenerateCodeForSwitchTableFunctions(TranspilerContext sb, PythonFakeSwitchStatement switchStatement)
+        {
+            PythonStatementTranslator stmntTranslator = (PythonStatementTranslator)this.StatementTranslator;
+            for (int chunkId = 0; chunkId < switchStatement.ChunkCount; ++chunkId)
+            {
+                sb.Append(sb.CurrentTab);
+                sb.Append("def ");
+                sb.Append(switchStatement.GetTableFunctionName(chunkId));
+                sb.Append('(');
+                stmntTranslator.AppendTableFunctionArgs(sb, switchStatement);
+                sb.Append("):\n");
+                sb.TabDepth++;
+                stmntTranslator.TranslateStatements(sb, switchStatement.GetChunkCode(chunkId));
+                sb.TabDepth--;
+                sb.Append("\n");
+            }
+        }
+
+        public override void GenerateCodeForProfileCounters(TranspilerContext sb, string[] slotNames)
+        {
+            sb.Append("PST_profileNames = [");
+            sb.Append(string.Join(", ", slotNames.Select(name => CodeUtil.ConvertStringValueToCode(name))));
+            sb.Append("]\n");
+            sb.Append("PST_profileCounters = [0] * len(PST_profileNames)\n");
+            sb.MarkFeatureAsBeingUsed("HELPER:PST_dumpProfile");
+        }
+
         public override void GenerateCodeForStruct(TranspilerContext sb, StructDefinition structDef)
         {
             throw new InvalidOperationException(); // This function should not be called. Python uses lists as structs.
@@ -0,0 +1,69 @@
+﻿using Pastel.Parser.ParseNodes;
+using System.Linq;
+
+namespace Pastel.Transpilers.Python
+{
+    // PEP 484 annotations for the python-type-hints build option. Since the generated module starts with
+    // "from __future__ import annotations", these are never evaluated by CPython and only need to make sense to
+    // type checkers and compilers such as mypyc and Cython. Structs are lists in Python, so each struct type is a
+    // typing alias of a list (see PythonExporter).
+    internal class PythonTypeTranspiler : AbstractTypeTranspiler
+    {
+        private TranspilerContext transpilerCtx;
+
+        public PythonTypeTranspiler(TranspilerContext transpilerCtx)
+        {
+            this.transpilerCtx = transpilerCtx;
+        }
+
+        public static string GetStructAliasName(string structName)
+        {
+            return "S_" + structName;
+        }
+
+        public override string TranslateType(PType type)
+        {
+            switch (type.RootValue)
+            {
+                case "int":
+                case "byte":
+                    return "int";
+                case "double": return "float";
+                case "bool": return "bool";
+                case "void": return "None";
+
+                // Characters are strings of length 1.
+                case "char":
+                case "string":
+                    return "str";
+
+                case "StringBuilder": return "list[str]";
+                case "List": return "list[" + this.TranslateType(type.Generics[0]) + "]";
+                case "Dictionary": return "dict[" + this.TranslateType(type.Generics[0]) + ", " + this.TranslateType(type.Generics[1]) + "]";
+
+                case "Array":
+                    PType itemType = type.Generics[0];
+                    if (itemType.IsByte) return "bytearray";
+                    if (this.transpilerCtx.PythonTypedArrays && (itemType.IsInteger || itemType.IsFloat))
+                    {
+                        this.transpilerCtx.MarkFeatureAsBeingUsed("IMPORT:array");
+                        return "array.array[" + (itemType.IsFloat ? "float" : "int") + "]";
+                    }
+                    return "list[" + this.TranslateType(itemType) + "]";
+
+                case "Func":
+                    this.transpilerCtx.MarkFeatureAsBeingUsed("IMPORT:typing");
+                    return "typing.Callable[[" + string.Join(", ", type.Generics.Skip(1).Select(this.TranslateType)) + "], " + this.TranslateType(type.Generics[0]) + "]";
+            }
+
+            if (type.IsStruct)
+            {
+                return GetStructAliasName(type.RootValue);
+            }
+
+            // object and template types
+            this.transpilerCtx.MarkFeatureAsBeingUsed("IMPORT:typing");
+            return "typing.Any";
+        }
+    }
+}
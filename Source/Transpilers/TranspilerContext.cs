@@ -13,10 +13,13 @@ namespace Pastel.Transpilers
 
         public string UniquePrefixForNonCollisions { get; set; }
 
-        // This is a hack for conveying extra information to the top-level function serializer for switch statement stuff.
-        // This reference is updated in TranslateFunctionDefinition.
-        internal FunctionDefinition PY_HACK_CurrentFunctionDef { get; set; }
+        // The function that code is currently being generated for. Python switch statements use this to name their globals.
+        internal FunctionDefinition? CurrentFunctionDefinition { get; set; }
         public int SwitchCounter { get; set; }
+        public PythonSwitchLowering PythonSwitchLowering { get; set; } = PythonSwitchLowering.AUTO;
+        public bool PythonTypedArrays { get; set; } = false;
+        public bool PythonTypeHints { get; set; } = false;
+        public bool PythonHoistGlobals { get; set; } = false;
         private int currentIndentDepth = 0;
         public string CurrentTab { get; private set; }
         internal AbstractTranspiler Transpiler { get; set; }
@@ -36,11 +39,41 @@ namespace Pastel.Transpilers
             this.TabDepth = 0;
         }
 
+        // Creates a context for generating code for functions on another thread. It has its own transpiler, since
+        // translators hold on to their context. Its feature usage is added back to this context with MergeFeatureUsage.
+        internal TranspilerContext CreateFunctionContext()
+        {
+            TranspilerContext ctx = new TranspilerContext(this.PastelContext)
+            {
+                UniquePrefixForNonCollisions = this.UniquePrefixForNonCollisions,
+                PythonSwitchLowering = this.PythonSwitchLowering,
+                PythonTypedArrays = this.PythonTypedArrays,
+                PythonTypeHints = this.PythonTypeHints,
+                PythonHoistGlobals = this.PythonHoistGlobals,
+                TabDepth = this.TabDepth,
+            };
+            ctx.Transpiler = LanguageUtil.CreateTranspiler(this.PastelContext.Language, ctx);
+            return ctx;
+        }
+
+        internal void MergeFeatureUsage(TranspilerContext other)
+        {
+            this.featureUsage.UnionWith(other.featureUsage);
+        }
+
         public void InjectStringAtIndex(int index, string value)
         {
             this.buffer.Insert(index, value);
         }
 
+        // Removes and returns everything that was appended after the given index.
+        public string ExtractStringFromIndex(int index)
+        {
+            string value = this.buffer.ToString(index, this.buffer.Length - index);
+            this.buffer.Length = index;
+            return value;
+        }
+
         public string WrapVariableName(string name)
         {
             return this.VariablePrefix == null ? name : (this.VariablePrefix + name);
@@ -109,14 +142,5 @@ namespace Pastel.Transpilers
             return value;
         }
 
-        internal FunctionDefinition CurrentFunctionDefinition
-        {
-            get { return this.PY_HACK_CurrentFunctionDef; }
-            set
-            {
-                this.PY_HACK_CurrentFunctionDef = value;
-                this.SwitchCounter = 0;
-            }
-        }
     }
 }
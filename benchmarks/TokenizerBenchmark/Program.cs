@@ -0,0 +1,88 @@
+﻿using Pastel.Parser;
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+
+namespace Pastel.Benchmarks
+{
+    // Tokenizes a corpus of .pst files and reports tokens per second and bytes allocated per token.
+    // By default the corpus is every .pst file in the repository, repeated until it is at least 4 MB.
+    //
+    // Usage: dotnet run -c Release --project benchmarks/TokenizerBenchmark [corpus directory]
+    public class Program
+    {
+        private const int MIN_CORPUS_SIZE = 4 * 1024 * 1024;
+        private const int RUNS = 7;
+
+        public static void Main(string[] args)
+        {
+            string corpusDir = args.Length > 0 ? args[0] : FindRepositoryRoot();
+            List<KeyValuePair<string, string>> corpus = LoadCorpus(corpusDir);
+            long corpusSize = corpus.Sum(file => (long)file.Value.Length);
+
+            // Warm up, and count the tokens.
+            long tokenCount = TokenizeAll(corpus);
+
+            double bestSeconds = double.MaxValue;
+            long allocatedBytes = 0;
+            for (int i = 0; i < RUNS; i++)
+            {
+                GC.Collect();
+                long allocatedBefore = GC.GetAllocatedBytesForCurrentThread();
+                System.Diagnostics.Stopwatch timer = System.Diagnostics.Stopwatch.StartNew();
+                TokenizeAll(corpus);
+                double seconds = timer.Elapsed.TotalSeconds;
+                allocatedBytes = GC.GetAllocatedBytesForCurrentThread() - allocatedBefore;
+                bestSeconds = Math.Min(bestSeconds, seconds);
+            }
+
+            Console.WriteLine("Corpus:            " + corpus.Count + " files, " + (corpusSize / 1e6).ToString("0.0") + " M chars, " + tokenCount + " tokens");
+            Console.WriteLine("Best of " + RUNS + " runs:    " + (bestSeconds * 1000).ToString("0.0") + " ms");
+            Console.WriteLine("Tokens per second: " + (tokenCount / bestSeconds / 1e6).ToString("0.00") + " M");
+            Console.WriteLine("Allocated:         " + (allocatedBytes / 1e6).ToString("0.0") + " MB (" + (allocatedBytes / (double)tokenCount).ToString("0.0") + " bytes per token)");
+        }
+
+        private static long TokenizeAll(List<KeyValuePair<string, string>> corpus)
+        {
+            long count = 0;
+            foreach (KeyValuePair<string, string> file in corpus)
+            {
+                count += Tokenizer.Tokenize(file.Key, file.Value).Length;
+            }
+            return count;
+        }
+
+        private static List<KeyValuePair<string, string>> LoadCorpus(string dir)
+        {
+            string[] paths = Directory.GetFiles(dir, "*.pst", SearchOption.AllDirectories)
+                .Where(path => !path.Contains(Path.DirectorySeparatorChar + "tmp" + Path.DirectorySeparatorChar))
+                .OrderBy(path => path)
+                .ToArray();
+            if (paths.Length == 0) throw new Exception("No .pst files found in " + dir);
+
+            List<KeyValuePair<string, string>> corpus = new List<KeyValuePair<string, string>>();
+            long size = 0;
+            for (int copy = 0; size < MIN_CORPUS_SIZE; copy++)
+            {
+                foreach (string path in paths)
+                {
+                    string code = File.ReadAllText(path);
+                    corpus.Add(new KeyValuePair<string, string>(path + "#" + copy, code));
+                    size += code.Length;
+                }
+            }
+            return corpus;
+        }
+
+        private static string FindRepositoryRoot()
+        {
+            string dir = AppContext.BaseDirectory;
+            while (!File.Exists(Path.Combine(dir, "testrunner.py")))
+            {
+                dir = Path.GetDirectoryName(dir) ?? throw new Exception("Could not find the repository root. Pass a corpus directory instead.");
+            }
+            return dir;
+        }
+    }
+}
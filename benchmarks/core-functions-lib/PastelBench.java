@@ -0,0 +1,39 @@
+public class PastelBench {
+  public static void main(String[] args) {
+    final long start = System.nanoTime();
+    final java.lang.management.ThreadMXBean threads = java.lang.management.ManagementFactory.getThreadMXBean();
+    FunctionWrapper.PST_RegisterExtensibleCallback("benchClock", new FunctionWrapper.PstExtWrapper() {
+      @Override
+      public Object run(Object[] args) {
+        return (System.nanoTime() - start) / 1000000000.0;
+      }
+    });
+    FunctionWrapper.PST_RegisterExtensibleCallback("benchAllocatedBytes", new FunctionWrapper.PstExtWrapper() {
+      @Override
+      public Object run(Object[] args) {
+        if (threads instanceof com.sun.management.ThreadMXBean) {
+          return (double) ((com.sun.management.ThreadMXBean) threads).getThreadAllocatedBytes(Thread.currentThread().getId());
+        }
+        return -1.0;
+      }
+    });
+    FunctionWrapper.PST_RegisterExtensibleCallback("benchReport", new FunctionWrapper.PstExtWrapper() {
+      @Override
+      public Object run(Object[] args) {
+        StringBuilder line = new StringBuilder("RESULT");
+        for (Object arg : args) {
+          line.append('\t').append(arg);
+        }
+        System.out.println(line);
+        return null;
+      }
+    });
+    FunctionWrapper.PST_RegisterExtensibleCallback("benchNoop", new FunctionWrapper.PstExtWrapper() {
+      @Override
+      public Object run(Object[] args) {
+        return null;
+      }
+    });
+    FunctionWrapper.runner();
+  }
+}
@@ -0,0 +1,16 @@
+namespace PastelBench;
+
+public class Program {
+
+    public static void Main(string[] args) {
+        System.Diagnostics.Stopwatch clock = System.Diagnostics.Stopwatch.StartNew();
+        PastelBench.GeneratedCode.FunctionWrapper.PST_RegisterExtensibleCallback("benchClock", _ => clock.Elapsed.TotalSeconds);
+        PastelBench.GeneratedCode.FunctionWrapper.PST_RegisterExtensibleCallback("benchAllocatedBytes", _ => (double)System.GC.GetAllocatedBytesForCurrentThread());
+        PastelBench.GeneratedCode.FunctionWrapper.PST_RegisterExtensibleCallback("benchReport", args => {
+            System.Console.WriteLine("RESULT\t" + string.Join("\t", args));
+            return null!;
+        });
+        PastelBench.GeneratedCode.FunctionWrapper.PST_RegisterExtensibleCallback("benchNoop", _ => null!);
+        PastelBench.GeneratedCode.FunctionWrapper.runner();
+    }
+}
@@ -0,0 +1,3 @@
+module plexi.io/pastel
+
+go 1.20
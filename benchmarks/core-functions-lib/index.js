@@ -0,0 +1,9 @@
+import PST from './gen.js';
+
+// JavaScript has no cumulative allocation counter.
+PST.registerExtension('benchClock', () => performance.now() / 1000);
+PST.registerExtension('benchAllocatedBytes', () => -1.0);
+PST.registerExtension('benchReport', (args) => console.log(['RESULT', ...args].join('\t')));
+PST.registerExtension('benchNoop', () => null);
+
+PST.runner();
@@ -0,0 +1,44 @@
+package main
+
+import (
+	"fmt"
+	"runtime"
+	"strings"
+	"time"
+)
+
+func toGoString(value any) string {
+	s := value.(*pstring)
+	if s.str != nil {
+		return *s.str
+	}
+	runes := make([]rune, len(s.uchars))
+	for i, c := range s.uchars {
+		runes[i] = rune(c)
+	}
+	return string(runes)
+}
+
+func main() {
+	start := time.Now()
+	PST_RegisterExtensibleCallback("benchClock", func(args []any) any {
+		return time.Since(start).Seconds()
+	})
+	PST_RegisterExtensibleCallback("benchAllocatedBytes", func(args []any) any {
+		var stats runtime.MemStats
+		runtime.ReadMemStats(&stats)
+		return float64(stats.TotalAlloc)
+	})
+	PST_RegisterExtensibleCallback("benchReport", func(args []any) any {
+		fields := []string{"RESULT"}
+		for _, arg := range args {
+			fields = append(fields, toGoString(arg))
+		}
+		fmt.Println(strings.Join(fields, "\t"))
+		return nil
+	})
+	PST_RegisterExtensibleCallback("benchNoop", func(args []any) any {
+		return nil
+	})
+	fn_runner()
+}
@@ -0,0 +1,11 @@
+import time
+import pygen
+
+pygen.PST_RegisterExtensibleCallback('benchClock', lambda args: time.perf_counter())
+# Python has no cumulative allocation counter. tracemalloc would slow down the code being measured.
+pygen.PST_RegisterExtensibleCallback('benchAllocatedBytes', lambda args: -1.0)
+pygen.PST_RegisterExtensibleCallback('benchReport', lambda args: print('\t'.join(['RESULT'] + args)))
+pygen.PST_RegisterExtensibleCallback('benchNoop', lambda args: None)
+
+if __name__ == '__main__':
+  pygen.V_runner()
@@ -0,0 +1,459 @@
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import testrunner
+from pastelclient import PastelClient
+from testrunner import file_read_text, file_write_text, run_command
+
+# Benchmarks every core function on every target platform. A Pastel micro-benchmark is generated for each core
+# function (and each input size, for functions whose cost depends on the size of their input), transpiled to each
+# platform, and run by the host program in benchmarks/core-functions-lib. The results are nanoseconds per
+# operation and, on platforms that can count them (C#, Go, Java), bytes allocated per operation. Core functions
+# that a platform's translator doesn't support are left out for that platform and listed with the results.
+#
+# Usage: python benchmarks/core_functions.py path/to/pastel/binary/pastel[.exe] --platform:[ all | csharp | go | java | js | python | python-typed-arrays ] [options]
+#
+#   --sizes 10,1000,100000     Input sizes for functions whose cost depends on the size of the input.
+#   --only LIST_,STRING_TRIM   Only runs the benchmarks whose name starts with one of these prefixes.
+#   --min-time 0.05            Minimum duration of a timed batch of operations, in seconds.
+#   --repeat 3                 Number of timed batches. The fastest one is reported.
+#   --keep path/to/dir         Writes the generated projects to this directory instead of a temp dir.
+#   --save results.json        Saves the results so that later runs can be compared against them.
+#   --compare results.json     Compares against saved results and exits with an error if anything got slower
+#                              than the threshold.
+#   --threshold 1.5            How much slower (as a ratio) an operation can get before it counts as a regression.
+
+DEFAULT_SIZES = [10, 1000, 100000]
+
+# Operations faster than this are too noisy to compare between runs.
+MIN_COMPARABLE_NS = 20
+
+# Each benchmark is (core function, whether it depends on the input size, setup code, code for one operation).
+# The operation code runs in a loop where iter is the iteration number and n is the input size (1 for benchmarks
+# that don't depend on it). It adds something to checksum so that the result is used. Some operations need a second
+# operation to keep the input the same from one iteration to the next (e.g. LIST_POP adds an item back), so results
+# are comparable between platforms rather than an exact cost of the core function alone. LOOP is the cost of the
+# loop itself with an int modulo, which most of the other benchmarks also do.
+BENCHMARKS = [
+    ('LOOP', False, [], ['checksum += iter % 7;']),
+
+    ('ARRAY_GET', True, ['Array<int> arr = benchIntArray(n);'], ['checksum += arr[iter % n];']),
+    ('ARRAY_JOIN', True, ['Array<string> strs = benchStringArray(n);'], ['checksum += strs.join(",").size();']),
+    ('ARRAY_LENGTH', True, ['Array<int> arr = benchIntArray(n);'], ['checksum += arr.size();']),
+    ('ARRAY_SET', True, ['Array<int> arr = benchIntArray(n);'], ['arr[iter % n] = iter;']),
+    ('BASE64_TO_BYTES', True, ['string b64 = Base64.fromBytes(benchByteArray(n));'], ['checksum += Base64.toBytes(b64).size();']),
+    ('BASE64_TO_STRING', True, ['string b64 = Base64.fromBytes(benchString(n).toUtf8Bytes());'], ['checksum += Base64.toStringUtf8(b64).size();']),
+    ('BOOL_TO_STRING', False, [], ['checksum += Convert.boolToString(iter % 2 == 0).size();']),
+    ('BYTES_TO_BASE64', True, ['Array<int> bytes = benchByteArray(n);'], ['checksum += Base64.fromBytes(bytes).size();']),
+    ('CHAR_TO_STRING', False, ['string letters = benchString(26);'], ['checksum += Convert.charToString(letters[iter % 26]).size();']),
+    ('CHR', False, [], ['if (Convert.charCodeToChar(97 + iter % 26) == \'a\') checksum += 1;']),
+    ('CURRENT_TIME_SECONDS', False, [], ['checksum += Math.floor(DateTime.currentTimeFloat()) % 2;']),
+    ('DICTIONARY_CONTAINS_KEY', True, ['Dictionary<int, int> lookup = benchIntDictionary(n);'], ['if (lookup.contains(iter % (2 * n))) checksum += 1;']),
+    ('DICTIONARY_GET', True, ['Dictionary<int, int> lookup = benchIntDictionary(n);'], ['checksum += lookup[iter % n];']),
+    ('DICTIONARY_KEYS', True, ['Dictionary<int, int> lookup = benchIntDictionary(n);'], ['checksum += lookup.keys().size();']),
+    ('DICTIONARY_REMOVE', True, ['Dictionary<int, int> lookup = benchIntDictionary(n);'], ['lookup.remove(iter % n);', 'lookup[iter % n] = iter;']),
+    ('DICTIONARY_SET', True, ['Dictionary<int, int> lookup = benchIntDictionary(n);'], ['lookup[iter % n] = iter;']),
+    ('DICTIONARY_SIZE', True, ['Dictionary<int, int> lookup = benchIntDictionary(n);'], ['checksum += lookup.size();']),
+    ('DICTIONARY_TRY_GET', True, ['Dictionary<int, int> lookup = benchIntDictionary(n);'], ['checksum += lookup.tryGet(iter % (2 * n), 1);']),
+    ('DICTIONARY_VALUES', True, ['Dictionary<int, int> lookup = benchIntDictionary(n);'], ['checksum += lookup.values().size();']),
+    ('EXTENSIBLE_CALLBACK_INVOKE', False, ['Array<object> args = new Array<object>(0);'], ['Pastel.invokeExtension("benchNoop", args);', 'checksum += 1;']),
+    ('FLOAT_TO_STRING', False, [], ['checksum += Convert.floatToString(iter * 0.5).size();']),
+    ('INT_TO_STRING', False, [], ['checksum += Convert.intToString(iter).size();']),
+    ('IS_VALID_INTEGER', False, ['Array<string> numStrs = benchIntStrings();'], ['if (Convert.isValidInteger(numStrs[iter % 64])) checksum += 1;']),
+    ('LIST_ADD', True, ['List<int> list = new List<int>();'], ['list.add(iter);', 'if (list.size() >= n) list.clear();']),
+    ('LIST_CONCAT', True, ['List<int> a = benchIntList(n);', 'List<int> b = benchIntList(n);'], ['checksum += Collections.concatenateLists(a, b).size();']),
+    ('LIST_CLEAR', False, ['List<int> list = new List<int>();'], ['list.add(iter);', 'list.clear();', 'checksum += 1;']),
+    ('LIST_GET', True, ['List<int> list = benchIntList(n);'], ['checksum += list[iter % n];']),
+    ('LIST_INSERT', True, ['List<int> list = benchIntList(n);'], ['list.insert(iter % n, iter);', 'checksum += list.pop();']),
+    ('LIST_JOIN_STRINGS', True, ['List<string> strs = benchStringList(n);'], ['checksum += strs.join(",").size();']),
+    ('LIST_POP', True, ['List<int> list = benchIntList(n);'], ['checksum += list.pop();', 'list.add(iter);']),
+    ('LIST_REMOVE_AT', True, ['List<int> list = benchIntList(n);'], ['list.removeAt(iter % n);', 'list.add(iter);']),
+    ('LIST_REVERSE', True, ['List<int> list = benchIntList(n);'], ['list.reverse();', 'checksum += list[0];']),
+    ('LIST_SET', True, ['List<int> list = benchIntList(n);'], ['list[iter % n] = iter;']),
+    ('LIST_SHUFFLE', True, ['List<int> list = benchIntList(n);'], ['list.shuffle();', 'checksum += list[0];']),
+    ('LIST_SIZE', True, ['List<int> list = benchIntList(n);'], ['checksum += list.size();']),
+    ('LIST_TO_ARRAY', True, ['List<int> list = benchIntList(n);'], ['checksum += list.toArray().size();']),
+    ('MATH_ABS', False, [], ['checksum += Math.abs(iter - 1000);']),
+    ('MATH_ARCCOS', False, [], ['checksum += Math.floor(Math.arcCos((iter % 100) / 100.0) * 10);']),
+    ('MATH_ARCSIN', False, [], ['checksum += Math.floor(Math.arcSin((iter % 100) / 100.0) * 10);']),
+    ('MATH_ARCTAN', False, [], ['checksum += Math.floor(Math.arcTan(iter % 100, 7) * 10);']),
+    ('MATH_CEIL', False, [], ['checksum += Math.ceil(iter * 0.5);']),
+    ('MATH_COS', False, [], ['checksum += Math.floor(Math.cos(iter * 0.01) * 10);']),
+    ('MATH_FLOOR', False, [], ['checksum += Math.floor(iter * 0.5);']),
+    ('MATH_LOG', False, [], ['checksum += Math.floor(Math.log(iter + 1.0));']),
+    ('MATH_POW', False, [], ['checksum += Math.floor(Math.pow(1.0001, iter % 100));']),
+    ('MATH_SIN', False, [], ['checksum += Math.floor(Math.sin(iter * 0.01) * 10);']),
+    ('MATH_TAN', False, [], ['checksum += Math.floor(Math.tan(iter * 0.01));']),
+    ('ORD', False, ['string letters = benchString(26);'], ['checksum += Convert.charToCharCode(letters[iter % 26]);']),
+    ('PARSE_FLOAT_UNSAFE', False, ['Array<string> floatStrs = benchFloatStrings();'], ['checksum += Math.floor(Convert.parseFloatUnsafe(floatStrs[iter % 64]));']),
+    ('PARSE_INT', False, ['Array<string> numStrs = benchIntStrings();'], ['checksum += Convert.parseInt(numStrs[(iter * 2) % 64]);']),
+    ('RANDOM_FLOAT', False, [], ['checksum += Math.floor(Random.nextFloat() * 10);']),
+    ('SORTED_COPY_OF_INT_ARRAY', True, ['Array<int> arr = benchIntArray(n);'], ['checksum += Sorting.getIntegerSortedCopy(arr)[0];']),
+    ('SORTED_COPY_OF_STRING_ARRAY', True, ['Array<string> strs = benchStringArray(n);'], ['checksum += Sorting.getLexicalSortedCopy(strs)[0].size();']),
+    ('STRING_APPEND', True, ['string str = "";'], ['Deprecated.stringAppend(str, "x");', 'if (str.size() >= n) str = "";']),
+    ('STRING_CHAR_AT', True, ['string str = benchString(n);'], ['if (str[iter % n] == \'a\') checksum += 1;']),
+    ('STRING_CHAR_CODE_AT', True, ['string str = benchString(n);'], ['checksum += str.charCodeAt(iter % n);']),
+    ('STRING_COMPARE_IS_REVERSE', False, ['Array<string> strs = benchStringArray(64);'], ['if (Deprecated.stringCompareIsReverse(strs[iter % 64], strs[(iter + 1) % 64])) checksum += 1;']),
+    ('STRING_CONTAINS', True, ['string str = benchString(n);'], ['if (str.contains("zq")) checksum += 1;']),
+    ('STRING_ENDS_WITH', True, ['string str = benchString(n);', 'string suffix = str.subString(n / 2, n - n / 2);'], ['if (str.endsWith(suffix)) checksum += 1;']),
+    ('STRING_EQUALS', True, ['string str = benchString(n);', 'string other = benchString(n);'], ['if (Deprecated.stringEquals(str, other)) checksum += 1;']),
+    ('STRING_FROM_CHAR_CODE', False, [], ['checksum += Convert.charCodeToString(97 + iter % 26).size();']),
+    ('STRING_INDEX_OF', True, ['string str = benchString(n);'], ['checksum += str.indexOf("zq") + 1;']),
+    ('STRING_LAST_INDEX_OF', True, ['string str = benchString(n);'], ['checksum += str.lastIndexOf("zq") + 1;']),
+    ('STRING_LENGTH', True, ['string str = benchString(n);'], ['checksum += str.size();']),
+    ('STRING_REPLACE', True, ['string str = benchString(n);'], ['checksum += str.replace("ab", "xyz").size();']),
+    ('STRING_REVERSE', True, ['string str = benchString(n);'], ['checksum += str.reverse().size();']),
+    ('STRING_SPLIT', True, ['string csv = benchStringArray(n).join(",");'], ['checksum += csv.split(",").size();']),
+    ('STRING_STARTS_WITH', True, ['string str = benchString(n);', 'string prefix = str.subString(0, n / 2);'], ['if (str.startsWith(prefix)) checksum += 1;']),
+    ('STRING_SUBSTRING', True, ['string str = benchString(n);'], ['checksum += str.subString(iter % 2, n / 2).size();']),
+    ('STRING_SUBSTRING_IS_EQUAL_TO', True, ['string str = benchString(n);'], ['if (str.subStringIsEqualTo(iter % n, "ab")) checksum += 1;']),
+    ('STRING_TO_LOWER', True, ['string str = benchString(n).toUpper();'], ['checksum += str.toLower().size();']),
+    ('STRING_TO_UNICODE_CHARS', True, ['string str = benchString(n);'], ['checksum += str.toUnicodeChars().size();']),
+    ('STRING_TO_UPPER', True, ['string str = benchString(n);'], ['checksum += str.toUpper().size();']),
+    ('STRING_TO_UTF8_BYTES', True, ['string str = benchString(n);'], ['checksum += str.toUtf8Bytes().size();']),
+    ('STRING_TRIM', True, ['string str = "   " + benchString(n) + "   ";'], ['checksum += str.trim().size();']),
+    ('STRING_TRIM_END', True, ['string str = "   " + benchString(n) + "   ";'], ['checksum += str.trimEnd().size();']),
+    ('STRING_TRIM_START', True, ['string str = "   " + benchString(n) + "   ";'], ['checksum += str.trimStart().size();']),
+    ('STRINGBUILDER_ADD', True, ['StringBuilder sb = new StringBuilder();'], ['sb.add("x");', 'if (iter % n == 0) sb.clear();']),
+    ('STRINGBUILDER_CLEAR', False, ['StringBuilder sb = new StringBuilder();'], ['sb.add("x");', 'sb.clear();', 'checksum += 1;']),
+    ('STRINGBUILDER_TOSTRING', True, ['StringBuilder sb = new StringBuilder();', 'for (int i = 0; i < n; i += 1) sb.add("x");'], ['checksum += sb.toString().size();']),
+    ('STRONG_REFERENCE_EQUALITY', False, ['List<int> a = new List<int>();', 'List<int> b = new List<int>();'], ['if (Deprecated.strongReferenceEquality(a, b)) checksum += 1;']),
+    ('TO_CODE_STRING', True, ['string str = benchString(n) + "\\n\\"";'], ['checksum += Json.serializeString(str).size();']),
+    ('TRY_PARSE_FLOAT', False, ['Array<string> floatStrs = benchFloatStrings();', 'Array<double> result = new Array<double>(2);'], ['Convert.tryParseFloat(floatStrs[iter % 64], result);', 'checksum += Math.floor(result[1]);']),
+    ('UTF8_BYTES_TO_STRING', True, ['Array<int> utf8 = benchString(n).toUtf8Bytes();'], ['checksum += Convert.utf8BytesToString(utf8).size();']),
+]
+
+# Core functions that aren't benchmarked, and why.
+NOT_BENCHMARKED = {
+    'EMIT_COMMENT': 'only affects the generated code',
+    'LIST_JOIN_CHARS': 'no Pastel syntax is translated to it',
+    'MULTIPLY_LIST': 'its signature uses a Value type that does not exist, so it cannot be called',
+    'PRINT_STDERR': 'writes to the console',
+    'PRINT_STDOUT': 'writes to the console',
+}
+
+def generate_source(benchmarks, sizes, min_seconds, repeat):
+    lines = [
+        'const double BENCH_MIN_SECONDS = ' + repr(float(min_seconds)) + ';',
+        'const int BENCH_REPEAT = ' + str(repeat) + ';',
+        '',
+        '@import("bench-lib.pst");',
+        '',
+    ]
+    for i, (name, sized, setup, body) in enumerate(benchmarks):
+        lines.append('int bench_' + name + '(int n, int iterations) {')
+        lines.append('    int checksum = 0;')
+        lines += ['    ' + line for line in setup]
+        lines.append('    for (int iter = 0; iter < iterations; iter += 1) {')
+        lines += ['        ' + line for line in body]
+        lines.append('        checksum = checksum & 16777215;')
+        lines.append('    }')
+        lines.append('    return checksum;')
+        lines.append('}')
+        lines.append('')
+
+    # An if chain rather than a switch so that the dispatch is the same on every platform.
+    lines.append('int benchRun(int id, int n, int iterations) {')
+    for i, (name, sized, setup, body) in enumerate(benchmarks):
+        lines.append('    if (id == ' + str(i) + ') return bench_' + name + '(n, iterations);')
+    lines.append('    return 0;')
+    lines.append('}')
+    lines.append('')
+
+    lines.append('void runner() {')
+    for i, (name, sized, setup, body) in enumerate(benchmarks):
+        for size in (sizes if sized else [1]):
+            lines.append('    benchMeasure(' + str(i) + ', "' + name + '", ' + str(size) + ');')
+    lines.append('}')
+    lines.append('')
+    return '\n'.join(lines)
+
+def create_targets():
+    return [
+        testrunner.create_csharp_target('csharp', 'PastelBench.GeneratedCode', 'FunctionWrapper.cs', 'csgen'),
+        testrunner.create_go_target('go', 'gogen', 'gofuncs.go', '.'),
+        testrunner.create_java_target('java', 'FunctionWrapper.java', '.'),
+        testrunner.create_javascript_target('js', 'gen.js'),
+        testrunner.create_python_target('python', 'pygen/__init__.py'),
+        testrunner.create_python_target('python-instrumented', 'pygen/__init__.py', instrument = True),
+        testrunner.create_python_target('python-split-modules', 'pygen/__init__.py', modules = 'call-graph'),
+        testrunner.create_python_target('python-type-hints', 'pygen/__init__.py', type_hints = True),
+        testrunner.create_python_target('python-typed-arrays', 'pygen/__init__.py', typed_arrays = True),
+    ]
+
+# Translator errors are exceptions with a long stack trace. The name of the method that threw is enough to
+# tell why a core function isn't supported.
+def summarize_build_error(error):
+    first_line = error.strip().split('\n')[0]
+    method = re.search(r'at Pastel\.Transpilers\.[\w.]+\.(\w+)\(', error)
+    if method == None: return first_line
+    return first_line.split(':')[0].split('.')[-1] + ' in ' + method.group(1)
+
+def build_source(client, dst_dir, platform, source):
+    file_write_text(os.path.join(dst_dir, 'bench.pst'), source)
+    return client.build_output(os.path.join(dst_dir, 'bench.json'), platform).strip()
+
+# Builds all the benchmarks for the platform. If that fails, each benchmark is built on its own to find the ones
+# that the platform can't translate, and those are left out. Returns the benchmarks that were built and a
+# dictionary of the names of the ones that were left out to the reason.
+def build_platform(client, dst_dir, platform, benchmarks, options):
+    error = build_source(client, dst_dir, platform, generate_source(benchmarks, options['sizes'], options['min-time'], options['repeat']))
+    if error == '':
+        return benchmarks, {}
+
+    supported = []
+    unsupported = {}
+    for benchmark in benchmarks:
+        error = build_source(client, dst_dir, platform, generate_source([benchmark], options['sizes'], options['min-time'], options['repeat']))
+        if error == '':
+            supported.append(benchmark)
+        else:
+            unsupported[benchmark[0]] = summarize_build_error(error)
+    if len(supported) == 0 or 'LOOP' in unsupported:
+        raise Exception('Pastel compilation failed:\n' + error)
+    error = build_source(client, dst_dir, platform, generate_source(supported, options['sizes'], options['min-time'], options['repeat']))
+    if error != '':
+        raise Exception('Pastel compilation failed:\n' + error)
+    return supported, unsupported
+
+# Returns the benchmarks that were run, the names of the benchmarks the platform doesn't support (mapped to the
+# reason), and the exit code and output of the host program. Raises an exception if the platform couldn't be run at
+# all.
+def run_platform(client, work_dir, platform, benchmarks, options):
+    lib_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'core-functions-lib')
+    dst_dir = os.path.join(work_dir, platform)
+    if os.path.isdir(dst_dir):
+        shutil.rmtree(dst_dir)
+    os.makedirs(dst_dir)
+    for file in os.listdir(lib_dir):
+        # Skips anything else that ends up in there, like __pycache__ from running main.py in place.
+        if os.path.isfile(os.path.join(lib_dir, file)):
+            shutil.copyfile(os.path.join(lib_dir, file), os.path.join(dst_dir, file))
+    file_write_text(os.path.join(dst_dir, 'bench.json'), json.dumps({
+        'source': 'bench.pst',
+        'entry-points': ['runner'],
+        'targets': create_targets(),
+    }, indent = 2))
+
+    benchmarks, unsupported = build_platform(client, dst_dir, platform, benchmarks, options)
+    return benchmarks, unsupported, run_host(dst_dir, platform)
+
+# Unlike testrunner.run_command, this also returns the exit code, since a host program that crashes part way through
+# has still printed the results of the benchmarks before the crash.
+def run_host_command(ex, args, cwd):
+    result = subprocess.run(' '.join([ex] + args), shell = True, cwd = cwd, stdout = subprocess.PIPE, stderr = subprocess.STDOUT)
+    return result.returncode, result.stdout.decode('utf-8', 'replace').replace('\r\n', '\n')
+
+def run_host(dst_dir, platform):
+
+    if platform == 'js':
+        gen_js_path = os.path.join(dst_dir, 'gen.js')
+        file_write_text(
+            gen_js_path,
+            file_read_text(gen_js_path) + '\n\n' + 'export default { runner, registerExtension: PASTEL_regCallback };\n')
+        return run_host_command('node', ['index.js'], cwd = dst_dir)
+
+    if platform.startswith('python'):
+        return run_host_command(testrunner.PYTHON_COMMAND, ['main.py'], cwd = dst_dir)
+
+    if platform == 'java':
+        javac_result = run_command('javac', ['*.java'], cwd = dst_dir).strip()
+        if javac_result != '':
+            raise Exception('Java compilation failed:\n' + javac_result)
+        return run_host_command('java', ['PastelBench'], cwd = dst_dir)
+
+    if platform == 'csharp':
+        build_result = run_command('dotnet', ['build', '-c', 'Release', 'PastelBench.csproj'], cwd = dst_dir)
+        if 'Build succeeded.' not in build_result:
+            raise Exception('C# compilation failed:\n' + build_result)
+        return run_host_command(os.path.join('bin', 'Release', 'net8.0', 'PastelBench'), [], cwd = dst_dir)
+
+    if platform == 'go':
+        return run_host_command('go', ['run', '.'], cwd = dst_dir)
+
+    raise Exception('No runner for platform: ' + platform)
+
+# Returns a dictionary of "NAME/size" (or just "NAME" for benchmarks that don't depend on the size) to a
+# dictionary of ns per op and bytes allocated per op (None if not measurable).
+def parse_results(output, benchmarks):
+    sized = dict((name, is_sized) for name, is_sized, _, _ in benchmarks)
+    results = {}
+    for line in output.split('\n'):
+        parts = line.strip().split('\t')
+        if len(parts) != 6 or parts[0] != 'RESULT': continue
+        name, size, iterations, ns, allocated = parts[1:]
+        key = name + '/' + size if sized[name] else name
+        results[key] = {
+            'ns': float(ns),
+            'bytes': None if allocated == '-' else float(allocated),
+            'iterations': int(iterations),
+        }
+    if len(results) == 0:
+        raise Exception('No results. Output:\n' + output.strip())
+    return results
+
+# Everything the host program printed other than results, e.g. the exception that it crashed with.
+def get_host_errors(output):
+    return '\n'.join(line for line in output.split('\n') if not line.startswith('RESULT\t')).strip()
+
+def get_result_keys(benchmarks, sizes):
+    for name, sized, _, _ in benchmarks:
+        if sized:
+            for size in sizes:
+                yield name + '/' + str(size)
+        else:
+            yield name
+
+def format_ns(ns):
+    if ns >= 1000000: return '%.2f ms' % (ns / 1000000)
+    if ns >= 1000: return '%.2f us' % (ns / 1000)
+    return '%.1f ns' % ns
+
+def format_bytes(allocated):
+    if allocated == None: return '-'
+    if allocated >= 1000000: return '%.1f MB' % (allocated / 1000000)
+    if allocated >= 1000: return '%.1f KB' % (allocated / 1000)
+    return '%.0f B' % allocated
+
+# Results that a platform should have reported but didn't (because its host program crashed) are shown as ERROR.
+def print_table(title, keys, platforms, results, errors, formatter, field):
+    print(title)
+    key_width = max(len(key) for key in keys) + 2
+    widths = [max(14, len(platform)) + 2 for platform in platforms]
+    print(' ' * key_width + ''.join(platform.rjust(width) for platform, width in zip(platforms, widths)))
+    for key in keys:
+        cells = []
+        for platform, width in zip(platforms, widths):
+            value = results.get(platform, {}).get(key)
+            if key in errors[platform]:
+                cells.append('ERROR'.rjust(width))
+            else:
+                cells.append(('' if value == None else formatter(value[field])).rjust(width))
+        print(key.ljust(key_width) + ''.join(cells))
+    print('')
+
+# Returns a list of regression descriptions.
+def compare_results(results, baseline, threshold):
+    regressions = []
+    for platform in results:
+        for key, result in results[platform].items():
+            before = baseline.get(platform, {}).get(key)
+            if before == None or before['ns'] < MIN_COMPARABLE_NS: continue
+            ratio = result['ns'] / before['ns']
+            if ratio > threshold:
+                regressions.append('%s %s: %s -> %s (%.2fx)' % (platform, key, format_ns(before['ns']), format_ns(result['ns']), ratio))
+    return regressions
+
+def parse_args(args):
+    if len(args) == 0 or args[0].startswith('--'):
+        return None
+    options = {
+        'pastel': os.path.abspath(args[0]),
+        'platforms': [],
+        'sizes': DEFAULT_SIZES,
+        'only': None,
+        'min-time': 0.05,
+        'repeat': 3,
+        'keep': None,
+        'save': None,
+        'compare': None,
+        'threshold': 1.5,
+    }
+    i = 1
+    while i < len(args):
+        arg = args[i]
+        if arg.startswith('--platform:'):
+            platform = arg[len('--platform:'):]
+            if platform == 'all':
+                options['platforms'] += testrunner.ALL_FVT_PLATFORMS
+            elif platform in testrunner.ALL_FVT_PLATFORMS:
+                options['platforms'].append(platform)
+            else:
+                return None
+            i += 1
+            continue
+        name = arg[2:]
+        if not arg.startswith('--') or name not in options or name in ('pastel', 'platforms') or i + 1 >= len(args):
+            return None
+        value = args[i + 1]
+        if name == 'sizes': value = [int(size) for size in value.split(',')]
+        elif name == 'only': value = value.split(',')
+        elif name == 'repeat': value = int(value)
+        elif name in ('min-time', 'threshold'): value = float(value)
+        options[name] = value
+        i += 2
+    if len(options['platforms']) == 0:
+        return None
+    options['platforms'] = sorted(set(options['platforms']))
+    return options
+
+def main(args):
+    options = parse_args(args)
+    if options == None:
+        print("Usage: python benchmarks/core_functions.py path/to/pastel/binary/pastel[.exe] --platform:[ all | " + ' | '.join(testrunner.ALL_FVT_PLATFORMS) + " ] [--sizes 10,1000,100000] [--only LIST_,STRING_] [--min-time 0.05] [--repeat 3] [--keep dir] [--save results.json] [--compare results.json] [--threshold 1.5]")
+        return 1
+
+    benchmarks = BENCHMARKS
+    if options['only'] != None:
+        benchmarks = [b for b in BENCHMARKS if b[0] == 'LOOP' or any(b[0].startswith(prefix) for prefix in options['only'])]
+
+    work_dir = os.path.abspath(options['keep']) if options['keep'] != None else tempfile.mkdtemp(prefix = 'pastel_core_function_bench_')
+    failed = False
+    client = PastelClient(options['pastel'])
+    try:
+        results = {}
+        errors = {}
+        unsupported_by_platform = {}
+        for platform in options['platforms']:
+            print('Running benchmarks: ' + platform)
+            try:
+                platform_benchmarks, unsupported, (exit_code, output) = run_platform(client, work_dir, platform, benchmarks, options)
+                results[platform] = parse_results(output, platform_benchmarks)
+                errors[platform] = set(key for key in get_result_keys(platform_benchmarks, options['sizes']) if key not in results[platform])
+                unsupported_by_platform[platform] = unsupported
+                if exit_code != 0 or len(errors[platform]) > 0:
+                    print('FAILED: The host program exited with code ' + str(exit_code) + ' after reporting ' + str(len(results[platform])) + ' of ' + str(len(results[platform]) + len(errors[platform])) + ' results:\n' + get_host_errors(output))
+                    failed = True
+            except Exception as e:
+                print('FAILED: ' + str(e))
+                failed = True
+        print('')
+
+        platforms = [platform for platform in options['platforms'] if platform in results]
+        if len(platforms) == 0:
+            return 1
+        keys = list(get_result_keys(benchmarks, options['sizes']))
+        print_table('Time per operation', keys, platforms, results, errors, format_ns, 'ns')
+        print_table('Allocated per operation', keys, platforms, results, errors, format_bytes, 'bytes')
+        print('Not benchmarked: ' + ', '.join(name + ' (' + reason + ')' for name, reason in sorted(NOT_BENCHMARKED.items())))
+        for platform in platforms:
+            for name, reason in sorted(unsupported_by_platform[platform].items()):
+                print('Not supported by ' + platform + ': ' + name + ' (' + reason + ')')
+
+        if options['save'] != None:
+            file_write_text(os.path.abspath(options['save']), json.dumps(results, indent = 2, sort_keys = True))
+
+        if options['compare'] != None:
+            baseline = json.loads(file_read_text(options['compare']))
+            regressions = compare_results(results, baseline, options['threshold'])
+            print('')
+            if len(regressions) > 0:
+                print('Regressions compared to ' + options['compare'] + ':')
+                for regression in regressions:
+                    print('  ' + regression)
+                return 1
+            print('No regressions compared to ' + options['compare'])
+    finally:
+        client.close()
+        if options['keep'] == None:
+            shutil.rmtree(work_dir)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
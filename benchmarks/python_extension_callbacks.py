@@ -0,0 +1,110 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Compares invoking an extensible callback by a constant name, which the Python target binds to a global when the
+# module is imported, against invoking it by a name that is only known at runtime, which is looked up in the
+# dictionary of registered callbacks on each call. The callback is invoked the same way as fail() in
+# tests/fvt-lib/fvt-assert.pst.
+#
+# Usage: python benchmarks/python_extension_callbacks.py path/to/pastel/binary/pastel[.exe]
+
+CALLS = 1000000
+REPEAT = 5
+
+SOURCE = '\n'.join([
+    'object notifyConstant(string msg) {',
+    '    Array<object> args = new Array<object>(1);',
+    '    args[0] = msg;',
+    '    object ignored = Pastel.invokeExtension("notify", args);',
+    '    return ignored;',
+    '}',
+    '',
+    'object notifyDynamic(string name, string msg) {',
+    '    Array<object> args = new Array<object>(1);',
+    '    args[0] = msg;',
+    '    object ignored = Pastel.invokeExtension(name, args);',
+    '    return ignored;',
+    '}',
+    '',
+    'int callConstant(int n) {',
+    '    int count = 0;',
+    '    for (int i = 0; i < n; i++) {',
+    '        if (notifyConstant("x") == null) count += 1;',
+    '    }',
+    '    return count;',
+    '}',
+    '',
+    'int callDynamic(string name, int n) {',
+    '    int count = 0;',
+    '    for (int i = 0; i < n; i++) {',
+    '        if (notifyDynamic(name, "x") == null) count += 1;',
+    '    }',
+    '    return count;',
+    '}',
+    '',
+])
+
+def file_write_text(path, content):
+    c = open(path, 'wb')
+    c.write(content.encode('utf-8'))
+    c.close()
+
+def run_command(ex, args):
+    c = os.popen(ex + ' ' + ' '.join(args))
+    t = c.read()
+    c.close()
+    return t
+
+def build(pastel_path, work_dir):
+    file_write_text(os.path.join(work_dir, 'bench.pst'), SOURCE)
+    build_path = os.path.join(work_dir, 'bench.json')
+    file_write_text(build_path, json.dumps({
+        'source': 'bench.pst',
+        'targets': [
+            {
+                'name': 'python',
+                'language': 'python',
+                'output': { 'functions-path': 'bench_callbacks.py' },
+            },
+        ],
+    }, indent = 2))
+    result = run_command(pastel_path, [build_path, 'python']).strip()
+    if result != '':
+        raise Exception("Pastel compilation failed:\n" + result)
+    return __import__('bench_callbacks')
+
+def time_best(fn, *args):
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        if fn(*args) != CALLS:
+            raise Exception("Unexpected result from " + fn.__name__)
+        elapsed = time.perf_counter() - start
+        if best == None or elapsed < best: best = elapsed
+    return best
+
+def main(args):
+    if len(args) != 1:
+        print("Usage: python benchmarks/python_extension_callbacks.py path/to/pastel/binary/pastel[.exe]")
+        return
+    pastel_path = os.path.abspath(args[0])
+    work_dir = tempfile.mkdtemp(prefix = 'pastel_callback_bench_')
+    sys.path.insert(0, work_dir)
+    try:
+        module = build(pastel_path, work_dir)
+        module.PST_RegisterExtensibleCallback('notify', lambda args: None)
+        constant = time_best(module.V_callConstant, CALLS)
+        dynamic = time_best(module.V_callDynamic, 'notify', CALLS)
+        print('%d callback invocations, best of %d runs' % (CALLS, REPEAT))
+        print('%-16s%10s%10s' % ('', 'ms', 'ns/call'))
+        print('%-16s%10.1f%10.1f' % ('constant name', constant * 1e3, constant * 1e9 / CALLS))
+        print('%-16s%10.1f%10.1f' % ('dynamic name', dynamic * 1e3, dynamic * 1e9 / CALLS))
+    finally:
+        shutil.rmtree(work_dir)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,149 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Compares loops in generated Python code with and without the python-hoist-globals build option, which binds the
+# builtins, module functions, helpers, and generated functions that a function uses in loops to locals. Each
+# benchmark is a loop of --iterations iterations and the result is the time per iteration. Python 3.11 and later
+# cache global lookups in the bytecode, so the difference is mostly seen on older versions.
+#
+# Usage: python benchmarks/python_hoist_globals.py path/to/pastel/binary/pastel[.exe] [--iterations 1000000] [--repeat 10]
+
+MODES = [('globals', False), ('hoisted', True)]
+
+SOURCE = '\n'.join([
+    'int square(int x) {',
+    '    if (x < 0) return square(-x);',
+    '    return x * x;',
+    '}',
+    '',
+    'int benchBuiltins(int n) {',
+    '    int total = 0;',
+    '    for (int i = 0; i < n; i += 1) {',
+    '        string s = "" + i;',
+    '        total += s.size() + Math.abs(i - 500);',
+    '    }',
+    '    return total;',
+    '}',
+    '',
+    'int benchMath(int n) {',
+    '    int total = 0;',
+    '    for (int i = 0; i < n; i += 1) {',
+    '        total += Math.floor(i / 3.0) + Math.ceil(i / 7.0) + Math.floor(i * 0.5);',
+    '    }',
+    '    return total;',
+    '}',
+    '',
+    'int benchFunctionCalls(int n) {',
+    '    int total = 0;',
+    '    int i = 0;',
+    '    while (i < n) {',
+    '        total += square(i % 100) - square(i % 10);',
+    '        i += 1;',
+    '    }',
+    '    return total;',
+    '}',
+    '',
+    'int benchHelpers(int n) {',
+    '    int total = 0;',
+    '    string text = "The quick brown fox jumps over the lazy dog";',
+    '    for (int i = 0; i < n; i += 1) {',
+    '        int start = i % 40;',
+    '        total += text.subString(start, 3).size();',
+    '    }',
+    '    return total;',
+    '}',
+    '',
+])
+
+BENCHMARKS = ['benchBuiltins', 'benchMath', 'benchFunctionCalls', 'benchHelpers']
+
+def file_write_text(path, content):
+    c = open(path, 'wb')
+    c.write(content.encode('utf-8'))
+    c.close()
+
+def run_command(ex, args):
+    c = os.popen(ex + ' ' + ' '.join(args))
+    t = c.read()
+    c.close()
+    return t
+
+def build(pastel_path, work_dir, hoist_globals):
+    file_write_text(os.path.join(work_dir, 'bench.pst'), SOURCE)
+    module_name = 'bench_hoisted' if hoist_globals else 'bench_globals'
+    build_path = os.path.join(work_dir, 'bench.json')
+    file_write_text(build_path, json.dumps({
+        'source': 'bench.pst',
+        'targets': [
+            {
+                'name': 'python',
+                'language': 'python',
+                'python-hoist-globals': hoist_globals,
+                # Inlining would remove the calls to square().
+                'inline-budget': 0,
+                'output': { 'functions-path': module_name + '.py' },
+            },
+        ],
+    }, indent = 2))
+    result = run_command(pastel_path, [build_path, 'python']).strip()
+    if result != '':
+        raise Exception("Pastel compilation failed:\n" + result)
+    return __import__(module_name)
+
+# The modes take turns so that anything else running on the machine affects them equally.
+def time_best(fns, n, repeat):
+    best = [None] * len(fns)
+    results = [None] * len(fns)
+    for _ in range(repeat):
+        for i, fn in enumerate(fns):
+            start = time.perf_counter()
+            results[i] = fn(n)
+            elapsed = time.perf_counter() - start
+            if best[i] == None or elapsed < best[i]: best[i] = elapsed
+    if any(result != results[0] for result in results):
+        raise Exception("The modes returned different results")
+    return best
+
+def parse_args(args):
+    if len(args) == 0 or args[0].startswith('--'):
+        return None
+    options = { 'pastel': os.path.abspath(args[0]), 'iterations': 1000000, 'repeat': 10 }
+    i = 1
+    while i < len(args):
+        name = args[i][2:]
+        if not args[i].startswith('--') or name not in options or name == 'pastel' or i + 1 >= len(args):
+            return None
+        options[name] = int(args[i + 1])
+        i += 2
+    return options
+
+def main(args):
+    options = parse_args(args)
+    if options == None:
+        print("Usage: python benchmarks/python_hoist_globals.py path/to/pastel/binary/pastel[.exe] [--iterations 1000000] [--repeat 10]")
+        return
+    work_dir = tempfile.mkdtemp(prefix = 'pastel_hoist_globals_bench_')
+    sys.path.insert(0, work_dir)
+    try:
+        modules = [build(options['pastel'], work_dir, hoist_globals) for _, hoist_globals in MODES]
+        ns_per_iteration = {}
+        for name in BENCHMARKS:
+            best = time_best([getattr(module, 'V_' + name) for module in modules], options['iterations'], options['repeat'])
+            for (mode, _), seconds in zip(MODES, best):
+                ns_per_iteration[(mode, name)] = seconds * 1e9 / options['iterations']
+
+        print('ns per iteration, %d iterations, best of %d runs' % (options['iterations'], options['repeat']))
+        print('%-22s' % '' + ''.join('%12s' % mode for mode, _ in MODES) + '%12s' % 'gain')
+        for name in BENCHMARKS:
+            before = ns_per_iteration[(MODES[0][0], name)]
+            after = ns_per_iteration[(MODES[1][0], name)]
+            print('%-22s%12.1f%12.1f%11.1f%%' % (name, before, after, (before - after) * 100 / before))
+    finally:
+        shutil.rmtree(work_dir)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
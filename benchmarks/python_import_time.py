@@ -0,0 +1,117 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from synthetic_project import file_write_text, generate_project, run_command
+
+# Compares how long it takes to start using the generated Python code of a large project when it's a single
+# module against the package layouts of the python-modules build option, with and without python-precompile.
+# Each measurement is done in a new Python process so that nothing has been imported yet.
+#
+# Usage: python benchmarks/python_import_time.py path/to/pastel/binary/pastel[.exe] [--sizes 2000,10000] [--repeat 5]
+
+DEFAULT_SIZES = [2000, 10000]
+LAYOUTS = ['single', 'file', 'call-graph']
+
+# Prints the time in ms to import the package, to get one function (which imports the module it's in), and then
+# to get all of them.
+MEASURE_SCRIPT = '\n'.join([
+    'import sys, time',
+    'start = time.perf_counter()',
+    'import gen',
+    'imported = time.perf_counter()',
+    'getattr(gen, sys.argv[1])',
+    'first = time.perf_counter()',
+    'for name in [n for n in dir(gen) if n.startswith("V_")]: getattr(gen, name)',
+    'end = time.perf_counter()',
+    'print((imported - start) * 1000, (first - imported) * 1000, (end - first) * 1000)',
+])
+
+def build(pastel_path, project_dir, layout, precompile):
+    target = layout + ('-pyc' if precompile else '')
+    package_dir = os.path.join(project_dir, 'out', target, 'gen')
+    if os.path.isdir(package_dir):
+        shutil.rmtree(package_dir)
+    build_path = os.path.join(project_dir, target + '.json')
+    file_write_text(build_path, json.dumps({
+        'source': 'main.pst',
+        'targets': [
+            {
+                'name': target,
+                'language': 'python',
+                'python-modules': layout,
+                # .pyc files only work with the version of Python that wrote them.
+                'python-precompile': sys.executable if precompile else False,
+                'output': { 'functions-path': 'out/' + target + '/gen/__init__.py' },
+            },
+        ],
+    }, indent = 2))
+    result = run_command(pastel_path, [build_path, target]).strip()
+    if result != '':
+        raise Exception("Pastel compilation failed:\n" + result)
+    return os.path.dirname(package_dir)
+
+def measure(out_dir, function_name, precompile, repeat):
+    env = dict(os.environ)
+    if not precompile:
+        env['PYTHONDONTWRITEBYTECODE'] = '1'
+    best = None
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-c', MEASURE_SCRIPT, function_name],
+            cwd = out_dir,
+            env = env,
+            stdout = subprocess.PIPE,
+            check = True).stdout.decode('utf-8')
+        times = [float(t) for t in output.split()]
+        if best == None or sum(times) < sum(best): best = times
+    return best
+
+def parse_args(args):
+    if len(args) == 0 or args[0].startswith('--'):
+        return None
+    options = { 'pastel': os.path.abspath(args[0]), 'sizes': DEFAULT_SIZES, 'repeat': 5 }
+    i = 1
+    while i < len(args):
+        if args[i] == '--sizes' and i + 1 < len(args):
+            options['sizes'] = [int(size) for size in args[i + 1].split(',')]
+        elif args[i] == '--repeat' and i + 1 < len(args):
+            options['repeat'] = int(args[i + 1])
+        else:
+            return None
+        i += 2
+    return options
+
+def main(args):
+    options = parse_args(args)
+    if options == None:
+        print("Usage: python benchmarks/python_import_time.py path/to/pastel/binary/pastel[.exe] [--sizes 2000,10000] [--repeat 5]")
+        return 1
+
+    work_dir = tempfile.mkdtemp(prefix = 'pastel_import_bench_')
+    try:
+        print('Best of %d runs, in ms. "first" gets the function at the start of the call chain, "all" then gets every function.' % options['repeat'])
+        for size in options['sizes']:
+            project_dir = os.path.join(work_dir, 'project_' + str(size))
+            for path, content in generate_project(size).items():
+                file_write_text(os.path.join(project_dir, path.replace('/', os.sep)), content)
+
+            print('')
+            print('%d functions' % size)
+            print('%-18s' % '' + ''.join('%10s' % column for column in ['modules', 'import', 'first', 'all', 'total']))
+            for precompile in [False, True]:
+                for layout in LAYOUTS:
+                    out_dir = build(options['pastel'], project_dir, layout, precompile)
+                    modules = len([f for f in os.listdir(os.path.join(out_dir, 'gen')) if f.endswith('.py')])
+                    times = measure(out_dir, 'V_m0_fn0', precompile, options['repeat'])
+                    label = layout + (' + .pyc' if precompile else '')
+                    print('%-18s' % label + '%10d' % modules + ''.join('%10.1f' % t for t in times + [sum(times)]))
+    finally:
+        shutil.rmtree(work_dir)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,141 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT_DIR)
+import testrunner
+from testrunner import file_read_text, file_write_text, run_command
+
+# Builds the FVT programs with the python-type-hints build option and compares running them as plain CPython
+# against running them as a native extension compiled by mypyc. Both use the Python given by --python, which is
+# the one running this script by default, and mypyc has to be installed for it (pip install mypy). Programs that
+# mypyc can't compile are listed with the first error, which is usually a null stored somewhere that the
+# annotations say can't be None.
+#
+# Usage: python benchmarks/python_mypyc.py path/to/pastel/binary/pastel[.exe] [--repeat 5] [--keep path/to/dir] [--python path/to/python]
+
+# Prints the time in ms that the program's runner took. Each run is a new process so that the time doesn't
+# include anything that was cached by a previous run (e.g. @memoize caches).
+MEASURE_SCRIPT = '\n'.join([
+    'import time',
+    'import pygen',
+    'def on_fail(msg): raise Exception(msg)',
+    "pygen.PST_RegisterExtensibleCallback('fail', lambda args: on_fail(args[0]))",
+    'start = time.perf_counter()',
+    'pygen.V_runner()',
+    'print((time.perf_counter() - start) * 1000)',
+])
+
+def parse_args(args):
+    if len(args) == 0 or args[0].startswith('--'):
+        return None
+    options = { 'pastel': os.path.abspath(args[0]), 'repeat': 5, 'keep': None, 'python': sys.executable }
+    i = 1
+    while i < len(args):
+        name = args[i][2:]
+        if not args[i].startswith('--') or name not in options or name == 'pastel' or i + 1 >= len(args):
+            return None
+        options[name] = int(args[i + 1]) if name == 'repeat' else args[i + 1]
+        i += 2
+    return options
+
+def get_test_ids():
+    fvt_dir = os.path.join(ROOT_DIR, 'tests', 'fvt')
+    # Tests that only run on other platforms end with [platform].
+    return sorted(file[:-len('.pst')] for file in os.listdir(fvt_dir) if file.endswith('.pst') and ']' not in file)
+
+def build(pastel_path, dst_dir, test_id):
+    fvt_lib_dir = os.path.join(ROOT_DIR, 'tests', 'fvt-lib')
+    for file in os.listdir(fvt_lib_dir):
+        if file.endswith('.pst'):
+            file_write_text(os.path.join(dst_dir, file), file_read_text(os.path.join(fvt_lib_dir, file)))
+    file_write_text(os.path.join(dst_dir, 'test.pst'), file_read_text(os.path.join(ROOT_DIR, 'tests', 'fvt', test_id + '.pst')))
+    file_write_text(os.path.join(dst_dir, 'platform.pst'), testrunner.create_platform_constants('python-type-hints'))
+    file_write_text(os.path.join(dst_dir, 'measure.py'), MEASURE_SCRIPT)
+    file_write_text(os.path.join(dst_dir, 'test.json'), json.dumps({
+        'source': 'index.pst',
+        'entry-points': ['runner'],
+        'targets': [testrunner.create_python_target('python', 'pygen/__init__.py', type_hints = True)],
+    }, indent = 2))
+    result = run_command(pastel_path, [os.path.join(dst_dir, 'test.json'), 'python']).strip()
+    if result != '':
+        raise Exception('Pastel compilation failed:\n' + result)
+
+# Compiles a copy of the generated package with mypyc and removes the .py file so that the extension module is
+# imported instead. Returns None if it worked, otherwise the first error.
+def compile_with_mypyc(python, dst_dir):
+    process = subprocess.run(
+        [python, '-m', 'mypyc', os.path.join('pygen', '__init__.py')],
+        cwd = dst_dir,
+        capture_output = True,
+        text = True)
+    if process.returncode != 0:
+        lines = [line for line in (process.stdout + process.stderr).split('\n') if ': error:' in line]
+        return lines[0].split(': error:')[1].strip() if len(lines) > 0 else (process.stdout + process.stderr).strip()
+    os.remove(os.path.join(dst_dir, 'pygen', '__init__.py'))
+    return None
+
+def measure(python, dst_dir, repeat):
+    best = None
+    for _ in range(repeat):
+        process = subprocess.run([python, 'measure.py'], cwd = dst_dir, capture_output = True, text = True)
+        if process.returncode != 0:
+            raise Exception('Running the program failed:\n' + process.stderr.strip())
+        ms = float(process.stdout.strip().split('\n')[-1])
+        if best == None or ms < best: best = ms
+    return best
+
+def main(args):
+    options = parse_args(args)
+    if options == None:
+        print("Usage: python benchmarks/python_mypyc.py path/to/pastel/binary/pastel[.exe] [--repeat 5] [--keep dir] [--python path/to/python]")
+        return 1
+
+    python = options['python']
+    if subprocess.run([python, '-c', 'import mypyc'], capture_output = True).returncode != 0:
+        print("mypyc is not installed for " + python + ". Install it with: pip install mypy")
+        return 1
+
+    work_dir = os.path.abspath(options['keep']) if options['keep'] != None else tempfile.mkdtemp(prefix = 'pastel_mypyc_bench_')
+    failed = False
+    try:
+        rows = []
+        for test_id in get_test_ids():
+            print('Building: ' + test_id)
+            cpython_dir = os.path.join(work_dir, test_id, 'cpython')
+            mypyc_dir = os.path.join(work_dir, test_id, 'mypyc')
+            if os.path.isdir(os.path.dirname(cpython_dir)):
+                shutil.rmtree(os.path.dirname(cpython_dir))
+            os.makedirs(cpython_dir)
+            try:
+                build(options['pastel'], cpython_dir, test_id)
+                shutil.copytree(cpython_dir, mypyc_dir)
+                cpython_ms = measure(python, cpython_dir, options['repeat'])
+                error = compile_with_mypyc(python, mypyc_dir)
+                if error != None:
+                    rows.append((test_id, cpython_ms, None, error))
+                else:
+                    rows.append((test_id, cpython_ms, measure(python, mypyc_dir, options['repeat']), None))
+            except Exception as e:
+                print('FAILED: ' + str(e))
+                failed = True
+        print('')
+
+        print('Time to run each FVT program, best of %d runs' % options['repeat'])
+        print('%-14s%12s%12s%10s' % ('', 'CPython', 'mypyc', ''))
+        for test_id, cpython_ms, mypyc_ms, error in rows:
+            if error != None:
+                print('%-14s%10.2fms  not compiled: %s' % (test_id, cpython_ms, error))
+            else:
+                print('%-14s%10.2fms%10.2fms%9.2fx' % (test_id, cpython_ms, mypyc_ms, cpython_ms / mypyc_ms))
+    finally:
+        if options['keep'] == None:
+            shutil.rmtree(work_dir)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,122 @@
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+# Compares the Python switch statement lowerings (see PythonSwitchLowering in the transpiler)
+# on generated switches of various sizes.
+#
+# Usage: python benchmarks/python_switch.py path/to/pastel/binary/pastel[.exe]
+
+CASE_COUNTS = [10, 50, 200]
+LOWERINGS = ['binary-search', 'if-chain', 'table']
+DISPATCH_COUNT = 300000
+REPEAT = 5
+
+def file_write_text(path, content):
+    c = open(path, 'wb')
+    c.write(content.encode('utf-8'))
+    c.close()
+
+def run_command(ex, args):
+    c = os.popen(ex + ' ' + ' '.join(args))
+    t = c.read()
+    c.close()
+    return t
+
+# Case values are spread out (multiples of 7) so that they're not simply chunk ID's.
+# Every case returns so that all 3 lowerings are applicable.
+def generate_source(case_count):
+    lines = [
+        'int step(int op, int acc) {',
+        '    switch (op) {',
+    ]
+    for i in range(case_count):
+        lines.append('        case ' + str(i * 7) + ':')
+        lines.append('            return acc + ' + str(i + 1) + ';')
+    lines += [
+        '        default:',
+        '            return acc - 1;',
+        '    }',
+        '}',
+        '',
+        'int runOps(Array<int> ops) {',
+        '    int acc = 0;',
+        '    for (int i = 0; i < ops.size(); i++) {',
+        '        acc = step(ops[i], acc);',
+        '    }',
+        '    return acc;',
+        '}',
+        '',
+    ]
+    return '\n'.join(lines)
+
+def build(pastel_path, work_dir, case_count, lowering):
+    file_write_text(os.path.join(work_dir, 'bench.pst'), generate_source(case_count))
+    module_name = 'bench_' + str(case_count) + '_' + lowering.replace('-', '_')
+    build_path = os.path.join(work_dir, 'bench.json')
+    file_write_text(build_path, json.dumps({
+        'source': 'bench.pst',
+        'targets': [
+            {
+                'name': 'python',
+                'language': 'python',
+                'python-switch': lowering,
+                'output': { 'functions-path': module_name + '.py' },
+            },
+        ],
+    }, indent = 2))
+    result = run_command(pastel_path, [build_path, 'python']).strip()
+    if result != '':
+        raise Exception("Pastel compilation failed:\n" + result)
+    return module_name
+
+def time_module(module_name, ops):
+    module = __import__(module_name)
+    expected = None
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = module.V_runOps(ops)
+        elapsed = time.perf_counter() - start
+        if expected != None and result != expected: raise Exception("Inconsistent result")
+        expected = result
+        if best == None or elapsed < best: best = elapsed
+    return best, expected
+
+def main(args):
+    if len(args) != 1:
+        print("Usage: python benchmarks/python_switch.py path/to/pastel/binary/pastel[.exe]")
+        return
+    pastel_path = os.path.abspath(args[0])
+    work_dir = tempfile.mkdtemp(prefix = 'pastel_switch_bench_')
+    sys.path.insert(0, work_dir)
+    try:
+        print('cases  lowering        ns/dispatch  vs binary-search')
+        for case_count in CASE_COUNTS:
+            rnd = random.Random(case_count)
+            # Include some values that miss every case to exercise the default.
+            ops = [rnd.randrange(case_count + 1) * 7 for _ in range(DISPATCH_COUNT)]
+            baseline = None
+            baseline_result = None
+            for lowering in LOWERINGS:
+                module_name = build(pastel_path, work_dir, case_count, lowering)
+                elapsed, result = time_module(module_name, ops)
+                if baseline == None:
+                    baseline = elapsed
+                    baseline_result = result
+                elif result != baseline_result:
+                    raise Exception("Lowering '" + lowering + "' produced a different result")
+                print('%5d  %-14s  %11.1f  %15.2fx' % (
+                    case_count,
+                    lowering,
+                    elapsed * 1e9 / DISPATCH_COUNT,
+                    baseline / elapsed))
+    finally:
+        shutil.rmtree(work_dir)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
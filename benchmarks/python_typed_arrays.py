@@ -0,0 +1,141 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Compares the default list representation of Array<int> and Array<double> in generated Python code
+# against the array.array representation enabled by the python-typed-arrays build option.
+#
+# Usage: python benchmarks/python_typed_arrays.py path/to/pastel/binary/pastel[.exe]
+
+ARRAY_SIZE = 1000000
+REPEAT = 5
+MODES = [('list', False), ('array.array', True)]
+
+SOURCE = '\n'.join([
+    'Array<int> makeInts(int n) {',
+    '    Array<int> arr = new Array<int>(n);',
+    '    for (int i = 0; i < n; i++) {',
+    '        arr[i] = (i * 7919) % 1000003;',
+    '    }',
+    '    return arr;',
+    '}',
+    '',
+    'Array<double> makeDoubles(int n) {',
+    '    Array<double> arr = new Array<double>(n);',
+    '    for (int i = 0; i < n; i++) {',
+    '        arr[i] = i * 0.5;',
+    '    }',
+    '    return arr;',
+    '}',
+    '',
+    'int sumInts(Array<int> arr) {',
+    '    int total = 0;',
+    '    for (int i = 0; i < arr.size(); i++) {',
+    '        total += arr[i];',
+    '    }',
+    '    return total;',
+    '}',
+    '',
+    'double sumDoubles(Array<double> arr) {',
+    '    double total = 0.0;',
+    '    for (int i = 0; i < arr.size(); i++) {',
+    '        total += arr[i];',
+    '    }',
+    '    return total;',
+    '}',
+    '',
+    'Array<int> sortInts(Array<int> arr) {',
+    '    return Sorting.getIntegerSortedCopy(arr);',
+    '}',
+    '',
+])
+
+def file_write_text(path, content):
+    c = open(path, 'wb')
+    c.write(content.encode('utf-8'))
+    c.close()
+
+def run_command(ex, args):
+    c = os.popen(ex + ' ' + ' '.join(args))
+    t = c.read()
+    c.close()
+    return t
+
+def build(pastel_path, work_dir, typed_arrays):
+    file_write_text(os.path.join(work_dir, 'bench.pst'), SOURCE)
+    module_name = 'bench_typed' if typed_arrays else 'bench_list'
+    build_path = os.path.join(work_dir, 'bench.json')
+    file_write_text(build_path, json.dumps({
+        'source': 'bench.pst',
+        'targets': [
+            {
+                'name': 'python',
+                'language': 'python',
+                'python-typed-arrays': typed_arrays,
+                'output': { 'functions-path': module_name + '.py' },
+            },
+        ],
+    }, indent = 2))
+    result = run_command(pastel_path, [build_path, 'python']).strip()
+    if result != '':
+        raise Exception("Pastel compilation failed:\n" + result)
+    return __import__(module_name)
+
+# Bytes still allocated by the array (and its items) after it has been created.
+def measure_memory(fn):
+    tracemalloc.start()
+    try:
+        arr = fn(ARRAY_SIZE)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del arr
+    return size
+
+def time_best(fn, *args):
+    best = None
+    result = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - start
+        if best == None or elapsed < best: best = elapsed
+    return best, result
+
+def main(args):
+    if len(args) != 1:
+        print("Usage: python benchmarks/python_typed_arrays.py path/to/pastel/binary/pastel[.exe]")
+        return
+    pastel_path = os.path.abspath(args[0])
+    work_dir = tempfile.mkdtemp(prefix = 'pastel_typed_array_bench_')
+    sys.path.insert(0, work_dir)
+    try:
+        rows = []
+        for mode, typed_arrays in MODES:
+            module = build(pastel_path, work_dir, typed_arrays)
+            ints = module.V_makeInts(ARRAY_SIZE)
+            doubles = module.V_makeDoubles(ARRAY_SIZE)
+            rows.append((mode, [
+                ('int[] memory (MB)', measure_memory(module.V_makeInts) / 1e6),
+                ('double[] memory (MB)', measure_memory(module.V_makeDoubles) / 1e6),
+                ('int[] fill (ms)', time_best(module.V_makeInts, ARRAY_SIZE)[0] * 1e3),
+                ('int[] sum (ms)', time_best(module.V_sumInts, ints)[0] * 1e3),
+                ('double[] sum (ms)', time_best(module.V_sumDoubles, doubles)[0] * 1e3),
+                ('int[] sort (ms)', time_best(module.V_sortInts, ints)[0] * 1e3),
+            ]))
+            if list(module.V_sortInts(ints)[:3]) != sorted(ints)[:3]:
+                raise Exception("Incorrect sort result for " + mode)
+
+        print('Arrays of %d elements, best of %d runs' % (ARRAY_SIZE, REPEAT))
+        print('%-22s' % '' + ''.join('%14s' % mode for mode, _ in rows))
+        for i in range(len(rows[0][1])):
+            print('%-22s' % rows[0][1][i][0] + ''.join('%14.1f' % values[i][1] for _, values in rows))
+    finally:
+        shutil.rmtree(work_dir)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,135 @@
+import os
+import shutil
+import sys
+import tempfile
+
+import core_functions
+from core_functions import format_ns, parse_results, print_table, run_platform
+from pastelclient import PastelClient
+
+# Compares building a string out of many small pieces with a StringBuilder against repeated string concatenation,
+# which is what Pastel code has to fall back to on platforms without a StringBuilder. This uses the same host
+# programs as benchmarks/core_functions.py, so one "operation" is building an entire string of n pieces.
+#
+# Usage: python benchmarks/string_builder.py path/to/pastel/binary/pastel[.exe] --platform:[ all | csharp | go | java | js | python | python-typed-arrays ] [options]
+#
+#   --sizes 1000,100000,1000000    Number of pieces in the string.
+#   --max-concat 100000            Largest number of pieces to use with concatenation, which can be quadratic.
+#                                  (Go takes minutes to concatenate 1000000 pieces.)
+#   --min-time 0.05                Minimum duration of a timed batch of operations, in seconds.
+#   --repeat 3                     Number of timed batches. The fastest one is reported.
+#   --keep path/to/dir             Writes the generated projects to this directory instead of a temp dir.
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+
+PIECE_SETUP = ['string piece = "ab";']
+
+BENCHMARKS = [
+    ('STRINGBUILDER', True, PIECE_SETUP, [
+        'StringBuilder sb = new StringBuilder();',
+        'for (int i = 0; i < n; i += 1) sb.add(piece);',
+        'checksum += sb.toString().size();',
+    ]),
+    ('CONCAT', True, PIECE_SETUP, [
+        'string str = "";',
+        'for (int i = 0; i < n; i += 1) str = str + piece;',
+        'checksum += str.size();',
+    ]),
+]
+
+def format_throughput(ns_per_piece):
+    per_second = 1000000000.0 / ns_per_piece
+    if per_second >= 1000000: return '%.1f M/s' % (per_second / 1000000)
+    return '%.1f K/s' % (per_second / 1000)
+
+def parse_args(args):
+    if len(args) == 0 or args[0].startswith('--'):
+        return None
+    options = {
+        'pastel': os.path.abspath(args[0]),
+        'platforms': [],
+        'sizes': DEFAULT_SIZES,
+        'max-concat': 100000,
+        'min-time': 0.05,
+        'repeat': 3,
+        'keep': None,
+    }
+    i = 1
+    while i < len(args):
+        arg = args[i]
+        if arg.startswith('--platform:'):
+            platform = arg[len('--platform:'):]
+            if platform == 'all':
+                options['platforms'] += core_functions.testrunner.ALL_FVT_PLATFORMS
+            elif platform in core_functions.testrunner.ALL_FVT_PLATFORMS:
+                options['platforms'].append(platform)
+            else:
+                return None
+            i += 1
+            continue
+        name = arg[2:]
+        if not arg.startswith('--') or name not in options or name in ('pastel', 'platforms') or i + 1 >= len(args):
+            return None
+        value = args[i + 1]
+        if name == 'sizes': value = [int(size) for size in value.split(',')]
+        elif name in ('max-concat', 'repeat'): value = int(value)
+        elif name == 'min-time': value = float(value)
+        options[name] = value
+        i += 2
+    if len(options['platforms']) == 0:
+        return None
+    options['platforms'] = sorted(set(options['platforms']))
+    return options
+
+def main(args):
+    options = parse_args(args)
+    if options == None:
+        print("Usage: python benchmarks/string_builder.py path/to/pastel/binary/pastel[.exe] --platform:[ all | " + ' | '.join(core_functions.testrunner.ALL_FVT_PLATFORMS) + " ] [--sizes 1000,100000,1000000] [--max-concat 100000] [--min-time 0.05] [--repeat 3] [--keep dir]")
+        return 1
+
+    work_dir = os.path.abspath(options['keep']) if options['keep'] != None else tempfile.mkdtemp(prefix = 'pastel_string_builder_bench_')
+    failed = False
+    client = PastelClient(options['pastel'])
+    try:
+        results = {}
+        for platform in options['platforms']:
+            print('Running benchmarks: ' + platform)
+            results[platform] = {}
+            # Each benchmark is built and run on its own since concatenation may not run at every size.
+            for benchmark in BENCHMARKS:
+                sizes = options['sizes']
+                if benchmark[0] == 'CONCAT':
+                    sizes = [size for size in sizes if size <= options['max-concat']]
+                if len(sizes) == 0: continue
+                run_options = dict(options)
+                run_options['sizes'] = sizes
+                try:
+                    ran, unsupported, output = run_platform(client, work_dir, platform, [benchmark], run_options)
+                    if len(ran) == 0:
+                        print('  ' + benchmark[0] + ' is not supported: ' + unsupported[benchmark[0]])
+                        continue
+                    results[platform].update(parse_results(output, ran))
+                except Exception as e:
+                    print('FAILED: ' + str(e))
+                    failed = True
+        print('')
+
+        platforms = [platform for platform in options['platforms'] if len(results[platform]) > 0]
+        if len(platforms) == 0:
+            return 1
+        keys = [name + '/' + str(size) for size in options['sizes'] for name, _, _, _ in BENCHMARKS]
+        per_piece = {}
+        for platform in platforms:
+            per_piece[platform] = {}
+            for key, result in results[platform].items():
+                per_piece[platform][key] = { 'ns': result['ns'] / int(key.split('/')[1]) }
+        print_table('Time to build the string', keys, platforms, results, format_ns, 'ns')
+        print_table('Pieces per second', keys, platforms, per_piece, format_throughput, 'ns')
+    finally:
+        client.close()
+        if options['keep'] == None:
+            shutil.rmtree(work_dir)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,293 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Generates synthetic Pastel projects of increasing size and builds each of them with --profile to see how the
+# compiler scales and which phases the time goes to. Each project has structs, enums, constants, switches, loops,
+# calls between functions, and @import's nested 3 levels deep (main -> module -> file of functions -> snippet).
+#
+# Usage: python benchmarks/synthetic_project.py path/to/pastel/binary/pastel[.exe] [options]
+#
+#   --sizes 1000,10000,50000   Number of functions in each generated project.
+#   --language python          Language of the build target.
+#   --repeat 3                 Each project is built this many times and the fastest build is reported.
+#   --keep path/to/dir         Writes the projects and profile reports to this directory instead of a temp dir.
+#   --save results.json        Saves the results so that later runs can be compared against them.
+#   --compare results.json     Compares against saved results and exits with an error if any phase got slower
+#                              than the threshold.
+#   --threshold 1.25           How much slower (as a ratio) a phase can get before it counts as a regression.
+
+DEFAULT_SIZES = [1000, 10000, 50000]
+FUNCTIONS_PER_FILE = 50
+FILES_PER_MODULE = 10
+CASES_PER_SWITCH = 8
+
+# Phases that take less than this are too noisy to compare between runs.
+MIN_COMPARABLE_MS = 50
+
+def file_write_text(path, content):
+    parent = os.path.dirname(path)
+    if not os.path.isdir(parent):
+        os.makedirs(parent)
+    c = open(path, 'wb')
+    c.write(content.encode('utf-8'))
+    c.close()
+
+def file_read_text(path):
+    c = open(path, 'rb')
+    t = c.read().decode('utf-8')
+    c.close()
+    return t
+
+def run_command(ex, args):
+    c = os.popen(ex + ' ' + ' '.join(args))
+    t = c.read()
+    c.close()
+    return t
+
+def generate_module_types(m):
+    return '\n'.join([
+        'enum Kind' + str(m) + ' {',
+        '    RED,',
+        '    GREEN,',
+        '    BLUE,',
+        '}',
+        '',
+        'const int SCALE_' + str(m) + ' = ' + str(m % 7 + 2) + ';',
+        '',
+        'struct Point' + str(m) + ' {',
+        '    int x;',
+        '    int y;',
+        '    int kind;',
+        '    string label;',
+        '    List<int> history;',
+        '}',
+        '',
+    ])
+
+# Functions call the function before them in the same module so that every function is reachable from the last
+# one in the module, and the first function in each module calls into the previous module.
+def generate_function(m, index, name, previous_name, previous_point):
+    lines = [
+        'int ' + name + '(Point' + str(m) + ' p, int x) {',
+        '    int acc = x * SCALE_' + str(m) + ';',
+        '    @import("snippets/clamp.pst");',
+        '    switch ((x + ' + str(index) + ') % ' + str(CASES_PER_SWITCH + 2) + ') {',
+    ]
+    for case in range(CASES_PER_SWITCH):
+        lines.append('        case ' + str(case) + ':')
+        if case % 4 == 0:
+            lines.append('            acc += p.x * ' + str(case + 1) + ';')
+        elif case % 4 == 1:
+            lines.append('            acc -= p.y;')
+        elif case % 4 == 2:
+            lines.append('            p.label = p.label + "' + str(case) + '";')
+        else:
+            lines.append('            p.history.add(acc);')
+        lines.append('            break;')
+    lines += [
+        '        default:',
+        '            acc = acc / 2;',
+        '            break;',
+        '    }',
+        '    if (p.kind == Kind' + str(m) + '.' + ['RED', 'GREEN', 'BLUE'][index % 3] + ') {',
+        '        acc += p.history.size();',
+        '    }',
+        '    for (int i = 0; i < ' + str(index % 5 + 1) + '; i++) {',
+        '        acc = (acc * 31 + i) % 1000003;',
+        '    }',
+    ]
+    if previous_name != None:
+        if previous_point == None:
+            lines.append('    acc += ' + previous_name + '(p, acc % 100);')
+        else:
+            lines.append('    acc += ' + previous_name + '(new ' + previous_point + '(acc, x, 0, "", new List<int>()), acc % 100);')
+    lines += [
+        '    return acc;',
+        '}',
+        '',
+    ]
+    return '\n'.join(lines)
+
+# Returns a dictionary of relative file paths to file content.
+def generate_project(function_count):
+    files = {
+        'snippets/clamp.pst': '\n'.join([
+            'if (acc < 0) {',
+            '    acc = -acc;',
+            '}',
+            '',
+        ]),
+    }
+    main_imports = []
+    functions_per_module = FUNCTIONS_PER_FILE * FILES_PER_MODULE
+    module_count = (function_count + functions_per_module - 1) // functions_per_module
+    previous_name = None
+    index = 0
+    for m in range(module_count):
+        module_dir = 'modules/m' + str(m)
+        files[module_dir + '/types.pst'] = generate_module_types(m)
+        module_imports = ['@import("' + module_dir + '/types.pst");']
+        first_in_module = True
+        f = 0
+        while index < function_count and f < FILES_PER_MODULE:
+            path = module_dir + '/functions' + str(f) + '.pst'
+            code = []
+            for _ in range(FUNCTIONS_PER_FILE):
+                if index >= function_count: break
+                name = 'm' + str(m) + '_fn' + str(index)
+                previous_point = 'Point' + str(m - 1) if first_in_module and previous_name != None else None
+                code.append(generate_function(m, index, name, previous_name, previous_point))
+                previous_name = name
+                first_in_module = False
+                index += 1
+            files[path] = '\n'.join(code)
+            module_imports.append('@import("' + path + '");')
+            f += 1
+        files[module_dir + '/module.pst'] = '\n'.join(module_imports) + '\n'
+        main_imports.append('@import("' + module_dir + '/module.pst");')
+    files['main.pst'] = '\n'.join(main_imports) + '\n'
+    return files
+
+def write_project(project_dir, function_count, language):
+    for path, content in generate_project(function_count).items():
+        file_write_text(os.path.join(project_dir, path.replace('/', os.sep)), content)
+    build_path = os.path.join(project_dir, 'build.json')
+    file_write_text(build_path, json.dumps({
+        'source': 'main.pst',
+        'targets': [
+            {
+                'name': 'bench',
+                'language': language,
+                'output': { 'functions-path': 'out/gen_functions', 'structs-path': 'out/structs' },
+            },
+        ],
+    }, indent = 2))
+    return build_path
+
+# Top-level phases don't overlap, so their sum is the time spent in the compiler (not counting .NET startup).
+TOP_LEVEL_PHASES = ['parse-config', 'check-build-cache', 'parse', 'resolve', 'export']
+
+def build_with_profile(pastel_path, build_path, profile_path):
+    start = time.perf_counter()
+    result = run_command(pastel_path, [build_path, 'bench', '--profile', profile_path]).strip()
+    wall_ms = (time.perf_counter() - start) * 1000
+    if result != '':
+        raise Exception("Pastel compilation failed:\n" + result)
+    summary = json.loads(file_read_text(profile_path))['summary'][0]
+    phases = {}
+    for phase in summary['phases']:
+        phases[phase['name']] = phase
+    return {
+        'wall_ms': wall_ms,
+        'compile_ms': sum(phases[name]['ms'] for name in TOP_LEVEL_PHASES if name in phases),
+        'phases': phases,
+        'hotFunctions': summary['hotFunctions'],
+    }
+
+def run_size(pastel_path, work_dir, function_count, language, repeat):
+    project_dir = os.path.join(work_dir, 'project_' + str(function_count))
+    build_path = write_project(project_dir, function_count, language)
+    best = None
+    for i in range(repeat):
+        profile = build_with_profile(pastel_path, build_path, os.path.join(project_dir, 'profile.json'))
+        if best == None or profile['compile_ms'] < best['compile_ms']: best = profile
+    return best
+
+def print_results(results):
+    sizes = sorted(results.keys(), key = int)
+    phase_names = []
+    for size in sizes:
+        for name in results[size]['phases']:
+            if name not in phase_names: phase_names.append(name)
+    print('%-28s' % 'functions' + ''.join('%12s' % size for size in sizes))
+    print('%-28s' % 'wall time (ms)' + ''.join('%12.0f' % results[size]['wall_ms'] for size in sizes))
+    print('%-28s' % 'compile time (ms)' + ''.join('%12.0f' % results[size]['compile_ms'] for size in sizes))
+    print('%-28s' % 'allocated (MB)' + ''.join('%12.1f' % (sum(results[size]['phases'][name]['allocatedBytes'] for name in TOP_LEVEL_PHASES if name in results[size]['phases']) / 1e6) for size in sizes))
+    print('')
+    print('Time per phase (ms)')
+    for name in phase_names:
+        print('  %-26s' % name + ''.join('%12.1f' % results[size]['phases'].get(name, { 'ms': 0 })['ms'] for size in sizes))
+    largest = sizes[-1]
+    print('')
+    print('Slowest functions in the ' + largest + ' function project')
+    for fn in results[largest]['hotFunctions'][:10]:
+        print('  %-26s %-26s %8.2f ms' % (fn['name'], fn['phase'], fn['ms']))
+
+# Returns a list of regression descriptions.
+def compare_results(results, baseline, threshold):
+    regressions = []
+    for size in results:
+        if size not in baseline: continue
+        for name, phase in results[size]['phases'].items():
+            before = baseline[size]['phases'].get(name)
+            if before == None or before['ms'] < MIN_COMPARABLE_MS: continue
+            ratio = phase['ms'] / before['ms']
+            if ratio > threshold:
+                regressions.append('%s functions, %s: %.1f ms -> %.1f ms (%.2fx)' % (size, name, before['ms'], phase['ms'], ratio))
+    return regressions
+
+def parse_args(args):
+    if len(args) == 0 or args[0].startswith('--'):
+        return None
+    options = {
+        'pastel': os.path.abspath(args[0]),
+        'sizes': DEFAULT_SIZES,
+        'language': 'python',
+        'repeat': 3,
+        'keep': None,
+        'save': None,
+        'compare': None,
+        'threshold': 1.25,
+    }
+    i = 1
+    while i < len(args):
+        name = args[i][2:]
+        if not args[i].startswith('--') or name not in options or name == 'pastel' or i + 1 >= len(args):
+            return None
+        value = args[i + 1]
+        if name == 'sizes': value = [int(size) for size in value.split(',')]
+        elif name == 'repeat': value = int(value)
+        elif name == 'threshold': value = float(value)
+        options[name] = value
+        i += 2
+    return options
+
+def main(args):
+    options = parse_args(args)
+    if options == None:
+        print("Usage: python benchmarks/synthetic_project.py path/to/pastel/binary/pastel[.exe] [--sizes 1000,10000,50000] [--language python] [--repeat 3] [--keep dir] [--save results.json] [--compare results.json] [--threshold 1.25]")
+        return 1
+
+    work_dir = os.path.abspath(options['keep']) if options['keep'] != None else tempfile.mkdtemp(prefix = 'pastel_synthetic_bench_')
+    try:
+        results = {}
+        for size in options['sizes']:
+            results[str(size)] = run_size(options['pastel'], work_dir, size, options['language'], options['repeat'])
+        print('Synthetic projects, ' + options['language'] + ', best of ' + str(options['repeat']) + ' builds')
+        print('')
+        print_results(results)
+
+        if options['save'] != None:
+            file_write_text(os.path.abspath(options['save']), json.dumps(results, indent = 2))
+
+        if options['compare'] != None:
+            baseline = json.loads(file_read_text(options['compare']))
+            regressions = compare_results(results, baseline, options['threshold'])
+            print('')
+            if len(regressions) > 0:
+                print('Regressions compared to ' + options['compare'] + ':')
+                for regression in regressions:
+                    print('  ' + regression)
+                return 1
+            print('No regressions compared to ' + options['compare'])
+    finally:
+        if options['keep'] == None:
+            shutil.rmtree(work_dir)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
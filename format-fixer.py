@@ -1,6 +1,8 @@
 FILENAME = 'config-formatting.txt'
 
-import array
+import concurrent.futures
+import hashlib
+import json
 import os
 import sys
 
@@ -111,57 +113,100 @@ styles = {
   'FORMAT_CONFIG': FormatStyle().tabs('    ').newline('\n'),
 }
 
-def os_pathify(paths):
-  return list(map(lambda f: f.replace('/', os.sep), paths))
+# Formatting results are cached here by path as [mtime, size, hash] of files that are known to be formatted,
+# so that files that haven't changed since the last run aren't read again.
+CACHE_FILE = os.path.join('__pycache__', 'format-fixer.cache.json')
 
-def get_all_files():
-  output = []
-  get_all_files_impl('.', output)
-  return output
+# Bump this when FormatStyle changes what it generates, so that files are checked again.
+CACHE_VERSION = 1
+
+# Files are formatted in a process pool when there are at least this many to check.
+MIN_FILES_FOR_POOL = 64
 
-BAD_PATH_MARKERS = os_pathify([
+BOM = b'\xef\xbb\xbf'
+
+BAD_PATH_MARKERS = [
   '/obj/Debug',
   '/obj/Release',
   '/bin/Debug',
   '/bin/Release',
   '/node_modules',
   '/.vscode',
-])
+  '/.git',
+  '/__pycache__',
+]
 
-IGNORE_FILES = os_pathify([
+IGNORE_FILES = [
   'package.json',
   '.min.js',
-])
-
-def get_all_files_impl(path, output):
-  for file in os.listdir(path):
-    full_path = path + os.sep + file
-    if os.path.isdir(full_path):
-      bad = False
-      for bad_path_marker in BAD_PATH_MARKERS:
-        if full_path.endswith(bad_path_marker):
-          bad = True
-          break
-      if not bad:
-        get_all_files_impl(full_path, output)
+]
+
+class Matcher:
+  def __init__(self, pattern, style_name):
+    if '*' in pattern:
+      self.prefix, self.ext = pattern.split('*')
     else:
-      bad = False
-      for ignore_file in IGNORE_FILES:
-        if full_path.endswith(ignore_file):
-          bad = True
-          break
-      if not bad:
-        output.append(full_path[2:])
+      parts = pattern.split('.')
+      self.prefix = '.'.join(parts[:-1])
+      self.ext = parts[-1]
+    self.style_name = style_name
+
+  def matches(self, path):
+    return path.startswith(self.prefix) and path.endswith(self.ext)
+
+  # Whether a file in the given directory (with a trailing /) could match.
+  def may_match_in(self, dir_path):
+    return dir_path.startswith(self.prefix) or self.prefix.startswith(dir_path)
+
+# Walks the tree once and returns (path, entry, style names) for each file that matches a pattern. Paths use /
+# regardless of the OS. Directories that can't contain a match aren't walked.
+def get_matching_files(matchers):
+  output = []
+  get_matching_files_impl('.', '', matchers, output)
+  return output
 
-def main():
+def get_matching_files_impl(path, canonical_path, matchers, output):
+  with os.scandir(path) as entries:
+    for entry in entries:
+      full_path = canonical_path + entry.name
+      if entry.is_dir():
+        if any(('/' + full_path).endswith(marker) for marker in BAD_PATH_MARKERS):
+          continue
+        dir_matchers = [m for m in matchers if m.may_match_in(full_path + '/')]
+        if len(dir_matchers) > 0:
+          get_matching_files_impl(entry.path, full_path + '/', dir_matchers, output)
+      elif not any(full_path.endswith(ignore_file) for ignore_file in IGNORE_FILES):
+        style_names = [m.style_name for m in matchers if m.matches(full_path)]
+        if len(style_names) > 0:
+          output.append((full_path, entry, style_names))
+
+def main(args):
 
   if sys.version_info.major < 3:
     print("Python 2 is not supported by this script.")
-    return
+    return False
+
+  check_only = False
+  use_cache = True
+  jobs = os.cpu_count() or 1
+  for arg in args:
+    if arg == '--check':
+      check_only = True
+    elif arg == '--no-cache':
+      use_cache = False
+    elif arg.startswith('-j') and arg[2:].isdigit() and int(arg[2:]) > 0:
+      jobs = int(arg[2:])
+    else:
+      print("Usage: python format-fixer.py [--check] [--no-cache] [-jN]")
+      print("")
+      print("--check lists the files that aren't formatted without changing them, and fails if there are any.")
+      print("--no-cache checks every file instead of skipping the ones that haven't changed since the last run.")
+      print("-jN formats the files in N processes (default: the number of CPUs).")
+      return False
 
   config_file = read_text(FILENAME) + "\n\nFORMAT_CONFIG: " + FILENAME + "\n"
 
-  MATCHERS = []
+  matchers = []
   for raw_line in config_file.split('\n'):
     t = raw_line.split('#')[0].strip().split(':')
     if len(t) >= 2:
@@ -172,89 +217,113 @@ def main():
         if style_name == 'IGNORE':
           IGNORE_FILES.append(pattern)
         elif style_name == 'BAD_PATH':
-          BAD_PATH_MARKERS.append(pattern)
+          BAD_PATH_MARKERS.append(pattern.replace('\\', '/'))
         else:
           print("Unknown style: " + style_name)
       else:
-        MATCHERS.append((pattern, style))
-
-  all_files = get_all_files()
-  for pattern, matcher in MATCHERS:
-    if '*' in pattern:
-      prefix, ext = pattern.split('*')
+        matchers.append(Matcher(pattern.replace('\\', '/'), style_name))
+
+  # Any change to the config invalidates the whole cache since it may change which style applies to a file.
+  cache_key = str(CACHE_VERSION) + ':' + hashlib.sha1(config_file.encode('utf-8')).hexdigest()
+  cache = load_cache(cache_key) if use_cache else {}
+
+  todo = []
+  for path, entry, style_names in get_matching_files(matchers):
+    stat = entry.stat()
+    cached = cache.get(path)
+    if cached != None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+      continue
+    todo.append((path, style_names, check_only, cached))
+
+  if len(todo) >= MIN_FILES_FOR_POOL and jobs > 1:
+    with concurrent.futures.ProcessPoolExecutor(max_workers = jobs) as pool:
+      results = list(pool.map(format_file, todo, chunksize = 16))
+  else:
+    results = list(map(format_file, todo))
+
+  unformatted = 0
+  for (path, _, _, _), (changed, cache_entry) in zip(todo, results):
+    if changed:
+      print(("Not formatted: " if check_only else "Updating: ") + path)
+      unformatted += 1
+    if cache_entry == None:
+      cache.pop(path, None)
     else:
-      parts = pattern.split('.')
-      prefix = '.'.join(parts[:-1])
-      ext = parts[-1]
-    for file in all_files:
-      canonical_file = file.replace('\\', '/')
-      if canonical_file .startswith(prefix) and canonical_file .endswith(ext):
-        text = read_text(file)
-        text = matcher.apply(text)
-        write_text(file, text, matcher.newline_char, matcher.include_bom)
+      cache[path] = cache_entry
 
-def read_text(path):
-  c = open(path, 'rb')
-  raw_bytes = c.read()
+  if use_cache:
+    save_cache(cache_key, cache)
+
+  return not (check_only and unformatted > 0)
+
+# Applies the styles to the file in order and writes it if it changed (unless only checking). Returns whether it
+# changed and the new cache entry for the file, which is None if the file isn't formatted.
+def format_file(job):
+  path, style_names, check_only, cached = job
+  old_bytes = read_bytes(path)
+  old_hash = hashlib.sha1(old_bytes).hexdigest()
+  stat = os.stat(path)
+
+  # The file was touched but its content is what was already formatted.
+  if cached != None and cached[2] == old_hash:
+    return False, [stat.st_mtime_ns, stat.st_size, old_hash]
+
+  text = decode_text(old_bytes)
+  for style_name in style_names:
+    text = styles[style_name].apply(text)
+  style = styles[style_names[-1]]
+  new_bytes = encode_text(text, style.newline_char, style.include_bom)
+
+  if new_bytes == old_bytes:
+    return False, [stat.st_mtime_ns, stat.st_size, old_hash]
+  if check_only:
+    return True, None
+
+  c = open(path, 'wb')
+  c.write(new_bytes)
+  c.close()
+  stat = os.stat(path)
+  return True, [stat.st_mtime_ns, stat.st_size, hashlib.sha1(new_bytes).hexdigest()]
+
+def load_cache(cache_key):
+  try:
+    cache = json.loads(read_bytes(CACHE_FILE).decode('utf-8'))
+  except (OSError, ValueError):
+    return {}
+  if cache.get('key') != cache_key:
+    return {}
+  return cache.get('files', {})
+
+def save_cache(cache_key, files):
+  os.makedirs(os.path.dirname(CACHE_FILE), exist_ok = True)
+  c = open(CACHE_FILE, 'wb')
+  c.write(json.dumps({ 'key': cache_key, 'files': files }).encode('utf-8'))
   c.close()
-  if len(raw_bytes) > 3 and raw_bytes[0] == 239 and raw_bytes[1] == 187 and raw_bytes[2] == 191:
+
+def read_text(path):
+  return decode_text(read_bytes(path))
+
+def decode_text(raw_bytes):
+  if len(raw_bytes) > 3 and raw_bytes.startswith(BOM):
     raw_bytes = raw_bytes[3:]
   try:
     return raw_bytes.decode('utf-8')
-  except:
-    pass
-  ascii = []
-  for c in raw_bytes:
-    ascii.append(chr(c))
-  return ''.join(ascii)
+  except UnicodeDecodeError:
+    return raw_bytes.decode('latin-1')
 
 def read_bytes(path):
   c = open(path, 'rb')
-  text = c.read()
+  raw_bytes = c.read()
   c.close()
-  return bytearray(text)
+  return raw_bytes
 
-def string_to_byte_array(s):
-  if sys.version_info.major == 2:
-    return array.array('B', s)
-  else:
-    return bytearray(s, 'utf-8')
-
-def write_text(path, text, newline_char, include_bom):
-  bytes = string_to_byte_array(text)
+def encode_text(text, newline_char, include_bom):
+  raw_bytes = text.encode('utf-8')
+  if newline_char != '\n':
+    raw_bytes = raw_bytes.replace(b'\n', b'\r\n')
   if include_bom:
-    new_bytes = [239, 187, 191]
-  else:
-    new_bytes = []
-  if newline_char == '\n':
-    for byte in bytes:
-      new_bytes.append(byte)
-  else:
-    for byte in bytes:
-      if byte == 10:
-        new_bytes.append(13)
-        new_bytes.append(10)
-      else:
-        new_bytes.append(byte)
-
-  old_bytes = read_bytes(path)
-  update = False
-  if len(old_bytes) != len(new_bytes):
-    update = True
-  elif len(old_bytes) > 0:
-    if old_bytes[-1] != new_bytes[-1]:
-      update = True
-    else:
-      for old, new in zip(old_bytes, new_bytes):
-        if old != new:
-          update = True
-          break
-
-  if update:
-    print("Updating: " + path)
-    c = open(path, 'wb')
-    c.write(bytearray(new_bytes))
-    c.close()
+    raw_bytes = BOM + raw_bytes
+  return raw_bytes
 
 def fix_pbxproj_file(lines, devId):
   output = []
@@ -268,4 +337,5 @@ def fix_pbxproj_file(lines, devId):
       output.append(line)
   return output
 
-main()
+if __name__ == '__main__':
+  sys.exit(0 if main(sys.argv[1:]) else 1)
@@ -0,0 +1,76 @@
+import json
+import os
+import subprocess
+import threading
+
+# Client for a Pastel compiler running as a server (pastel --serve). A single compiler process handles all
+# the builds, so .NET startup and JIT compilation are only paid for once.
+#
+# e.g.
+#   with PastelClient('path/to/pastel') as client:
+#       result = client.build('path/to/build.json', ['python'])
+#       if not result['success']: print('\n'.join(result['errors']))
+
+class PastelClient:
+
+    def __init__(self, pastel_exec_path, watch = False):
+        args = [pastel_exec_path, '--serve']
+        if watch: args.append('--watch')
+        self.process = subprocess.Popen(
+            args,
+            stdin = subprocess.PIPE,
+            stdout = subprocess.PIPE,
+            encoding = 'utf-8')
+        self.next_id = 1
+        self.events = []
+        self.lock = threading.Lock()
+
+    # Builds the given targets, or the default target if none are given. Returns the server's response, which
+    # has 'success', a list of 'errors', and a list of 'targets' with the status and written files of each.
+    def build(self, project_path, targets = None):
+        request = { 'command': 'build', 'project': os.path.abspath(project_path) }
+        if targets != None: request['targets'] = targets
+        return self.send(request)
+
+    # Returns the same text that running pastel from the command line would print for a single target.
+    def build_output(self, project_path, target = None):
+        return '\n'.join(self.build(project_path, None if target == None else [target])['errors'])
+
+    # The server handles one request at a time, so requests from other threads wait for the response.
+    def send(self, request):
+        with self.lock:
+            request = dict(request)
+            request['id'] = self.next_id
+            self.next_id += 1
+            self.process.stdin.write(json.dumps(request) + '\n')
+            self.process.stdin.flush()
+            while True:
+                message = self.read_message()
+                if message.get('id') == request['id']:
+                    return message
+                self.events.append(message)
+
+    # Blocks until the server sends a watch mode rebuild notification.
+    def wait_for_event(self):
+        if len(self.events) > 0:
+            return self.events.pop(0)
+        return self.read_message()
+
+    def read_message(self):
+        line = self.process.stdout.readline()
+        if line == '':
+            raise Exception("The Pastel server exited unexpectedly.")
+        return json.loads(line)
+
+    def close(self):
+        if self.process.poll() == None:
+            self.process.stdin.write(json.dumps({ 'command': 'shutdown' }) + '\n')
+            self.process.stdin.close()
+            self.process.wait()
+        self.process.stdout.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
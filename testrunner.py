@@ -1,9 +1,19 @@
 import json
 import os
 import random
+import shutil
+import subprocess
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from xml.sax.saxutils import escape, quoteattr
+from pastelclient import PastelClient
 
-ALL_FVT_PLATFORMS = ['csharp', 'go', 'java', 'js', 'python']
+ALL_FVT_PLATFORMS = ['csharp', 'go', 'java', 'js', 'python', 'python-hoist-globals', 'python-instrumented', 'python-split-modules', 'python-type-hints', 'python-typed-arrays']
+
+# Platforms that need a separate compile step. All the tests for these are generated into one project, each in
+# its own namespace, so that it's only compiled once.
+BATCHED_PLATFORMS = ['csharp', 'java']
 
 PYTHON_COMMAND = 'python' if os.name == 'nt' else 'python3'
 
@@ -20,155 +30,282 @@ def file_write_text(path, content):
     c.write(content.encode('utf-8'))
     c.close()
 
+# Returns everything the command wrote to stdout and stderr. Commands run on several threads at once, so the
+# working directory is passed to the process instead of being changed for the whole runner.
 def run_command(ex, args = None, cwd = None):
     cmd = ex
     if args != None: cmd += ' ' + ' '.join(args)
-    old_dir = os.getcwd()
-    try:
-        if cwd != None:
-            os.chdir(cwd)
-        c = os.popen(cmd)
-        t = c.read()
-        c.close()
-    finally:
-        if cwd != None:
-            os.chdir(old_dir)
-
-    return t
-
-def generate_csharp_guid():
-    HEX = list('0123456789ABCDEF')
-    output = list('HHHHHHHH-HHHH-HHHH-HHHH-HHHHHHHHHHHH')
-    for i in range(len(output)):
-        if output[i] == 'H':
-            output[i] = random.choice(HEX)
-    return ''.join(output)
-
-def run_fvt_tests(pastel_exec_path, platforms):
+    result = subprocess.run(cmd, shell = True, cwd = cwd, stdout = subprocess.PIPE, stderr = subprocess.STDOUT)
+    return result.stdout.decode('utf-8', 'replace').replace('\r\n', '\n')
+
+class TestResult:
+    def __init__(self, suite, name, platform):
+        self.suite = suite
+        self.name = name
+        self.platform = platform
+        self.passed = True
+        self.output = ''
+        self.seconds = 0.0
+
+    def fail(self, message):
+        self.passed = False
+        self.output = message
+
+    def get_id(self):
+        return self.name if self.platform == None else self.name + ' [' + self.platform + ']'
+
+class FvtJob:
+    def __init__(self, test_id, platform, dst_dir, batch_dir, input_files, culled_names, ordered_names):
+        self.test_id = test_id
+        self.platform = platform
+        self.dst_dir = dst_dir
+        self.batch_dir = batch_dir
+        self.input_files = input_files
+        self.culled_names = culled_names
+        self.ordered_names = ordered_names
+        self.result = TestResult('fvt', test_id, platform)
+
+# Returns a function that builds a target and returns what pastel printed, which is empty on success.
+def create_pastel_builder(pastel_exec_path, client):
+    if client != None:
+        return lambda build_path, target: client.build_output(build_path, target)
+    return lambda build_path, target: run_command(pastel_exec_path, [build_path, target])
+
+# Namespaces and packages can't have the characters that are allowed in test names.
+def get_namespace_safe_id(test_id):
+    return ''.join(c if c.isalnum() else '_' for c in test_id)
+
+def create_fvt_target(platform, test_id):
+    if platform == 'csharp': return create_csharp_target('csharp', 'PastelTest.Tests.' + get_namespace_safe_id(test_id), 'FunctionWrapper.cs', 'csgen')
+    if platform == 'go': return create_go_target('go', 'gogen', 'gofuncs.go', '.')
+    if platform == 'java': return create_java_target('java', 'FunctionWrapper.java', '.', package = 'fvt_' + get_namespace_safe_id(test_id))
+    if platform == 'js': return create_javascript_target('js', 'gen.js')
+    if platform == 'python': return create_python_target('python', 'pygen/__init__.py')
+    if platform == 'python-hoist-globals': return create_python_target('python-hoist-globals', 'pygen/__init__.py', hoist_globals = True)
+    if platform == 'python-instrumented': return create_python_target('python-instrumented', 'pygen/__init__.py', instrument = True)
+    if platform == 'python-split-modules': return create_python_target('python-split-modules', 'pygen/__init__.py', modules = 'call-graph')
+    if platform == 'python-type-hints': return create_python_target('python-type-hints', 'pygen/__init__.py', type_hints = True)
+    if platform == 'python-typed-arrays': return create_python_target('python-typed-arrays', 'pygen/__init__.py', typed_arrays = True)
+    raise Exception("Unknown platform: " + platform)
+
+# The constants that let the test code check which platform it's running on.
+def create_platform_constants(platform):
+    return '\n'.join([
+        'const bool IS_CSHARP = ' + str(platform == 'csharp').lower() + ';',
+        'const bool IS_GO = ' + str(platform == 'go').lower() + ';',
+        'const bool IS_JAVA = ' + str(platform == 'java').lower() + ';',
+        'const bool IS_JS = ' + str(platform == 'js').lower() + ';',
+        'const bool IS_PYTHON = ' + str(platform.startswith('python')).lower() + ';',
+        '',
+    ])
+
+# A test can set build options with comments at the top of its code:
+#   // entry-points: name1 name2      -- the "entry-points" of the build file
+#   // culled: name1 name2            -- FVT only: names that must not appear in any generated file
+#   // culled[python]: name1 name2    -- the same, only for that platform (python also covers python-typed-arrays, etc.)
+#   // ordered: name1 name2           -- FVT only: names that must first appear in this order in the generated code
+#   // profile: {"name": 1}           -- FVT only: the execution profile that the target is built with
+def get_test_directives(test_code, platform):
+    directives = { 'entry-points': None, 'culled': [], 'ordered': [], 'profile': None }
+    for line in test_code.split('\n'):
+        line = line.strip()
+        if not line.startswith('//'): break
+        if ':' not in line: continue
+        name, values = line[2:].split(':', 1)
+        name = name.strip()
+        if name.endswith(']'):
+            name, name_platform = name[:-1].split('[')
+            if platform != name_platform and not platform.startswith(name_platform + '-'): continue
+        if name == 'entry-points':
+            directives['entry-points'] = values.split()
+        elif name == 'culled':
+            directives['culled'] += values.split()
+        elif name == 'ordered':
+            directives['ordered'] += values.split()
+        elif name == 'profile':
+            directives['profile'] = values.strip()
+    return directives
+
+# Every (test, platform) pair is a separate job. Jobs are run in 3 stages, each in parallel: transpiling with
+# pastel, compiling the batched platforms, and running the tests.
+def run_fvt_tests(pastel_build, platforms, pool, keep_temp):
     fvt_dir = os.path.join('tests', 'fvt')
     test_libs = {}
     fvt_lib_dir = os.path.join('tests', 'fvt-lib')
     for file in os.listdir(fvt_lib_dir):
         test_libs[file] = file_read_text(os.path.join(fvt_lib_dir, file))
 
-    sln_code = test_libs['PastelTest.sln']
-    sln_code = sln_code.replace('PROJ_GUID', generate_csharp_guid())
-    sln_code = sln_code.replace('SOLUTION_GUID', generate_csharp_guid())
-    test_libs['PastelTest.sln'] = sln_code
-
     test_ids = [file[:-len('.pst')] for file in os.listdir(fvt_dir) if file.endswith('.pst')]
     test_ids.sort()
 
-    for test_id in test_ids:
-        test_code = file_read_text(os.path.join(fvt_dir, test_id + '.pst'))
-        dst_dir = get_temp_dir(test_id)
-        files = test_libs.copy()
-        files['test.json'] = json.dumps({
-            'source': 'index.pst',
-            'targets': [
-                create_csharp_target('csharp', 'PastelTest.GeneratedCode', 'FunctionWrapper.cs', 'csgen'),
-                create_go_target('go', 'gogen', 'gofuncs.go', '.'),
-                create_java_target('java', 'FunctionWrapper.java', '.'),
-                create_javascript_target('js', 'gen.js'),
-                create_python_target('python', 'pygen/__init__.py'),
-            ]
-        }, indent = 2)
-        files['test.pst'] = test_code
-        for file in files.keys():
-            file_write_text(os.path.join(dst_dir, file), files[file])
-
-        build_path = os.path.join(dst_dir, 'test.json')
-        all_pass = True
-        applicable_platforms = platforms[:]
-        if test_id.endswith(']'):
-            t = test_id.split('[')
-            applicable_platforms = [t.pop()[:-1]]
-            test_id = '['.join(t)
-
-        for platform in applicable_platforms:
-            print("Running FVT: " + test_id + " [" + platform + "]")
-
-            file_write_text(os.path.join(dst_dir, 'platform.pst'), '\n'.join([
-                'const bool IS_CSHARP = ' + str(platform == 'csharp').lower() + ';',
-                'const bool IS_GO = ' + str(platform == 'go').lower() + ';',
-                'const bool IS_JAVA = ' + str(platform == 'java').lower() + ';',
-                'const bool IS_JS = ' + str(platform == 'js').lower() + ';',
-                'const bool IS_PYTHON = ' + str(platform == 'python').lower() + ';',
-                '',
-            ]))
-            result = run_command(pastel_exec_path, [build_path, platform]).strip()
-
-            if result != '':
-                print(FAIL_STR + " -- Pastel compilation")
-                print(result)
-                all_pass = False
-                break
-
-            if platform == 'js':
-                # TODO: add option to apply default export to exported JS code.
-                gen_js_path = os.path.join(dst_dir, 'gen.js')
-                file_write_text(
-                    gen_js_path,
-                    file_read_text(gen_js_path) + '\n\n' + 'export default { runner, registerExtension: PASTEL_regCallback };\n')
-
-                node_result = run_command('node', ['index.js'], cwd = dst_dir).strip()
-                if node_result != '':
-                    print(FAIL_STR)
-                    print(node_result)
-                    all_pass = False
-                    break
-
-            elif platform == 'python':
-                py_result = run_command(PYTHON_COMMAND, ['main.py'], cwd = dst_dir)
-                if py_result != '':
-                    print(FAIL_STR)
-                    print(py_result)
-                    all_pass = False
-                    break
-
-            elif platform == 'java':
-                javac_result = run_command('javac', ['*.java'], cwd = dst_dir).strip()
-                if javac_result != '':
-                    print(FAIL_STR + ' -- Java compilation')
-                    print(javac_result)
-                    all_pass = False
-                    break
-
-                java_result = run_command('java', ['PastelTest'], cwd = dst_dir).strip()
-                if java_result != '':
-                    print(FAIL_STR)
-                    print(java_result)
-                    all_pass = False
-                    break
-
-            elif platform == 'csharp':
-                csc_result = run_command('dotnet', ['build', 'PastelTest.sln'], cwd = dst_dir).strip()
-                if 'Build succeeded.' not in csc_result:
-                    print(FAIL_STR + ' -- C# compilation')
-                    print(csc_result)
-                    all_pass = False
-                    break
-
-                cs_run_result = run_command(os.path.join('bin', 'Debug', 'net8.0', 'PastelTest'), [], cwd = dst_dir).strip()
-                if cs_run_result != '':
-                    print(FAIL_STR)
-                    print(csc_result)
-                    all_pass = False
-                    break
-
-            elif platform == 'go':
-                go_result = run_command('go', ['run', '*.go'], cwd = dst_dir).strip()
-                if go_result != '':
-                    print(FAIL_STR + ' -- Go compilation')
-                    print(go_result)
-                    all_pass = False
-                    break
-
-            else:
-                raise Exception("TODO: implement automatic runner for this platform")
-
-        if all_pass:
-            pass # TODO: delete directory
+    jobs = []
+    batch_dirs = {}
+    for platform in sorted(platforms):
+        if platform in BATCHED_PLATFORMS:
+            batch_dirs[platform] = get_temp_dir('fvt_' + platform)
+        for test_file_id in test_ids:
+            test_id = test_file_id
+            if test_id.endswith(']'):
+                t = test_id.split('[')
+                if t.pop()[:-1] != platform: continue
+                test_id = '['.join(t)
+
+            batch_dir = batch_dirs.get(platform)
+            dst_dir = os.path.join(batch_dir, test_id) if batch_dir != None else get_temp_dir(test_id + '_' + platform)
+            ensure_dir_exists(dst_dir)
+            files = {}
+            for file in test_libs:
+                # The host program of a batched platform is shared by all the tests and is added when they're compiled.
+                if batch_dir == None or file.endswith('.pst'):
+                    files[file] = test_libs[file]
+            files['test.pst'] = file_read_text(os.path.join(fvt_dir, test_file_id + '.pst'))
+            files['platform.pst'] = create_platform_constants(platform)
+            directives = get_test_directives(files['test.pst'], platform)
+            build_file = { 'source': 'index.pst' }
+            if directives['entry-points'] != None:
+                build_file['entry-points'] = directives['entry-points']
+            build_file['targets'] = [create_fvt_target(platform, test_id)]
+            if directives['profile'] != None:
+                files['test-profile.json'] = directives['profile']
+                build_file['targets'][0]['profile'] = 'test-profile.json'
+            files['test.json'] = json.dumps(build_file, indent = 2)
+            for file in files.keys():
+                file_write_text(os.path.join(dst_dir, file), files[file])
+            jobs.append(FvtJob(test_id, platform, dst_dir, batch_dir, set(files.keys()), directives['culled'], directives['ordered']))
+
+    list(pool.map(lambda job: transpile_fvt_test(pastel_build, job), jobs))
+
+    compile_results = {}
+    for platform, result in zip(batch_dirs.keys(), pool.map(
+            lambda platform: compile_fvt_batch(platform, batch_dirs[platform], test_libs, [job for job in jobs if job.platform == platform]),
+            batch_dirs.keys())):
+        compile_results[platform] = result
+
+    list(pool.map(run_fvt_test, jobs))
+
+    results = []
+    for platform in sorted(compile_results.keys()):
+        if not compile_results[platform].passed:
+            print(compile_results[platform].output)
+        results.append(compile_results[platform])
+    jobs.sort(key = lambda job: (job.test_id, job.platform))
+    for job in jobs:
+        print("Running FVT: " + job.test_id + " [" + job.platform + "]")
+        if not job.result.passed:
+            print(job.result.output)
+        results.append(job.result)
+
+    if not keep_temp:
+        for job in jobs:
+            if job.result.passed and job.batch_dir == None:
+                shutil.rmtree(job.dst_dir)
+        for platform in batch_dirs:
+            if all(job.result.passed for job in jobs if job.platform == platform):
+                shutil.rmtree(batch_dirs[platform])
+    return results
+
+def transpile_fvt_test(pastel_build, job):
+    start = time.time()
+    result = pastel_build(os.path.join(job.dst_dir, 'test.json'), job.platform).strip()
+    found = find_culled_names(job) if result == '' else []
+    misordered = find_misordered_names(job) if result == '' else []
+    if result != '':
+        job.result.fail(FAIL_STR + " -- Pastel compilation\n" + result)
+    elif len(found) > 0:
+        job.result.fail(FAIL_STR + " -- Culled names found in the generated code\n" + '\n'.join(found))
+    elif len(misordered) > 0:
+        job.result.fail(FAIL_STR + " -- Names out of order in the generated code\n" + '\n'.join(misordered))
+    elif job.platform == 'js':
+        # TODO: add option to apply default export to exported JS code.
+        gen_js_path = os.path.join(job.dst_dir, 'gen.js')
+        file_write_text(
+            gen_js_path,
+            file_read_text(gen_js_path) + '\n\n' + 'export default { runner, registerExtension: PASTEL_regCallback };\n')
+    job.result.seconds += time.time() - start
+
+# Returns a line for each generated file that contains a name that the test expects to be culled.
+def find_culled_names(job):
+    found = []
+    if len(job.culled_names) == 0: return found
+    for dir_path, _, files in os.walk(job.dst_dir):
+        for file in files:
+            path = os.path.join(dir_path, file)
+            rel_path = os.path.relpath(path, job.dst_dir)
+            if rel_path in job.input_files: continue
+            content = file_read_text(path)
+            for name in job.culled_names:
+                # The counters of an instrumented build are still named after the functions that were inlined.
+                if job.platform == 'python-instrumented': content = content.replace('"' + name + '"', '')
+                if name in content:
+                    found.append(rel_path + ': ' + name)
+    return found
+
+# Returns a line for each generated file that contains the first of the names that the test expects in order, but
+# not all of them in that order.
+def find_misordered_names(job):
+    found = []
+    if len(job.ordered_names) == 0: return found
+    for dir_path, _, files in os.walk(job.dst_dir):
+        for file in files:
+            path = os.path.join(dir_path, file)
+            rel_path = os.path.relpath(path, job.dst_dir)
+            if rel_path in job.input_files: continue
+            content = file_read_text(path)
+            if job.ordered_names[0] not in content: continue
+            indexes = [content.find(name) for name in job.ordered_names]
+            if -1 in indexes or indexes != sorted(indexes):
+                found.append(rel_path + ': ' + ' '.join(sorted(job.ordered_names, key = lambda name: content.find(name))))
+    return found
+
+# Returns the result of compiling the batch. If it fails, each of its tests is also marked as failed.
+def compile_fvt_batch(platform, batch_dir, test_libs, jobs):
+    compile_result = TestResult('fvt', '(compile)', platform)
+    start = time.time()
+    jobs = [job for job in jobs if job.result.passed]
+    if platform == 'csharp':
+        file_write_text(os.path.join(batch_dir, 'PastelTest.csproj'), test_libs['PastelTest.csproj'])
+        file_write_text(os.path.join(batch_dir, 'Program.cs'), test_libs['Program.cs'])
+        output = run_command('dotnet', ['build', 'PastelTest.csproj'], cwd = batch_dir).strip()
+        if 'Build succeeded.' not in output:
+            compile_result.fail(FAIL_STR + ' -- C# compilation\n' + output)
+
+    elif platform == 'java':
+        java_files = []
+        for job in jobs:
+            package = 'fvt_' + get_namespace_safe_id(job.test_id)
+            file_write_text(os.path.join(job.dst_dir, 'PastelTest.java'), 'package ' + package + ';\n\n' + test_libs['PastelTest.java'])
+            java_files += [os.path.join(job.test_id, file) for file in os.listdir(job.dst_dir) if file.endswith('.java')]
+        if len(java_files) > 0:
+            output = run_command('javac', ['-d', 'classes'] + java_files, cwd = batch_dir).strip()
+            if output != '':
+                compile_result.fail(FAIL_STR + ' -- Java compilation\n' + output)
+
+    compile_result.seconds = time.time() - start
+    if not compile_result.passed:
+        for job in jobs:
+            job.result.fail(FAIL_STR + ' -- ' + platform + ' compilation of all the tests failed')
+    return compile_result
+
+def run_fvt_test(job):
+    if not job.result.passed: return
+    start = time.time()
+    platform = job.platform
+    if platform == 'js':
+        output = run_command('node', ['index.js'], cwd = job.dst_dir).strip()
+    elif platform.startswith('python'):
+        output = run_command(PYTHON_COMMAND, ['main.py'], cwd = job.dst_dir).strip()
+    elif platform == 'java':
+        output = run_command('java', ['-cp', 'classes', 'fvt_' + get_namespace_safe_id(job.test_id) + '.PastelTest'], cwd = job.batch_dir).strip()
+    elif platform == 'csharp':
+        output = run_command(os.path.join('bin', 'Debug', 'net8.0', 'PastelTest'), [get_namespace_safe_id(job.test_id)], cwd = job.batch_dir).strip()
+    elif platform == 'go':
+        output = run_command('go', ['run', '*.go'], cwd = job.dst_dir).strip()
+    else:
+        raise Exception("TODO: implement automatic runner for this platform")
+
+    if output != '':
+        job.result.fail(FAIL_STR + '\n' + output)
+    job.result.seconds += time.time() - start
 
 def get_test_file_data(content, test_file_path, project_runtime_dir):
     lines = content.replace('\r\n', '\n').split('\n')
@@ -183,9 +320,9 @@ def get_test_file_data(content, test_file_path, project_runtime_dir):
             return (test_code, expected_error)
     raise Exception("Invalid test file: " + test_file_path)
 
-def create_java_target(name, func_path, struct_path):
+def create_java_target(name, func_path, struct_path, package = None):
     if not func_path.endswith('.java'): raise Exception()
-    return {
+    target = {
         'name': name,
         'language': 'java',
         'output': {
@@ -194,6 +331,9 @@ def create_java_target(name, func_path, struct_path):
             'functions-wrapper-class': func_path[:-len('.java')],
         }
     }
+    if package != None:
+        target['output']['namespace'] = package
+    return target
 
 def create_csharp_target(name, ns, func_path, struct_path):
     if not func_path.endswith('.cs'): raise Exception()
@@ -230,60 +370,128 @@ def create_javascript_target(name, func_path):
         'output': { 'functions-path': func_path, }
     }
 
-def create_python_target(name, func_path):
-    return {
+def create_python_target(name, func_path, typed_arrays = False, modules = None, instrument = False, type_hints = False, hoist_globals = False):
+    target = {
         'name': name,
         'language': 'python',
         'output': {  'functions-path': func_path }
     }
-
-def run_error_tests(pastel_exec_path):
+    if typed_arrays:
+        target['python-typed-arrays'] = True
+    if modules != None:
+        target['python-modules'] = modules
+    if instrument:
+        target['instrument'] = True
+    if type_hints:
+        target['python-type-hints'] = True
+    if hoist_globals:
+        target['python-hoist-globals'] = True
+    return target
+
+def run_error_tests(pastel_build, pool, keep_temp):
     error_dir = os.path.join('tests', 'errors')
     test_ids = [f[:-len('.txt')] for f in os.listdir(error_dir) if f.lower().endswith('.txt')]
     test_ids.sort()
-    for test_id in test_ids:
-        dst_path = get_temp_dir(test_id)
-        test_path = os.path.join(error_dir, test_id + '.txt')
-        test_content = file_read_text(test_path)
-        code, expected = get_test_file_data(test_content, test_path, dst_path)
-        code_path = os.path.abspath(os.path.join(dst_path, 'test.pst'))
-        lang_id = 'js'
-        if test_id.endswith(']'):
-            lang_id = test_id.split('[').pop()[:-1]
-        build_file = {
-            'source': 'test.pst',
-            'targets': [
-                {
-                    'csharp': create_csharp_target('test', 'PastelGenerated', 'FunctionWrapper.cs', '.'),
-                    'go': create_go_target('test', 'gogen', 'gofuncs.go', '.'),
-                    'java': create_java_target('test', 'FunctionWrapper.java', '.'),
-                    'js': create_javascript_target('test', 'gen.js'),
-                    'python': create_python_target('test', 'gen.py'),
-                }[lang_id]
-            ]
-        }
-        build_path = os.path.join(dst_path, 'test.json')
-        file_write_text(
-            build_path,
-            json.dumps(build_file, indent = 2))
-        file_write_text(
-            code_path,
-            code)
-
-        actual = run_command(pastel_exec_path, [build_path, 'test']).strip().replace('\r\n', '\n')
-        actual = actual.replace(code_path, 'test.pst')
-        print("Running Error Test: " + test_id)
-        if expected != actual:
-            print("FAIL!")
-            print("BUILD FILE:")
-            print("  " + os.path.abspath(build_path))
-            print('-' * 40)
-            print("Expected:\n" + expected)
-            print('-' * 40)
-            print("Actual:\n" + actual)
-            print('-' * 40)
-        else:
-            pass # TODO: delete the tmp directory
+    results = list(pool.map(lambda test_id: run_error_test(pastel_build, error_dir, test_id, keep_temp), test_ids))
+    for result in results:
+        print("Running Error Test: " + result.name)
+        if not result.passed:
+            print(result.output)
+    return results
+
+def run_error_test(pastel_build, error_dir, test_id, keep_temp):
+    result = TestResult('errors', test_id, None)
+    start = time.time()
+    dst_path = get_temp_dir(test_id)
+    test_path = os.path.join(error_dir, test_id + '.txt')
+    test_content = file_read_text(test_path)
+    code, expected = get_test_file_data(test_content, test_path, dst_path)
+    code_path = os.path.abspath(os.path.join(dst_path, 'test.pst'))
+    lang_id = 'js'
+    if test_id.endswith(']'):
+        lang_id = test_id.split('[').pop()[:-1]
+    build_file = { 'source': 'test.pst' }
+    entry_points = get_test_directives(code, lang_id)['entry-points']
+    if entry_points != None:
+        build_file['entry-points'] = entry_points
+    build_file['targets'] = [
+        {
+            'csharp': create_csharp_target('test', 'PastelGenerated', 'FunctionWrapper.cs', '.'),
+            'go': create_go_target('test', 'gogen', 'gofuncs.go', '.'),
+            'java': create_java_target('test', 'FunctionWrapper.java', '.'),
+            'js': create_javascript_target('test', 'gen.js'),
+            'python': create_python_target('test', 'gen.py'),
+        }[lang_id]
+    ]
+    build_path = os.path.join(dst_path, 'test.json')
+    file_write_text(
+        build_path,
+        json.dumps(build_file, indent = 2))
+    file_write_text(
+        code_path,
+        code)
+
+    actual = pastel_build(build_path, 'test').strip().replace('\r\n', '\n')
+    actual = actual.replace(code_path, 'test.pst')
+    if expected != actual:
+        result.fail('\n'.join([
+            "FAIL!",
+            "BUILD FILE:",
+            "  " + os.path.abspath(build_path),
+            '-' * 40,
+            "Expected:\n" + expected,
+            '-' * 40,
+            "Actual:\n" + actual,
+            '-' * 40,
+        ]))
+    elif not keep_temp:
+        shutil.rmtree(dst_path)
+    result.seconds = time.time() - start
+    return result
+
+def write_json_report(path, results, seconds):
+    file_write_text(path, json.dumps({
+        'tests': len(results),
+        'failures': sum(1 for r in results if not r.passed),
+        'seconds': round(seconds, 3),
+        'results': [
+            {
+                'suite': r.suite,
+                'name': r.name,
+                'platform': r.platform,
+                'passed': r.passed,
+                'seconds': round(r.seconds, 3),
+                'output': r.output,
+            } for r in results
+        ],
+    }, indent = 2) + '\n')
+
+# Each suite and platform (e.g. fvt.python) is a separate <testsuite>.
+def write_junit_report(path, results, seconds):
+    suites = {}
+    for r in results:
+        suite_name = r.suite if r.platform == None else r.suite + '.' + r.platform
+        suites.setdefault(suite_name, []).append(r)
+
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<testsuites tests="%d" failures="%d" time="%.3f">' % (len(results), sum(1 for r in results if not r.passed), seconds),
+    ]
+    for suite_name in sorted(suites.keys()):
+        suite = suites[suite_name]
+        lines.append('  <testsuite name=%s tests="%d" failures="%d" time="%.3f">' % (
+            quoteattr(suite_name), len(suite), sum(1 for r in suite if not r.passed), sum(r.seconds for r in suite)))
+        for r in suite:
+            testcase = '    <testcase classname=%s name=%s time="%.3f"' % (quoteattr(suite_name), quoteattr(r.name), r.seconds)
+            if r.passed:
+                lines.append(testcase + ' />')
+            else:
+                lines.append(testcase + '>')
+                lines.append('      <failure message=%s>%s</failure>' % (quoteattr(r.output.split('\n')[0]), escape(r.output)))
+                lines.append('    </testcase>')
+        lines.append('  </testsuite>')
+    lines.append('</testsuites>')
+    file_write_text(path, '\n'.join(lines) + '\n')
 
 LETTERS = 'abcdefghijklmnopqrstuvwyxz'
 CHARS = list(LETTERS + LETTERS.upper() + '0123456789')
@@ -303,46 +511,95 @@ def get_temp_dir(hint = None):
     ensure_dir_exists(path)
     return path
 
+# Returns True if all the tests passed.
 def main(args):
     if len(args) == 0:
-        print("Usage: python testrunner.py path/to/pastel/binary/pastel[.exe] --errtests --fvt:[ all | " + ' | '.join(ALL_FVT_PLATFORMS) + "]")
+        print("Usage: python testrunner.py path/to/pastel/binary/pastel[.exe] --errtests --fvt:[ all | " + ' | '.join(ALL_FVT_PLATFORMS) + "] [--serve] [-j N] [--keep-temp] [--json:report.json] [--junit:report.xml]")
         print("")
         print("e.g. python testrunner.py ./bin/pastel --errtests --fvt:js --fvt:python")
-        return
+        print("")
+        print("--serve runs all the builds in a single pastel process instead of starting pastel for each one.")
+        print("-j sets how many tests run at the same time (default: the number of CPUs).")
+        print("--keep-temp keeps the generated projects in tests/tmp even when the tests pass.")
+        print("--json and --junit write a report of the results and the duration of each test.")
+        return False
 
     pastel_path = args[0]
     if not os.path.exists(pastel_path):
         print("Path does not exist: " + pastel_path[:999])
-        return
+        return False
 
     fvt_flags = []
     enable_err = False
-    for arg in args[1:]:
+    use_server = False
+    keep_temp = False
+    jobs = os.cpu_count() or 1
+    json_report_path = None
+    junit_report_path = None
+    remaining_args = args[1:]
+    while len(remaining_args) > 0:
+        arg = remaining_args.pop(0)
         if arg.startswith('--fvt:'):
             fvt_arg = arg[len('--fvt:'):]
             if fvt_arg == 'all':
                 fvt_flags += ALL_FVT_PLATFORMS
             elif fvt_arg not in ALL_FVT_PLATFORMS:
                 print("Unrecognized FVT arg: " + arg)
-                return
+                return False
             else:
                 fvt_flags.append(fvt_arg)
         elif arg == '--errtests':
             enable_err = True
+        elif arg == '--serve':
+            use_server = True
+        elif arg == '--keep-temp':
+            keep_temp = True
+        elif arg.startswith('-j'):
+            value = arg[2:] if len(arg) > 2 else (remaining_args.pop(0) if len(remaining_args) > 0 else '')
+            if not value.isdigit() or int(value) < 1:
+                print("-j requires a positive number")
+                return False
+            jobs = int(value)
+        elif arg.startswith('--json:'):
+            json_report_path = arg[len('--json:'):]
+        elif arg.startswith('--junit:'):
+            junit_report_path = arg[len('--junit:'):]
         else:
             print("Unknown arg: " + arg)
-            return
+            return False
 
     fvt_platforms = list(set(fvt_flags))
 
-    if len(fvt_platforms):
-        run_fvt_tests(pastel_path, fvt_platforms)
-    if enable_err:
-        run_error_tests(pastel_path)
+    start = time.time()
+    results = []
+    client = PastelClient(pastel_path) if use_server else None
+    try:
+        pastel_build = create_pastel_builder(pastel_path, client)
+        with ThreadPoolExecutor(max_workers = jobs) as pool:
+            if len(fvt_platforms):
+                results += run_fvt_tests(pastel_build, fvt_platforms, pool, keep_temp)
+            if enable_err:
+                results += run_error_tests(pastel_build, pool, keep_temp)
+    finally:
+        if client != None:
+            client.close()
+
+    tmp_dir = os.path.join('tests', 'tmp')
+    if os.path.isdir(tmp_dir) and len(os.listdir(tmp_dir)) == 0:
+        os.rmdir(tmp_dir)
+
+    seconds = time.time() - start
+    if json_report_path != None:
+        write_json_report(json_report_path, results, seconds)
+    if junit_report_path != None:
+        write_junit_report(junit_report_path, results, seconds)
+    return all(r.passed for r in results)
 
 if __name__ == '__main__':
     try:
-        main(sys.argv[1:])
+        passed = main(sys.argv[1:])
     except Exception as ex:
         print(FAIL_STR)
         print(ex)
+        passed = False
+    sys.exit(0 if passed else 1)
@@ -4,7 +4,12 @@ public class Program {
 
     public static void Main(string[] args) {
         try {
-            PastelTest.GeneratedCode.FunctionWrapper.runner();
+            // All the tests are compiled into this project, each in its own namespace. The test to run is passed in.
+            System.Type wrapper = typeof(Program).Assembly.GetType("PastelTest.Tests." + args[0] + ".FunctionWrapper")!;
+            wrapper.GetMethod("runner")!.Invoke(null, null);
+        } catch (System.Reflection.TargetInvocationException e) {
+            System.Console.WriteLine("*FAIL!* -- c# hard crash");
+            System.Console.WriteLine(e.InnerException);
         } catch (System.Exception e) {
             System.Console.WriteLine("*FAIL!* -- c# hard crash");
             System.Console.WriteLine(e);
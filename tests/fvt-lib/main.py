@@ -7,6 +7,9 @@ pygen.PST_RegisterExtensibleCallback('fail', lambda args: on_fail(args[0]))
 
 def main():
   pygen.V_runner()
+  # Only instrumented builds have this.
+  if hasattr(pygen, 'PST_dumpProfile'):
+    pygen.PST_dumpProfile('profile.json')
 
 if __name__ == '__main__':
   try: